@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""Load test of the multi-account worker pool.
+
+Runs one sync cycle for many accounts against a fake Wiener Netze API that
+answers after a configurable latency, and reports wall time, CPU time,
+memory per account and how evenly the API call slots were shared.
+MQTT publishes go to a counting stub, so only the sync itself is measured.
+
+By default the API is an in-process fake client. With ``--fake-server`` the
+real API client talks HTTP to the local fake API server instead, including
+the OAuth login, and 429/5xx/timeout faults can be injected.
+
+Usage:
+    python benchmarks/account_pool_load_test.py
+    python benchmarks/account_pool_load_test.py --accounts 50 --workers 8 --latency 0.2 --output results.json
+    python benchmarks/account_pool_load_test.py --fake-server --error-rate 0.05 --rate-limit-rate 0.05
+"""
+
+import argparse
+import json
+import logging
+import resource
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+# Add src directory and the test fixtures to Python path
+root_path = Path(__file__).parent.parent
+sys.path.insert(0, str(root_path / "src"))
+sys.path.insert(0, str(root_path))
+
+from wnsm_sync.config.loader import ConfigLoader, WNSMConfig
+from wnsm_sync.core.accounts import AccountPool
+from tests.fixtures.fake_api_server import FakeWienerNetzeServer, FaultProfile
+from tests.fixtures.fake_smartmeter import FakeSmartmeter
+from tests.fixtures.vienna_library import pinned_library
+
+
+class CountingPublisher:
+    """Stands in for the shared MQTT client and counts publishes."""
+    
+    class _RateLimiter:
+        throttled_seconds = 0.0
+    
+    def __init__(self):
+        self.rate_limiter = self._RateLimiter()
+        self.messages = 0
+    
+    def publish_message(self, topic: str, payload: Any, **kwargs) -> bool:
+        self.messages += 1
+        return True
+
+
+def jain_index(values) -> float:
+    """Jain's fairness index: 1.0 when all values are equal."""
+    values = list(values)
+    squares = sum(v * v for v in values)
+    if not values or squares == 0:
+        return 1.0
+    return sum(values) ** 2 / (len(values) * squares)
+
+
+def run(accounts: int, workers: int, latency: float, jitter: float, history_days: int,
+        server: Optional[FakeWienerNetzeServer] = None) -> Dict[str, Any]:
+    """Run one pool cycle and collect the measurements.
+    
+    Args:
+        accounts: Number of accounts
+        workers: ACCOUNT_WORKERS
+        latency: API latency of the in-process fake client
+        jitter: Additional random latency of the in-process fake client
+        history_days: Days fetched per account
+        server: Running fake API server to use instead of the in-process fake client
+    """
+    overrides: Dict[str, Any] = {"history_days": history_days}
+    if server is not None:
+        overrides.update(api_auth_url=server.auth_url, api_base_url=server.api_url,
+                         retry_delay=1, api_timeout=10)
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp_path = Path(tmp)
+        accounts_file = tmp_path / "accounts.json"
+        accounts_file.write_text(json.dumps([
+            {"name": f"account{i:03d}", "username": f"user{i}", "password": "secret",
+             "zp": server.zaehlpunkte_for(f"user{i}")[0] if server else f"AT0010000000000000001000000{i:06d}",
+             **overrides}
+            for i in range(accounts)
+        ]))
+        config = WNSMConfig(
+            wnsm_username="", wnsm_password="", zp="", mqtt_host="localhost",
+            accounts_file=str(accounts_file), account_workers=workers,
+            session_file=str(tmp_path / "session.json"),
+            schedule_state_file=str(tmp_path / "schedule_state.json"),
+            discovery_state_file=str(tmp_path / "discovery_state.json")
+        )
+        
+        tracemalloc.start()
+        memory_before = tracemalloc.get_traced_memory()[0]
+        
+        pool = AccountPool(config, ConfigLoader().load_accounts(config))
+        publisher = CountingPublisher()
+        FakeSmartmeter.reset_counters()
+        for index, sync in enumerate(pool.accounts.values()):
+            sync.mqtt_client = publisher
+            if server is None:
+                sync.shared.api_client = FakeSmartmeter(latency=latency, jitter=jitter, seed=index,
+                                                         api_slot=sync.shared.api_gate.slot)
+        
+        cpu_started = time.process_time()
+        started = time.monotonic()
+        success = pool.run_sync_cycle()
+        wall = time.monotonic() - started
+        cpu = time.process_time() - cpu_started
+        
+        memory_after, memory_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    
+    cycle_seconds = list(pool.cycle_seconds.values())
+    wait_seconds = list(pool.api_queue.wait_seconds.values())
+    # Lower bound: two API calls per account, spread over the workers
+    ideal = 2 * accounts * (latency + jitter / 2) / workers
+    
+    results = {
+        "accounts": accounts,
+        "workers": workers,
+        "latency": latency,
+        "jitter": jitter,
+        "history_days": history_days,
+        "success": success,
+        "failed_accounts": sorted(name for name, ok in pool.last_results.items() if not ok),
+        "wall_seconds": round(wall, 3),
+        "ideal_wall_seconds": round(ideal, 3),
+        "cpu_seconds": round(cpu, 3),
+        "max_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        "heap_bytes_per_account": (memory_after - memory_before) // max(1, accounts),
+        "heap_peak_bytes": memory_peak,
+        "max_api_in_flight": FakeSmartmeter.max_in_flight,
+        "mqtt_messages": publisher.messages,
+        "cycle_seconds": {
+            "min": round(min(cycle_seconds), 3),
+            "median": round(statistics.median(cycle_seconds), 3),
+            "max": round(max(cycle_seconds), 3)
+        },
+        "fairness": {
+            "granted_jain": round(jain_index(pool.api_queue.granted.values()), 4),
+            "wait_jain": round(jain_index(wait_seconds), 4),
+            "max_wait_seconds": round(max(wait_seconds), 3)
+        }
+    }
+    if server is not None:
+        stats = server.snapshot()
+        results["max_api_in_flight"] = stats["max_in_flight"]
+        results["server"] = stats
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--accounts", type=int, default=50, help="Number of accounts")
+    parser.add_argument("--workers", type=int, default=8, help="ACCOUNT_WORKERS")
+    parser.add_argument("--latency", type=float, default=0.1, help="API latency in seconds")
+    parser.add_argument("--jitter", type=float, default=0.05, help="Additional random API latency in seconds")
+    parser.add_argument("--history-days", type=int, default=1, help="Days fetched per account")
+    parser.add_argument("--fake-server", action="store_true", help="Use the HTTP fake API with the real client")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Share of 429 responses (--fake-server)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of 5xx responses (--fake-server)")
+    parser.add_argument("--timeout-rate", type=float, default=0.0, help="Share of hanging requests (--fake-server)")
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    args = parser.parse_args()
+    
+    # Per-cycle INFO logs of 50 accounts would dominate the measurement
+    logging.basicConfig(level=logging.WARNING)
+    
+    if args.fake_server:
+        faults = FaultProfile(latency=args.latency, jitter=args.jitter, rate_limit_rate=args.rate_limit_rate,
+                              error_rate=args.error_rate, timeout_rate=args.timeout_rate, hang_seconds=15, seed=1)
+        with FakeWienerNetzeServer(faults=faults) as server, pinned_library():
+            results = run(args.accounts, args.workers, args.latency, args.jitter, args.history_days, server)
+    else:
+        results = run(args.accounts, args.workers, args.latency, args.jitter, args.history_days)
+    
+    print(f"{results['accounts']} accounts, {results['workers']} workers: "
+          f"{results['wall_seconds']:.2f} s wall (ideal {results['ideal_wall_seconds']:.2f} s), "
+          f"{results['cpu_seconds']:.2f} s CPU")
+    print(f"  max API calls in flight: {results['max_api_in_flight']}")
+    print(f"  heap per account: {results['heap_bytes_per_account'] / 1024:.1f} KiB, "
+          f"max RSS: {results['max_rss_kb'] / 1024:.1f} MiB")
+    print(f"  cycle seconds: {results['cycle_seconds']}")
+    print(f"  fairness: {results['fairness']}")
+    if "server" in results:
+        print(f"  server requests: {results['server']['requests']}, faults: {results['server']['faults']}")
+    
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {args.output}")
+    
+    return 0 if results["success"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""Benchmark the per-request logging overhead of Smartmeter._call_api.
+
+Serves a canned bewegungsdaten response through a requests transport
+adapter, so the whole client path runs without network I/O, and measures
+the time per request with logging off, at INFO and at DEBUG. For
+comparison, the eager f-string logging the client used before (full
+headers and a 500-byte preview at INFO) is replayed on the same responses.
+Log output goes to an in-memory stream and its size per request is reported.
+Modes are measured interleaved ``--repeat`` times and the fastest run of
+each is kept, which filters out most of the scheduling and GC noise.
+
+Usage:
+    python benchmarks/api_logging_benchmark.py
+    python benchmarks/api_logging_benchmark.py --days 365 --requests 200 --repeat 9
+"""
+
+import argparse
+import io
+import json
+import logging
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Optional
+
+import requests
+from requests.adapters import BaseAdapter
+
+# Add src directory to Python path
+src_path = Path(__file__).parent.parent / "src"
+sys.path.insert(0, str(src_path))
+
+from wnsm_sync.api import client as api_client
+from wnsm_sync.api.client import Smartmeter
+
+ENDPOINT = "user/messwerte/bewegungsdaten"
+
+
+class CannedAdapter(BaseAdapter):
+    """Transport adapter answering every request with the same body."""
+    
+    def __init__(self, body: bytes):
+        super().__init__()
+        self.body = body
+    
+    def send(self, request, **kwargs):
+        response = requests.Response()
+        response.status_code = 200
+        response._content = self.body
+        response.headers["Content-Type"] = "application/json"
+        response.headers["Set-Cookie"] = "AUTH_SESSION_ID=0123456789abcdef; Path=/; Secure"
+        response.url = request.url
+        response.request = request
+        response.elapsed = timedelta(0)
+        return response
+    
+    def close(self):
+        pass
+
+
+def canned_body(days: int) -> bytes:
+    """bewegungsdaten response with 15-minute values for the given number of days."""
+    start = datetime(2024, 1, 1)
+    values = [
+        {
+            "wert": 0.1 + (slot % 96) / 1000,
+            "zeitpunktVon": (start + timedelta(minutes=15 * slot)).strftime("%Y-%m-%dT%H:%M:%S.000Z"),
+            "zeitpunktBis": (start + timedelta(minutes=15 * slot + 15)).strftime("%Y-%m-%dT%H:%M:%S.000Z"),
+            "geschaetzt": False
+        }
+        for slot in range(days * 96)
+    ]
+    return json.dumps({"descriptor": {"rolle": "V002"}, "values": values}).encode("utf-8")
+
+
+def legacy_logging(logger: logging.Logger, url: str, headers: Dict[str, str], response: requests.Response) -> None:
+    """The logging _call_api did per request before the low-overhead mode."""
+    logger.info(f"API call to {ENDPOINT} (base: None)")
+    logger.info("Checking token validity")
+    logger.info(f"Making API request to {url}")
+    logger.info(f"Headers: {headers}")
+    logger.info(f"Response status: {response.status_code}")
+    logger.info(f"Response headers: {response.headers}")
+    content_preview = response.content[:500].decode('utf-8', errors='replace')
+    logger.info(f"Response content preview: {content_preview}")
+
+
+def measure(smartmeter: Smartmeter, stream: io.StringIO, level: int, count: int,
+            legacy: Optional[logging.Logger] = None) -> Dict[str, float]:
+    """Time ``count`` API calls at a log level.
+    
+    Args:
+        smartmeter: Client with the canned adapter mounted
+        stream: Stream the log handler writes to
+        level: Level of the client's logger
+        count: Number of requests
+        legacy: Logger replaying the old logging at INFO, with the client's logging off
+    
+    Returns:
+        Microseconds and log bytes per request
+    """
+    api_client.logger.setLevel(logging.CRITICAL if legacy else level)
+    stream.seek(0)
+    stream.truncate()
+    
+    started = time.perf_counter()
+    for _ in range(count):
+        response = smartmeter._call_api(ENDPOINT, return_response=True)
+        if legacy:
+            legacy_logging(legacy, response.url, dict(response.request.headers), response)
+    elapsed = time.perf_counter() - started
+    return {"us_per_request": elapsed / count * 1e6, "log_bytes_per_request": len(stream.getvalue()) / count}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--days", type=int, default=30, help="Days of 15-minute values per response")
+    parser.add_argument("--requests", type=int, default=500, help="Requests per measurement")
+    parser.add_argument("--repeat", type=int, default=5, help="Measurements per mode, the fastest is reported")
+    args = parser.parse_args()
+    
+    smartmeter = Smartmeter("user", "password", api_url="https://api.example.invalid/rest/smp/1.0")
+    smartmeter.session.mount("https://", CannedAdapter(canned_body(args.days)))
+    smartmeter._access_token = "benchmark"
+    smartmeter._access_token_expiration = datetime.now() + timedelta(hours=1)
+    
+    stream = io.StringIO()
+    handler = logging.StreamHandler(stream)
+    handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+    legacy = logging.getLogger("legacy")
+    legacy.setLevel(logging.INFO)
+    for logger in (api_client.logger, legacy):
+        logger.addHandler(handler)
+        logger.propagate = False
+    # Every request is previewed, as if each one hit a different endpoint
+    api_client.PREVIEWS.interval = 0
+    
+    modes = {
+        "off": dict(level=logging.CRITICAL),
+        "legacy INFO": dict(level=logging.INFO, legacy=legacy),
+        "INFO": dict(level=logging.INFO),
+        "DEBUG": dict(level=logging.DEBUG),
+    }
+    # Warm up connection pools and caches
+    measure(smartmeter, stream, logging.CRITICAL, 20)
+    
+    results: Dict[str, Dict[str, float]] = {}
+    for _ in range(args.repeat):
+        for name, mode in modes.items():
+            result = measure(smartmeter, stream, count=args.requests, **mode)
+            if name not in results or result["us_per_request"] < results[name]["us_per_request"]:
+                results[name] = result
+    
+    baseline = results["off"]["us_per_request"]
+    print(f"Response: {args.days} days, {len(canned_body(args.days)) / 1024:.0f} KiB, {args.requests} requests")
+    print(f"{'logging':<12} {'us/request':>11} {'overhead us':>12} {'log bytes':>10}")
+    for name, result in results.items():
+        print(f"{name:<12} {result['us_per_request']:>11.1f} {result['us_per_request'] - baseline:>12.1f} "
+              f"{result['log_bytes_per_request']:>10.0f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
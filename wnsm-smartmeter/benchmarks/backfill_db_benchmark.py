@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+"""Benchmark PythonBackfill against a production-sized recorder database.
+
+Generates (or reuses) a ``home-assistant_v2.db`` with years of statistics
+for many sensors and measures:
+
+- auto-detection latency of the WNSM sensor's metadata_id
+- time of the DELETE of existing rows for the backfilled range
+- time of the whole backfill transaction, first write and rewrite
+- how long a concurrent recorder write has to wait for the database lock
+  while the backfill runs (the lock hold time the recorder sees), and the
+  latency of concurrent reads
+
+The database is modified by the backfill; pass ``--db`` to reuse a file
+created earlier with ``tests/fixtures/ha_recorder_db.py``.
+
+Usage:
+    python benchmarks/backfill_db_benchmark.py
+    python benchmarks/backfill_db_benchmark.py --sensors 400 --days 1095 --ranges 1,30,365 --output results.json
+    python benchmarks/backfill_db_benchmark.py --db /tmp/home-assistant_v2.db
+"""
+
+import argparse
+import json
+import logging
+import os
+import sqlite3
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+# Add src directory and the test fixtures to Python path
+root_path = Path(__file__).parent.parent
+sys.path.insert(0, str(root_path / "src"))
+sys.path.insert(0, str(root_path))
+
+from wnsm_sync.backfill.csv_exporter import CumulativeReading
+from wnsm_sync.backfill.python_backfill import PythonBackfill
+from wnsm_sync.config.loader import WNSMConfig
+from tests.fixtures.ha_recorder_db import generate_database
+
+ZP = "AT0010000000000000001000004392265"
+
+# start_ts of the rows written by the simulated recorder, far beyond the
+# generated history so they never collide with it
+_PROBE_START_TS = 4_000_000_000
+
+
+class ContentionProbe:
+    """Simulates the recorder writing and reading while the backfill runs.
+    
+    A writer thread commits one short-term statistics row at a fixed
+    interval and a reader thread queries the statistics table; both record
+    how long each operation took.
+    """
+    
+    def __init__(self, path: str, interval: float = 0.02):
+        self.path = path
+        self.interval = interval
+        self.write_waits: List[float] = []
+        self.read_latencies: List[float] = []
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self._row = 0
+    
+    def _loop(self, operation: Callable[[sqlite3.Connection], None], samples: List[float]) -> None:
+        conn = sqlite3.connect(self.path, timeout=60, isolation_level=None)
+        try:
+            while not self._stop.is_set():
+                started = time.perf_counter()
+                operation(conn)
+                samples.append(time.perf_counter() - started)
+                self._stop.wait(self.interval)
+        finally:
+            conn.close()
+    
+    def _write(self, conn: sqlite3.Connection) -> None:
+        self._row += 1
+        conn.execute("BEGIN IMMEDIATE")
+        conn.execute(
+            "INSERT INTO statistics_short_term (created_ts, metadata_id, start_ts, mean, min, max) "
+            "VALUES (?, 1, ?, 1, 1, 1)",
+            (time.time(), _PROBE_START_TS + self._row)
+        )
+        conn.execute("COMMIT")
+    
+    def _read(self, conn: sqlite3.Connection) -> None:
+        conn.execute("SELECT MAX(start_ts) FROM statistics WHERE metadata_id = 1").fetchone()
+    
+    def __enter__(self) -> "ContentionProbe":
+        self._threads = [
+            threading.Thread(target=self._loop, args=(self._write, self.write_waits), daemon=True),
+            threading.Thread(target=self._loop, args=(self._read, self.read_latencies), daemon=True)
+        ]
+        for thread in self._threads:
+            thread.start()
+        # Let both threads take a baseline sample
+        time.sleep(self.interval * 5)
+        return self
+    
+    def __exit__(self, *exc_info) -> None:
+        self._stop.set()
+        for thread in self._threads:
+            thread.join()
+        conn = sqlite3.connect(self.path)
+        conn.execute("DELETE FROM statistics_short_term WHERE start_ts > ?", (_PROBE_START_TS,))
+        conn.commit()
+        conn.close()
+    
+    def summary(self) -> Dict[str, Any]:
+        """Maximum and 95th percentile of the recorded samples in seconds."""
+        def _stats(samples: List[float]) -> Dict[str, float]:
+            ordered = sorted(samples) or [0.0]
+            return {
+                "max": round(ordered[-1], 4),
+                "p95": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 4),
+                "samples": len(samples)
+            }
+        return {"recorder_write_wait": _stats(self.write_waits), "read_latency": _stats(self.read_latencies)}
+
+
+def cumulative_readings(days: int, end: datetime) -> List[CumulativeReading]:
+    """Quarter-hour cumulative readings for the days before ``end``."""
+    readings = []
+    total = 1000.0
+    timestamp = end - timedelta(days=days)
+    while timestamp < end:
+        total += 0.1
+        readings.append(CumulativeReading(timestamp=timestamp, cumulative_kwh=total))
+        timestamp += timedelta(minutes=15)
+    return readings
+
+
+def _median_seconds(func: Callable[[], Any], repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return round(statistics.median(timings), 5)
+
+
+def measure_delete(backfill: PythonBackfill, readings: List[CumulativeReading]) -> float:
+    """Time the DELETE of the range inside a transaction that is rolled back."""
+    conn = sqlite3.connect(backfill.ha_database_path)
+    try:
+        cursor = conn.cursor()
+        cursor.execute("BEGIN TRANSACTION")
+        started = time.perf_counter()
+        backfill._delete_existing_records(cursor, readings[0].timestamp, readings[-1].timestamp)
+        return round(time.perf_counter() - started, 5)
+    finally:
+        conn.rollback()
+        conn.close()
+
+
+def run(db_path: str, ranges: List[int], repeat: int) -> Dict[str, Any]:
+    """Run all measurements against an existing recorder database."""
+    config = WNSMConfig(
+        wnsm_username="benchmark", wnsm_password="benchmark", zp=ZP, mqtt_host="localhost",
+        ha_database_path=db_path
+    )
+    
+    conn = sqlite3.connect(db_path)
+    database = {
+        "path": db_path,
+        "size_bytes": os.path.getsize(db_path),
+        "journal_mode": conn.execute("PRAGMA journal_mode").fetchone()[0],
+        "statistics_meta": conn.execute("SELECT COUNT(*) FROM statistics_meta").fetchone()[0],
+        "statistics": conn.execute("SELECT COUNT(*) FROM statistics").fetchone()[0],
+        "statistics_short_term": conn.execute("SELECT COUNT(*) FROM statistics_short_term").fetchone()[0]
+    }
+    conn.close()
+    
+    detector = PythonBackfill(config)
+    metadata_id = detector.auto_detect_sensor_metadata_id()
+    if metadata_id is None:
+        raise RuntimeError(f"sensor.wnsm_daily_total_{ZP[-8:]} not found in {db_path}")
+    detection = {
+        "metadata_id": metadata_id,
+        "auto_detect_seconds": _median_seconds(detector.auto_detect_sensor_metadata_id, repeat),
+        "list_sensors_seconds": _median_seconds(detector.get_sensor_metadata_ids, repeat)
+    }
+    
+    backfill = PythonBackfill(config)
+    backfill.import_metadata_id = metadata_id
+    end = datetime.utcnow().replace(minute=0, second=0, microsecond=0)
+    
+    results = []
+    for days in ranges:
+        readings = cumulative_readings(days, end)
+        for attempt in ("first_write", "rewrite"):
+            delete_seconds = measure_delete(backfill, readings)
+            with ContentionProbe(db_path) as probe:
+                started = time.perf_counter()
+                if not backfill._insert_statistics(readings):
+                    raise RuntimeError("Inserting statistics failed")
+                transaction_seconds = time.perf_counter() - started
+            result = {
+                "range_days": days,
+                "attempt": attempt,
+                "readings": len(readings),
+                "delete_seconds": delete_seconds,
+                "transaction_seconds": round(transaction_seconds, 4),
+                **probe.summary()
+            }
+            results.append(result)
+            print(f"{days:>4} days {attempt:<11} delete {delete_seconds:8.4f} s, "
+                  f"transaction {transaction_seconds:8.3f} s, "
+                  f"recorder waited up to {result['recorder_write_wait']['max']:.3f} s, "
+                  f"reads up to {result['read_latency']['max']:.3f} s")
+    
+    return {
+        "created": datetime.utcnow().isoformat() + "Z",
+        "database": database,
+        "detection": detection,
+        "results": results
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--db", help="Existing recorder database to use (it is modified)")
+    parser.add_argument("--sensors", type=int, default=200, help="Sensors of the generated database")
+    parser.add_argument("--days", type=int, default=3 * 365, help="Days of history of the generated database")
+    parser.add_argument("--ranges", default="1,30,365", help="Comma-separated backfill ranges in days")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs of the auto-detection timings")
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    args = parser.parse_args()
+    
+    # The backfill logs every sensor it finds at INFO
+    logging.basicConfig(level=logging.WARNING)
+    ranges = [int(value) for value in args.ranges.split(",") if value.strip()]
+    
+    tmp: Optional[tempfile.TemporaryDirectory] = None
+    db_path = args.db
+    if db_path is None:
+        tmp = tempfile.TemporaryDirectory(prefix="wnsm_recorder_")
+        db_path = os.path.join(tmp.name, "home-assistant_v2.db")
+        started = time.monotonic()
+        generate_database(db_path, sensors=args.sensors, days=args.days, zaehlpunkte=[ZP])
+        print(f"Generated {db_path} in {time.monotonic() - started:.1f} s")
+    
+    try:
+        results = run(db_path, ranges, args.repeat)
+    finally:
+        if tmp is not None:
+            tmp.cleanup()
+    
+    database = results["database"]
+    print(f"Database: {database['statistics']} long-term, {database['statistics_short_term']} short-term rows, "
+          f"{database['size_bytes'] / 1024 / 1024:.0f} MiB, journal {database['journal_mode']}")
+    print(f"Auto-detection: {results['detection']['auto_detect_seconds'] * 1000:.2f} ms, "
+          f"listing kWh sensors: {results['detection']['list_sensors_seconds'] * 1000:.2f} ms")
+    
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {args.output}")
+    
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
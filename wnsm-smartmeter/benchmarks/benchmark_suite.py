@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+"""End-to-end benchmark suite of the processing and delivery stages.
+
+Generates deterministic 15-minute datasets (1 day, 1 year and 3 years per
+meter, for one or more meters) and measures wall time, CPU time and peak
+Python heap of each stage a fetched range passes through:
+
+    process     DataProcessor.process_bewegungsdaten_response
+    cumulative  PythonBackfill._convert_to_cumulative
+    insert      PythonBackfill._insert_statistics into a fresh HA recorder database
+    csv         CSVExporter.export_multiple_days
+    mqtt        WNSMSync._publish_energy_data_mqtt to a local broker stand-in
+
+Each stage runs ``--repeat`` times for timing and once more under
+tracemalloc for the memory peak, so tracing does not distort the timings.
+Results are written as JSON; ``--compare`` prints the change against an
+earlier results file, e.g. from the previous release.
+
+Usage:
+    python benchmarks/benchmark_suite.py
+    python benchmarks/benchmark_suite.py --datasets 1d,1y --meters 3 --output results.json
+    python benchmarks/benchmark_suite.py --stages process,insert --compare baseline.json
+"""
+
+import argparse
+import json
+import logging
+import platform
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+# Add src directory and the test fixtures to Python path
+root_path = Path(__file__).parent.parent
+sys.path.insert(0, str(root_path / "src"))
+sys.path.insert(0, str(root_path))
+
+from wnsm_sync.backfill.csv_exporter import CSVExporter
+from wnsm_sync.config.loader import WNSMConfig
+from wnsm_sync.core.multi_meter import MultiMeterSync
+from wnsm_sync.data.processor import DataProcessor
+from tests.fixtures.fake_mqtt_broker import FakeMQTTBroker
+from tests.fixtures.ha_recorder_db import create_database
+
+# Dataset name -> days of 15-minute readings per meter
+DATASETS = {"1d": 1, "1y": 365, "3y": 3 * 365}
+
+STAGES = ("process", "cumulative", "insert", "csv", "mqtt")
+
+
+def zaehlpunkt(index: int) -> str:
+    """Zählpunkt of the index-th benchmark meter."""
+    return f"AT0010000000000000001000000{index:06d}"
+
+
+def generate_response(zp: str, days: int, end: datetime, seed: int) -> Dict[str, Any]:
+    """Bewegungsdaten response with quarter-hour readings ending at ``end``.
+    
+    Values depend only on the seed and the position in the range, so every
+    run measures the same data regardless of the end date.
+    
+    Args:
+        zp: Zählpunkt of the response
+        days: Number of days of readings
+        end: Exclusive end of the range
+        seed: Seed of the consumption values
+    """
+    rng = random.Random(seed)
+    timestamp = end - timedelta(days=days)
+    values = []
+    for _ in range(days * 96):
+        values.append({
+            "zeitpunktVon": timestamp.strftime("%Y-%m-%dT%H:%M:%S.000Z"),
+            "wert": round(rng.uniform(0.02, 0.4), 3),
+            "geschaetzt": False
+        })
+        timestamp += timedelta(minutes=15)
+    return {"zaehlpunkt": zp, "values": values}
+
+
+def measure(run: Callable[[Any], Any], prepare: Callable[[], Any], repeat: int) -> Dict[str, Any]:
+    """Time a stage and record its memory peak.
+    
+    Args:
+        run: Stage under test, called with the result of prepare
+        prepare: Untimed setup executed before every run
+        repeat: Number of timed runs
+    """
+    walls, cpus = [], []
+    for _ in range(repeat):
+        state = prepare()
+        cpu_started = time.process_time()
+        started = time.perf_counter()
+        run(state)
+        walls.append(time.perf_counter() - started)
+        cpus.append(time.process_time() - cpu_started)
+    
+    state = prepare()
+    tracemalloc.start()
+    run(state)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    
+    return {
+        "wall_seconds": {"min": round(min(walls), 4), "median": round(statistics.median(walls), 4)},
+        "cpu_seconds": {"min": round(min(cpus), 4), "median": round(statistics.median(cpus), 4)},
+        "peak_bytes": peak
+    }
+
+
+class Suite:
+    """Benchmarks of one dataset size for a set of meters."""
+    
+    def __init__(self, workdir: Path, broker: FakeMQTTBroker, meters: int, days: int,
+                 end: datetime, payload_mode: str):
+        self.workdir = workdir
+        self.broker = broker
+        self.zaehlpunkte = [zaehlpunkt(i) for i in range(meters)]
+        self.responses = [generate_response(zp, days, end, seed=i) for i, zp in enumerate(self.zaehlpunkte)]
+        self.statistic_ids = [f"sensor.wnsm_daily_total_{zp[-8:]}" for zp in self.zaehlpunkte]
+        self._run_id = 0
+        
+        # Metadata IDs follow the insertion order of create_database()
+        self.config = WNSMConfig(
+            wnsm_username="benchmark", wnsm_password="benchmark", zp=",".join(self.zaehlpunkte),
+            mqtt_host="127.0.0.1", mqtt_port=broker.port, mqtt_payload_mode=payload_mode,
+            ha_import_metadata_id=",".join(f"{zp}={i + 1}" for i, zp in enumerate(self.zaehlpunkte)),
+            session_file=str(workdir / "session.json"),
+            schedule_state_file=str(workdir / "schedule_state.json"),
+            discovery_state_file=str(workdir / "discovery_state.json")
+        )
+        self.sync = MultiMeterSync(self.config)
+        
+        processor = DataProcessor()
+        self.energy_data = [
+            processor.process_bewegungsdaten_response(raw, zp)
+            for raw, zp in zip(self.responses, self.zaehlpunkte)
+        ]
+        self.cumulative = [
+            meter.backfill_integration._convert_to_cumulative(data.readings)
+            for meter, data in zip(self.sync.meters, self.energy_data)
+        ]
+    
+    @property
+    def readings(self) -> int:
+        """Readings handled per run across all meters."""
+        return sum(len(data.readings) for data in self.energy_data)
+    
+    def _fresh_dir(self, name: str) -> Path:
+        self._run_id += 1
+        path = self.workdir / f"{name}{self._run_id}"
+        path.mkdir()
+        return path
+    
+    def stage(self, name: str) -> Dict[str, Callable]:
+        """prepare/run callables of a stage."""
+        if name == "process":
+            processor = DataProcessor()
+            return {
+                "prepare": lambda: None,
+                "run": lambda _: [processor.process_bewegungsdaten_response(raw, zp)
+                                  for raw, zp in zip(self.responses, self.zaehlpunkte)]
+            }
+        if name == "cumulative":
+            return {
+                "prepare": lambda: None,
+                "run": lambda _: [meter.backfill_integration._convert_to_cumulative(data.readings)
+                                  for meter, data in zip(self.sync.meters, self.energy_data)]
+            }
+        if name == "insert":
+            return {"prepare": self._prepare_database, "run": self._insert}
+        if name == "csv":
+            return {
+                "prepare": lambda: self._fresh_dir("csv"),
+                "run": lambda path: [CSVExporter(str(path / zp)).export_multiple_days(data)
+                                     for zp, data in zip(self.zaehlpunkte, self.energy_data)]
+            }
+        if name == "mqtt":
+            return {"prepare": lambda: None, "run": self._publish}
+        raise ValueError(f"Unknown stage: {name}")
+    
+    def _prepare_database(self) -> Path:
+        path = self._fresh_dir("recorder") / "home-assistant_v2.db"
+        create_database(str(path), self.statistic_ids)
+        return path
+    
+    def _insert(self, path: Path) -> None:
+        for meter, readings in zip(self.sync.meters, self.cumulative):
+            meter.backfill_integration.ha_database_path = str(path)
+            if not meter.backfill_integration._insert_statistics(readings):
+                raise RuntimeError("Inserting statistics failed")
+    
+    def _publish(self, _) -> None:
+        for meter, data in zip(self.sync.meters, self.energy_data):
+            meter._publish_energy_data_mqtt(data)
+        # The broker handles packets in order: once this QoS 1 message is
+        # acknowledged, every reading before it has arrived
+        info = self.sync.mqtt_client._client.publish(f"{self.config.mqtt_topic}/benchmark", "done", qos=1)
+        info.wait_for_publish(60)
+        if not info.is_published():
+            raise RuntimeError("Broker did not acknowledge the publishes")
+
+
+def run_suite(datasets: List[str], meters: int, stages: List[str], repeat: int,
+              payload_mode: str = "reading", end: Optional[datetime] = None) -> Dict[str, Any]:
+    """Run the selected stages on every dataset.
+    
+    Args:
+        datasets: Dataset names from DATASETS
+        meters: Number of meters per dataset
+        stages: Stage names from STAGES
+        repeat: Timed runs per stage
+        payload_mode: MQTT_PAYLOAD_MODE of the mqtt stage
+        end: End of the generated ranges, defaults to today's midnight so
+            the insert stage also writes short-term statistics
+    """
+    end = end or datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    results = []
+    
+    workdir = Path(tempfile.mkdtemp(prefix="wnsm_benchmark_"))
+    try:
+        with FakeMQTTBroker() as broker:
+            for dataset in datasets:
+                (workdir / dataset).mkdir()
+                suite = Suite(workdir / dataset, broker, meters, DATASETS[dataset], end, payload_mode)
+                if "mqtt" in stages and not suite.sync.mqtt_client.connect():
+                    raise RuntimeError("Could not connect to the broker stand-in")
+                try:
+                    for name in stages:
+                        stage = suite.stage(name)
+                        result = measure(stage["run"], stage["prepare"], repeat)
+                        result.update(stage=name, dataset=dataset, meters=meters, readings=suite.readings,
+                                      readings_per_second=round(suite.readings / max(result["wall_seconds"]["median"], 1e-9)))
+                        results.append(result)
+                        print(f"{dataset:>3} x {meters} {name:<10} {result['wall_seconds']['median']:8.3f} s "
+                              f"{result['readings_per_second']:>10} readings/s "
+                              f"{result['peak_bytes'] / 1024 / 1024:8.1f} MiB peak")
+                finally:
+                    suite.sync.mqtt_client.disconnect()
+            broker_stats = broker.snapshot()
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    
+    return {
+        "created": datetime.utcnow().isoformat() + "Z",
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "repeat": repeat,
+        "mqtt_payload_mode": payload_mode,
+        "broker": {"messages": broker_stats["messages"], "bytes": broker_stats["bytes"]},
+        "results": results
+    }
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any]) -> None:
+    """Print the median wall time and memory peak change against a baseline."""
+    previous = {(r["stage"], r["dataset"], r["meters"]): r for r in baseline.get("results", [])}
+    print("Change against baseline (negative is faster / smaller):")
+    for result in results["results"]:
+        old = previous.get((result["stage"], result["dataset"], result["meters"]))
+        if old is None:
+            continue
+        wall = result["wall_seconds"]["median"] / max(old["wall_seconds"]["median"], 1e-9) - 1
+        memory = result["peak_bytes"] / max(old["peak_bytes"], 1) - 1
+        print(f"  {result['dataset']:>3} x {result['meters']} {result['stage']:<10} "
+              f"wall {wall:+7.1%}  peak {memory:+7.1%}")
+
+
+def _names(value: str, allowed) -> List[str]:
+    names = [name.strip() for name in value.split(",") if name.strip()]
+    unknown = [name for name in names if name not in allowed]
+    if unknown:
+        raise argparse.ArgumentTypeError(f"unknown: {', '.join(unknown)} (choose from {', '.join(allowed)})")
+    return names
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--datasets", type=lambda v: _names(v, DATASETS), default=list(DATASETS),
+                        help="Comma-separated datasets: 1d, 1y, 3y")
+    parser.add_argument("--meters", type=int, default=1, help="Meters per dataset")
+    parser.add_argument("--stages", type=lambda v: _names(v, STAGES), default=list(STAGES),
+                        help=f"Comma-separated stages: {', '.join(STAGES)}")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per stage")
+    parser.add_argument("--payload-mode", choices=("reading", "hour", "day"), default="reading",
+                        help="MQTT_PAYLOAD_MODE of the mqtt stage")
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    parser.add_argument("--compare", help="Earlier results file to compare against")
+    args = parser.parse_args()
+    
+    # Per-stage INFO logs would dominate the measurement
+    logging.basicConfig(level=logging.WARNING)
+    
+    results = run_suite(args.datasets, args.meters, args.stages, args.repeat, args.payload_mode)
+    
+    if args.compare:
+        with open(args.compare) as f:
+            compare(results, json.load(f))
+    
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {args.output}")
+    
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
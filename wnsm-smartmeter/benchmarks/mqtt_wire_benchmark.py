@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""Benchmark bytes on the wire and broker CPU for MQTT reading publishes.
+
+Compares MQTT 3.1.1 with MQTT v5 (topic aliases plus message expiry) for
+publishing 15-minute readings to ``{mqtt_topic}/15min``.
+
+Without ``--host`` the PUBLISH packet sizes are computed from the MQTT
+specification. With ``--host`` the readings are published to a real broker
+and the bytes handed to the socket are counted; ``--broker-pid`` additionally
+samples the broker's CPU time from /proc.
+
+Usage:
+    python benchmarks/mqtt_wire_benchmark.py
+    python benchmarks/mqtt_wire_benchmark.py --host localhost --broker-pid $(pidof mosquitto)
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+# Add src directory to Python path
+src_path = Path(__file__).parent.parent / "src"
+sys.path.insert(0, str(src_path))
+
+from wnsm_sync.config.loader import WNSMConfig
+from wnsm_sync.data.processor import DataProcessor
+from wnsm_sync.mqtt.client import MQTTClient
+
+ZP = "AT0010000000000000001000004392265"
+
+
+def _varint_length(value: int) -> int:
+    """Number of bytes of an MQTT variable byte integer."""
+    length = 1
+    while value >= 128:
+        value //= 128
+        length += 1
+    return length
+
+
+def publish_packet_size(topic: str, payload: bytes, properties_length: Optional[int] = None) -> int:
+    """Size of a QoS 0 PUBLISH packet.
+    
+    Args:
+        topic: Topic name as sent (empty when a topic alias is used)
+        payload: Message payload
+        properties_length: Length of the v5 properties, None for MQTT 3.1.1
+        
+    Returns:
+        Packet size in bytes including the fixed header
+    """
+    remaining = 2 + len(topic.encode("utf-8")) + len(payload)
+    if properties_length is not None:
+        remaining += _varint_length(properties_length) + properties_length
+    return 1 + _varint_length(remaining) + remaining
+
+
+def generate_payloads(count: int) -> List[bytes]:
+    """Generate serialized reading payloads as published by WNSMSync."""
+    date_from = datetime(2025, 1, 1)
+    energy_data = DataProcessor().generate_mock_data(
+        date_from=date_from,
+        date_until=date_from + timedelta(minutes=15 * count),
+        zaehlpunkt=ZP
+    )
+    return [json.dumps(r.to_mqtt_payload()).encode("utf-8") for r in energy_data.readings]
+
+
+def estimate(payloads: List[bytes], topic: str, expiry: int) -> Dict[str, Any]:
+    """Compute wire bytes for both protocol versions from the specification."""
+    v311 = sum(publish_packet_size(topic, p) for p in payloads)
+    
+    # TopicAlias: 1 + 2 bytes, MessageExpiryInterval: 1 + 4 bytes
+    expiry_length = 5 if expiry > 0 else 0
+    first = publish_packet_size(topic, payloads[0], 3 + expiry_length)
+    rest = sum(publish_packet_size("", p, 3 + expiry_length) for p in payloads[1:])
+    v5 = first + rest
+    
+    return {
+        "mode": "estimate",
+        "messages": len(payloads),
+        "payload_bytes": sum(len(p) for p in payloads),
+        "mqtt311_bytes": v311,
+        "mqtt5_bytes": v5,
+        "saved_bytes": v311 - v5,
+        "saved_percent": round(100.0 * (v311 - v5) / v311, 2),
+    }
+
+
+def _broker_cpu_seconds(pid: int) -> float:
+    """Read user+system CPU time of a process from /proc."""
+    with open(f"/proc/{pid}/stat") as f:
+        fields = f.read().rsplit(")", 1)[1].split()
+    return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+
+
+def measure(payloads: List[bytes], host: str, port: int, protocol: str, expiry: int,
+            broker_pid: Optional[int]) -> Dict[str, Any]:
+    """Publish payloads to a live broker and count bytes sent."""
+    config = WNSMConfig(
+        wnsm_username="bench",
+        wnsm_password="bench",
+        zp=ZP,
+        mqtt_host=host,
+        mqtt_port=port,
+        mqtt_topic="benchmark/wnsm",
+        mqtt_protocol=protocol,
+        mqtt_message_expiry=expiry
+    )
+    client = MQTTClient(config)
+    if not client.connect(timeout=10):
+        raise SystemExit(f"Could not connect to broker {host}:{port}")
+    
+    # Count every packet paho hands to the socket
+    sent = {"bytes": 0, "packets": 0}
+    paho_client = client._client
+    original_queue = paho_client._packet_queue
+    
+    def counting_queue(command, packet, *args, **kwargs):
+        sent["bytes"] += len(packet)
+        sent["packets"] += 1
+        return original_queue(command, packet, *args, **kwargs)
+    
+    paho_client._packet_queue = counting_queue
+    
+    topic = f"{config.mqtt_topic}/15min"
+    cpu_before = _broker_cpu_seconds(broker_pid) if broker_pid else None
+    started = time.perf_counter()
+    
+    for payload in payloads:
+        client._publish(topic, payload.decode("utf-8"), retain=False)
+    
+    # A QoS 1 round trip guarantees everything before it was flushed
+    paho_client.publish(f"{config.mqtt_topic}/barrier", "", qos=1).wait_for_publish(30)
+    elapsed = time.perf_counter() - started
+    cpu_after = _broker_cpu_seconds(broker_pid) if broker_pid else None
+    
+    paho_client._packet_queue = original_queue
+    client.disconnect()
+    
+    result = {
+        "mode": "live",
+        "protocol": protocol,
+        "messages": len(payloads),
+        "wire_bytes": sent["bytes"],
+        "packets": sent["packets"],
+        "seconds": round(elapsed, 3),
+    }
+    if cpu_before is not None:
+        result["broker_cpu_seconds"] = round(cpu_after - cpu_before, 3)
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--messages", type=int, default=10000, help="Readings to publish")
+    parser.add_argument("--expiry", type=int, default=3600, help="Message expiry for MQTT v5")
+    parser.add_argument("--host", help="Broker host for a live measurement")
+    parser.add_argument("--port", type=int, default=1883)
+    parser.add_argument("--broker-pid", type=int, help="Broker PID for CPU sampling")
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    args = parser.parse_args()
+    
+    payloads = generate_payloads(args.messages)
+    results = {"estimate": estimate(payloads, "smartmeter/energy/state/15min", args.expiry)}
+    
+    if args.host:
+        results["mqtt311"] = measure(payloads, args.host, args.port, "3.1.1", args.expiry, args.broker_pid)
+        results["mqtt5"] = measure(payloads, args.host, args.port, "5", args.expiry, args.broker_pid)
+    
+    output = json.dumps(results, indent=2)
+    if args.output:
+        Path(args.output).write_text(output)
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -11,8 +11,10 @@ sys.path.insert(0, str(src_path))
 
 from wnsm_sync.config.loader import ConfigLoader
 from wnsm_sync.config.secrets import SecretsManager
-from wnsm_sync.core.sync import WNSMSync
+from wnsm_sync.core.accounts import AccountPool
+from wnsm_sync.core.multi_meter import create_sync
 from wnsm_sync.core.utils import setup_logging
+from wnsm_sync.metrics import MetricsServer
 
 logger = logging.getLogger(__name__)
 
@@ -26,7 +28,15 @@ def main():
         config = config_loader.load()
         
         # Setup logging
-        setup_logging(config.debug)
+        setup_logging(
+            config.debug,
+            config.log_format,
+            log_file=config.log_file,
+            log_max_bytes=config.log_max_size * 1024 * 1024,
+            log_backups=config.log_backups,
+            log_compress=config.log_compress,
+            log_queue=config.log_queue
+        )
         
         # Log startup information
         logger.info("Wiener Netze Smart Meter Add-on started")
@@ -34,6 +44,9 @@ def main():
         if config.use_mock_data:
             logger.warning("MOCK DATA MODE ENABLED - Using simulated data instead of real API calls")
         
+        if config.metrics_port:
+            MetricsServer(config.metrics_port).start()
+        
         # Verify required dependencies
         try:
             import vienna_smartmeter
@@ -44,7 +57,10 @@ def main():
             sys.exit(1)
         
         # Create and run sync
-        sync = WNSMSync(config)
+        if config.accounts_file:
+            sync = AccountPool(config, config_loader.load_accounts(config))
+        else:
+            sync = create_sync(config)
         sync.run_continuous()
         
     except KeyboardInterrupt:
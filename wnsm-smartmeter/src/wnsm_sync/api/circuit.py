@@ -0,0 +1,195 @@
+"""Per-endpoint circuit breakers around the Wiener Netze API."""
+
+import enum
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, Optional
+
+from .classification import ErrorClass, classify
+from .errors import SmartmeterCircuitOpenError
+from ..metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+CIRCUIT_STATE = REGISTRY.gauge(
+    "wnsm_api_circuit_state", "State of the API circuit breakers (0 closed, 1 half open, 2 open)", ["endpoint"]
+)
+CIRCUIT_REJECTIONS = REGISTRY.counter(
+    "wnsm_api_circuit_rejections_total", "API calls failed fast by an open circuit breaker", ["endpoint"]
+)
+
+# Endpoints with their own breaker; the gateway can fail for one while the others still answer
+ENDPOINTS = ("login", "zaehlpunkte", "bewegungsdaten", "messwerte", "verbrauch")
+
+# Failures meaning the endpoint is unavailable. A 429 or 4xx shows it is up and answering.
+OUTAGE = frozenset({ErrorClass.TIMEOUT, ErrorClass.CONNECTION, ErrorClass.SERVER})
+# Failures saying nothing about the endpoint, e.g. an open breaker of an endpoint it depends on
+NEUTRAL = frozenset({ErrorClass.UNKNOWN, ErrorClass.CIRCUIT_OPEN})
+
+
+class CircuitState(enum.Enum):
+    """State of a circuit breaker."""
+    CLOSED = 0  #: Calls pass
+    HALF_OPEN = 1  #: One probe call passes, the others fail fast
+    OPEN = 2  #: Calls fail fast until the reset timeout has passed
+
+
+class CircuitBreaker:
+    """Circuit breaker of one API endpoint.
+    
+    Opens after a number of consecutive outage failures. While open, calls
+    raise SmartmeterCircuitOpenError without touching the network. Once the
+    reset timeout has passed, the next call is let through as a probe: its
+    success closes the breaker, its failure opens it for another timeout.
+    """
+    
+    def __init__(self, endpoint: str, failure_threshold: int = 3, reset_timeout: float = 60.0,
+                 clock: Callable[[], float] = time.monotonic):
+        """Initialize circuit breaker.
+        
+        Args:
+            endpoint: Endpoint name used in errors, logs and metrics
+            failure_threshold: Consecutive outage failures that open the breaker
+            reset_timeout: Seconds the breaker stays open before a probe
+            clock: Monotonic time source
+        """
+        self.endpoint = endpoint
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._state = CircuitState.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        CIRCUIT_STATE.set(CircuitState.CLOSED.value, endpoint=endpoint)
+    
+    @property
+    def state(self) -> CircuitState:
+        with self._lock:
+            return self._state
+    
+    def retry_in(self) -> float:
+        """Seconds until the next probe may be sent, 0 unless open."""
+        with self._lock:
+            if self._state is not CircuitState.OPEN:
+                return 0.0
+            return max(0.0, self._opened_at + self.reset_timeout - self.clock())
+    
+    def _set_state(self, state: CircuitState) -> None:
+        self._state = state
+        CIRCUIT_STATE.set(state.value, endpoint=self.endpoint)
+    
+    def before_call(self) -> None:
+        """Let a call pass, or fail it fast.
+        
+        Raises:
+            SmartmeterCircuitOpenError: If the breaker is open, or half open
+                with a probe already in flight
+        """
+        with self._lock:
+            if self._state is CircuitState.CLOSED:
+                return
+            retry_in = self._opened_at + self.reset_timeout - self.clock()
+            if self._state is CircuitState.OPEN and retry_in <= 0:
+                logger.info(f"Probing {self.endpoint} after {self.reset_timeout:.0f} s of open circuit")
+                self._set_state(CircuitState.HALF_OPEN)
+            if self._state is CircuitState.HALF_OPEN and not self._probing:
+                self._probing = True
+                return
+        CIRCUIT_REJECTIONS.inc(endpoint=self.endpoint)
+        raise SmartmeterCircuitOpenError(self.endpoint, max(0.0, retry_in))
+    
+    def record_success(self) -> None:
+        """Record that the endpoint answered."""
+        with self._lock:
+            self._probing = False
+            self._failures = 0
+            if self._state is not CircuitState.CLOSED:
+                logger.info(f"{self.endpoint} answered again, closing its circuit")
+                self._set_state(CircuitState.CLOSED)
+    
+    def record_failure(self, error: BaseException) -> None:
+        """Record a failed call; only outage failures count towards opening.
+        
+        Args:
+            error: Raised exception
+        """
+        error_class = classify(error).error_class
+        if error_class not in OUTAGE and error_class not in NEUTRAL:
+            # The endpoint answered, it just did not like the request
+            self.record_success()
+            return
+        with self._lock:
+            probe = self._probing
+            self._probing = False
+            if error_class in NEUTRAL:
+                return
+            self._failures += 1
+            if probe or self._failures >= self.failure_threshold:
+                if self._state is CircuitState.CLOSED:
+                    logger.warning(f"{self.endpoint} failed {self._failures} times in a row, opening its circuit "
+                                   f"for {self.reset_timeout:.0f} s")
+                else:
+                    logger.warning(f"Probe of {self.endpoint} failed, keeping its circuit open")
+                self._opened_at = self.clock()
+                self._set_state(CircuitState.OPEN)
+    
+    @contextmanager
+    def guard(self) -> Iterator[None]:
+        """Run the enclosed call under the breaker."""
+        self.before_call()
+        try:
+            yield
+        except BaseException as e:
+            self.record_failure(e)
+            raise
+        self.record_success()
+
+
+class CircuitBreakers:
+    """Circuit breakers of the API endpoints of one account."""
+    
+    def __init__(self, failure_threshold: int = 3, reset_timeout: float = 60.0,
+                 clock: Callable[[], float] = time.monotonic):
+        """Initialize circuit breakers.
+        
+        Args:
+            failure_threshold: Consecutive outage failures that open a breaker
+            reset_timeout: Seconds a breaker stays open before a probe
+            clock: Monotonic time source
+        """
+        self.breakers: Dict[str, CircuitBreaker] = {
+            endpoint: CircuitBreaker(endpoint, failure_threshold, reset_timeout, clock) for endpoint in ENDPOINTS
+        }
+    
+    def get(self, endpoint: str) -> Optional[CircuitBreaker]:
+        """Breaker of an endpoint, None for endpoints without one."""
+        return self.breakers.get(endpoint)
+    
+    @contextmanager
+    def guard(self, endpoint: str) -> Iterator[None]:
+        """Run the enclosed call under the endpoint's breaker, if it has one.
+        
+        Args:
+            endpoint: Endpoint name, e.g. "bewegungsdaten"
+        
+        Raises:
+            SmartmeterCircuitOpenError: If the endpoint's breaker is open
+        """
+        breaker = self.breakers.get(endpoint)
+        if breaker is None:
+            yield
+            return
+        with breaker.guard():
+            yield
+    
+    def open_circuits(self) -> Dict[str, float]:
+        """Endpoints whose breaker is not closed, with the seconds until their next probe."""
+        return {
+            endpoint: round(breaker.retry_in(), 1)
+            for endpoint, breaker in self.breakers.items()
+            if breaker.state is not CircuitState.CLOSED
+        }
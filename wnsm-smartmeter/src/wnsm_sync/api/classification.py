@@ -0,0 +1,128 @@
+"""Classification of failed API calls by their causes."""
+
+import enum
+import socket
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Iterator, Optional
+
+import requests
+
+from .errors import SmartmeterCircuitOpenError, SmartmeterLoginError, SmartmeterQueryError
+
+
+class ErrorClass(enum.Enum):
+    """Cause of a failed API call."""
+    TIMEOUT = "timeout"
+    CONNECTION = "connection"  #: Refused or reset connections, DNS failures
+    RATE_LIMITED = "rate_limited"  #: HTTP 429
+    SERVER = "server"  #: HTTP 5xx
+    CLIENT = "client"  #: HTTP 4xx other than 401/403/429, invalid queries
+    AUTH = "auth"  #: Rejected credentials or tokens
+    CIRCUIT_OPEN = "circuit_open"  #: Not sent, the endpoint's circuit breaker is open
+    UNKNOWN = "unknown"
+
+
+# Classes a later attempt can fix; retrying the others only wastes the cycle
+RETRYABLE = frozenset({
+    ErrorClass.TIMEOUT, ErrorClass.CONNECTION, ErrorClass.RATE_LIMITED, ErrorClass.SERVER, ErrorClass.UNKNOWN
+})
+
+
+@dataclass
+class Classification:
+    """Classified error."""
+    
+    error_class: ErrorClass
+    status: Optional[int] = None  # HTTP status, if the error carries a response
+    retry_after: Optional[float] = None  # Seconds the server asked us to wait
+    
+    @property
+    def retryable(self) -> bool:
+        return self.error_class in RETRYABLE
+
+
+def _chain(error: BaseException) -> Iterator[BaseException]:
+    """The error and the errors it was raised from, outermost first."""
+    seen = set()
+    while error is not None and id(error) not in seen:
+        seen.add(id(error))
+        yield error
+        error = error.__cause__ or error.__context__
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait according to a Retry-After header (delay seconds or HTTP date)."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        until = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if until.tzinfo is None:
+        until = until.replace(tzinfo=timezone.utc)
+    return max(0.0, (until - datetime.now(timezone.utc)).total_seconds())
+
+
+def _status_class(status: int) -> Optional[ErrorClass]:
+    if status == 429:
+        return ErrorClass.RATE_LIMITED
+    if status in (401, 403):
+        return ErrorClass.AUTH
+    if 500 <= status < 600:
+        return ErrorClass.SERVER
+    if 400 <= status < 500:
+        return ErrorClass.CLIENT
+    return None
+
+
+def classify(error: BaseException) -> Classification:
+    """Classify an error by the causes in its exception chain.
+    
+    Transport errors and HTTP statuses found anywhere in the chain take
+    precedence, so a login that failed because of a timeout is a timeout.
+    
+    Args:
+        error: Raised exception
+    
+    Returns:
+        Classification of the error
+    """
+    # Rejected by an open circuit breaker before anything was sent
+    for cause in _chain(error):
+        if isinstance(cause, SmartmeterCircuitOpenError):
+            return Classification(ErrorClass.CIRCUIT_OPEN, retry_after=cause.retry_in)
+    
+    # Responses carry the Retry-After header, so they win over status codes copied into wrapping errors
+    for cause in _chain(error):
+        response = getattr(cause, "response", None)
+        if isinstance(response, requests.Response) and _status_class(response.status_code) is not None:
+            return Classification(_status_class(response.status_code), response.status_code,
+                                  parse_retry_after(response.headers.get("Retry-After")))
+    
+    login_failed = False
+    query_failed = False
+    for cause in _chain(error):
+        code = getattr(cause, "code", None)
+        if isinstance(code, int) and _status_class(code) is not None:
+            return Classification(_status_class(code), code)
+        if isinstance(cause, (requests.exceptions.Timeout, socket.timeout, TimeoutError)):
+            return Classification(ErrorClass.TIMEOUT)
+        if isinstance(cause, (requests.exceptions.ConnectionError, ConnectionError)):
+            return Classification(ErrorClass.CONNECTION)
+        # The vienna-smartmeter library raises its own SmartmeterLoginError class
+        if isinstance(cause, SmartmeterLoginError) or type(cause).__name__ == "SmartmeterLoginError":
+            login_failed = True
+        if isinstance(cause, SmartmeterQueryError):
+            query_failed = True
+    
+    if login_failed:
+        return Classification(ErrorClass.AUTH)
+    if query_failed:
+        return Classification(ErrorClass.CLIENT)
+    return Classification(ErrorClass.UNKNOWN)
@@ -2,29 +2,119 @@
 import json
 import logging
 import os
-from datetime import datetime, timedelta, date
+import re
+import threading
+import time
+from datetime import datetime, timedelta, timezone, date
+from functools import partial
 from urllib import parse
-from typing import List, Dict, Any, Tuple, Optional
+from contextlib import nullcontext
+from typing import List, Dict, Any, Callable, ContextManager, Tuple, Optional
 
 import requests
+from dateutil import parser as date_parser
 from dateutil.relativedelta import relativedelta
 from lxml import html
 from vienna_smartmeter import Smartmeter as ViennaSmartmeter
 
 from . import constants as const
+from .circuit import CircuitBreakers
+from .coalescing import SingleFlight
 from .errors import (
+    SmartmeterCircuitOpenError,
     SmartmeterConnectionError,
     SmartmeterLoginError,
     SmartmeterQueryError,
 )
+from .hedging import Hedger
+from .log_helpers import PreviewSampler, redact, redact_text, summarize
+from .throttle import AdaptiveThrottle, ThrottledAdapter
+from ..metrics import REGISTRY
+from ..tracing import record_span, span
 
 logger = logging.getLogger(__name__)
 
+API_REQUEST_SECONDS = REGISTRY.histogram(
+    "wnsm_api_request_duration_seconds", "Duration of Wiener Netze API calls", ["endpoint", "outcome"]
+)
+API_RESPONSES = REGISTRY.counter(
+    "wnsm_api_responses_total", "HTTP responses received from Wiener Netze", ["endpoint", "status"]
+)
+API_RESPONSE_BYTES = REGISTRY.counter(
+    "wnsm_api_response_bytes_total", "Response body bytes fetched from Wiener Netze", ["endpoint"]
+)
+LOGIN_SECONDS = REGISTRY.histogram(
+    "wnsm_login_duration_seconds", "Duration of Wiener Netze logins", ["outcome"]
+)
+
+# Response previews are DEBUG output; even then one per endpoint every five minutes is enough
+PREVIEWS = PreviewSampler()
+
+# Path segments that name an endpoint rather than a customer, meter or ID
+_ENDPOINT_SEGMENT = re.compile(r"^[A-Za-z][A-Za-z_.-]*$")
+
+
+def endpoint_label(url: str) -> str:
+    """Low-cardinality metrics label of a request URL.
+    
+    Args:
+        url (str): Request URL.
+        
+    Returns:
+        str: Last path segment that is not an identifier, e.g. "messwerte".
+    """
+    for segment in reversed(parse.urlsplit(url).path.split("/")):
+        if _ENDPOINT_SEGMENT.match(segment):
+            return segment
+    return "other"
+
+
+def _record_response(response: requests.Response, *args, **kwargs) -> None:
+    """requests response hook counting responses and fetched bytes."""
+    endpoint = endpoint_label(response.url)
+    API_RESPONSES.inc(endpoint=endpoint, status=str(response.status_code))
+    # Streamed bodies must not be read here; their size is the declared length
+    if kwargs.get("stream"):
+        size = int(response.headers.get("Content-Length", 0) or 0)
+    else:
+        size = len(response.content or b"")
+    API_RESPONSE_BYTES.inc(size, endpoint=endpoint)
+    record_span("http", response.elapsed.total_seconds(), method=response.request.method, endpoint=endpoint,
+                status=response.status_code, bytes=size)
+
+
+def _as_datetime(value: date) -> datetime:
+    """Datetime of a date or datetime; naive times stand for UTC, as in the API queries."""
+    return value if isinstance(value, datetime) else datetime.combine(value, datetime.min.time())
+
+
+def _reading_time(timestamp: str) -> datetime:
+    """Naive UTC time of an API reading timestamp."""
+    parsed = date_parser.isoparse(timestamp)
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def _readings_between(data: Dict[str, Any], start: datetime, end: datetime) -> Dict[str, Any]:
+    """Readings of a {"data": [...]} result in the quarter hours from start to end."""
+    start = start.replace(minute=start.minute - start.minute % 15, second=0, microsecond=0)
+    return {"data": [item for item in data["data"] if start <= _reading_time(item["timestamp"]) < end]}
+
+
+def _raise_for_status(response: requests.Response, *args, **kwargs) -> None:
+    """Response hook raising HTTP errors, which the vienna-smartmeter library would parse as data."""
+    response.raise_for_status()
+
 
 class Smartmeter:
     """Smartmeter client wrapper for the vienna-smartmeter library."""
 
-    def __init__(self, username: str, password: str, use_mock: bool = False, api_timeout: int = 60, use_oauth: bool = True):
+    def __init__(self, username: str, password: str, use_mock: bool = False, api_timeout: int = 60, use_oauth: bool = True,
+                 auth_url: Optional[str] = None, api_url: Optional[str] = None,
+                 circuit_breakers: Optional[CircuitBreakers] = None, throttle: Optional[AdaptiveThrottle] = None,
+                 hedger: Optional[Hedger] = None, single_flight: Optional[SingleFlight] = None,
+                 api_slot: Optional[Callable[[], ContextManager[None]]] = None):
         """Initialize the Smartmeter API client.
 
         Args:
@@ -33,34 +123,110 @@ class Smartmeter:
             use_mock (bool, optional): Use mock data instead of real API calls. Defaults to False.
             api_timeout (int, optional): API request timeout in seconds. Defaults to 60.
             use_oauth (bool, optional): Use OAuth authentication. Defaults to True.
+            auth_url (str, optional): OpenID Connect base URL replacing AUTH_URL,
+                e.g. of a local fake API. Defaults to None.
+            api_url (str, optional): API base URL replacing API_URL. Defaults to None.
+            circuit_breakers (CircuitBreakers, optional): Breakers of the login,
+                zaehlpunkte, bewegungsdaten and messwerte endpoints. Defaults to
+                breakers with the default thresholds.
+            throttle (AdaptiveThrottle, optional): Rate and concurrency limit of
+                all requests of the account. Defaults to the default limits.
+            hedger (Hedger, optional): Hedges short, recent bewegungsdaten
+                queries with the verbrauch day view. Defaults to None (no hedging).
+            single_flight (SingleFlight, optional): Shares concurrent requests for
+                the same meter and range. Defaults to one per client.
+            api_slot (Callable, optional): Context manager held while a shared
+                readings request runs, e.g. the account's fair-queue slot. Callers
+                waiting for a request in flight hold none. Defaults to None.
         """
         self.username = username
         self.password = password
         self._use_mock = use_mock
         self.api_timeout = api_timeout
         self.use_oauth = use_oauth
+        self._auth_url = auth_url
+        self._api_url = api_url
         
         # Initialize the vienna-smartmeter client (defer initialization until login)
         self._client = None
         self._vienna_client_initialized = False
+        
+        # Every request of the account, whichever session sends it, shares one limiter
+        self.throttle = throttle or AdaptiveThrottle()
             
         # For session management compatibility
+        self.session = self._new_session()
         self._access_token = None
         self._refresh_token = None
         self._api_gateway_token = None
         self._access_token_expiration = None
         self._refresh_token_expiration = None
         self._api_gateway_b2b_token = None
+        
+        # Contracts are shared by all meters of the account
+        self._zaehlpunkte_cache: Optional[Tuple[datetime, list]] = None
+        self._zaehlpunkte_lock = threading.Lock()
+        
+        # Fail fast while an endpoint is down instead of running every call into its timeout
+        self.breakers = circuit_breakers or CircuitBreakers()
+        
+        # Recent days are served by two endpoints; a slow bewegungsdaten answer may be raced by verbrauch
+        self.hedger = hedger
+        
+        # Sync stages, backfill and diagnostics may ask for the same range at the same time
+        self.single_flight = single_flight or SingleFlight()
+        self.api_slot = api_slot or nullcontext
+
+    @property
+    def auth_url(self) -> str:
+        """OpenID Connect base URL used for the login."""
+        return self._auth_url or const.AUTH_URL
+
+    @property
+    def api_url(self) -> str:
+        """Base URL of the Smart Meter API."""
+        return self._api_url or const.API_URL
+
+    def _vienna_client_class(self) -> type:
+        """vienna-smartmeter client class, pointed at the configured base URLs.
+        
+        Returns:
+            type: ViennaSmartmeter, or a subclass overriding its URLs if base URLs are configured.
+        """
+        if not self._auth_url and not self._api_url:
+            return ViennaSmartmeter
+        
+        # The library joins endpoints by plain concatenation
+        overrides = {}
+        if self._auth_url:
+            overrides["AUTH_URL"] = self._auth_url.rstrip("/") + "/"
+        if self._api_url:
+            overrides["API_URL"] = self._api_url.rstrip("/") + "/"
+        return type("ConfiguredViennaSmartmeter", (ViennaSmartmeter,), overrides)
+
+    def _new_session(self) -> requests.Session:
+        """HTTP session whose requests are throttled and counted in the API metrics."""
+        session = requests.Session()
+        self._throttle_session(session)
+        session.hooks["response"].append(_record_response)
+        return session
+
+    def _throttle_session(self, session: requests.Session) -> None:
+        """Send the requests of a session through the account's throttle."""
+        adapter = ThrottledAdapter(self.throttle, endpoint_label)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
 
     def reset(self):
         """Reset the session and tokens."""
-        self.session = requests.Session()
+        self.session = self._new_session()
         self._access_token = None
         self._refresh_token = None
         self._api_gateway_token = None
         self._access_token_expiration = None
         self._refresh_token_expiration = None
         self._api_gateway_b2b_token = None
+        self._zaehlpunkte_cache = None
 
     def is_login_expired(self) -> bool:
         """Check if the login has expired.
@@ -87,17 +253,15 @@ class Smartmeter:
         Raises:
             SmartmeterConnectionError: If loading the login page fails.
         """
-        login_url = const.AUTH_URL + "auth?" + parse.urlencode(const.LOGIN_ARGS)
-        logger.info(f"Attempting to load login page from URL: {login_url}")
+        login_url = self.auth_url + "auth?" + parse.urlencode(const.LOGIN_ARGS)
+        logger.info("Loading login page from %s", self.auth_url)
         
         try:
             result = self.session.get(login_url)
-            logger.info(f"Login page response status: {result.status_code}")
-            logger.info(f"Login page response headers: {result.headers}")
-            
-            # Save the first 1000 characters of the response content to the log
-            content_preview = result.content[:1000].decode('utf-8', errors='replace')
-            logger.info(f"Login page content preview: {content_preview}")
+            logger.info("Login page response status: %s", result.status_code)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Login page response headers: %s", redact(result.headers))
+                logger.debug("Login page content preview: %s", PREVIEWS.preview(result.content))
             
         except Exception as exception:
             logger.error(f"Exception during login page load: {str(exception)}")
@@ -113,7 +277,7 @@ class Smartmeter:
             # For now, let's use a hardcoded URL for testing
             # This is a temporary workaround until we can fix the parsing
             logger.info("Using hardcoded login URL as a workaround")
-            return const.AUTH_URL + "login-actions/authenticate"
+            return self.auth_url + "login-actions/authenticate"
             
         except Exception as exception:
             logger.error(f"Exception during login form extraction: {str(exception)}")
@@ -132,23 +296,21 @@ class Smartmeter:
             SmartmeterConnectionError: If connection fails.
             SmartmeterLoginError: If login fails.
         """
-        logger.info(f"Starting credentials login with URL: {url}")
+        logger.info("Starting credentials login")
         
         try:
             # First step: Submit username
-            logger.info(f"Submitting username: {self.username}")
+            logger.info("Submitting username")
             result = self.session.post(
                 url,
                 data={"username": self.username, "login": " "},
                 allow_redirects=False,
             )
             
-            logger.info(f"Username submission response status: {result.status_code}")
-            logger.info(f"Username submission response headers: {result.headers}")
-            
-            # Log a preview of the response content
-            content_preview = result.content[:1000].decode('utf-8', errors='replace')
-            logger.info(f"Username submission response content preview: {content_preview}")
+            logger.info("Username submission response status: %s", result.status_code)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Username submission response headers: %s", redact(result.headers))
+                logger.debug("Username submission response content preview: %s", PREVIEWS.preview(result.content))
 
             if result.status_code not in [200, 302]:
                 logger.error(f"Initial login step failed with status {result.status_code}")
@@ -158,9 +320,9 @@ class Smartmeter:
             tree = html.fromstring(result.content)
             form_inputs = tree.xpath("//form//input[@name]")
             
-            logger.info(f"Found {len(form_inputs)} form inputs")
+            logger.debug("Found %d form inputs", len(form_inputs))
             for input_el in form_inputs:
-                logger.info(f"Form input: name={input_el.attrib.get('name')}, type={input_el.attrib.get('type')}")
+                logger.debug("Form input: name=%s, type=%s", input_el.attrib.get('name'), input_el.attrib.get('type'))
             
             # Build form data dynamically
             form_data = {el.attrib['name']: el.attrib.get('value', '') for el in form_inputs}
@@ -169,7 +331,7 @@ class Smartmeter:
             if 'password' in form_data:
                 form_data['password'] = self.password
             
-            logger.info(f"Form data keys: {list(form_data.keys())}")
+            logger.debug("Form data keys: %s", list(form_data.keys()))
                 
             # Extract the form action URL
             action = tree.xpath("(//form/@action)")
@@ -186,7 +348,7 @@ class Smartmeter:
                 
                 raise SmartmeterLoginError("Could not find password form action URL")
             
-            logger.info(f"Password form action URL: {action[0]}")
+            logger.debug("Password form action URL: %s", redact_text(action[0]))
                 
             # Submit password form
             logger.info("Submitting password form")
@@ -196,8 +358,8 @@ class Smartmeter:
                 allow_redirects=False,
             )
             
-            logger.info(f"Password submission response status: {result.status_code}")
-            logger.info(f"Password submission response headers: {result.headers}")
+            logger.info("Password submission response status: %s", result.status_code)
+            logger.debug("Password submission response headers: %s", redact(result.headers))
 
         except Exception as exception:
             logger.error(f"Login error: {str(exception)}")
@@ -208,7 +370,7 @@ class Smartmeter:
             raise SmartmeterLoginError("Login failed. Check username/password.")
             
         location = result.headers["Location"]
-        logger.info(f"Redirect location: {location}")
+        logger.debug("Redirect location: %s", redact_text(location))
         parsed_url = parse.urlparse(location)
 
         try:
@@ -245,7 +407,7 @@ class Smartmeter:
         """
         try:
             result = self.session.post(
-                const.AUTH_URL + "token",
+                self.auth_url + "token",
                 data=const.build_access_token_args(code=code),
             )
         except Exception as exception:
@@ -287,26 +449,35 @@ class Smartmeter:
             self._access_token_expiration = datetime.now() + timedelta(hours=1)
             return self
             
-        try:
-            logger.info("Performing OAuth login using vienna-smartmeter library")
-            
-            # Initialize the vienna-smartmeter client (this will trigger authentication)
-            if not self._vienna_client_initialized:
-                logger.info(f"Initializing vienna-smartmeter client with username: {self.username}")
-                self._client = ViennaSmartmeter(self.username, self.password)
-                self._vienna_client_initialized = True
-                logger.info("Vienna-smartmeter client initialized successfully")
-            
-            # Mark as logged in
-            self._access_token = "vienna_smartmeter_authenticated"
-            self._access_token_expiration = datetime.now() + timedelta(hours=1)
-            
-            logger.info("OAuth login completed successfully")
-            return self
-            
-        except Exception as error:
-            logger.error(f"OAuth login failed: {str(error)}")
-            raise SmartmeterLoginError(f"OAuth authentication failed: {str(error)}") from error
+        started = time.perf_counter()
+        with span("login"), self.breakers.guard("login"):
+            try:
+                logger.info("Performing OAuth login using vienna-smartmeter library")
+                
+                # Initialize the vienna-smartmeter client (this will trigger authentication)
+                if not self._vienna_client_initialized:
+                    logger.info(f"Initializing vienna-smartmeter client with username: {self.username}")
+                    self._client = self._vienna_client_class()(self.username, self.password)
+                    self._vienna_client_initialized = True
+                    # Count the library's API traffic like our own
+                    library_session = getattr(self._client, "session", None)
+                    if isinstance(library_session, requests.Session):
+                        self._throttle_session(library_session)
+                        library_session.hooks["response"].extend([_record_response, _raise_for_status])
+                    logger.info("Vienna-smartmeter client initialized successfully")
+                
+                # Mark as logged in
+                self._access_token = "vienna_smartmeter_authenticated"
+                self._access_token_expiration = datetime.now() + timedelta(hours=1)
+                
+                LOGIN_SECONDS.observe(time.perf_counter() - started, outcome="success")
+                logger.info("OAuth login completed successfully")
+                return self
+                
+            except Exception as error:
+                LOGIN_SECONDS.observe(time.perf_counter() - started, outcome="error")
+                logger.error(f"OAuth login failed: {str(error)}")
+                raise SmartmeterLoginError(f"OAuth authentication failed: {str(error)}") from error
 
     def _access_valid_or_raise(self):
         """Check if the access token is still valid or raise an exception.
@@ -314,7 +485,7 @@ class Smartmeter:
         Raises:
             SmartmeterConnectionError: If access token is expired.
         """
-        logger.info("Checking token validity")
+        logger.debug("Checking token validity")
         
         # For testing, we'll be more lenient
         if self._access_token is None:
@@ -448,8 +619,7 @@ class Smartmeter:
         Raises:
             SmartmeterConnectionError: If connection fails or token is invalid.
         """
-        logger.info(f"API call to {endpoint} (base: {base_url})")
-        logger.info(f"Checking token validity")
+        logger.debug("API call to %s (base: %s)", endpoint, base_url)
         
         # Use instance timeout if none provided
         if timeout is None:
@@ -502,7 +672,7 @@ class Smartmeter:
                     ]
                 }
                 
-                logger.info(f"Mock bewegungsdaten: {mock_data}")
+                logger.debug("Mock bewegungsdaten: %s", mock_data)
                 return mock_data
             
             # For zaehlpunkte endpoint
@@ -547,7 +717,7 @@ class Smartmeter:
                         "zaehlpunktnummer": zaehlpunkt
                     }
                     
-                    logger.info(f"Mock zaehlpunkt data: {mock_data}")
+                    logger.debug("Mock zaehlpunkt data: %s", mock_data)
                     return mock_data
                 
                 # For zaehlpunkt messwerte endpoint
@@ -585,7 +755,7 @@ class Smartmeter:
                         ]
                     }
                     
-                    logger.info(f"Mock zaehlpunkt messwerte data: {mock_data}")
+                    logger.debug("Mock zaehlpunkt messwerte data: %s", mock_data)
                     return mock_data
                 
                 # For general zaehlpunkte endpoint
@@ -623,7 +793,7 @@ class Smartmeter:
                         }
                     }
                     
-                    logger.info(f"Mock zaehlpunkte data: {mock_data}")
+                    logger.debug("Mock zaehlpunkte data: %s", mock_data)
                     return mock_data
             
             # For any other endpoint
@@ -635,7 +805,7 @@ class Smartmeter:
         self._access_valid_or_raise()
 
         if base_url is None:
-            base_url = const.API_URL
+            base_url = self.api_url
             
         # Make sure the endpoint doesn't start with a slash if it's going to be joined
         if endpoint.startswith('/'):
@@ -661,29 +831,42 @@ class Smartmeter:
         if data:
             headers["Content-Type"] = "application/json"
 
-        logger.info(f"Making API request to {url}")
-        logger.info(f"Headers: {headers}")
+        endpoint_name = endpoint_label(url)
+        verbose = logger.isEnabledFor(logging.DEBUG)
+        if verbose:
+            logger.debug("Request headers: %s", redact(headers))
         
+        started = time.perf_counter()
+        outcome = "error"
         try:
-            response = self.session.request(
-                method, url, headers=headers, json=data, timeout=timeout
-            )
-            
-            logger.info(f"Response status: {response.status_code}")
-            logger.info(f"Response headers: {response.headers}")
-            
-            # Log a preview of the response content
-            content_preview = response.content[:500].decode('utf-8', errors='replace')
-            logger.info(f"Response content preview: {content_preview}")
-            
-            response.raise_for_status()
+            with self.breakers.guard(endpoint_name):
+                response = self.session.request(
+                    method, url, headers=headers, json=data, timeout=timeout
+                )
+                
+                # One summary line per request; the arguments are only formatted if the record is emitted
+                logger.info("API %s %s -> %s (%d bytes, %.2f s)", method, endpoint_name, response.status_code,
+                            len(response.content), time.perf_counter() - started,
+                            extra={"endpoint": endpoint_name, "status": response.status_code})
+                if verbose:
+                    logger.debug("Response headers: %s", redact(response.headers))
+                    if PREVIEWS.allow(endpoint_name):
+                        logger.debug("Response content preview: %s", PREVIEWS.preview(response.content))
+                
+                response.raise_for_status()
             
             if return_response:
+                outcome = "success"
                 return response
                 
-            return response.json()
+            result = response.json()
+            outcome = "success"
+            return result
             
+        except SmartmeterCircuitOpenError:
+            raise
         except requests.exceptions.Timeout as e:
+            outcome = "timeout"
             error_msg = f"Request timeout after {timeout} seconds"
             logger.error(f"API request timeout: {url} - {error_msg}")
             raise SmartmeterConnectionError(
@@ -698,10 +881,10 @@ class Smartmeter:
         except requests.exceptions.HTTPError as e:
             status_code = getattr(e.response, "status_code", None)
             content = getattr(e.response, "content", b"").decode("utf-8", errors="ignore")
-            error_msg = f"HTTP {status_code}: {content[:200]}"
+            error_msg = f"HTTP {status_code}: {redact_text(content[:200])}"
             logger.error(f"API HTTP error: {url} - {error_msg}")
             raise SmartmeterConnectionError(
-                f"API HTTP error: {url} - {error_msg}"
+                f"API HTTP error: {url} - {error_msg}", code=status_code
             ) from e
         except requests.exceptions.RequestException as e:
             status_code = getattr(e.response, "status_code", None) if hasattr(e, 'response') and e.response else None
@@ -721,6 +904,8 @@ class Smartmeter:
             error_msg = f"Unexpected error: {str(e)}"
             logger.error(f"Unexpected error in API call: {url} - {error_msg}")
             raise SmartmeterConnectionError(f"Unexpected error in API call: {url} - {error_msg}") from e
+        finally:
+            API_REQUEST_SECONDS.observe(time.perf_counter() - started, endpoint=endpoint_name, outcome=outcome)
         
         # The code below is kept for reference but not used
         """
@@ -849,6 +1034,9 @@ class Smartmeter:
                     
             return customer_id, zp, const.AnlagenType.from_str(anlagetype)
             
+        except (SmartmeterConnectionError, SmartmeterQueryError):
+            # Let the caller's retry policy decide
+            raise
         except Exception as e:
             logger.error(f"Error getting zaehlpunkt details: {str(e)}")
             # Return mock data
@@ -872,17 +1060,39 @@ class Smartmeter:
         if not self.use_oauth or self._client is None:
             logger.warning("OAuth disabled or client not initialized, returning mock data")
             return self._get_mock_zaehlpunkte()
+        
+        # Concurrent meter fetches wait for one request instead of each sending their own
+        with self._zaehlpunkte_lock:
+            if self._zaehlpunkte_cache is not None:
+                fetched_at, contracts = self._zaehlpunkte_cache
+                if datetime.now() - fetched_at < timedelta(seconds=const.ZAEHLPUNKTE_CACHE_SECONDS):
+                    logger.debug("Using cached zaehlpunkte")
+                    return contracts
+            
+            contracts = self._load_zaehlpunkte()
+            self._zaehlpunkte_cache = (datetime.now(), contracts)
+            return contracts
+    
+    def _load_zaehlpunkte(self) -> list:
+        """Query the contracts and their zaehlpunkte from the API.
+        
+        Returns:
+            list: Contracts in the format used by this client.
             
+        Raises:
+            SmartmeterConnectionError: If the request fails or its circuit is open.
+            SmartmeterQueryError: If the response has an unexpected format.
+        """
         try:
-            logger.info("Using vienna-smartmeter library to get zaehlpunkte")
+            logger.debug("Using vienna-smartmeter library to get zaehlpunkte")
             # Use the vienna-smartmeter library
-            data = self._client.zaehlpunkte()
-            logger.info(f"Vienna smartmeter returned: {type(data)} with {len(data) if isinstance(data, list) else 'unknown'} items")
+            with self.breakers.guard("zaehlpunkte"):
+                data = self._client.zaehlpunkte()
+            logger.info("Vienna smartmeter returned zaehlpunkte: %s", summarize(data))
             
             # Debug: log the actual data structure
-            if isinstance(data, list) and len(data) > 0:
-                logger.info(f"First item structure: {data[0]}")
-                logger.info(f"First item keys: {list(data[0].keys()) if isinstance(data[0], dict) else 'N/A'}")
+            if isinstance(data, list) and data and logger.isEnabledFor(logging.DEBUG):
+                logger.debug("First item structure: %s", redact(data[0]))
             
             # Convert to the format expected by the rest of the code
             if isinstance(data, list):
@@ -906,16 +1116,21 @@ class Smartmeter:
                     
                     contracts.append(contract)
                 
-                logger.info(f"Converted {len(contracts)} contracts with {sum(len(c['zaehlpunkte']) for c in contracts)} zaehlpunkte")
+                logger.info("Converted %d contracts with %d zaehlpunkte",
+                            len(contracts), sum(len(c['zaehlpunkte']) for c in contracts))
                 return contracts
             else:
-                logger.warning(f"Unexpected data format from vienna-smartmeter: {type(data)}")
-                return self._get_mock_zaehlpunkte()
+                raise SmartmeterQueryError(f"Unexpected zaehlpunkte format from vienna-smartmeter: {type(data)}")
                 
+        except requests.exceptions.RequestException as e:
+            status = e.response.status_code if e.response is not None else None
+            raise SmartmeterConnectionError(f"zaehlpunkte request failed: {e}", code=status) from e
+        except (SmartmeterConnectionError, SmartmeterQueryError):
+            raise
         except Exception as e:
+            # Real API failures must not turn into mock readings
             logger.error(f"Error getting zaehlpunkte: {e}")
-            logger.info("Returning mock zaehlpunkte data")
-            return self._get_mock_zaehlpunkte()
+            raise SmartmeterConnectionError(f"zaehlpunkte request failed: {e}") from e
     
     def _get_mock_zaehlpunkte(self) -> list:
         """Get mock zaehlpunkte data for testing."""
@@ -1181,9 +1396,10 @@ class Smartmeter:
             Dict[str, Any]: Bewegungsdaten response.
             
         Raises:
-            SmartmeterQueryError: If data validation fails.
+            SmartmeterConnectionError: If the request fails or its circuit is open.
+            SmartmeterQueryError: If the response has an unexpected format.
         """
-        logger.info(f"Fetching bewegungsdaten for dates: {date_from} to {date_until}")
+        logger.info("Fetching bewegungsdaten for dates: %s to %s", date_from, date_until)
         
         # Set date range defaults
         if date_until is None:
@@ -1200,59 +1416,153 @@ class Smartmeter:
             return self._get_mock_bewegungsdaten(zaehlpunktnummer, date_from, date_until, valuetype)
             
         try:
-            logger.info("Using vienna-smartmeter library to get bewegungsdaten")
-            
             # Get zaehlpunkt info
             customer_id, zaehlpunkt, anlagetype = self.get_zaehlpunkt(zaehlpunktnummer)
-            logger.info(f"Using zaehlpunkt: {zaehlpunkt}, customer_id: {customer_id}, anlagetype: {anlagetype}")
-            
-            # Use the vienna-smartmeter library with 15-minute resolution
-            logger.info(f"Requesting bewegungsdaten with rolle=V002 (15-min intervals)")
-            logger.info(f"Date range: {date_from} to {date_until}")
-            
-            # Use V002 for 15-minute intervals (discovered through testing)
-            data = self._client.bewegungsdaten(
-                zaehlpunkt=zaehlpunkt,
-                date_from=date_from,
-                date_to=date_until,
-                rolle="V002"  # V002 gives 15-minute intervals for this meter type
+            logger.debug("Using zaehlpunkt: %s, customer_id: %s, anlagetype: %s", zaehlpunkt, customer_id, anlagetype)
+            
+            return self.single_flight.do(
+                zaehlpunkt, "bewegungsdaten", _as_datetime(date_from), _as_datetime(date_until),
+                partial(self._fetch_readings, customer_id, zaehlpunkt, date_from, date_until),
+                subrange=_readings_between
             )
-            logger.info(f"Got data with rolle=V002: {len(data.get('values', []))} points")
-            
-            logger.info(f"Vienna smartmeter returned bewegungsdaten: {type(data)}")
-            logger.info(f"Bewegungsdaten keys: {list(data.keys()) if isinstance(data, dict) else 'N/A'}")
-            if isinstance(data, dict):
-                values_array = data.get('values', [])
-                logger.info(f"Values array length: {len(values_array)}")
-                if len(values_array) > 0:
-                    logger.info(f"First data point: {values_array[0]}")
-            
-            # Convert vienna-smartmeter format to expected format
-            if isinstance(data, dict) and 'values' in data:
-                # Convert from vienna-smartmeter format to our expected format
-                converted_data = {
-                    'data': []
-                }
-                
-                for item in data.get('values', []):
-                    # Convert the data point format
-                    converted_item = {
-                        'timestamp': item.get('zeitpunktVon', ''),  # Use zeitpunktVon as timestamp
-                        'value': item.get('wert', 0),
-                        'estimated': item.get('geschaetzt', False)
-                    }
-                    converted_data['data'].append(converted_item)
-                
-                logger.info(f"Converted {len(converted_data['data'])} data points to expected format")
-                return converted_data
-            else:
-                logger.warning(f"Unexpected data format from vienna-smartmeter: {type(data)}")
-                return self._get_mock_bewegungsdaten(zaehlpunktnummer, date_from, date_until, valuetype)
                 
+        except requests.exceptions.RequestException as e:
+            status = e.response.status_code if e.response is not None else None
+            raise SmartmeterConnectionError(f"bewegungsdaten request failed: {e}", code=status) from e
+        except (SmartmeterConnectionError, SmartmeterQueryError):
+            raise
         except Exception as e:
+            # Real API failures must not turn into mock readings
             logger.error(f"Error getting bewegungsdaten: {e}")
-            logger.info("Returning mock bewegungsdaten data")
-            return self._get_mock_bewegungsdaten(zaehlpunktnummer, date_from, date_until, valuetype)
+            raise SmartmeterConnectionError(f"bewegungsdaten request failed: {e}") from e
+    
+    def _fetch_readings(self, customer_id: str, zaehlpunkt: str, date_from: date,
+                        date_until: date) -> Dict[str, Any]:
+        """Query quarter-hour readings from bewegungsdaten, hedged by verbrauch if enabled.
+        
+        Only the caller sending a shared request gets here, so only it takes an API slot.
+        """
+        fetch = partial(self._fetch_bewegungsdaten, customer_id, zaehlpunkt, date_from, date_until)
+        with self.api_slot():
+            if self.hedger is None or not self.hedger.covers(date_from, date_until):
+                return fetch()
+            # Recent days are also served by the verbrauch day view; ask it too when bewegungsdaten is slow
+            data, source = self.hedger.call(fetch, partial(self._fetch_verbrauch, zaehlpunkt, date_from, date_until))
+        logger.debug("bewegungsdaten of %s served by the %s source", zaehlpunkt, source)
+        return data
+    
+    def _fetch_bewegungsdaten(self, customer_id: str, zaehlpunkt: str, date_from: date,
+                              date_until: date) -> Dict[str, Any]:
+        """Query quarter-hour readings from bewegungsdaten with the vienna-smartmeter library.
+        
+        Args:
+            customer_id (str): Customer ID.
+            zaehlpunkt (str): Zaehlpunkt number.
+            date_from (date): Start of the range.
+            date_until (date): End of the range.
+            
+        Returns:
+            Dict[str, Any]: Readings as {"data": [{"timestamp", "value", "estimated"}]}, values in kWh.
+        """
+        logger.debug("Using vienna-smartmeter library to get bewegungsdaten")
+        
+        # Use the vienna-smartmeter library with 15-minute resolution
+        logger.debug("Requesting bewegungsdaten with rolle=V002 (15-min intervals)")
+        
+        # Use V002 for 15-minute intervals (discovered through testing)
+        started = time.perf_counter()
+        with span("api.bewegungsdaten", date_from=str(date_from), date_until=str(date_until)) as api_span, \
+                self.breakers.guard("bewegungsdaten"):
+            try:
+                data = self._client.bewegungsdaten(
+                    zaehlpunkt=zaehlpunkt,
+                    date_from=date_from,
+                    date_to=date_until,
+                    rolle="V002"  # V002 gives 15-minute intervals for this meter type
+                )
+            except Exception:
+                API_REQUEST_SECONDS.observe(time.perf_counter() - started, endpoint="bewegungsdaten", outcome="error")
+                raise
+            API_REQUEST_SECONDS.observe(time.perf_counter() - started, endpoint="bewegungsdaten", outcome="success")
+            api_span.set_attribute("points", len(data.get("values", [])) if isinstance(data, dict) else 0)
+        logger.info("Vienna smartmeter returned bewegungsdaten: %s", summarize(data))
+        if isinstance(data, dict) and data.get('values') and logger.isEnabledFor(logging.DEBUG):
+            logger.debug("First data point: %s", data['values'][0])
+        
+        # Convert vienna-smartmeter format to expected format
+        if isinstance(data, dict) and 'values' in data:
+            # Convert from vienna-smartmeter format to our expected format
+            converted_data = {
+                'data': []
+            }
+            
+            for item in data.get('values', []):
+                # Convert the data point format
+                converted_item = {
+                    'timestamp': item.get('zeitpunktVon', ''),  # Use zeitpunktVon as timestamp
+                    'value': item.get('wert', 0),
+                    'estimated': item.get('geschaetzt', False)
+                }
+                converted_data['data'].append(converted_item)
+            
+            logger.debug("Converted %d data points to expected format", len(converted_data['data']))
+            return converted_data
+        else:
+            raise SmartmeterQueryError(f"Unexpected bewegungsdaten format from vienna-smartmeter: {type(data)}")
+
+    def _fetch_verbrauch(self, zaehlpunkt: str, date_from: date, date_until: date) -> Dict[str, Any]:
+        """Query quarter-hour readings from the verbrauch day view, in the format of _fetch_bewegungsdaten.
+        
+        The day view covers one day per request and reports Wh; days are
+        requested one by one and readings outside the range are dropped.
+        The requests go through the library's authenticated session like
+        _fetch_bewegungsdaten, under the verbrauch circuit breaker and
+        request metrics.
+        
+        Args:
+            zaehlpunkt (str): Zaehlpunkt number.
+            date_from (date): Start of the range.
+            date_until (date): End of the range.
+            
+        Returns:
+            Dict[str, Any]: Readings as {"data": [{"timestamp", "value", "estimated"}]}, values in kWh.
+        """
+        start = _as_datetime(date_from)
+        end = _as_datetime(date_until)
+        start = start.replace(minute=start.minute - start.minute % 15, second=0, microsecond=0)
+        
+        readings = []
+        day = start.replace(hour=0, minute=0)
+        with span("api.verbrauch", date_from=str(date_from), date_until=str(date_until)) as api_span:
+            while day < end:
+                started = time.perf_counter()
+                outcome = "error"
+                try:
+                    with self.breakers.guard("verbrauch"):
+                        data = self._client._call_api(f"m/messdaten/zaehlpunkt/{zaehlpunkt}/verbrauch", query=(
+                            const.build_verbrauchs_args(
+                                dateFrom=self._dt_string(day),
+                                dateTo=self._dt_string(day + timedelta(days=1)),
+                                dayViewResolution=const.Resolution.QUARTER_HOUR.value
+                            )
+                        ))
+                    outcome = "success"
+                finally:
+                    API_REQUEST_SECONDS.observe(time.perf_counter() - started, endpoint="verbrauch", outcome=outcome)
+                if not isinstance(data, dict) or "values" not in data:
+                    raise SmartmeterQueryError(f"Unexpected verbrauch format from vienna-smartmeter: {type(data)}")
+                for item in data["values"]:
+                    if item.get("value") is None:
+                        continue
+                    if start <= _reading_time(item["timestamp"]) < end:
+                        readings.append({
+                            "timestamp": item["timestamp"],
+                            "value": item["value"] / 1000,  # Wh to kWh
+                            "estimated": item.get("isEstimated", False)
+                        })
+                day += timedelta(days=1)
+            api_span.set_attribute("points", len(readings))
+        return {"data": readings}
     
     def _get_mock_bewegungsdaten(self, zaehlpunktnummer: str, date_from: date, date_until: date, valuetype: const.ValueType) -> Dict[str, Any]:
         """Get mock bewegungsdaten for testing."""
@@ -0,0 +1,120 @@
+"""Single-flight coalescing of concurrent API requests for the same readings."""
+
+import logging
+import threading
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .errors import SmartmeterSharedRequestError
+from ..metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+COALESCED_REQUESTS = REGISTRY.counter(
+    "wnsm_api_coalesced_requests_total", "API calls served by an identical or larger request already in flight",
+    ["endpoint", "match"]
+)
+
+
+class _Flight:
+    """A request in flight and, once done, its outcome."""
+    
+    def __init__(self, start: datetime, end: datetime):
+        self.start = start
+        self.end = end
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """Lets concurrent callers of the same meter, endpoint and range share one request.
+    
+    The first caller runs the request; callers arriving while it is in
+    flight wait for it and get its parsed result, or an error caused by
+    its error. A caller
+    whose range lies within a larger range in flight is served from that
+    request too, if the endpoint can cut a result down to a sub-range.
+    Nothing is kept once a request is done, so this never serves stale
+    data. Results are shared between callers and must not be modified.
+    """
+    
+    def __init__(self):
+        """Initialize single flight."""
+        self._lock = threading.Lock()
+        self._flights: Dict[Tuple[str, str], List[_Flight]] = {}
+    
+    def in_flight(self) -> int:
+        """Number of requests currently in flight."""
+        with self._lock:
+            return sum(len(flights) for flights in self._flights.values())
+    
+    def _join(self, key: Tuple[str, str], start: datetime, end: datetime,
+              subrange: Optional[Callable]) -> Tuple[_Flight, Optional[str]]:
+        """Find a flight serving the range, or register a new one; returns it and how it matched."""
+        with self._lock:
+            flights = self._flights.setdefault(key, [])
+            for flight in flights:
+                if flight.start == start and flight.end == end:
+                    return flight, "exact"
+            if subrange is not None:
+                for flight in flights:
+                    if flight.start <= start and end <= flight.end:
+                        return flight, "subrange"
+            flight = _Flight(start, end)
+            flights.append(flight)
+            return flight, None
+    
+    def _land(self, key: Tuple[str, str], flight: _Flight) -> None:
+        with self._lock:
+            flights = self._flights[key]
+            flights.remove(flight)
+            if not flights:
+                del self._flights[key]
+        flight.done.set()
+    
+    def do(self, meter: str, endpoint: str, start: datetime, end: datetime, func: Callable[[], Any],
+           subrange: Optional[Callable[[Any, datetime, datetime], Any]] = None) -> Any:
+        """Run a request, or wait for one in flight that serves the same range.
+        
+        Args:
+            meter: Zaehlpunkt the request is for
+            endpoint: Endpoint name, e.g. "bewegungsdaten"
+            start: Start of the requested range
+            end: End of the requested range
+            func: Sends the request and returns its parsed result
+            subrange: Cuts a result down to the given range; without it
+                only requests for the identical range are shared
+        
+        Returns:
+            Parsed result of the request
+        
+        Raises:
+            SmartmeterSharedRequestError: If a shared request failed, with its error as the cause
+            Exception: The error of the request, for the caller that sent it
+        """
+        key = (meter, endpoint)
+        flight, match = self._join(key, start, end, subrange)
+        if match is None:
+            try:
+                flight.result = func()
+            except BaseException as e:
+                flight.error = e
+                raise
+            finally:
+                self._land(key, flight)
+            return flight.result
+        
+        COALESCED_REQUESTS.inc(endpoint=endpoint, match=match)
+        logger.debug("%s of %s from %s to %s joins the request for %s to %s in flight",
+                     endpoint, meter, start, end, flight.start, flight.end)
+        flight.done.wait()
+        if flight.error is not None:
+            # Each caller gets its own error; raising the shared one would rewrite its traceback from several threads
+            code = getattr(flight.error, "code", None)
+            raise SmartmeterSharedRequestError(
+                f"Shared {endpoint} request failed: {flight.error}", code=code if isinstance(code, int) else None
+            ) from flight.error
+        if match == "exact":
+            return flight.result
+        return subrange(flight.result, start, end)
@@ -16,6 +16,9 @@ REDIRECT_URI = "https://smartmeter-web.wienernetze.at/"
 API_DATE_FORMAT = "%Y-%m-%dT%H:%M:%S.%f"
 AUTH_URL = "https://log.wien/auth/realms/logwien/protocol/openid-connect/"  # noqa
 
+# How long the contract/zaehlpunkt list is reused across meter queries
+ZAEHLPUNKTE_CACHE_SECONDS = 300
+
 # OAuth URLs from the provided credentials
 OAUTH_AUTH_URL = "https://api.wstw.at/invoke/pub.apigateway.oauth2/authorize"
 OAUTH_TOKEN_URL = "https://api.wstw.at/invoke/pub.apigateway.oauth2/getAccessToken"
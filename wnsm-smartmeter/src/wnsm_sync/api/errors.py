@@ -31,6 +31,22 @@ class SmartmeterQueryError(SmartmeterError):
     """Raised if query went not as expected."""
 
 
+class SmartmeterCircuitOpenError(SmartmeterConnectionError):
+    """Raised without calling the API while the endpoint's circuit breaker is open."""
+
+    def __init__(self, endpoint, retry_in):
+        """Creates the error for an endpoint whose next probe is due in retry_in seconds."""
+        self.endpoint = endpoint
+        self.retry_in = retry_in
+        super().__init__(
+            f"Wiener Netze API unavailable: {endpoint} circuit open, next probe in {retry_in:.0f} s"
+        )
+
+
+class SmartmeterSharedRequestError(SmartmeterConnectionError):
+    """Raised to callers that shared a failed request; the request's error is the cause."""
+
+
 # Aliases for backward compatibility and cleaner naming
 WNSMAPIError = SmartmeterError
 AuthenticationError = SmartmeterLoginError
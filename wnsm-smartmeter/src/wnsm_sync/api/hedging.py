@@ -0,0 +1,139 @@
+"""Hedged requests between two API sources of the same readings."""
+
+import logging
+import math
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from datetime import date, datetime, timedelta
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+
+from ..metrics import REGISTRY
+from ..tracing import bind_context
+
+logger = logging.getLogger(__name__)
+
+HEDGED_REQUESTS = REGISTRY.counter(
+    "wnsm_api_hedged_requests_total", "Backup requests sent, by the source that answered first", ["winner"]
+)
+
+
+class LatencyTracker:
+    """Recent latencies of a request source and their percentile."""
+    
+    def __init__(self, percentile: float = 95.0, window: int = 50, min_samples: int = 5,
+                 initial: float = 5.0):
+        """Initialize latency tracker.
+        
+        Args:
+            percentile: Percentile of the recent latencies used as threshold
+            window: Number of recent latencies kept
+            min_samples: Samples needed before the percentile replaces the initial threshold
+            initial: Threshold in seconds until enough samples were recorded
+        """
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.initial = initial
+        self._samples: Deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+    
+    def record(self, latency: float) -> None:
+        """Add the latency of a successful request in seconds."""
+        with self._lock:
+            self._samples.append(latency)
+    
+    def threshold(self) -> float:
+        """Latency in seconds that only the slowest requests exceed."""
+        with self._lock:
+            samples = sorted(self._samples)
+        if len(samples) < self.min_samples:
+            return self.initial
+        return samples[max(0, math.ceil(self.percentile / 100 * len(samples)) - 1)]
+
+
+class Hedger:
+    """Sends a backup request to a second source when the primary one is slow.
+    
+    The primary request starts right away. If it has not answered once it
+    is slower than the percentile of its recent latencies, the backup
+    request starts too and whichever succeeds first wins; the other one
+    runs to completion in the background and its result is dropped. A
+    primary failing before the threshold starts the backup at once. If both
+    fail, the primary's error is raised.
+    """
+    
+    def __init__(self, percentile: float = 95.0, max_days: int = 2, min_delay: float = 0.5, workers: int = 4):
+        """Initialize hedger.
+        
+        Args:
+            percentile: Latency percentile of the primary source after which the backup is sent
+            max_days: Longest date range in days that is hedged
+            min_delay: Minimum seconds before a backup request
+            workers: Threads running the requests
+        """
+        self.tracker = LatencyTracker(percentile)
+        self.max_days = max_days
+        self.min_delay = min_delay
+        self.workers = workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+    
+    def covers(self, date_from: date, date_until: date) -> bool:
+        """Whether a date range is recent and short enough to be hedged."""
+        start = date_from.date() if isinstance(date_from, datetime) else date_from
+        end = date_until.date() if isinstance(date_until, datetime) else date_until
+        limit = timedelta(days=self.max_days)
+        return end - start <= limit and date.today() - end <= limit
+    
+    def _submit(self, func: Callable[[], Any]) -> Future:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="wnsm-hedge")
+        return self._executor.submit(bind_context(func))
+    
+    def call(self, primary: Callable[[], Any], backup: Callable[[], Any]) -> Tuple[Any, str]:
+        """Call the primary source, hedged by the backup source.
+        
+        Args:
+            primary: Request of the primary source
+            backup: Request of the backup source, returning the same format
+        
+        Returns:
+            Result of the first successful request and its source, "primary" or "backup"
+        
+        Raises:
+            Exception: The primary's error if both requests failed
+        """
+        started = time.monotonic()
+        
+        def timed_primary() -> Any:
+            result = primary()
+            self.tracker.record(time.monotonic() - started)
+            return result
+        
+        delay = max(self.min_delay, self.tracker.threshold())
+        futures: Dict[Future, str] = {self._submit(timed_primary): "primary"}
+        done, _ = wait(futures, timeout=delay)
+        for future in done:
+            if future.exception() is None:
+                return future.result(), "primary"
+        
+        if done:
+            logger.warning(f"Primary source failed ({next(iter(done)).exception()}), asking the backup source")
+        else:
+            logger.info(f"Primary source slower than {delay:.2f} s, sending a backup request")
+        futures[self._submit(backup)] = "backup"
+        
+        errors: Dict[str, BaseException] = {}
+        pending = set(futures)
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                source = futures[future]
+                if future.exception() is None:
+                    HEDGED_REQUESTS.inc(winner=source)
+                    logger.info(f"{source.capitalize()} source answered first after {time.monotonic() - started:.2f} s")
+                    return future.result(), source
+                errors[source] = future.exception()
+        raise errors.get("primary") or errors["backup"]
@@ -0,0 +1,103 @@
+"""Cheap, redacted logging of API requests and responses."""
+
+import re
+import threading
+import time
+from typing import Any, Dict, Optional
+
+# Header and payload keys whose values never reach the log (compared lowercase)
+SENSITIVE_KEYS = frozenset({
+    "authorization", "apikey", "x-gateway-apikey", "cookie", "set-cookie", "password",
+    "access_token", "refresh_token", "id_token", "client_secret", "code", "session_state"
+})
+REDACTED = "***"
+
+# Secrets embedded in free text, e.g. response previews and error messages; values cut off by truncation match too
+_SECRET_PATTERNS = (
+    re.compile(r'("(?:access_token|refresh_token|id_token|client_secret|password)"\s*:\s*")[^"]*("?)', re.IGNORECASE),
+    re.compile(r"((?:access_token|refresh_token|id_token|code|password)=)[^&\s\"']+", re.IGNORECASE),
+    re.compile(r"(Bearer\s+)[A-Za-z0-9\-._~+/]+=*", re.IGNORECASE),
+)
+
+
+def redact(value: Any) -> Any:
+    """Copy of a mapping (or list) with the values of sensitive keys masked.
+    
+    Args:
+        value: Headers, query parameters or a decoded JSON payload
+    
+    Returns:
+        Redacted copy, nested mappings and lists included
+    """
+    if hasattr(value, "items"):
+        return {
+            key: REDACTED if str(key).lower() in SENSITIVE_KEYS else redact(item)
+            for key, item in value.items()
+        }
+    if isinstance(value, list):
+        return [redact(item) for item in value]
+    return value
+
+
+def redact_text(text: str) -> str:
+    """Mask tokens, passwords and bearer credentials in free text."""
+    for pattern in _SECRET_PATTERNS:
+        text = pattern.sub(lambda match: match.group(1) + REDACTED + (match.group(2) if match.lastindex > 1 else ""),
+                           text)
+    return text
+
+
+def summarize(payload: Any) -> str:
+    """Describe the shape of a payload without formatting its content.
+    
+    Args:
+        payload: Decoded JSON payload
+    
+    Returns:
+        Short description, e.g. ``dict(descriptor, data[5])``
+    """
+    if isinstance(payload, dict):
+        parts = [f"{key}[{len(item)}]" if isinstance(item, (list, dict)) else str(key) for key, item in payload.items()]
+        return f"dict({', '.join(parts)})"
+    if isinstance(payload, list):
+        return f"list[{len(payload)}]"
+    return type(payload).__name__
+
+
+class PreviewSampler:
+    """Lets through at most one response preview per endpoint and interval.
+    
+    Polling the same endpoint every cycle would otherwise repeat the same
+    preview in the add-on log.
+    """
+    
+    def __init__(self, interval: float = 300.0, size: int = 500):
+        """Initialize preview sampler.
+        
+        Args:
+            interval: Minimum seconds between two previews of one endpoint
+            size: Maximum preview length in bytes
+        """
+        self.interval = interval
+        self.size = size
+        self._last: Dict[str, float] = {}
+        self._lock = threading.Lock()
+    
+    def allow(self, endpoint: str, now: Optional[float] = None) -> bool:
+        """Whether a preview of this endpoint may be logged now.
+        
+        Args:
+            endpoint: Endpoint label
+            now: Monotonic time, defaults to now
+        """
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            last = self._last.get(endpoint)
+            if last is not None and now - last < self.interval:
+                return False
+            self._last[endpoint] = now
+            return True
+    
+    def preview(self, content: bytes) -> str:
+        """Redacted, truncated preview of a response body."""
+        return redact_text(content[:self.size].decode("utf-8", errors="replace"))
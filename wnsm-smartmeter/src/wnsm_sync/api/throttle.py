@@ -0,0 +1,191 @@
+"""Adaptive client-side rate and concurrency limits for the Wiener Netze gateway."""
+
+import logging
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .classification import parse_retry_after
+from ..metrics import REGISTRY
+from ..rate_limit import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+CONCURRENCY_LIMIT = REGISTRY.gauge(
+    "wnsm_api_concurrency_limit", "Concurrent Wiener Netze API requests currently allowed"
+)
+RATE_LIMIT = REGISTRY.gauge(
+    "wnsm_api_rate_limit", "Wiener Netze API requests per second currently allowed"
+)
+THROTTLE_WAIT_SECONDS = REGISTRY.counter(
+    "wnsm_api_throttle_wait_seconds_total", "Seconds API requests waited for the adaptive limiter"
+)
+
+# Responses meaning the gateway is overloaded or throttling us
+OVERLOAD_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+# Requests per second the limiter grows to when the account sets no rate limit
+DEFAULT_MAX_RATE = 5.0
+
+
+class AdaptiveThrottle:
+    """Token bucket and AIMD concurrency limit shared by all requests of an account.
+    
+    Healthy responses grow the concurrency limit by one per window of
+    requests and the request rate by a twentieth of its maximum. A 429 or
+    5xx response, a timeout or a latency well above the endpoint's usual
+    one halves both, at most once per cooldown, so a burst of concurrent
+    failures counts as one signal. A 429 also holds back all requests for
+    its Retry-After, up to a maximum pause.
+    """
+    
+    def __init__(self, max_concurrency: int = 4, max_rate: float = DEFAULT_MAX_RATE, min_rate: float = 0.2,
+                 latency_tolerance: float = 3.0, latency_floor: float = 2.0, cooldown: float = 1.0,
+                 max_pause: float = 30.0):
+        """Initialize adaptive throttle.
+        
+        Args:
+            max_concurrency: Maximum concurrent requests
+            max_rate: Maximum requests per second
+            min_rate: Requests per second the rate never drops below
+            latency_tolerance: Latency multiple of the endpoint's average that counts as overload
+            latency_floor: Latencies in seconds below which no request counts as slow
+            cooldown: Minimum seconds between two decreases
+            max_pause: Maximum seconds a Retry-After holds back all requests;
+                longer waits are left to the retry policy
+        """
+        self.max_concurrency = max_concurrency
+        self.max_rate = max_rate
+        self.min_rate = min(min_rate, max_rate)
+        self.latency_tolerance = latency_tolerance
+        self.latency_floor = latency_floor
+        self.cooldown = cooldown
+        self.max_pause = max_pause
+        # Start in the middle and let healthy responses find the ceiling
+        self.limit = max(1.0, max_concurrency / 2)
+        self.bucket = TokenBucket(max_rate, capacity=max(1.0, max_rate))
+        self._cond = threading.Condition()
+        self._in_flight = 0
+        self._latency: Dict[str, float] = {}
+        self._last_decrease = float("-inf")
+        self._paused_until = 0.0
+        self._publish()
+    
+    @property
+    def rate(self) -> float:
+        """Requests per second currently allowed."""
+        return self.bucket.rate
+    
+    @property
+    def in_flight(self) -> int:
+        with self._cond:
+            return self._in_flight
+    
+    def _publish(self) -> None:
+        CONCURRENCY_LIMIT.set(int(self.limit))
+        RATE_LIMIT.set(round(self.bucket.rate, 3))
+    
+    def acquire(self) -> float:
+        """Wait for the rate limit, then for a free concurrency slot.
+        
+        Returns:
+            Seconds spent waiting
+        """
+        started = time.monotonic()
+        # Wait for the rate first so a throttled request holds no slot
+        with self._cond:
+            pause = self._paused_until - started
+        if pause > 0:
+            time.sleep(pause)
+        self.bucket.acquire()
+        with self._cond:
+            while self._in_flight >= int(self.limit):
+                self._cond.wait()
+            self._in_flight += 1
+        waited = time.monotonic() - started
+        if waited > 0:
+            THROTTLE_WAIT_SECONDS.inc(waited)
+        return waited
+    
+    def release(self, endpoint: str, latency: float, status: Optional[int] = None, timed_out: bool = False,
+                retry_after: Optional[float] = None) -> None:
+        """Return a slot and adapt the limits to the outcome of the request.
+        
+        Args:
+            endpoint: Endpoint label, latencies are compared per endpoint
+            latency: Seconds until the response headers arrived
+            status: HTTP status, None if no response arrived
+            timed_out: Whether the request timed out
+            retry_after: Seconds a 429 response asked us to wait
+        """
+        now = time.monotonic()
+        with self._cond:
+            self._in_flight -= 1
+            average = self._latency.get(endpoint)
+            slow = (status is not None and average is not None and latency > self.latency_floor
+                    and latency > average * self.latency_tolerance)
+            if status is not None:
+                # Slow average: a lasting change of latency becomes the new normal
+                self._latency[endpoint] = latency if average is None else average * 0.9 + latency * 0.1
+            
+            if timed_out:
+                reason = "timeout"
+            elif status in OVERLOAD_STATUSES:
+                reason = f"HTTP {status}"
+            elif slow:
+                reason = f"latency {latency:.1f} s"
+            else:
+                reason = None
+            
+            if reason is not None:
+                if status == 429 and retry_after:
+                    self._paused_until = max(self._paused_until, now + min(retry_after, self.max_pause))
+                if now - self._last_decrease >= self.cooldown:
+                    self._last_decrease = now
+                    self.limit = max(1.0, self.limit / 2)
+                    self.bucket.set_rate(max(self.min_rate, self.bucket.rate / 2))
+                    logger.warning(f"API backing off after {reason} on {endpoint}: "
+                                   f"{int(self.limit)} concurrent, {self.bucket.rate:.2f} requests/s")
+            elif status is not None and status < 400:
+                self.limit = min(float(self.max_concurrency), self.limit + 1 / self.limit)
+                self.bucket.set_rate(min(self.max_rate, self.bucket.rate + self.max_rate / 20))
+            self._publish()
+            self._cond.notify_all()
+
+
+class ThrottledAdapter(HTTPAdapter):
+    """Transport adapter sending every request of a session through an AdaptiveThrottle."""
+    
+    def __init__(self, throttle: AdaptiveThrottle, label: Callable[[str], str], **kwargs):
+        """Initialize throttled adapter.
+        
+        Args:
+            throttle: Limiter shared by the sessions of the account
+            label: Endpoint label of a request URL
+            **kwargs: Arguments of HTTPAdapter
+        """
+        super().__init__(**kwargs)
+        self.throttle = throttle
+        self.label = label
+    
+    def send(self, request: requests.PreparedRequest, **kwargs) -> requests.Response:
+        self.throttle.acquire()
+        started = time.monotonic()
+        status = None
+        timed_out = False
+        retry_after = None
+        try:
+            response = super().send(request, **kwargs)
+            status = response.status_code
+            if status == 429:
+                retry_after = parse_retry_after(response.headers.get("Retry-After"))
+            return response
+        except requests.exceptions.Timeout:
+            timed_out = True
+            raise
+        finally:
+            self.throttle.release(self.label(request.url), time.monotonic() - started, status,
+                                  timed_out, retry_after)
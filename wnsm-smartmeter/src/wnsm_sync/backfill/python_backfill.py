@@ -3,16 +3,31 @@
 import logging
 import sqlite3
 import tempfile
+import time
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Optional, List, Dict, Any
 
 from ..config.loader import WNSMConfig
 from ..data.models import EnergyData, EnergyReading
+from ..metrics import REGISTRY
+from ..tracing import record_span
 from .csv_exporter import CSVExporter, CumulativeReading
 
 logger = logging.getLogger(__name__)
 
+BACKFILL_PHASE_SECONDS = REGISTRY.histogram(
+    "wnsm_backfill_duration_seconds", "Duration of the phases of a statistics backfill", ["phase"]
+)
+BACKFILL_LOCK_WAIT_SECONDS = REGISTRY.histogram(
+    "wnsm_backfill_lock_wait_seconds", "Time waited for the recorder database write lock"
+)
+BACKFILL_LOCK_HOLD_SECONDS = REGISTRY.histogram(
+    "wnsm_backfill_lock_hold_seconds", "Time the recorder database write lock was held by a backfill"
+)
+BACKFILL_ROWS = REGISTRY.counter("wnsm_backfill_rows_total", "Statistics rows written by backfills", ["table"])
+BACKFILL_RATE = REGISTRY.gauge("wnsm_backfill_rows_per_second", "Readings per second of the last backfill")
+
 
 def normalize_timestamp_to_utc(timestamp: datetime) -> datetime:
     """Normalize a timestamp to timezone-naive UTC.
@@ -58,12 +73,17 @@ class PythonBackfill:
         
         # Short term statistics retention (days)
         self.short_term_days = getattr(config, 'ha_short_term_days', 14)
+        
+        # Statistics rows (long- and short-term) written since start
+        self.rows_written = 0
     
-    def backfill_energy_data(self, energy_data: EnergyData) -> bool:
+    def backfill_energy_data(self, energy_data: EnergyData, start_sum: float = 0.0) -> bool:
         """Backfill energy data into Home Assistant database.
         
         Args:
             energy_data: Energy data to backfill
+            start_sum: Cumulative total before the first reading, used when
+                a long range is backfilled in consecutive chunks
             
         Returns:
             True if backfill was successful, False otherwise
@@ -75,7 +95,7 @@ class PythonBackfill:
             logger.info(f"Starting Python backfill for {len(energy_data.readings)} energy readings")
             
             # Convert readings to cumulative format
-            cumulative_readings = self._convert_to_cumulative(energy_data.readings)
+            cumulative_readings = self._convert_to_cumulative(energy_data.readings, start_sum)
             
             if not cumulative_readings:
                 logger.warning("No cumulative readings to backfill")
@@ -122,17 +142,19 @@ class PythonBackfill:
         logger.debug("All prerequisites for Python backfill are met")
         return True
     
-    def _convert_to_cumulative(self, readings: List[EnergyReading]) -> List[CumulativeReading]:
+    def _convert_to_cumulative(self, readings: List[EnergyReading],
+                               start_sum: float = 0.0) -> List[CumulativeReading]:
         """Convert delta readings to cumulative readings.
         
         Args:
             readings: List of delta readings
+            start_sum: Cumulative total before the first reading
             
         Returns:
             List of cumulative readings
         """
         cumulative_readings = []
-        cumulative_total = 0.0
+        cumulative_total = start_sum
         
         # Sort readings by timestamp to ensure proper cumulative calculation
         sorted_readings = sorted(readings, key=lambda r: r.timestamp)
@@ -159,12 +181,16 @@ class PythonBackfill:
             True if insertion was successful, False otherwise
         """
         try:
+            started = time.perf_counter()
             conn = sqlite3.connect(self.ha_database_path)
             cursor = conn.cursor()
             
-            # Begin transaction
-            cursor.execute("BEGIN TRANSACTION")
+            # Take the write lock up front, so waiting for the recorder is measured on its own
+            cursor.execute("BEGIN IMMEDIATE TRANSACTION")
+            locked = time.perf_counter()
+            BACKFILL_LOCK_WAIT_SECONDS.observe(locked - started)
             
+            rows: Dict[str, int] = {}
             # Get time range for deletion
             if readings:
                 # Normalize all timestamps to timezone-naive UTC for comparison
@@ -173,20 +199,37 @@ class PythonBackfill:
                 end_time = max(normalized_timestamps)
                 
                 # Delete existing records in the time range
-                self._delete_existing_records(cursor, start_time, end_time)
+                with BACKFILL_PHASE_SECONDS.time(phase="delete"):
+                    self._delete_existing_records(cursor, start_time, end_time)
                 
                 # Insert new records
-                self._insert_new_records(cursor, readings)
+                with BACKFILL_PHASE_SECONDS.time(phase="insert"):
+                    rows = self._insert_new_records(cursor, readings)
             
             # Commit transaction
-            conn.commit()
+            with BACKFILL_PHASE_SECONDS.time(phase="commit"):
+                conn.commit()
+            BACKFILL_LOCK_HOLD_SECONDS.observe(time.perf_counter() - locked)
             conn.close()
             
+            for table, count in rows.items():
+                BACKFILL_ROWS.inc(count, table=table)
+            self.rows_written += sum(rows.values())
+            elapsed = time.perf_counter() - started
+            if readings and elapsed > 0:
+                BACKFILL_RATE.set(len(readings) / elapsed)
+            record_span("sqlite.transaction", elapsed, readings=len(readings),
+                        statistics_rows=rows.get("statistics", 0),
+                        short_term_rows=rows.get("statistics_short_term", 0),
+                        lock_wait_seconds=round(locked - started, 6), committed=True)
+            
             logger.info(f"Successfully inserted {len(readings)} statistics records")
             return True
             
         except Exception as e:
             logger.error(f"Error inserting statistics: {e}")
+            record_span("sqlite.transaction", time.perf_counter() - started, readings=len(readings),
+                        committed=False, error=str(e))
             if 'conn' in locals():
                 conn.rollback()
                 conn.close()
@@ -222,14 +265,18 @@ class PythonBackfill:
         deleted_short = cursor.rowcount
         logger.debug(f"Deleted {deleted_short} existing short-term statistics records")
     
-    def _insert_new_records(self, cursor: sqlite3.Cursor, readings: List[CumulativeReading]) -> None:
+    def _insert_new_records(self, cursor: sqlite3.Cursor, readings: List[CumulativeReading]) -> Dict[str, int]:
         """Insert new statistics records.
         
         Args:
             cursor: Database cursor
             readings: List of cumulative readings to insert
+            
+        Returns:
+            Number of rows inserted per table
         """
         short_term_cutoff = datetime.now() - timedelta(days=self.short_term_days)
+        rows = {"statistics": 0, "statistics_short_term": 0}
         
         for reading in readings:
             # Normalize timestamp to timezone-naive UTC
@@ -244,6 +291,7 @@ class PythonBackfill:
                     utc_time, 
                     utc_time - timedelta(hours=1)
                 )
+                rows["statistics"] += 1
             
             # Insert into short-term statistics (5-minute data)
             if utc_time > short_term_cutoff:
@@ -254,6 +302,9 @@ class PythonBackfill:
                     utc_time, 
                     utc_time - timedelta(minutes=5)
                 )
+                rows["statistics_short_term"] += 1
+        
+        return rows
     
     def _insert_statistic_record(
         self, 
@@ -1,10 +1,11 @@
 """Configuration loading and validation."""
 
 import os
+import re
 import json
 import logging
 from typing import Dict, Any, List, Optional
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, replace
 
 from .secrets import SecretsManager
 
@@ -18,7 +19,7 @@ class WNSMConfig:
     # Required fields
     wnsm_username: str
     wnsm_password: str
-    zp: str  # Zählpunkt number
+    zp: str  # Zählpunkt number, or several separated by commas
     mqtt_host: str
     
     # Optional fields with defaults
@@ -26,18 +27,50 @@ class WNSMConfig:
     mqtt_username: Optional[str] = None
     mqtt_password: Optional[str] = None
     mqtt_topic: str = "smartmeter/energy/state"
-    update_interval: int = 3600  # 1 hour
+    mqtt_availability_topic: Optional[str] = None  # Shared by all meters, defaults to {mqtt_topic}/availability
+    mqtt_protocol: str = "3.1.1"  # "5" enables topic aliases and message expiry
+    mqtt_message_expiry: int = 3600  # Expiry (seconds) for non-retained messages with MQTT v5
+    mqtt_rate_limit_messages: int = 0  # Max bulk messages per second (0 = unlimited)
+    mqtt_rate_limit_bytes: int = 0  # Max bulk payload bytes per second (0 = unlimited)
+    mqtt_payload_mode: str = "reading"  # "reading" (one message per slot), "hour" or "day" batches
+    update_interval: int = 3600  # 1 hour (maximum interval with adaptive scheduling)
+    adaptive_schedule: bool = True  # Poll around the learned data arrival window
+    min_poll_interval: int = 900  # Poll interval inside the expected arrival window
+    login_prewarm_seconds: int = 120  # Log in this long before a scheduled poll
     history_days: int = 1
     use_mock_data: bool = False
     use_oauth: bool = True  # Whether to use OAuth authentication (disable for testing)
     use_secrets: bool = False  # Whether to use secrets.yaml for credentials
     retry_count: int = 3
     retry_delay: int = 10
+    retry_max_delay: int = 300  # Maximum delay before a retry in seconds
+    retry_budget: int = 600  # Seconds per cycle that may be spent waiting for retries
+    retry_endpoint_budget: int = 10  # Retries per API endpoint and cycle
+    circuit_failure_threshold: int = 3  # Consecutive outage failures that open an API endpoint's circuit
+    circuit_reset_timeout: int = 60  # Seconds an open circuit fails fast before a probe request
     api_timeout: int = 60  # API request timeout in seconds
+    api_auth_url: Optional[str] = None  # Override of the Wiener Netze login URL, e.g. a local fake API
+    api_base_url: Optional[str] = None  # Override of the Wiener Netze API base URL
+    api_rate_limit: int = 0  # HTTP requests per minute the adaptive limiter of this account may grow to (0 = its default)
+    api_max_concurrency: int = 4  # Concurrent API requests the adaptive limiter may grow to
+    hedge_requests: bool = False  # Race slow recent-day bewegungsdaten requests with the verbrauch day view
+    hedge_percentile: int = 95  # Latency percentile of bewegungsdaten after which the backup request is sent
+    hedge_max_days: int = 2  # Only ranges of at most this many recent days are hedged
+    stage_timeout: int = 900  # Maximum duration of a single sync stage in seconds
+    import_chunk_days: int = 30  # Backfills longer than this are imported chunk by chunk
+    import_queue_size: int = 2  # Chunks buffered between import stages
     debug: bool = False
+    log_format: str = "text"  # "text" or "json" (one JSON object per line)
+    log_file: Optional[str] = None  # Additionally write the log to this file
+    log_max_size: int = 5  # MiB at which the log file is rotated
+    log_backups: int = 3  # Rotated log files kept
+    log_compress: bool = False  # Gzip rotated log files
+    log_queue: bool = True  # Write the log on a background thread
     
     # Advanced options
     session_file: str = "/data/session.json"
+    discovery_state_file: str = "/data/discovery_state.json"
+    schedule_state_file: str = "/data/schedule_state.json"
     secrets_paths: List[str] = field(default_factory=lambda: [
         "/config/secrets.yaml",
         "/homeassistant/secrets.yaml", 
@@ -54,29 +87,193 @@ class WNSMConfig:
     ha_generation_metadata_id: Optional[str] = None
     ha_short_term_days: int = 14  # Days to keep short-term statistics
     
+    # CSV export options
+    csv_export: bool = False  # Export every fetched day as ha-backfill compatible CSV
+    csv_export_dir: str = "/data/csv"
+    
+    # Observability
+    metrics_port: int = 0  # Port of the Prometheus /metrics endpoint (0 = disabled)
+    diagnostic_sensors: bool = True  # Publish per-cycle performance numbers as HA diagnostic sensors
+    profile_cycles: int = 0  # Profile the next N sync cycles with cProfile and tracemalloc
+    profile_stages: Optional[str] = None  # Comma-separated stages to profile (default: all)
+    profile_dir: str = "/data/profiles"
+    profile_keep: int = 10  # Profiled cycles whose files are kept
+    tracing: bool = False  # Export a span timeline of every sync cycle
+    trace_dir: str = "/data/traces"
+    trace_keep: int = 20  # Cycle traces kept
+    
+    # Multi-account hosting
+    accounts_file: Optional[str] = None  # JSON list of accounts synced by this process
+    account_name: Optional[str] = None  # Set on per-account configs
+    account_workers: int = 4  # Accounts syncing (and API calls in flight) at the same time
+    
+    # All meters of the account; parsed from a comma-separated ZP
+    zaehlpunkte: List[str] = field(default_factory=list)
+    
     def __post_init__(self):
         """Validate configuration after initialization."""
+        if not self.zaehlpunkte and self.zp:
+            self.zaehlpunkte = [zp.strip() for zp in str(self.zp).split(",") if zp.strip()]
+        self.zaehlpunkte = list(dict.fromkeys(self.zaehlpunkte))
+        if self.zaehlpunkte:
+            self.zp = self.zaehlpunkte[0]
         self._validate()
     
+    @property
+    def availability_topic(self) -> str:
+        """Topic carrying the online/offline state of the add-on."""
+        return self.mqtt_availability_topic or f"{self.mqtt_topic}/availability"
+    
+    @property
+    def multi_meter(self) -> bool:
+        """Whether more than one Zählpunkt is configured."""
+        return len(self.zaehlpunkte) > 1
+    
+    def metadata_id_for(self, zaehlpunkt: str) -> Optional[str]:
+        """Statistics metadata ID configured for a meter.
+        
+        With several meters, ``ha_import_metadata_id`` takes
+        ``<zaehlpunkt>=<id>`` pairs separated by commas; the Zählpunkt may be
+        given in full or as its last 8 digits.
+        
+        Args:
+            zaehlpunkt: Meter point identifier
+            
+        Returns:
+            Metadata ID, None to auto-detect it
+        """
+        value = self.ha_import_metadata_id
+        if not value:
+            return None
+        if "=" not in str(value):
+            return None if self.multi_meter else str(value)
+        
+        for pair in str(value).split(","):
+            meter, _, metadata_id = pair.partition("=")
+            if meter.strip() in (zaehlpunkt, zaehlpunkt[-8:]):
+                return metadata_id.strip()
+        return None
+    
+    def for_meter(self, zaehlpunkt: str) -> "WNSMConfig":
+        """Derive the configuration of a single meter.
+        
+        Each meter publishes below its own topic and writes its own
+        statistics; the availability topic stays shared.
+        
+        Args:
+            zaehlpunkt: Meter point identifier
+            
+        Returns:
+            Configuration for the meter
+        """
+        if not self.multi_meter:
+            return self
+        return replace(
+            self,
+            zp=zaehlpunkt,
+            zaehlpunkte=[zaehlpunkt],
+            mqtt_topic=f"{self.mqtt_topic}/{zaehlpunkt[-8:]}",
+            mqtt_availability_topic=self.availability_topic,
+            ha_import_metadata_id=self.metadata_id_for(zaehlpunkt)
+        )
+    
     def _validate(self):
         """Validate configuration values."""
-        if not self.wnsm_username:
-            raise ValueError("WNSM username is required")
-        if not self.wnsm_password:
-            raise ValueError("WNSM password is required")
-        if not self.zp:
-            raise ValueError("Zählpunkt (ZP) is required")
+        # Credentials come from the accounts file when hosting several accounts
+        if not self.accounts_file:
+            if not self.wnsm_username:
+                raise ValueError("WNSM username is required")
+            if not self.wnsm_password:
+                raise ValueError("WNSM password is required")
+            if not self.zp:
+                raise ValueError("Zählpunkt (ZP) is required")
         if not self.mqtt_host:
             raise ValueError("MQTT host is required")
         
+        # Meter topics and entity IDs use the last 8 digits
+        suffixes = [zp[-8:] for zp in self.zaehlpunkte]
+        if len(set(suffixes)) != len(suffixes):
+            raise ValueError("Zählpunkte must differ in their last 8 digits")
+        
         if self.mqtt_port <= 0 or self.mqtt_port > 65535:
             raise ValueError("MQTT port must be between 1 and 65535")
         
+        if str(self.mqtt_protocol) not in ("3.1.1", "5"):
+            raise ValueError("MQTT protocol must be '3.1.1' or '5'")
+        
+        if self.mqtt_payload_mode not in ("reading", "hour", "day"):
+            raise ValueError("MQTT payload mode must be 'reading', 'hour' or 'day'")
+        
+        if self.log_format not in ("text", "json"):
+            raise ValueError("Log format must be 'text' or 'json'")
+        
+        if self.log_max_size < 1:
+            raise ValueError("Log max size must be at least 1 MiB")
+        
+        if self.log_backups < 1:
+            raise ValueError("Log backups must be at least 1")
+        
         if self.update_interval < 60:
             raise ValueError("Update interval must be at least 60 seconds")
         
+        if self.min_poll_interval < 60:
+            raise ValueError("Minimum poll interval must be at least 60 seconds")
+        
+        if self.stage_timeout < 1:
+            raise ValueError("Stage timeout must be at least 1 second")
+        
+        if self.retry_max_delay < self.retry_delay:
+            raise ValueError("Retry max delay must not be smaller than the retry delay")
+        
+        if self.retry_budget < 0 or self.retry_endpoint_budget < 0:
+            raise ValueError("Retry budgets must not be negative")
+        
+        if self.circuit_failure_threshold < 1:
+            raise ValueError("Circuit failure threshold must be at least 1")
+        
+        if self.circuit_reset_timeout < 1:
+            raise ValueError("Circuit reset timeout must be at least 1 second")
+        
+        if self.import_chunk_days < 1:
+            raise ValueError("Import chunk size must be at least 1 day")
+        
+        if self.import_queue_size < 1:
+            raise ValueError("Import queue size must be at least 1")
+        
         if self.history_days < 1:
             raise ValueError("History days must be at least 1")
+        
+        if self.api_rate_limit < 0:
+            raise ValueError("API rate limit must not be negative")
+        
+        if self.api_max_concurrency < 1:
+            raise ValueError("API max concurrency must be at least 1")
+        
+        if self.hedge_percentile < 50 or self.hedge_percentile > 99:
+            raise ValueError("Hedge percentile must be between 50 and 99")
+        
+        if self.hedge_max_days < 1:
+            raise ValueError("Hedge max days must be at least 1")
+        
+        if self.account_workers < 1:
+            raise ValueError("Account workers must be at least 1")
+        
+        if self.metrics_port < 0 or self.metrics_port > 65535:
+            raise ValueError("Metrics port must be between 1 and 65535, or 0 to disable metrics")
+        
+        if self.profile_cycles < 0:
+            raise ValueError("Profile cycles must not be negative")
+        
+        if self.profile_keep < 1:
+            raise ValueError("Profile keep must be at least 1")
+        
+        if self.trace_keep < 1:
+            raise ValueError("Trace keep must be at least 1")
+        
+        for name in ("api_auth_url", "api_base_url"):
+            url = getattr(self, name)
+            if url and not url.startswith(("http://", "https://")):
+                raise ValueError(f"{name.upper()} must be an http(s) URL")
 
 
 class ConfigLoader:
@@ -94,30 +291,72 @@ class ConfigLoader:
         "mqtt_username": ["MQTT_USERNAME"],
         "mqtt_password": ["MQTT_PASSWORD"],
         "mqtt_topic": ["MQTT_TOPIC"],
+        "mqtt_protocol": ["MQTT_PROTOCOL"],
+        "mqtt_message_expiry": ["MQTT_MESSAGE_EXPIRY"],
+        "mqtt_rate_limit_messages": ["MQTT_RATE_LIMIT_MESSAGES"],
+        "mqtt_rate_limit_bytes": ["MQTT_RATE_LIMIT_BYTES"],
+        "mqtt_payload_mode": ["MQTT_PAYLOAD_MODE"],
         "update_interval": ["UPDATE_INTERVAL"],
+        "adaptive_schedule": ["ADAPTIVE_SCHEDULE"],
+        "min_poll_interval": ["MIN_POLL_INTERVAL"],
+        "login_prewarm_seconds": ["LOGIN_PREWARM_SECONDS"],
         "history_days": ["HISTORY_DAYS"],
         "use_mock_data": ["WNSM_USE_MOCK_DATA", "USE_MOCK_DATA"],
         "use_oauth": ["USE_OAUTH"],
         "use_secrets": ["USE_SECRETS"],
         "retry_count": ["RETRY_COUNT"],
         "retry_delay": ["RETRY_DELAY"],
+        "retry_max_delay": ["RETRY_MAX_DELAY"],
+        "retry_budget": ["RETRY_BUDGET"],
+        "retry_endpoint_budget": ["RETRY_ENDPOINT_BUDGET"],
+        "circuit_failure_threshold": ["CIRCUIT_FAILURE_THRESHOLD"],
+        "circuit_reset_timeout": ["CIRCUIT_RESET_TIMEOUT"],
         "api_timeout": ["API_TIMEOUT"],
+        "api_auth_url": ["API_AUTH_URL"],
+        "api_base_url": ["API_BASE_URL"],
+        "api_rate_limit": ["API_RATE_LIMIT"],
+        "api_max_concurrency": ["API_MAX_CONCURRENCY"],
+        "hedge_requests": ["HEDGE_REQUESTS"],
+        "hedge_percentile": ["HEDGE_PERCENTILE"],
+        "hedge_max_days": ["HEDGE_MAX_DAYS"],
+        "accounts_file": ["ACCOUNTS_FILE"],
+        "account_workers": ["ACCOUNT_WORKERS"],
+        "stage_timeout": ["STAGE_TIMEOUT"],
+        "import_chunk_days": ["IMPORT_CHUNK_DAYS"],
+        "import_queue_size": ["IMPORT_QUEUE_SIZE"],
         "debug": ["DEBUG"],
+        "log_format": ["LOG_FORMAT"],
+        "log_file": ["LOG_FILE"],
+        "log_max_size": ["LOG_MAX_SIZE"],
+        "log_backups": ["LOG_BACKUPS"],
+        "log_compress": ["LOG_COMPRESS"],
+        "log_queue": ["LOG_QUEUE"],
         "enable_backfill": ["ENABLE_BACKFILL"],
         "use_python_backfill": ["USE_PYTHON_BACKFILL"],
         "ha_database_path": ["HA_DATABASE_PATH"],
         "ha_backfill_binary": ["HA_BACKFILL_BINARY"],
+        "csv_export": ["CSV_EXPORT"],
+        "csv_export_dir": ["CSV_EXPORT_DIR"],
         "ha_import_metadata_id": ["HA_IMPORT_METADATA_ID"],
         "ha_export_metadata_id": ["HA_EXPORT_METADATA_ID"],
         "ha_generation_metadata_id": ["HA_GENERATION_METADATA_ID"],
-        "ha_short_term_days": ["HA_SHORT_TERM_DAYS"]
+        "ha_short_term_days": ["HA_SHORT_TERM_DAYS"],
+        "metrics_port": ["METRICS_PORT"],
+        "diagnostic_sensors": ["DIAGNOSTIC_SENSORS"],
+        "profile_cycles": ["PROFILE_CYCLES"],
+        "profile_stages": ["PROFILE_STAGES"],
+        "profile_dir": ["PROFILE_DIR"],
+        "profile_keep": ["PROFILE_KEEP"],
+        "tracing": ["TRACING"],
+        "trace_dir": ["TRACE_DIR"],
+        "trace_keep": ["TRACE_KEEP"]
     }
     
     # Fields that should be converted to integers
-    INT_FIELDS = {"mqtt_port", "update_interval", "history_days", "retry_count", "retry_delay", "api_timeout", "ha_short_term_days"}
+    INT_FIELDS = {"mqtt_port", "mqtt_message_expiry", "mqtt_rate_limit_messages", "mqtt_rate_limit_bytes", "update_interval", "min_poll_interval", "login_prewarm_seconds", "history_days", "retry_count", "retry_delay", "retry_max_delay", "retry_budget", "retry_endpoint_budget", "circuit_failure_threshold", "circuit_reset_timeout", "api_timeout", "api_rate_limit", "api_max_concurrency", "hedge_percentile", "hedge_max_days", "account_workers", "stage_timeout", "import_chunk_days", "import_queue_size", "ha_short_term_days", "metrics_port", "profile_cycles", "profile_keep", "trace_keep", "log_max_size", "log_backups"}
     
     # Fields that should be converted to booleans
-    BOOL_FIELDS = {"use_mock_data", "use_oauth", "use_secrets", "debug", "enable_backfill", "use_python_backfill"}
+    BOOL_FIELDS = {"use_mock_data", "adaptive_schedule", "use_oauth", "use_secrets", "debug", "enable_backfill", "use_python_backfill", "csv_export", "diagnostic_sensors", "tracing", "log_compress", "log_queue", "hedge_requests"}
     
     def __init__(self, secrets_manager: Optional[SecretsManager] = None):
         """Initialize config loader.
@@ -152,6 +391,11 @@ class ConfigLoader:
         # Convert types
         self._convert_types(config_dict)
         
+        # Account credentials live in the accounts file
+        if config_dict.get("accounts_file"):
+            for key in ("wnsm_username", "wnsm_password", "zp"):
+                config_dict.setdefault(key, "")
+        
         # Log configuration (without sensitive data)
         self._log_config(config_dict)
         
@@ -167,6 +411,78 @@ class ConfigLoader:
             logger.info(f"Filtered config to valid fields: {list(filtered_config.keys())}")
             return WNSMConfig(**filtered_config)
     
+    # Short keys accepted in the accounts file
+    ACCOUNT_KEY_ALIASES = {"username": "wnsm_username", "password": "wnsm_password"}
+    
+    def load_accounts(self, config: WNSMConfig) -> List[WNSMConfig]:
+        """Load the accounts hosted by this process.
+        
+        The accounts file is a JSON list of objects with ``name``,
+        ``username``, ``password`` and ``zp``; any other configuration key
+        overrides the add-on setting for that account. Each account gets
+        its own session file and publishes below ``mqtt_topic/<name>``.
+        
+        Args:
+            config: Add-on configuration with ``accounts_file`` set
+            
+        Returns:
+            One configuration per account, with ``account_name`` set
+            
+        Raises:
+            ValueError: If the file is invalid or an account is misconfigured
+        """
+        try:
+            with open(config.accounts_file, 'r') as f:
+                entries = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            raise ValueError(f"Failed to load accounts file {config.accounts_file}: {e}") from e
+        
+        if not isinstance(entries, list) or not entries:
+            raise ValueError("Accounts file must contain a non-empty list of accounts")
+        
+        valid_fields = set(WNSMConfig.__dataclass_fields__.keys())
+        session_dir = os.path.join(os.path.dirname(config.session_file) or ".", "sessions")
+        accounts = []
+        names = set()
+        
+        for index, entry in enumerate(entries):
+            overrides = {}
+            for key, value in entry.items():
+                config_key = key.lower().replace('-', '_')
+                overrides[self.ACCOUNT_KEY_ALIASES.get(config_key, config_key)] = value
+            
+            name = re.sub(r"[^A-Za-z0-9_-]", "_", str(overrides.pop("name", None) or f"account{index + 1}"))
+            if name in names:
+                raise ValueError(f"Duplicate account name: {name}")
+            names.add(name)
+            
+            unknown = set(overrides) - valid_fields
+            if unknown:
+                raise ValueError(f"Unknown settings for account {name}: {', '.join(sorted(unknown))}")
+            
+            self._resolve_secrets(overrides)
+            self._convert_types(overrides)
+            
+            account_config = {
+                "session_file": os.path.join(session_dir, f"{name}.json"),
+                "mqtt_topic": f"{config.mqtt_topic}/{name}",
+                "mqtt_availability_topic": config.availability_topic,
+                "accounts_file": None,
+                "zaehlpunkte": [],
+                # Statistics of one account must never be written into another's
+                "ha_import_metadata_id": None
+            }
+            account_config.update(overrides)
+            account_config["account_name"] = name
+            
+            try:
+                accounts.append(replace(config, **account_config))
+            except ValueError as e:
+                raise ValueError(f"Invalid configuration for account {name}: {e}") from e
+        
+        logger.info(f"Loaded {len(accounts)} accounts from {config.accounts_file}")
+        return accounts
+    
     def _load_from_options_file(self, config_dict: Dict[str, Any]):
         """Load configuration from Home Assistant options.json file."""
         if os.path.exists(self.OPTIONS_FILE):
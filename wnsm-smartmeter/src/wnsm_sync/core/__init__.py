@@ -1,6 +1,21 @@
 """Core synchronization logic."""
 
-from .sync import WNSMSync
+from .sync import WNSMSync, SharedResources, EnergySink, SinkPipeline, SinkResult
+from .multi_meter import MultiMeterSync, create_sync
+from .accounts import AccountPool
+from .api_gate import AccountGate, FairQueue
+from .diagnostics import CycleDiagnostics
+from .orchestrator import SyncOrchestrator
+from .pipeline import ChunkedImport, ImportReport
+from .retry import Classification, ErrorClass, RetryPolicy, classify
+from .scheduler import AdaptiveScheduler, PollDecision
 from .utils import with_retry, SessionManager
 
-__all__ = ["WNSMSync", "with_retry", "SessionManager"]
\ No newline at end of file
+__all__ = [
+    "WNSMSync", "SharedResources", "MultiMeterSync", "create_sync",
+    "AccountPool", "AccountGate", "FairQueue", "EnergySink", "SinkPipeline", "SinkResult", "SyncOrchestrator",
+    "CycleDiagnostics",
+    "ChunkedImport", "ImportReport", "AdaptiveScheduler", "PollDecision",
+    "Classification", "ErrorClass", "RetryPolicy", "classify",
+    "with_retry", "SessionManager"
+]
\ No newline at end of file
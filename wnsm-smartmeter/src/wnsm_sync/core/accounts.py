@@ -0,0 +1,240 @@
+"""Hosting several Wiener Netze accounts in one process."""
+
+import asyncio
+import logging
+import signal
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Union
+
+from ..config.loader import WNSMConfig
+from ..mqtt.client import MQTTClient
+from ..mqtt.discovery import DiscoveryStateStore, HA_STATUS_TOPIC
+from .api_gate import AccountGate, FairQueue
+from .multi_meter import MultiMeterSync
+from .scheduler import AdaptiveScheduler
+from .sync import SharedResources, WNSMSync
+from .utils import SessionManager
+
+logger = logging.getLogger(__name__)
+
+
+class AccountPool:
+    """Runs the syncs of several accounts on a bounded worker pool.
+    
+    Every account keeps its own API client, session file and rate limit and
+    is scheduled on its own poll plan. At most ``account_workers`` accounts
+    run a cycle at the same time, and their API calls share the same number
+    of slots, granted round-robin between accounts. The MQTT connection,
+    discovery state and scheduler state are shared by all accounts.
+    """
+    
+    def __init__(self, config: WNSMConfig, accounts: List[WNSMConfig]):
+        """Initialize account pool.
+        
+        Args:
+            config: Add-on configuration (broker, pool size, state files)
+            accounts: Per-account configurations, see ``ConfigLoader.load_accounts``
+        """
+        self.config = config
+        self.api_queue = FairQueue(config.account_workers)
+        self.mqtt_client = MQTTClient(config)
+        discovery_state = DiscoveryStateStore(config)
+        discovery_lock = threading.Lock()
+        scheduler = AdaptiveScheduler(config)
+        
+        self.accounts: Dict[str, Union[WNSMSync, MultiMeterSync]] = {}
+        for account_config in accounts:
+            name = account_config.account_name
+            shared = SharedResources(
+                session_manager=SessionManager(account_config),
+                mqtt_client=self.mqtt_client,
+                discovery_state=discovery_state,
+                scheduler=scheduler,
+                api_gate=AccountGate(name, self.api_queue),
+                discovery_lock=discovery_lock
+            )
+            if account_config.multi_meter:
+                self.accounts[name] = MultiMeterSync(account_config, shared=shared)
+            else:
+                self.accounts[name] = WNSMSync(account_config, shared=shared)
+        
+        self.last_results: Dict[str, bool] = {}
+        self.cycle_seconds: Dict[str, float] = {}
+        self._workers: Optional[asyncio.Semaphore] = None
+        self._stop_event: Optional[asyncio.Event] = None
+        self._tasks: List[asyncio.Task] = []
+    
+    def setup_discovery(self, force: bool = False) -> bool:
+        """Publish Home Assistant discovery for all accounts and remove what none generates anymore.
+        
+        Args:
+            force: Re-publish all configs regardless of stored hashes
+        
+        Returns:
+            True if the discovery of all accounts was published successfully
+        """
+        results = [sync.setup_discovery(force=force, prune=False) for sync in self.accounts.values()]
+        if self.accounts:
+            # The state store is shared, so only the topics of all accounts together tell what is stale
+            topics = set().union(*(sync.discovery_topics() for sync in self.accounts.values()))
+            next(iter(self.accounts.values())).remove_stale_discovery(topics)
+        return all(results)
+    
+    def _on_ha_status(self, payload: str, retained: bool) -> None:
+        """Re-publish discovery of all accounts when Home Assistant restarts."""
+        if payload == "online" and not retained:
+            logger.info("Home Assistant restarted, re-publishing discovery configurations")
+            self.setup_discovery(force=True)
+    
+    def start(self) -> None:
+        """Open the shared MQTT connection and publish discovery for all accounts."""
+        logger.info(f"Hosting {len(self.accounts)} accounts with {self.config.account_workers} workers")
+        
+        if not self.mqtt_client.connect():
+            logger.warning("Persistent MQTT connection unavailable, falling back to per-message connections")
+            self.mqtt_client.publish_availability(True)
+        self.mqtt_client.subscribe(HA_STATUS_TOPIC, self._on_ha_status)
+        for sync in self.accounts.values():
+            sync.subscribe_commands()
+        
+        self.setup_discovery()
+    
+    def shutdown(self) -> None:
+        """Mark the service offline and close the MQTT connection."""
+        if self.mqtt_client.is_connected():
+            self.mqtt_client.disconnect()
+        else:
+            self.mqtt_client.publish_availability(False)
+    
+    def _prepare_loop(self) -> None:
+        """Size the thread pool used for blocking stages to the worker count."""
+        loop = asyncio.get_running_loop()
+        loop.set_default_executor(ThreadPoolExecutor(
+            max_workers=max(4, self.config.account_workers * 4), thread_name_prefix="account"
+        ))
+        self._workers = asyncio.Semaphore(self.config.account_workers)
+    
+    async def _run_account_cycle(self, name: str, force_backfill: bool = False) -> bool:
+        """Run one cycle of an account once a worker is free."""
+        sync = self.accounts[name]
+        async with self._workers:
+            started = time.monotonic()
+            try:
+                result = await sync.orchestrator.run_cycle(force_backfill)
+            finally:
+                self.cycle_seconds[name] = time.monotonic() - started
+        self.last_results[name] = result
+        return result
+    
+    async def run_cycle(self, force_backfill: bool = False) -> Dict[str, bool]:
+        """Run one cycle for every account.
+        
+        Args:
+            force_backfill: If True, force use of database backfill instead of MQTT
+        
+        Returns:
+            Success of each account's cycle keyed by account name
+        """
+        self._prepare_loop()
+        results = await asyncio.gather(
+            *(self._run_account_cycle(name, force_backfill) for name in self.accounts)
+        )
+        return dict(zip(self.accounts, results))
+    
+    def run_sync_cycle(self, force_backfill: bool = False) -> bool:
+        """Run a single synchronization cycle for all accounts.
+        
+        Args:
+            force_backfill: If True, force use of database backfill instead of MQTT
+        
+        Returns:
+            True if the cycles of all accounts were successful
+        """
+        results = asyncio.run(self.run_cycle(force_backfill))
+        return all(results.values())
+    
+    async def _sleep(self, seconds: float) -> bool:
+        """Sleep unless shutdown is requested, returning True on shutdown."""
+        try:
+            await asyncio.wait_for(self._stop_event.wait(), timeout=max(0.0, seconds))
+            return True
+        except asyncio.TimeoutError:
+            return False
+    
+    async def _wait_for_next_poll(self, name: str) -> bool:
+        """Sleep until the account's next poll, pre-warming its login.
+        
+        Args:
+            name: Name of the account
+        
+        Returns:
+            True if shutdown was requested while waiting
+        """
+        sync = self.accounts[name]
+        delay = sync.next_poll_delay()
+        logger.info(f"Account {name}: next poll in {delay:.0f} seconds")
+        
+        if not sync.config.adaptive_schedule:
+            return await self._sleep(delay)
+        
+        prewarm = min(sync.config.login_prewarm_seconds, delay)
+        if await self._sleep(delay - prewarm):
+            return True
+        await asyncio.to_thread(sync._prewarm_login)
+        return await self._sleep(sync.next_poll_delay())
+    
+    async def _account_loop(self, name: str) -> None:
+        """Sync one account on its own schedule until shutdown."""
+        while not self._stop_event.is_set():
+            await self._run_account_cycle(name)
+            if await self._wait_for_next_poll(name):
+                return
+    
+    def stop(self) -> None:
+        """Request shutdown and cancel running cycles."""
+        logger.info("Received shutdown signal, stopping")
+        if self._stop_event is not None:
+            self._stop_event.set()
+        for task in self._tasks:
+            task.cancel()
+    
+    async def run_forever(self) -> None:
+        """Run all accounts until SIGTERM/SIGINT."""
+        loop = asyncio.get_running_loop()
+        self._prepare_loop()
+        self._stop_event = asyncio.Event()
+        
+        handled_signals = []
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            try:
+                loop.add_signal_handler(sig, self.stop)
+                handled_signals.append(sig)
+            except (NotImplementedError, RuntimeError):
+                pass
+        
+        await asyncio.to_thread(self.start)
+        
+        try:
+            self._tasks = [asyncio.create_task(self._account_loop(name)) for name in self.accounts]
+            results = await asyncio.gather(*self._tasks, return_exceptions=True)
+            for name, result in zip(self.accounts, results):
+                if isinstance(result, Exception):
+                    logger.error(f"Account {name} stopped: {result}")
+        finally:
+            for sig in handled_signals:
+                loop.remove_signal_handler(sig)
+            await asyncio.to_thread(self.shutdown)
+    
+    def run_continuous(self) -> None:
+        """Run continuous synchronization of all accounts until SIGTERM/SIGINT."""
+        logger.info("Starting continuous synchronization")
+        
+        try:
+            asyncio.run(self.run_forever())
+        except KeyboardInterrupt:
+            logger.info("Received interrupt signal, shutting down")
+        except Exception as e:
+            logger.error(f"Continuous sync failed: {e}")
+            raise
@@ -0,0 +1,108 @@
+"""Fair queueing of Wiener Netze API calls between accounts."""
+
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Deque, Dict, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class FairQueue:
+    """Grants a bounded number of API call slots round-robin between accounts.
+    
+    Callers of the same account are served in arrival order, but an account
+    with many queued calls cannot starve the others: when a slot frees up
+    it goes to the next account in the rotation that has a waiting call.
+    """
+    
+    def __init__(self, slots: int):
+        """Initialize fair queue.
+        
+        Args:
+            slots: Maximum number of API calls in flight across all accounts
+        """
+        self.slots = slots
+        self._free = slots
+        self._cond = threading.Condition()
+        self._waiting: Dict[str, Deque[object]] = {}
+        self._rotation: Deque[str] = deque()
+        self.granted: Dict[str, int] = {}
+        self.wait_seconds: Dict[str, float] = {}
+    
+    def acquire(self, account: str) -> None:
+        """Block until the account is granted a slot.
+        
+        Args:
+            account: Name of the account making the call
+        """
+        started = time.monotonic()
+        ticket = object()
+        
+        with self._cond:
+            queue = self._waiting.setdefault(account, deque())
+            if not queue:
+                self._rotation.append(account)
+            queue.append(ticket)
+            
+            while not (self._free > 0 and self._rotation[0] == account and queue[0] is ticket):
+                self._cond.wait()
+            
+            queue.popleft()
+            self._rotation.popleft()
+            if queue:
+                # Further calls of this account go to the back of the rotation
+                self._rotation.append(account)
+            else:
+                del self._waiting[account]
+            
+            self._free -= 1
+            self.granted[account] = self.granted.get(account, 0) + 1
+            self.wait_seconds[account] = self.wait_seconds.get(account, 0.0) + time.monotonic() - started
+            self._cond.notify_all()
+    
+    def release(self) -> None:
+        """Return a slot."""
+        with self._cond:
+            self._free += 1
+            self._cond.notify_all()
+    
+    @property
+    def in_flight(self) -> int:
+        """Number of slots currently granted."""
+        with self._cond:
+            return self.slots - self._free
+
+
+class AccountGate:
+    """Takes an account's share of the fair queue for each API call.
+    
+    The gate only bounds how many calls run at once across accounts; the
+    request rate of an account is limited by its AdaptiveThrottle, which
+    sees every HTTP request rather than every API call.
+    """
+    
+    def __init__(self, account: str, queue: Optional[FairQueue] = None):
+        """Initialize account gate.
+        
+        Args:
+            account: Name of the account
+            queue: Fair queue shared with the other accounts of the process
+        """
+        self.account = account
+        self.queue = queue
+        self.calls = 0
+    
+    @contextmanager
+    def slot(self) -> Iterator[None]:
+        """Hold an API call slot for the duration of the block."""
+        if self.queue is not None:
+            self.queue.acquire(self.account)
+        try:
+            self.calls += 1
+            yield
+        finally:
+            if self.queue is not None:
+                self.queue.release()
@@ -0,0 +1,35 @@
+"""Per-cycle performance numbers published as Home Assistant diagnostic sensors."""
+
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+
+@dataclass
+class CycleDiagnostics:
+    """Performance numbers of the last sync cycle of one meter.
+    
+    Filled in while the cycle runs and published once at its end on the
+    ``diagnostics`` topic, which backs the diagnostic entities created by
+    ``HomeAssistantDiscovery.create_diagnostic_sensor_configs()``.
+    """
+    
+    cycle_seconds: Optional[float] = None
+    fetch_seconds: Optional[float] = None
+    readings: int = 0
+    backfill_rows: int = 0
+    mqtt_readings_per_second: Optional[float] = None
+    mqtt_outbox: int = 0
+    
+    def to_payload(self) -> Dict[str, Any]:
+        """Convert to the MQTT payload of the diagnostics topic."""
+        def _round(value: Optional[float]) -> Optional[float]:
+            return round(value, 3) if value is not None else None
+        
+        return {
+            "cycle_seconds": _round(self.cycle_seconds),
+            "fetch_seconds": _round(self.fetch_seconds),
+            "readings": self.readings,
+            "backfill_rows": self.backfill_rows,
+            "mqtt_readings_per_second": _round(self.mqtt_readings_per_second),
+            "mqtt_outbox": self.mqtt_outbox
+        }
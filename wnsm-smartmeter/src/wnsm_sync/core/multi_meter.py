@@ -0,0 +1,195 @@
+"""Synchronization of several Zählpunkte of one account."""
+
+import asyncio
+import logging
+import time
+from typing import Dict, List, Optional, Set, Union
+
+from ..config.loader import WNSMConfig
+from ..mqtt.discovery import HA_STATUS_TOPIC
+from .orchestrator import SyncOrchestrator
+from .sync import SharedResources, WNSMSync
+
+logger = logging.getLogger(__name__)
+
+
+class MultiMeterOrchestrator(SyncOrchestrator):
+    """Runs the cycles of all meters concurrently.
+    
+    The meters share one login, so it is established once before the
+    per-meter cycles fan out; the cycle then takes about as long as the
+    slowest meter.
+    """
+    
+    async def _timed_cycle(self, meter: WNSMSync, force_backfill: bool) -> bool:
+        """Run one meter's cycle and record its duration."""
+        started = time.monotonic()
+        try:
+            return await meter.orchestrator.run_cycle(force_backfill)
+        finally:
+            self.sync.last_cycle_seconds[meter.config.zp] = time.monotonic() - started
+    
+    async def run_cycle(self, force_backfill: bool = False) -> bool:
+        """Run a synchronization cycle for every meter.
+        
+        Args:
+            force_backfill: If True, force use of database backfill instead of MQTT
+        
+        Returns:
+            True if the cycles of all meters were successful
+        """
+        multi = self.sync
+        started = time.monotonic()
+        
+        await self._run_stage("login", multi.primary._prewarm_login)
+        results = await asyncio.gather(
+            *(self._timed_cycle(meter, force_backfill) for meter in multi.meters)
+        )
+        
+        elapsed = time.monotonic() - started
+        slowest = max(multi.last_cycle_seconds.values(), default=0.0)
+        logger.info(
+            f"Synced {sum(results)}/{len(results)} meters in {elapsed:.1f} seconds "
+            f"(slowest meter {slowest:.1f} seconds)"
+        )
+        return all(results)
+
+
+class MultiMeterSync:
+    """Synchronizes all Zählpunkte of an account in one process.
+    
+    Each meter keeps its own topics, discovery, watermark and statistics
+    target, while the API login, the session file, the MQTT connection and
+    the scheduler state are shared.
+    """
+    
+    def __init__(self, config: WNSMConfig, shared: Optional[SharedResources] = None):
+        """Initialize multi-meter sync.
+        
+        Args:
+            config: Account-level configuration listing all Zählpunkte
+            shared: Resources shared by the meters, created if not given
+        """
+        self.config = config
+        self.shared = shared or SharedResources.create(config)
+        self.meters: List[WNSMSync] = [
+            WNSMSync(config.for_meter(zaehlpunkt), shared=self.shared)
+            for zaehlpunkt in config.zaehlpunkte
+        ]
+        self.last_cycle_seconds: Dict[str, float] = {}
+        self.orchestrator = MultiMeterOrchestrator(self)
+    
+    @property
+    def primary(self) -> WNSMSync:
+        """Meter used for account-level operations such as the login."""
+        return self.meters[0]
+    
+    @property
+    def mqtt_client(self):
+        """Shared MQTT client."""
+        return self.shared.mqtt_client
+    
+    @property
+    def profiler(self):
+        """Profiler of the primary meter, used for account-level stages."""
+        return self.primary.profiler
+    
+    @property
+    def cancel_event(self):
+        """Cancel event of the primary meter, used for account-level stages."""
+        return self.primary.cancel_event
+    
+    def setup_discovery(self, force: bool = False, prune: bool = True) -> bool:
+        """Publish Home Assistant discovery for every meter.
+        
+        Args:
+            force: Re-publish all configs regardless of stored hashes
+            prune: Remove configs that no meter generates anymore
+        
+        Returns:
+            True if the discovery of all meters was published successfully
+        """
+        results = [meter.setup_discovery(force=force, prune=False) for meter in self.meters]
+        if prune:
+            self.remove_stale_discovery(self.discovery_topics())
+        return all(results)
+    
+    def discovery_topics(self) -> Set[str]:
+        """Discovery topics of the entities all meters currently generate."""
+        return set().union(*(meter.discovery_topics() for meter in self.meters))
+    
+    def remove_stale_discovery(self, topics: Set[str]) -> int:
+        """Remove published discovery configs that no meter generates anymore."""
+        return self.primary.remove_stale_discovery(topics)
+    
+    def _on_ha_status(self, payload: str, retained: bool) -> None:
+        """Re-publish discovery of all meters when Home Assistant restarts."""
+        if payload == "online" and not retained:
+            logger.info("Home Assistant restarted, re-publishing discovery configurations")
+            self.setup_discovery(force=True)
+    
+    def _prewarm_login(self) -> None:
+        """Log in once for all meters."""
+        self.primary._prewarm_login()
+    
+    def next_poll_delay(self) -> float:
+        """Seconds until the earliest meter is due."""
+        return min(meter.next_poll_delay() for meter in self.meters)
+    
+    def subscribe_commands(self) -> None:
+        """Subscribe the command topics of every meter."""
+        for meter in self.meters:
+            meter.subscribe_commands()
+    
+    def start(self) -> None:
+        """Open the shared MQTT connection and publish discovery for all meters."""
+        logger.info(f"Syncing {len(self.meters)} meters: {', '.join(self.config.zaehlpunkte)}")
+        
+        if not self.mqtt_client.connect():
+            logger.warning("Persistent MQTT connection unavailable, falling back to per-message connections")
+            self.primary.publish_availability(True)
+        self.mqtt_client.subscribe(HA_STATUS_TOPIC, self._on_ha_status)
+        self.subscribe_commands()
+        
+        self.setup_discovery()
+    
+    def shutdown(self) -> None:
+        """Mark the service offline and close the MQTT connection."""
+        self.primary.shutdown()
+    
+    def run_sync_cycle(self, force_backfill: bool = False) -> bool:
+        """Run a single synchronization cycle for all meters.
+        
+        Args:
+            force_backfill: If True, force use of database backfill instead of MQTT
+        
+        Returns:
+            True if the cycles of all meters were successful
+        """
+        return asyncio.run(self.orchestrator.run_cycle(force_backfill))
+    
+    def run_continuous(self) -> None:
+        """Run continuous synchronization loop until SIGTERM/SIGINT."""
+        logger.info("Starting continuous synchronization")
+        
+        try:
+            asyncio.run(self.orchestrator.run_forever())
+        except KeyboardInterrupt:
+            logger.info("Received interrupt signal, shutting down")
+        except Exception as e:
+            logger.error(f"Continuous sync failed: {e}")
+            raise
+
+
+def create_sync(config: WNSMConfig) -> Union[WNSMSync, MultiMeterSync]:
+    """Create the sync for a configuration.
+    
+    Args:
+        config: Configuration object
+    
+    Returns:
+        MultiMeterSync if several Zählpunkte are configured, WNSMSync otherwise
+    """
+    if config.multi_meter:
+        return MultiMeterSync(config)
+    return WNSMSync(config)
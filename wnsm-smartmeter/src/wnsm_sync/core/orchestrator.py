@@ -0,0 +1,301 @@
+"""asyncio orchestration of sync cycles."""
+
+import asyncio
+import logging
+import signal
+import time
+from typing import TYPE_CHECKING, Any, Callable, Optional, Set
+
+from ..metrics import REGISTRY
+from ..tracing import span, start_trace
+from .diagnostics import CycleDiagnostics
+
+if TYPE_CHECKING:
+    from .sync import WNSMSync
+
+logger = logging.getLogger(__name__)
+
+STAGE_SECONDS = REGISTRY.histogram("wnsm_stage_duration_seconds", "Duration of sync cycle stages", ["stage"])
+CYCLE_SECONDS = REGISTRY.histogram("wnsm_cycle_duration_seconds", "Duration of sync cycles", ["outcome"])
+
+
+def _in_span(name: str, func: Callable[..., Any], *args) -> Any:
+    """Run a stage in its worker thread as a span of the cycle trace."""
+    with span(name):
+        return func(*args)
+
+
+class CycleCancelled(Exception):
+    """Raised at a checkpoint of a stage whose cycle was cancelled or timed out."""
+
+
+class SyncOrchestrator:
+    """Runs the stages of a sync cycle from an asyncio event loop.
+    
+    The stages of one cycle run one after another; blocking stages (API
+    fetch, sink fan-out) run in worker threads so the loop stays free for
+    timers and SIGTERM/SIGINT. A Python thread cannot be killed: when a stage
+    times out or the cycle is cancelled, the orchestrator stops waiting for
+    it and sets the sync's cancel event. The worker keeps running until its
+    next checkpoint (before each API call, between MQTT messages and before
+    each sink), so it may outlive the timeout by up to one API request or
+    database write, and shutdown waits for it as long.
+    """
+    
+    def __init__(self, sync: "WNSMSync"):
+        """Initialize orchestrator.
+        
+        Args:
+            sync: Sync instance providing the stage implementations
+        """
+        self.sync = sync
+        self.config = sync.config
+        self._stop_event: Optional[asyncio.Event] = None
+        self._cycle_task: Optional[asyncio.Task] = None
+        # Workers of timed-out or cancelled stages that have not reached a checkpoint yet
+        self._abandoned: Set[asyncio.Task] = set()
+    
+    async def _run_stage(self, name: str, func: Callable[..., Any], *args,
+                         timeout: Optional[float] = None) -> Any:
+        """Run a blocking stage in a worker thread with a timeout.
+        
+        Args:
+            name: Stage name for logging
+            func: Blocking callable implementing the stage
+            *args: Arguments passed to the callable
+            timeout: Stage timeout in seconds, defaults to the configured stage timeout
+        
+        Returns:
+            The stage result
+        
+        Raises:
+            TimeoutError: If the stage exceeds its timeout; the worker thread
+                stops at its next checkpoint
+        """
+        if timeout is None:
+            timeout = self.config.stage_timeout
+        started = time.monotonic()
+        # Profiled (if requested) in the worker thread that runs the stage
+        stage = self.sync.profiler.wrap(name, func)
+        worker = asyncio.ensure_future(asyncio.to_thread(_in_span, f"stage.{name}", stage, *args))
+        try:
+            done, _ = await asyncio.wait({worker}, timeout=timeout)
+            if not done:
+                # The worker thread cannot be killed; ask it to stop at the next checkpoint
+                self.sync.cancel_event.set()
+                self._abandoned.add(worker)
+                raise TimeoutError(f"Stage '{name}' timed out after {timeout} seconds")
+            return worker.result()
+        except asyncio.CancelledError:
+            self._abandoned.add(worker)
+            raise
+        finally:
+            elapsed = time.monotonic() - started
+            STAGE_SECONDS.observe(elapsed, stage=name)
+            logger.debug(f"Stage '{name}' finished in {elapsed:.2f} seconds")
+    
+    async def _settle_abandoned(self) -> None:
+        """Wait for the workers of abandoned stages to stop before the cancel event is cleared."""
+        pending = {worker for worker in self._abandoned if not worker.done()}
+        if pending:
+            logger.warning(f"Waiting for {len(pending)} timed-out stages to reach their cancel checkpoint")
+            await asyncio.wait(pending)
+        for worker in self._abandoned:
+            # Their outcome no longer matters; retrieve it so asyncio does not report it as lost
+            if not worker.cancelled():
+                worker.exception()
+        self._abandoned.clear()
+    
+    async def run_cycle(self, force_backfill: bool = False) -> bool:
+        """Run a single synchronization cycle.
+        
+        Args:
+            force_backfill: If True, force use of database backfill instead of MQTT
+        
+        Returns:
+            True if sync was successful, False otherwise
+        """
+        if not self.config.tracing:
+            return await self._measured_cycle(force_backfill)
+        
+        with start_trace("cycle", zaehlpunkt=self.config.zp, force_backfill=force_backfill) as root:
+            success = await self._measured_cycle(force_backfill)
+            root.set_attribute("success", success)
+        try:
+            path = await asyncio.to_thread(self.sync.trace_exporter.export, root.trace)
+            logger.debug(f"Wrote trace of {len(root.trace.spans)} spans to {path}")
+        except OSError as e:
+            logger.warning(f"Failed to write cycle trace: {e}")
+        return success
+    
+    async def _measured_cycle(self, force_backfill: bool) -> bool:
+        """Cycle with metrics, diagnostics and profiling, see run_cycle()."""
+        sync = self.sync
+        sync.diagnostics = CycleDiagnostics()
+        sync.retry_policy.start_cycle()
+        rows_before = sync.backfill_integration.rows_written
+        profiled = sync.profiler.start_cycle()
+        started = time.monotonic()
+        outcome = "cancelled"
+        try:
+            success = await self._cycle(force_backfill)
+            outcome = "success" if success else "failure"
+            return success
+        finally:
+            elapsed = time.monotonic() - started
+            CYCLE_SECONDS.observe(elapsed, outcome=outcome)
+            if outcome != "cancelled" and self.config.diagnostic_sensors:
+                sync.diagnostics.cycle_seconds = elapsed
+                sync.diagnostics.backfill_rows = sync.backfill_integration.rows_written - rows_before
+                await asyncio.to_thread(sync.publish_diagnostics)
+            if profiled:
+                await asyncio.to_thread(sync.profiler.finish_cycle)
+    
+    async def _cycle(self, force_backfill: bool) -> bool:
+        """Stages of one synchronization cycle, see run_cycle()."""
+        sync = self.sync
+        # A worker abandoned by the previous cycle would carry on once the event is cleared
+        await self._settle_abandoned()
+        sync.cancel_event.clear()
+        
+        try:
+            logger.info("Starting sync cycle")
+            await self._run_stage("status", sync.publish_status, "running")
+            
+            if sync.use_chunked_import(force_backfill):
+                return await self._run_import()
+            
+            # Fetch energy data
+            fetch_started = time.monotonic()
+            energy_data = await self._run_stage("fetch", sync.fetch_energy_data)
+            sync.diagnostics.fetch_seconds = time.monotonic() - fetch_started
+            sync._plan_next_poll(energy_data)
+            if not energy_data:
+                error = "Failed to fetch energy data"
+                if sync.fetch_error:
+                    error += f": {sync.fetch_error}"
+                await self._run_stage("status", sync.publish_status, "error", error)
+                return False
+            sync.diagnostics.readings = energy_data.reading_count
+            
+            # Determine whether to use backfill or MQTT
+            use_backfill = force_backfill or sync._should_use_backfill(energy_data)
+            
+            # Fan the dataset out to MQTT, backfill and the other sinks
+            success = await self._run_stage("sinks", sync.publish_energy_data, energy_data, use_backfill)
+            
+            if not success:
+                await self._run_stage("status", sync.publish_status, "error", "Failed to publish some energy data")
+                return False
+            
+            # Mark as successful
+            await self._run_stage("status", sync.publish_status, "success")
+            logger.info("Sync cycle completed successfully")
+            return True
+        
+        except asyncio.CancelledError:
+            sync.cancel_event.set()
+            logger.warning("Sync cycle cancelled")
+            raise
+        except Exception as e:
+            logger.error(f"Sync cycle failed: {e}")
+            await asyncio.to_thread(sync.publish_status, "error", str(e))
+            return False
+    
+    async def _run_import(self) -> bool:
+        """Run a large backfill through the chunked import pipeline."""
+        sync = self.sync
+        ranges = sync.import_ranges()
+        
+        # Each chunk gets the full stage timeout
+        report = await self._run_stage("import", sync.run_chunked_import, ranges,
+                                       timeout=self.config.stage_timeout * max(1, len(ranges)))
+        sync._plan_next_poll(report.last_chunk)
+        sync.diagnostics.readings = report.readings
+        fetch = report.stages.get("fetch")
+        if fetch is not None and fetch.items:
+            # Mean latency of one chunk's API request
+            sync.diagnostics.fetch_seconds = fetch.busy_seconds / fetch.items
+        
+        if not report.success:
+            await self._run_stage("status", sync.publish_status, "error", f"Import failed in {report.error}")
+            return False
+        
+        await self._run_stage("status", sync.publish_status, "success")
+        logger.info("Sync cycle completed successfully")
+        return True
+    
+    def stop(self) -> None:
+        """Request shutdown and cancel the running cycle."""
+        logger.info("Received shutdown signal, stopping")
+        if self._stop_event is not None:
+            self._stop_event.set()
+        if self._cycle_task is not None and not self._cycle_task.done():
+            self._cycle_task.cancel()
+    
+    async def _sleep(self, seconds: float) -> bool:
+        """Sleep unless shutdown is requested.
+        
+        Returns:
+            True if shutdown was requested while sleeping
+        """
+        if seconds <= 0:
+            return self._stop_event.is_set()
+        try:
+            await asyncio.wait_for(self._stop_event.wait(), timeout=seconds)
+            return True
+        except asyncio.TimeoutError:
+            return False
+    
+    async def _wait_for_next_poll(self) -> bool:
+        """Sleep until the next scheduled poll, pre-warming the login.
+        
+        Returns:
+            True if shutdown was requested while waiting
+        """
+        delay = self.sync.next_poll_delay()
+        logger.info(f"Sleeping for {delay:.0f} seconds until next poll")
+        
+        if not self.config.adaptive_schedule:
+            return await self._sleep(delay)
+        
+        prewarm = min(self.config.login_prewarm_seconds, delay)
+        if await self._sleep(delay - prewarm):
+            return True
+        await asyncio.to_thread(self.sync._prewarm_login)
+        return await self._sleep(self.sync.next_poll_delay())
+    
+    async def run_forever(self) -> None:
+        """Run continuous synchronization until SIGTERM/SIGINT."""
+        loop = asyncio.get_running_loop()
+        self._stop_event = asyncio.Event()
+        
+        handled_signals = []
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            try:
+                loop.add_signal_handler(sig, self.stop)
+                handled_signals.append(sig)
+            except (NotImplementedError, RuntimeError):
+                # Not on the main thread or not supported by the platform
+                pass
+        
+        await asyncio.to_thread(self.sync.start)
+        
+        try:
+            while not self._stop_event.is_set():
+                self._cycle_task = asyncio.create_task(self.run_cycle())
+                try:
+                    await self._cycle_task
+                except asyncio.CancelledError:
+                    if not self._stop_event.is_set():
+                        raise
+                    break
+                finally:
+                    self._cycle_task = None
+                
+                if await self._wait_for_next_poll():
+                    break
+        finally:
+            for sig in handled_signals:
+                loop.remove_signal_handler(sig)
+            await asyncio.to_thread(self.sync.shutdown)
@@ -0,0 +1,292 @@
+"""Producer/consumer pipeline for chunked historical imports."""
+
+import logging
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from ..data.models import EnergyData
+from ..tracing import bind_context
+
+logger = logging.getLogger(__name__)
+
+# Marks the end of the stream between stages
+_DONE = object()
+
+# How often blocked stages re-check for cancellation
+_POLL_SECONDS = 0.1
+
+
+def split_range(date_from: datetime, date_until: datetime, chunk_days: int) -> List[Tuple[datetime, datetime]]:
+    """Split a date range into consecutive chunks.
+    
+    Args:
+        date_from: Start of the range
+        date_until: End of the range
+        chunk_days: Maximum length of a chunk in days
+    
+    Returns:
+        List of (start, end) tuples in chronological order
+    """
+    ranges = []
+    start = date_from
+    while start < date_until:
+        end = min(start + timedelta(days=chunk_days), date_until)
+        ranges.append((start, end))
+        start = end
+    return ranges
+
+
+@dataclass
+class StageStats:
+    """Timing of one pipeline stage."""
+    
+    name: str
+    items: int = 0
+    busy_seconds: float = 0.0  # Doing work
+    starved_seconds: float = 0.0  # Waiting for input from the previous stage
+    blocked_seconds: float = 0.0  # Waiting for space in the next stage's queue
+    
+    def utilization(self, wall_seconds: float) -> float:
+        """Fraction of the pipeline's wall time the stage spent working."""
+        if wall_seconds <= 0:
+            return 0.0
+        return min(1.0, self.busy_seconds / wall_seconds)
+    
+    def to_dict(self, wall_seconds: float) -> Dict[str, Any]:
+        """Convert to a JSON-serializable dictionary."""
+        return {
+            "items": self.items,
+            "busy": round(self.busy_seconds, 3),
+            "starved": round(self.starved_seconds, 3),
+            "blocked": round(self.blocked_seconds, 3),
+            "utilization": round(self.utilization(wall_seconds), 3)
+        }
+
+
+@dataclass
+class ImportReport:
+    """Outcome of a chunked import."""
+    
+    chunks: int = 0
+    readings: int = 0
+    total_kwh: float = 0.0
+    wall_seconds: float = 0.0
+    success: bool = True
+    error: Optional[str] = None
+    last_chunk: Optional[EnergyData] = None
+    stages: Dict[str, StageStats] = field(default_factory=dict)
+    
+    @property
+    def bottleneck(self) -> Optional[str]:
+        """Name of the busiest stage."""
+        if not self.stages:
+            return None
+        return max(self.stages.values(), key=lambda stats: stats.busy_seconds).name
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to a JSON-serializable dictionary."""
+        return {
+            "chunks": self.chunks,
+            "readings": self.readings,
+            "total_kwh": round(self.total_kwh, 3),
+            "duration": round(self.wall_seconds, 3),
+            "success": self.success,
+            "error": self.error,
+            "bottleneck": self.bottleneck,
+            "stages": {
+                name: stats.to_dict(self.wall_seconds) for name, stats in self.stages.items()
+            }
+        }
+
+
+class ChunkedImport:
+    """Overlaps fetching, processing and writing of date-range chunks.
+    
+    Each stage runs in its own thread and hands results to the next stage
+    through a bounded queue, so the API request for chunk N+1 is in flight
+    while chunk N is parsed and written. A full queue blocks the upstream
+    stage, which keeps at most ``queue_size`` chunks buffered per stage.
+    Chunks reach the write stage in chronological order.
+    """
+    
+    def __init__(
+        self,
+        fetch_chunk: Callable[[datetime, datetime], Any],
+        process_chunk: Callable[[Any], Optional[EnergyData]],
+        write_chunk: Callable[[EnergyData], bool],
+        queue_size: int = 2,
+        cancel_event: Optional[threading.Event] = None
+    ):
+        """Initialize chunked import.
+        
+        Args:
+            fetch_chunk: Fetches raw data for a (start, end) range, None if empty
+            process_chunk: Turns raw data into EnergyData, None if empty
+            write_chunk: Writes a processed chunk, returns False on failure
+            queue_size: Maximum number of chunks buffered between two stages
+            cancel_event: Aborts the import when set
+        """
+        self.fetch_chunk = fetch_chunk
+        self.process_chunk = process_chunk
+        self.write_chunk = write_chunk
+        self.queue_size = queue_size
+        self.cancel_event = cancel_event or threading.Event()
+        self._abort = threading.Event()
+        self._error: Optional[str] = None
+    
+    def _stopped(self) -> bool:
+        return self._abort.is_set() or self.cancel_event.is_set()
+    
+    def _fail(self, stage: str, error: str) -> None:
+        """Record the first failure and stop all stages."""
+        if self._error is None:
+            self._error = f"{stage}: {error}"
+            logger.error(f"Chunked import failed in {stage} stage: {error}")
+        self._abort.set()
+    
+    def _put(self, out_queue: queue.Queue, item: Any, stats: StageStats) -> bool:
+        """Put an item, blocking while the queue is full (backpressure)."""
+        started = time.monotonic()
+        try:
+            while not self._stopped():
+                try:
+                    out_queue.put(item, timeout=_POLL_SECONDS)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+        finally:
+            stats.blocked_seconds += time.monotonic() - started
+    
+    def _get(self, in_queue: queue.Queue, stats: StageStats) -> Any:
+        """Get the next item, returning _DONE on end of stream or abort."""
+        started = time.monotonic()
+        try:
+            while not self._stopped():
+                try:
+                    return in_queue.get(timeout=_POLL_SECONDS)
+                except queue.Empty:
+                    continue
+            return _DONE
+        finally:
+            stats.starved_seconds += time.monotonic() - started
+    
+    def _fetch_stage(self, ranges: List[Tuple[datetime, datetime]], out_queue: queue.Queue,
+                     stats: StageStats) -> None:
+        try:
+            for start, end in ranges:
+                if self._stopped():
+                    return
+                
+                started = time.monotonic()
+                raw_data = self.fetch_chunk(start, end)
+                stats.busy_seconds += time.monotonic() - started
+                
+                if raw_data is None:
+                    logger.info(f"No data for {start.date()} to {end.date()}, skipping chunk")
+                    continue
+                
+                stats.items += 1
+                if not self._put(out_queue, raw_data, stats):
+                    return
+        except Exception as e:
+            self._fail("fetch", str(e))
+        finally:
+            self._put(out_queue, _DONE, stats)
+    
+    def _process_stage(self, in_queue: queue.Queue, out_queue: queue.Queue, stats: StageStats) -> None:
+        try:
+            while True:
+                raw_data = self._get(in_queue, stats)
+                if raw_data is _DONE:
+                    return
+                
+                started = time.monotonic()
+                energy_data = self.process_chunk(raw_data)
+                stats.busy_seconds += time.monotonic() - started
+                
+                if energy_data is None:
+                    continue
+                
+                stats.items += 1
+                if not self._put(out_queue, energy_data, stats):
+                    return
+        except Exception as e:
+            self._fail("process", str(e))
+        finally:
+            self._put(out_queue, _DONE, stats)
+    
+    def run(self, ranges: List[Tuple[datetime, datetime]]) -> ImportReport:
+        """Import all ranges.
+        
+        Args:
+            ranges: Chronologically ordered (start, end) ranges to import
+        
+        Returns:
+            ImportReport with totals and per-stage utilization
+        """
+        report = ImportReport(stages={
+            name: StageStats(name) for name in ("fetch", "process", "write")
+        })
+        raw_queue: queue.Queue = queue.Queue(maxsize=self.queue_size)
+        data_queue: queue.Queue = queue.Queue(maxsize=self.queue_size)
+        
+        threads = [
+            threading.Thread(target=bind_context(self._fetch_stage), args=(ranges, raw_queue, report.stages["fetch"]),
+                             name="import-fetch", daemon=True),
+            threading.Thread(target=bind_context(self._process_stage), args=(raw_queue, data_queue, report.stages["process"]),
+                             name="import-process", daemon=True)
+        ]
+        
+        started = time.monotonic()
+        for thread in threads:
+            thread.start()
+        
+        # The write stage runs on the calling thread
+        write_stats = report.stages["write"]
+        try:
+            while True:
+                energy_data = self._get(data_queue, write_stats)
+                if energy_data is _DONE:
+                    break
+                
+                write_started = time.monotonic()
+                written = self.write_chunk(energy_data)
+                write_stats.busy_seconds += time.monotonic() - write_started
+                
+                if not written:
+                    self._fail("write", f"failed to write chunk starting {energy_data.date_from}")
+                    break
+                
+                write_stats.items += 1
+                report.chunks += 1
+                report.readings += energy_data.reading_count
+                report.total_kwh += energy_data.total_kwh
+                report.last_chunk = energy_data
+        except Exception as e:
+            self._fail("write", str(e))
+        finally:
+            # Unblock upstream stages that are waiting for queue space
+            self._abort.set()
+            for thread in threads:
+                thread.join()
+        
+        report.wall_seconds = time.monotonic() - started
+        if self.cancel_event.is_set() and self._error is None:
+            self._error = "cancelled"
+        report.error = self._error
+        report.success = self._error is None
+        
+        logger.info(
+            f"Chunked import wrote {report.chunks} chunks ({report.readings} readings) "
+            f"in {report.wall_seconds:.1f} seconds; utilization "
+            + ", ".join(
+                f"{name} {stats.utilization(report.wall_seconds):.0%}"
+                for name, stats in report.stages.items()
+            )
+        )
+        return report
@@ -0,0 +1,234 @@
+"""cProfile and tracemalloc profiling of sync cycles."""
+
+import cProfile
+import glob
+import io
+import logging
+import os
+import pstats
+import threading
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Callable, Iterator, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+# Entries listed in the text summary of each profiled cycle
+TOP_ENTRIES = 25
+
+# Frames kept per tracemalloc allocation trace
+TRACEBACK_FRAMES = 10
+
+# tracemalloc is process-wide; profilers of concurrently syncing meters share it
+_tracing_lock = threading.Lock()
+_tracing_users = 0
+_tracing_owned = False
+_tracing_starts = 0
+
+
+def _start_tracing() -> Optional[int]:
+    """Start tracemalloc for one more profiled cycle.
+    
+    Returns:
+        Sequence number of the start if no other cycle is profiled, None otherwise
+    """
+    global _tracing_users, _tracing_owned, _tracing_starts
+    with _tracing_lock:
+        if _tracing_users == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start(TRACEBACK_FRAMES)
+            _tracing_owned = True
+        _tracing_users += 1
+        _tracing_starts += 1
+        if _tracing_users > 1:
+            return None
+        # The peak is process-wide; only a cycle profiled alone may reset it
+        tracemalloc.reset_peak()
+        return _tracing_starts
+
+
+def _profiled_alone(start: Optional[int]) -> bool:
+    """Whether no other cycle was profiled since the given start."""
+    with _tracing_lock:
+        return start is not None and _tracing_starts == start
+
+
+def _stop_tracing() -> None:
+    """Stop tracemalloc once the last profiled cycle ended, unless started elsewhere."""
+    global _tracing_users, _tracing_owned
+    with _tracing_lock:
+        _tracing_users -= 1
+        if _tracing_users == 0 and _tracing_owned:
+            tracemalloc.stop()
+            _tracing_owned = False
+
+
+class CycleProfiler:
+    """Profiles the stages of the next N sync cycles.
+    
+    cProfile only sees the thread it was enabled in, so every stage (and
+    every sink) is profiled in its own worker thread and the profiles are
+    merged when the cycle ends. tracemalloc traces all threads and is only
+    running while a cycle is profiled. Its peak is process-wide, so cycles
+    of several meters profiled at the same time report it as such.
+    
+    Each profiled cycle writes a ``.pstats`` file, loadable with ``pstats``
+    or snakeviz, and a ``.txt`` summary with the hottest functions and the
+    top allocations. Only the newest ``keep`` cycles are kept.
+    """
+    
+    def __init__(self, directory: str, cycles: int = 0, keep: int = 10,
+                 stages: Optional[Set[str]] = None, name: str = "cycle"):
+        """Initialize cycle profiler.
+        
+        Args:
+            directory: Directory receiving the profile files
+            cycles: Number of upcoming cycles to profile
+            keep: Number of profiled cycles whose files are kept
+            stages: Stage names to profile, None for all
+            name: Prefix of the profile file names
+        """
+        self.directory = directory
+        self.keep = keep
+        self.stages = stages
+        self.name = name
+        self._remaining = cycles
+        self._lock = threading.Lock()
+        self._active = False
+        self._profiles: List[cProfile.Profile] = []
+        self._baseline: Optional[tracemalloc.Snapshot] = None
+        self._tracing_start: Optional[int] = None
+    
+    @property
+    def active(self) -> bool:
+        """Whether the running cycle is profiled."""
+        return self._active
+    
+    @property
+    def remaining(self) -> int:
+        """Number of upcoming cycles that will be profiled."""
+        with self._lock:
+            return self._remaining
+    
+    def request(self, cycles: int) -> None:
+        """Profile the next cycles, e.g. on demand from an MQTT command.
+        
+        Args:
+            cycles: Number of cycles to profile; 0 cancels pending requests
+        """
+        with self._lock:
+            self._remaining = max(0, cycles)
+        logger.info(f"Profiling the next {self._remaining} sync cycles")
+    
+    def start_cycle(self) -> bool:
+        """Start profiling a cycle if one is requested.
+        
+        Returns:
+            True if the cycle is profiled
+        """
+        with self._lock:
+            if self._active or self._remaining <= 0:
+                return False
+            self._remaining -= 1
+            self._active = True
+            self._profiles = []
+        
+        self._tracing_start = _start_tracing()
+        self._baseline = tracemalloc.take_snapshot()
+        return True
+    
+    @contextmanager
+    def profile(self, stage: str) -> Iterator[None]:
+        """Profile the calling thread while the with block runs.
+        
+        Args:
+            stage: Name of the stage, matched against the stage filter
+        """
+        if not self._active or (self.stages and stage not in self.stages):
+            yield
+            return
+        
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            with self._lock:
+                self._profiles.append(profiler)
+    
+    def wrap(self, stage: str, func: Callable) -> Callable:
+        """Wrap a stage callable so it is profiled in the thread running it."""
+        def profiled(*args, **kwargs):
+            with self.profile(stage):
+                return func(*args, **kwargs)
+        return profiled
+    
+    def finish_cycle(self) -> Optional[str]:
+        """Stop profiling the cycle and write its files.
+        
+        Returns:
+            Path of the written .pstats file, None if nothing was profiled
+        """
+        with self._lock:
+            if not self._active:
+                return None
+            self._active = False
+            profiles, self._profiles = self._profiles, []
+        
+        snapshot = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        # With cycles profiled concurrently the peak may belong to any of them
+        alone = _profiled_alone(self._tracing_start)
+        _stop_tracing()
+        
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            base = os.path.join(self.directory, f"{self.name}-{datetime.now():%Y%m%d-%H%M%S-%f}")
+            
+            summary = io.StringIO()
+            if alone:
+                summary.write(f"Traced memory: {current / 1024:.1f} KiB, peak {peak / 1024:.1f} KiB\n\n")
+            else:
+                summary.write(f"Traced memory: {current / 1024:.1f} KiB, process-wide peak {peak / 1024:.1f} KiB "
+                              f"(other cycles were profiled at the same time)\n\n")
+            
+            pstats_path = None
+            if profiles:
+                stats = pstats.Stats(profiles[0], stream=summary)
+                for profiler in profiles[1:]:
+                    stats.add(profiler)
+                pstats_path = f"{base}.pstats"
+                stats.dump_stats(pstats_path)
+                stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(TOP_ENTRIES)
+            
+            summary.write(f"Top {TOP_ENTRIES} allocation sites grown during the cycle:\n")
+            for stat in snapshot.compare_to(self._baseline, "lineno")[:TOP_ENTRIES]:
+                summary.write(f"{stat}\n")
+            summary.write(f"\nTop {TOP_ENTRIES} allocation sites at the end of the cycle:\n")
+            for stat in snapshot.statistics("lineno")[:TOP_ENTRIES]:
+                summary.write(f"{stat}\n")
+            
+            with open(f"{base}.txt", "w") as f:
+                f.write(summary.getvalue())
+            
+            self._rotate()
+            logger.info(f"Wrote cycle profile {base}.txt ({'' if alone else 'process-wide '}"
+                        f"peak traced memory {peak / 1024 / 1024:.1f} MiB)")
+            return pstats_path
+        except Exception as e:
+            logger.warning(f"Failed to write cycle profile: {e}")
+            return None
+        finally:
+            self._baseline = None
+            self._tracing_start = None
+    
+    def _rotate(self) -> None:
+        """Delete the files of all but the newest ``keep`` profiled cycles."""
+        summaries = sorted(glob.glob(os.path.join(self.directory, f"{self.name}-*.txt")))
+        for path in summaries[:max(0, len(summaries) - self.keep)]:
+            for stale in (path, path[:-len(".txt")] + ".pstats"):
+                try:
+                    os.remove(stale)
+                except FileNotFoundError:
+                    pass
@@ -0,0 +1,150 @@
+"""Retry policy: error classification, decorrelated jitter and retry budgets."""
+
+import logging
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+# Classification lives with the API client, which needs it for its circuit breakers; re-exported here
+from ..api.classification import RETRYABLE, Classification, ErrorClass, classify, parse_retry_after
+from ..metrics import REGISTRY
+
+__all__ = [
+    "RETRYABLE", "Classification", "ErrorClass", "RetryPolicy", "classify", "parse_retry_after",
+    "RETRIES", "RETRY_GIVE_UPS"
+]
+
+logger = logging.getLogger(__name__)
+
+RETRIES = REGISTRY.counter("wnsm_retries_total", "Retried attempts of failed operations", ["operation"])
+RETRY_GIVE_UPS = REGISTRY.counter(
+    "wnsm_retry_give_ups_total", "Operations that failed without a further retry", ["operation", "reason"]
+)
+
+
+class RetryPolicy:
+    """Retries retryable errors with decorrelated jitter, within retry budgets.
+    
+    Each retry waits ``uniform(base, 3 * previous delay)`` capped at the
+    maximum delay, or longer if the server sent ``Retry-After``. The time
+    spent waiting per cycle and the retries per endpoint and cycle are
+    limited; call start_cycle() at the start of every sync cycle.
+    """
+    
+    def __init__(self, retries: int = 3, base_delay: float = 10.0, max_delay: float = 300.0,
+                 cycle_budget: float = 600.0, endpoint_retries: int = 10,
+                 sleep: Callable[[float], Any] = time.sleep, rng: Optional[random.Random] = None):
+        """Initialize retry policy.
+        
+        Args:
+            retries: Retries per call
+            base_delay: Minimum delay before a retry in seconds
+            max_delay: Maximum delay before a retry in seconds
+            cycle_budget: Seconds per cycle that may be spent waiting for retries
+            endpoint_retries: Retries per endpoint and cycle
+            sleep: Waits the given seconds; a truthy result (e.g. of a set
+                ``threading.Event.wait``) aborts retrying
+            rng: Random source of the jitter
+        """
+        self.retries = retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.cycle_budget = cycle_budget
+        self.endpoint_retries = endpoint_retries
+        self.sleep = sleep
+        self.rng = rng or random.Random()
+        self._lock = threading.Lock()
+        self._spent = 0.0
+        self._endpoint_counts: Dict[str, int] = {}
+    
+    @classmethod
+    def from_config(cls, config, sleep: Callable[[float], Any] = time.sleep) -> "RetryPolicy":
+        """Create a policy from the retry settings of a configuration."""
+        return cls(
+            retries=config.retry_count,
+            base_delay=config.retry_delay,
+            max_delay=getattr(config, "retry_max_delay", 300),
+            cycle_budget=getattr(config, "retry_budget", 600),
+            endpoint_retries=getattr(config, "retry_endpoint_budget", 10),
+            sleep=sleep
+        )
+    
+    def start_cycle(self) -> None:
+        """Reset the per-cycle budgets."""
+        with self._lock:
+            self._spent = 0.0
+            self._endpoint_counts.clear()
+    
+    @property
+    def remaining_budget(self) -> float:
+        """Seconds left for retry delays in this cycle."""
+        with self._lock:
+            return max(0.0, self.cycle_budget - self._spent)
+    
+    def _next_delay(self, previous: float, classification: Classification) -> float:
+        delay = min(self.max_delay, self.rng.uniform(self.base_delay, max(self.base_delay, previous * 3)))
+        if classification.retry_after is not None:
+            delay = max(delay, classification.retry_after)
+        return delay
+    
+    def _reserve(self, operation: str, delay: float) -> Optional[str]:
+        """Charge a retry to the budgets; returns the reason if one is exhausted."""
+        with self._lock:
+            if self._endpoint_counts.get(operation, 0) >= self.endpoint_retries:
+                return "endpoint_budget"
+            if self._spent + delay > self.cycle_budget:
+                return "cycle_budget"
+            self._endpoint_counts[operation] = self._endpoint_counts.get(operation, 0) + 1
+            self._spent += delay
+            return None
+    
+    def call(self, operation: str, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """Call a function, retrying retryable errors.
+        
+        Args:
+            operation: Endpoint or operation name the budgets are kept for
+            func: Function to call
+            *args: Arguments passed to the function
+            **kwargs: Keyword arguments passed to the function
+        
+        Returns:
+            Result of the function
+        
+        Raises:
+            Exception: The last error once it is not retryable, or the
+                attempts or budgets are used up
+        """
+        delay = self.base_delay
+        for attempt in range(self.retries + 1):
+            try:
+                return func(*args, **kwargs)
+            except Exception as e:
+                classification = classify(e)
+                status = f" (HTTP {classification.status})" if classification.status else ""
+                if not classification.retryable:
+                    logger.error(f"{operation} failed with a {classification.error_class.value} error{status}, "
+                                 f"not retrying: {e}")
+                    RETRY_GIVE_UPS.inc(operation=operation, reason="not_retryable")
+                    raise
+                if attempt >= self.retries:
+                    logger.error(f"All {self.retries + 1} attempts of {operation} failed")
+                    RETRY_GIVE_UPS.inc(operation=operation, reason="attempts")
+                    raise
+                
+                delay = self._next_delay(delay, classification)
+                exhausted = self._reserve(operation, delay)
+                if exhausted is not None:
+                    logger.error(f"{operation} failed with a {classification.error_class.value} error{status}, "
+                                 f"retry {exhausted.replace('_', ' ')} exhausted: {e}")
+                    RETRY_GIVE_UPS.inc(operation=operation, reason=exhausted)
+                    raise
+                
+                logger.warning(
+                    f"Attempt {attempt + 1}/{self.retries + 1} of {operation} failed with a "
+                    f"{classification.error_class.value} error{status}: {e}. Retrying in {delay:.1f} seconds..."
+                )
+                RETRIES.inc(operation=operation)
+                if self.sleep(delay):
+                    logger.warning(f"Retrying {operation} cancelled")
+                    raise
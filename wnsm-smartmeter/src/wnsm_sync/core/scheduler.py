@@ -0,0 +1,217 @@
+"""Data-availability-aware scheduling of sync cycles."""
+
+import json
+import logging
+import os
+import statistics
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..config.loader import WNSMConfig
+
+logger = logging.getLogger(__name__)
+
+# Number of observed arrivals kept per meter
+MAX_ARRIVALS = 30
+
+# Minimum half-width of the expected arrival window
+MIN_WINDOW_SECONDS = 1800
+
+DAY_SECONDS = 86400
+
+
+@dataclass
+class PollDecision:
+    """When the next sync cycle should run and why."""
+    
+    next_poll: datetime
+    reason: str
+    
+    @property
+    def delay_seconds(self) -> float:
+        """Seconds from now until the next poll."""
+        return max(0.0, (self.next_poll - datetime.now()).total_seconds())
+
+
+class AdaptiveScheduler:
+    """Learns when new data usually appears and plans polls around it.
+    
+    Wiener Netze publishes the previous day's readings once a day at a
+    roughly fixed time per meter. The scheduler records when new data was
+    first seen, polls at ``min_poll_interval`` inside the expected window,
+    and backs off exponentially (up to ``update_interval``) while nothing
+    new arrives.
+    """
+    
+    def __init__(self, config: WNSMConfig):
+        """Initialize adaptive scheduler.
+        
+        Args:
+            config: WNSM configuration object
+        """
+        self.config = config
+        self.state_file = config.schedule_state_file
+        self.min_interval = config.min_poll_interval
+        self.max_interval = max(config.update_interval, config.min_poll_interval)
+        self._state = self._load_state()
+        # Meters of one account share the scheduler and its state file
+        self._lock = threading.Lock()
+    
+    def _load_state(self) -> Dict[str, Any]:
+        """Load per-meter arrival history from disk."""
+        try:
+            if os.path.exists(self.state_file):
+                with open(self.state_file, 'r') as f:
+                    return json.load(f)
+        except Exception as e:
+            logger.warning(f"Failed to load schedule state: {e}")
+        return {"meters": {}}
+    
+    def _save_state(self) -> None:
+        """Persist per-meter arrival history to disk."""
+        try:
+            os.makedirs(os.path.dirname(self.state_file) or ".", exist_ok=True)
+            with open(self.state_file, 'w') as f:
+                json.dump(self._state, f)
+        except Exception as e:
+            logger.warning(f"Failed to save schedule state: {e}")
+    
+    def _meter_state(self, zaehlpunkt: str) -> Dict[str, Any]:
+        """Get (and create) the state entry for a meter."""
+        return self._state["meters"].setdefault(
+            zaehlpunkt, {"watermark": None, "arrivals": [], "misses": 0}
+        )
+    
+    def record_cycle(self, zaehlpunkt: str, latest_reading: Optional[datetime],
+                     now: Optional[datetime] = None) -> bool:
+        """Record the outcome of a sync cycle for a meter.
+        
+        Args:
+            zaehlpunkt: Meter point identifier
+            latest_reading: Timestamp of the newest reading fetched, None if
+                the fetch failed or returned nothing
+            now: Observation time, defaults to the current time
+        
+        Returns:
+            True if the cycle brought data for a new day
+        """
+        with self._lock:
+            return self._record_cycle(zaehlpunkt, latest_reading, now or datetime.now())
+    
+    def _record_cycle(self, zaehlpunkt: str, latest_reading: Optional[datetime], now: datetime) -> bool:
+        state = self._meter_state(zaehlpunkt)
+        previous = datetime.fromisoformat(state["watermark"]) if state["watermark"] else None
+        
+        if latest_reading is not None:
+            latest_reading = latest_reading.replace(tzinfo=None)
+        
+        new_day = latest_reading is not None and (
+            previous is None or latest_reading.date() > previous.date()
+        )
+        
+        if new_day:
+            # The very first observation says nothing about when data appears
+            if previous is not None:
+                seconds_of_day = now.hour * 3600 + now.minute * 60 + now.second
+                state["arrivals"] = (state["arrivals"] + [seconds_of_day])[-MAX_ARRIVALS:]
+            state["misses"] = 0
+        else:
+            state["misses"] += 1
+        
+        if latest_reading is not None and (previous is None or latest_reading > previous):
+            state["watermark"] = latest_reading.isoformat()
+        
+        self._save_state()
+        return new_day
+    
+    def expected_window(self, zaehlpunkt: str) -> Optional[Tuple[int, int]]:
+        """Expected arrival window of new data as seconds of the day.
+        
+        Arrivals are unwrapped around the first one before taking their
+        median, so arrivals on both sides of midnight (e.g. 23:50 and 00:10)
+        give a window around midnight rather than around noon.
+        
+        Args:
+            zaehlpunkt: Meter point identifier
+        
+        Returns:
+            Tuple of (start, end) seconds of day, None while still learning.
+            The start lies within the day; a window spanning midnight ends
+            after 86400.
+        """
+        with self._lock:
+            arrivals: List[int] = list(self._meter_state(zaehlpunkt)["arrivals"])
+        if len(arrivals) < 2:
+            return None
+        
+        # Seconds of day are circular: move each arrival to within half a day of the first
+        reference = arrivals[0]
+        arrivals = [
+            arrival + DAY_SECONDS * round((reference - arrival) / DAY_SECONDS) for arrival in arrivals
+        ]
+        
+        center = statistics.median(arrivals)
+        if len(arrivals) >= 4:
+            quartiles = statistics.quantiles(arrivals, n=4)
+            half_width = max(MIN_WINDOW_SECONDS, (quartiles[2] - quartiles[0]) / 2)
+        else:
+            half_width = max(MIN_WINDOW_SECONDS, statistics.pstdev(arrivals))
+        
+        start = (center - half_width) % DAY_SECONDS
+        return int(start), int(start + 2 * half_width)
+    
+    def next_poll(self, zaehlpunkt: str, now: Optional[datetime] = None) -> PollDecision:
+        """Plan the next poll for a meter.
+        
+        Args:
+            zaehlpunkt: Meter point identifier
+            now: Planning time, defaults to the current time
+        
+        Returns:
+            PollDecision with the next poll time and the reasoning
+        """
+        now = now or datetime.now()
+        with self._lock:
+            misses = self._meter_state(zaehlpunkt)["misses"]
+        backoff = min(self.max_interval, self.min_interval * (2 ** misses))
+        window = self.expected_window(zaehlpunkt)
+        
+        if window is None:
+            return self._decision(now, backoff, "learning arrival window; "
+                                  f"{misses} polls without new data")
+        
+        midnight = now.replace(hour=0, minute=0, second=0, microsecond=0)
+        window_start = midnight + timedelta(seconds=window[0])
+        window_end = midnight + timedelta(seconds=window[1])
+        if window_end - timedelta(days=1) >= now:
+            # Still inside yesterday's window, which spans midnight
+            window_start -= timedelta(days=1)
+            window_end -= timedelta(days=1)
+        window_text = f"{window_start:%H:%M}-{window_end:%H:%M}"
+        
+        if misses == 0:
+            # Today's data is in; the next day appears in tomorrow's window
+            target = window_start + timedelta(days=1)
+            return self._decision(now, (target - now).total_seconds(),
+                                  f"new data received; next expected {window_text}")
+        
+        if now < window_start:
+            return self._decision(now, (window_start - now).total_seconds(),
+                                  f"waiting for expected window {window_text}")
+        
+        if now <= window_end:
+            return self._decision(now, self.min_interval,
+                                  f"inside expected window {window_text}")
+        
+        # Late data: back off, but never sleep past tomorrow's window
+        tomorrow = window_start + timedelta(days=1)
+        delay = min(backoff, (tomorrow - now).total_seconds())
+        return self._decision(now, delay, f"no new data after window {window_text}; "
+                              f"backing off after {misses} polls")
+    
+    def _decision(self, now: datetime, delay: float, reason: str) -> PollDecision:
+        """Clamp a delay to the configured bounds and build a decision."""
+        delay = min(self.max_interval, max(self.min_interval, delay))
+        return PollDecision(next_poll=now + timedelta(seconds=delay), reason=reason)
@@ -1,57 +1,365 @@
 """Main synchronization orchestration."""
 
+import asyncio
 import logging
+import threading
 import time
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta
-from typing import Optional, Dict, Any
+from functools import wraps
+from typing import Optional, Dict, Any, Callable, List, Set, Tuple
 
 from ..config.loader import WNSMConfig
+from ..api.circuit import CircuitBreakers
 from ..api.client import Smartmeter
+from ..api.hedging import Hedger
+from ..api.throttle import DEFAULT_MAX_RATE, AdaptiveThrottle
 from ..data.processor import DataProcessor
 from ..data.models import EnergyData
 from ..mqtt.client import MQTTClient
-from ..mqtt.discovery import HomeAssistantDiscovery
+from ..mqtt.discovery import HomeAssistantDiscovery, DiscoveryStateStore, HA_STATUS_TOPIC
+from ..mqtt.rate_limit import Priority
+from ..backfill.csv_exporter import CSVExporter
 from ..backfill.python_backfill import PythonBackfill, normalize_timestamp_to_utc
-from .utils import with_retry, SessionManager
+from ..metrics import REGISTRY
+from ..tracing import TraceExporter, bind_context, record_span, span
+from .api_gate import AccountGate
+from .diagnostics import CycleDiagnostics
+from .orchestrator import CycleCancelled, SyncOrchestrator
+from .pipeline import ChunkedImport, ImportReport, split_range
+from .profiling import CycleProfiler
+from .scheduler import AdaptiveScheduler, PollDecision
+from .retry import ErrorClass, RetryPolicy, classify
+from .utils import SessionManager
 
 logger = logging.getLogger(__name__)
 
+MQTT_PUBLISH_RATE = REGISTRY.gauge(
+    "wnsm_mqtt_readings_per_second", "Readings per second of the last MQTT publish run"
+)
+
+
+@dataclass
+class SinkResult:
+    """Outcome of delivering a dataset to one sink."""
+    
+    name: str
+    success: bool
+    latency_seconds: float
+    error: Optional[str] = None
+    
+    def to_status(self) -> Dict[str, Any]:
+        """Convert to the per-sink entry of the status payload."""
+        return {
+            "success": self.success,
+            "latency": round(self.latency_seconds, 3),
+            "error": self.error
+        }
+
+
+class EnergySink(ABC):
+    """Destination for a processed energy dataset.
+    
+    Subclasses implement ``write`` and may override ``accepts`` to only
+    take part in MQTT or backfill cycles.
+    """
+    
+    name = "sink"
+    
+    def accepts(self, use_backfill: bool) -> bool:
+        """Whether the sink takes part in a cycle.
+        
+        Args:
+            use_backfill: True if the cycle backfills the database
+            
+        Returns:
+            True if ``write`` should be called
+        """
+        return True
+    
+    @abstractmethod
+    def write(self, energy_data: EnergyData, use_backfill: bool = False) -> bool:
+        """Deliver the dataset.
+        
+        Args:
+            energy_data: Processed energy data
+            use_backfill: True if the cycle backfills the database
+            
+        Returns:
+            True if the data was delivered completely
+        """
+
+
+class MQTTSink(EnergySink):
+    """Publishes readings (or only the daily total during backfill) over MQTT."""
+    
+    name = "mqtt"
+    
+    def __init__(self, sync: "WNSMSync"):
+        self.sync = sync
+    
+    def write(self, energy_data: EnergyData, use_backfill: bool = False) -> bool:
+        if use_backfill:
+            # The database gets the readings; MQTT still reports the daily total
+            return self.sync._publish_daily_total(energy_data)
+        return self.sync._publish_energy_data_mqtt(energy_data)
+
+
+class BackfillSink(EnergySink):
+    """Writes statistics into the Home Assistant database.
+    
+    ``start_sum`` is the cumulative sum the written statistics continue
+    from; a chunked import sets it to the total of the chunks before.
+    """
+    
+    name = "backfill"
+    
+    def __init__(self, backfill: PythonBackfill):
+        self.backfill = backfill
+        self.start_sum = 0.0
+    
+    def accepts(self, use_backfill: bool) -> bool:
+        return use_backfill
+    
+    def write(self, energy_data: EnergyData, use_backfill: bool = False) -> bool:
+        logger.info(f"Backfilling {energy_data.reading_count} energy readings to Home Assistant database")
+        return self.backfill.backfill_energy_data(energy_data, start_sum=self.start_sum)
+
+
+class CSVSink(EnergySink):
+    """Exports each day as an ha-backfill compatible CSV file."""
+    
+    name = "csv"
+    
+    def __init__(self, exporter: CSVExporter):
+        self.exporter = exporter
+    
+    def write(self, energy_data: EnergyData, use_backfill: bool = False) -> bool:
+        return bool(self.exporter.export_multiple_days(energy_data))
+
+
+class SinkPipeline:
+    """Hands one processed dataset to all registered sinks in parallel."""
+    
+    def __init__(self, profiler: Optional[CycleProfiler] = None, cancel_event: Optional[threading.Event] = None):
+        self.sinks: List[EnergySink] = []
+        self.last_results: List[SinkResult] = []
+        self.profiler = profiler
+        # Sinks not yet started are skipped once the cycle is cancelled
+        self.cancel_event = cancel_event or threading.Event()
+    
+    def register(self, sink: EnergySink) -> None:
+        """Register a sink.
+        
+        Args:
+            sink: Sink receiving every processed dataset
+        """
+        self.sinks.append(sink)
+    
+    def _run_sink(self, sink: EnergySink, energy_data: EnergyData, use_backfill: bool) -> SinkResult:
+        """Deliver the dataset to one sink, capturing status and latency."""
+        started = time.monotonic()
+        with span(f"sink.{sink.name}", readings=energy_data.reading_count, backfill=use_backfill) as sink_span:
+            try:
+                if self.cancel_event.is_set():
+                    raise CycleCancelled("cycle cancelled before the sink started")
+                if self.profiler is not None:
+                    # Sinks run in their own threads, which the stage's profile does not see
+                    with self.profiler.profile("sinks"):
+                        success = bool(sink.write(energy_data, use_backfill))
+                else:
+                    success = bool(sink.write(energy_data, use_backfill))
+                error = None if success else "Sink reported failure"
+            except Exception as e:
+                success = False
+                error = str(e)
+            if not success:
+                sink_span.set_attributes(status="failed", error=error)
+        
+        result = SinkResult(sink.name, success, time.monotonic() - started, error)
+        if success:
+            logger.info(f"Sink '{sink.name}' finished in {result.latency_seconds:.2f} seconds")
+        else:
+            logger.error(f"Sink '{sink.name}' failed after {result.latency_seconds:.2f} seconds: {error}")
+        return result
+    
+    def run(self, energy_data: EnergyData, use_backfill: bool = False) -> List[SinkResult]:
+        """Deliver the dataset to all sinks taking part in this cycle.
+        
+        Args:
+            energy_data: Processed energy data
+            use_backfill: True if the cycle backfills the database
+            
+        Returns:
+            One result per participating sink, in registration order
+        """
+        sinks = [sink for sink in self.sinks if sink.accepts(use_backfill)]
+        if not sinks:
+            self.last_results = []
+            return []
+        
+        with ThreadPoolExecutor(max_workers=len(sinks), thread_name_prefix="sink") as executor:
+            futures = [executor.submit(bind_context(self._run_sink), sink, energy_data, use_backfill) for sink in sinks]
+            self.last_results = [future.result() for future in futures]
+        return self.last_results
+
+
+@dataclass
+class SharedResources:
+    """Login, broker connection and state shared by the meters of an account."""
+    
+    session_manager: SessionManager
+    mqtt_client: MQTTClient
+    discovery_state: DiscoveryStateStore
+    scheduler: AdaptiveScheduler
+    api_gate: AccountGate
+    api_client: Optional[Smartmeter] = None
+    discovery_lock: threading.Lock = field(default_factory=threading.Lock)
+    login_lock: threading.RLock = field(default_factory=threading.RLock)
+    
+    @classmethod
+    def create(cls, config: WNSMConfig) -> "SharedResources":
+        """Create the shared resources of an account.
+        
+        Args:
+            config: Account-level configuration object
+            
+        Returns:
+            SharedResources instance
+        """
+        return cls(
+            session_manager=SessionManager(config),
+            mqtt_client=MQTTClient(config),
+            discovery_state=DiscoveryStateStore(config),
+            scheduler=AdaptiveScheduler(config),
+            api_gate=AccountGate(config.account_name or "default")
+        )
+
 
 class WNSMSync:
     """Main synchronization orchestrator for WNSM data."""
     
-    def __init__(self, config: WNSMConfig):
+    def __init__(self, config: WNSMConfig, shared: Optional[SharedResources] = None):
         """Initialize WNSM sync.
         
         Args:
             config: Configuration object
+            shared: Resources shared with the other meters of the account
         """
         self.config = config
-        self.session_manager = SessionManager(config)
+        self.shared = shared or SharedResources.create(config)
+        self.session_manager = self.shared.session_manager
         self.data_processor = DataProcessor()
-        self.mqtt_client = MQTTClient(config)
+        self.mqtt_client = self.shared.mqtt_client
         self.discovery = HomeAssistantDiscovery(config)
+        self.discovery_state = self.shared.discovery_state
+        self._discovery_lock = self.shared.discovery_lock
         self.backfill_integration = PythonBackfill(config)
-        self._api_client: Optional[Smartmeter] = None
+        self.scheduler = self.shared.scheduler
+        self.profiler = CycleProfiler(
+            config.profile_dir,
+            cycles=config.profile_cycles,
+            keep=config.profile_keep,
+            stages={stage.strip() for stage in config.profile_stages.split(",") if stage.strip()}
+            if config.profile_stages else None,
+            name=f"cycle-{config.zp[-8:]}"
+        )
+        self.trace_exporter = TraceExporter(config.trace_dir, keep=config.trace_keep, name=f"trace-{config.zp[-8:]}")
+        # Set when the running cycle is cancelled or a stage times out
+        self.cancel_event = threading.Event()
+        self.pipeline = SinkPipeline(self.profiler, self.cancel_event)
+        self.pipeline.register(MQTTSink(self))
+        self.backfill_sink = BackfillSink(self.backfill_integration)
+        self.pipeline.register(self.backfill_sink)
+        if config.csv_export:
+            self.pipeline.register(CSVSink(CSVExporter(config.csv_export_dir)))
+        self._next_poll: Optional[PollDecision] = None
+        self.last_import_report: Optional[ImportReport] = None
+        self.fetch_error: Optional[str] = None  # Why the last fetch returned no data
+        self.diagnostics = CycleDiagnostics()
+        
+        # Retry delays end early when the cycle is cancelled
+        self.retry_policy = RetryPolicy.from_config(config, sleep=self.cancel_event.wait)
+        self.orchestrator = SyncOrchestrator(self)
     
     @property
     def api_client(self) -> Smartmeter:
         """Get or create API client instance."""
-        if self._api_client is None:
-            self._api_client = Smartmeter(
-                username=self.config.wnsm_username,
-                password=self.config.wnsm_password,
-                use_mock=self.config.use_mock_data,
-                api_timeout=self.config.api_timeout,
-                use_oauth=getattr(self.config, 'use_oauth', True)
-            )
-            # Try to load existing session
-            self.session_manager.load_session(self._api_client)
-        return self._api_client
+        with self.shared.login_lock:
+            if self.shared.api_client is None:
+                self.shared.api_client = Smartmeter(
+                    username=self.config.wnsm_username,
+                    password=self.config.wnsm_password,
+                    use_mock=self.config.use_mock_data,
+                    api_timeout=self.config.api_timeout,
+                    use_oauth=getattr(self.config, 'use_oauth', True),
+                    auth_url=self.config.api_auth_url,
+                    api_url=self.config.api_base_url,
+                    circuit_breakers=CircuitBreakers(
+                        failure_threshold=self.config.circuit_failure_threshold,
+                        reset_timeout=self.config.circuit_reset_timeout
+                    ),
+                    throttle=AdaptiveThrottle(
+                        max_concurrency=self.config.api_max_concurrency,
+                        max_rate=(self.config.api_rate_limit / 60.0 if self.config.api_rate_limit
+                                  else DEFAULT_MAX_RATE)
+                    ),
+                    hedger=Hedger(
+                        percentile=self.config.hedge_percentile,
+                        max_days=self.config.hedge_max_days
+                    ) if self.config.hedge_requests else None,
+                    api_slot=self.shared.api_gate.slot
+                )
+                # Try to load existing session
+                self.session_manager.load_session(self.shared.api_client)
+            return self.shared.api_client
+    
+    def discovery_topics(self) -> Set[str]:
+        """Discovery topics of the entities this meter currently generates."""
+        return {discovery_config['topic'] for discovery_config in self.discovery.get_all_discovery_configs()}
     
-    def setup_discovery(self) -> bool:
+    def remove_stale_discovery(self, topics: Set[str]) -> int:
+        """Remove published discovery configs that are no longer generated.
+        
+        Entities disappear when diagnostics are turned off, the sensor mode
+        or topic changes or a meter is dropped; their retained configs would
+        keep them in Home Assistant forever. The state store is shared by
+        all meters and accounts, so the caller passes the topics of all of
+        them.
+        
+        Args:
+            topics: Discovery topics still generated by any meter
+        
+        Returns:
+            Number of removed configs
+        """
+        removed = 0
+        with self._discovery_lock:
+            published_hashes = self.discovery_state.load()
+            for topic in sorted(set(published_hashes) - topics):
+                if self.mqtt_client.remove_discovery(topic):
+                    del published_hashes[topic]
+                    removed += 1
+            if removed:
+                self.discovery_state.save(published_hashes)
+        if removed:
+            logger.info(f"Removed {removed} stale discovery configurations")
+        return removed
+    
+    def setup_discovery(self, force: bool = False, prune: bool = True) -> bool:
         """Setup Home Assistant MQTT discovery.
         
+        Discovery configs are published retained and only when their content
+        hash differs from the last published one, unless forced. Published
+        configs that are no longer generated are removed.
+        
+        Args:
+            force: Re-publish all configs regardless of stored hashes
+            prune: Remove stale configs; callers hosting several meters pass
+                False and call remove_stale_discovery() with all their topics
+        
         Returns:
             True if all discovery configs were published successfully
         """
@@ -59,18 +367,67 @@ class WNSMSync:
         
         discovery_configs = self.discovery.get_all_discovery_configs()
         success_count = 0
+        skipped_count = 0
         
-        for discovery_config in discovery_configs:
-            if self.mqtt_client.publish_discovery(discovery_config):
-                success_count += 1
-            else:
-                logger.error(f"Failed to publish discovery config: {discovery_config['topic']}")
+        # Called from both the main thread and the MQTT network thread
+        with self._discovery_lock:
+            published_hashes = self.discovery_state.load()
+            
+            for discovery_config in discovery_configs:
+                topic = discovery_config['topic']
+                config_hash = self.discovery.config_hash(discovery_config)
+                
+                if not force and published_hashes.get(topic) == config_hash:
+                    skipped_count += 1
+                    success_count += 1
+                    continue
+                
+                if self.mqtt_client.publish_discovery(discovery_config):
+                    published_hashes[topic] = config_hash
+                    success_count += 1
+                else:
+                    logger.error(f"Failed to publish discovery config: {topic}")
+            
+            self.discovery_state.save(published_hashes)
         
         total_configs = len(discovery_configs)
-        logger.info(f"Published {success_count}/{total_configs} discovery configurations")
+        logger.info(
+            f"Published {success_count - skipped_count}/{total_configs} discovery configurations "
+            f"({skipped_count} unchanged)"
+        )
+        if prune:
+            self.remove_stale_discovery({discovery_config['topic'] for discovery_config in discovery_configs})
         
         return success_count == total_configs
     
+    def _on_ha_status(self, payload: str, retained: bool) -> None:
+        """Re-publish discovery when Home Assistant announces a restart.
+        
+        Args:
+            payload: Birth/will payload published by Home Assistant
+            retained: Whether the message was replayed from the broker's store
+        """
+        if payload == "online" and not retained:
+            logger.info("Home Assistant restarted, re-publishing discovery configurations")
+            self.setup_discovery(force=True)
+    
+    def _on_profile_command(self, payload: str, retained: bool) -> None:
+        """Profile the next N cycles when asked to on the profile topic.
+        
+        Args:
+            payload: Number of cycles to profile
+            retained: Whether the message is a retained replay
+        """
+        # A retained command would profile again after every restart
+        if retained:
+            return
+        try:
+            cycles = int(payload.strip())
+        except ValueError:
+            logger.warning(f"Ignoring profile command '{payload}', expected a number of cycles")
+            return
+        self.profiler.request(cycles)
+    
     def fetch_energy_data(self) -> Optional[EnergyData]:
         """Fetch energy data from the API.
         
@@ -98,36 +455,22 @@ class WNSMSync:
     
     def _fetch_real_data(self) -> Optional[EnergyData]:
         """Fetch real energy data from the API."""
+        self.fetch_error = None
         try:
             logger.info("Fetching energy data from Wiener Netze API")
             
-            # Ensure we're logged in
-            if not self.api_client.is_logged_in():
-                logger.info("Logging in to Wiener Netze API")
-                with_retry(self.api_client.login, self.config)
-                # Save session after successful login
-                self.session_manager.save_session(self.api_client)
-            
             # Calculate date range
             date_until = datetime.now()
             date_from = date_until - timedelta(days=self.config.history_days)
             
-            logger.info(f"Fetching bewegungsdaten from {date_from.date()} to {date_until.date()}")
-            
-            # Fetch bewegungsdaten
-            raw_data = with_retry(
-                self.api_client.bewegungsdaten,
-                self.config,
-                zaehlpunktnummer=self.config.zp,
-                date_from=date_from,
-                date_until=date_until
-            )
+            raw_data = self.fetch_raw_range(date_from, date_until)
             
             if not raw_data:
                 logger.warning("No data returned from API")
                 return None
             
             # Process the raw data
+            self._checkpoint()
             energy_data = self.data_processor.process_bewegungsdaten_response(
                 raw_data, self.config.zp
             )
@@ -142,28 +485,166 @@ class WNSMSync:
             
         except Exception as e:
             logger.error(f"Failed to fetch energy data: {e}")
+            self.fetch_error = str(e)
             # Clear session on authentication errors
-            if "auth" in str(e).lower() or "login" in str(e).lower():
+            if classify(e).error_class is ErrorClass.AUTH:
                 logger.info("Clearing session due to authentication error")
                 self.session_manager.clear_session()
-                if self._api_client:
-                    self._api_client.reset()
+                if self.shared.api_client:
+                    self.shared.api_client.reset()
             return None
     
+    def _checkpoint(self) -> None:
+        """Stop a stage worker whose cycle was cancelled or timed out.
+        
+        Raises:
+            CycleCancelled: If the cancel event is set
+        """
+        if self.cancel_event.is_set():
+            raise CycleCancelled("sync cycle cancelled")
+    
+    def _call_api(self, func: Callable[..., Any], *args, gated: bool = True, **kwargs) -> Any:
+        """Call the API under the retry policy, each attempt through the account's API gate.
+        
+        Args:
+            func: API client method
+            *args: Arguments passed to the method
+            gated: Whether each attempt holds a gate slot; False for methods
+                that take the slot themselves
+            **kwargs: Keyword arguments passed to the method
+            
+        Returns:
+            Result of the API call
+        
+        Raises:
+            CycleCancelled: If the cycle was cancelled before the call
+        """
+        self._checkpoint()
+        
+        if not gated:
+            return self.retry_policy.call(func.__name__, func, *args, **kwargs)
+        
+        @wraps(func)
+        def in_slot(*call_args, **call_kwargs):
+            with self.shared.api_gate.slot():
+                return func(*call_args, **call_kwargs)
+        
+        return self.retry_policy.call(func.__name__, in_slot, *args, **kwargs)
+    
+    def fetch_raw_range(self, date_from: datetime, date_until: datetime) -> Optional[Dict[str, Any]]:
+        """Fetch the raw bewegungsdaten response for a date range.
+        
+        Args:
+            date_from: Start of the range
+            date_until: End of the range
+            
+        Returns:
+            Raw API response, None if the API returned nothing
+        """
+        # Ensure we're logged in; meters of one account share the login
+        with self.shared.login_lock:
+            if not self.api_client.is_logged_in():
+                logger.info("Logging in to Wiener Netze API")
+                self._call_api(self.api_client.login)
+                # Save session after successful login
+                self.session_manager.save_session(self.api_client)
+        
+        logger.info(f"Fetching bewegungsdaten from {date_from.date()} to {date_until.date()}")
+        
+        with span("fetch_range", date_from=str(date_from), date_until=str(date_until)):
+            # The client takes the gate slot only if it sends the request, not while sharing one in flight
+            return self._call_api(
+                self.api_client.bewegungsdaten,
+                zaehlpunktnummer=self.config.zp,
+                date_from=date_from,
+                date_until=date_until,
+                gated=False
+            ) or None
+    
+    def use_chunked_import(self, force_backfill: bool = False) -> bool:
+        """Whether the history is large enough to import it in chunks.
+        
+        Args:
+            force_backfill: If True, database backfill is forced
+            
+        Returns:
+            True if the cycle should run the chunked import pipeline
+        """
+        backfill_enabled = force_backfill or getattr(self.config, 'enable_backfill', False)
+        return backfill_enabled and self.config.history_days > self.config.import_chunk_days
+    
+    def import_ranges(self) -> List[Tuple[datetime, datetime]]:
+        """Date-range chunks covering the configured history."""
+        date_until = datetime.now()
+        date_from = date_until - timedelta(days=self.config.history_days)
+        return split_range(date_from, date_until, self.config.import_chunk_days)
+    
+    def run_chunked_import(self, ranges: Optional[List[Tuple[datetime, datetime]]] = None) -> ImportReport:
+        """Import a large history with fetching, processing and writing overlapped.
+        
+        Each chunk is written through the sink pipeline like the dataset of a
+        backfill cycle, so every sink receives every chunk in order.
+        
+        Args:
+            ranges: Date-range chunks to import, defaults to ``import_ranges()``
+            
+        Returns:
+            ImportReport with totals and per-stage utilization
+        """
+        ranges = ranges if ranges is not None else self.import_ranges()
+        logger.info(f"Importing {self.config.history_days} days in {len(ranges)} chunks")
+        
+        def fetch_chunk(date_from: datetime, date_until: datetime) -> Any:
+            if self.config.use_mock_data:
+                return self.data_processor.generate_mock_data(date_from, date_until, self.config.zp)
+            return self.fetch_raw_range(date_from, date_until)
+        
+        def process_chunk(raw_data: Any) -> Optional[EnergyData]:
+            if isinstance(raw_data, EnergyData):
+                return raw_data
+            energy_data = self.data_processor.process_bewegungsdaten_response(raw_data, self.config.zp)
+            points = (raw_data.get("data") or raw_data.get("values")) if isinstance(raw_data, dict) else None
+            if energy_data is None and points:
+                # The processor logs and swallows parse errors; skipping the chunk would leave a gap in the sums
+                raise ValueError(f"none of {len(points)} readings could be processed")
+            return energy_data
+        
+        def write_chunk(energy_data: EnergyData) -> bool:
+            # Every sink sees every chunk; the statistics sum continues where the previous chunk ended
+            results = self.pipeline.run(energy_data, use_backfill=True)
+            if not all(result.success for result in results):
+                return False
+            self.backfill_sink.start_sum += energy_data.total_kwh
+            return True
+        
+        # The import runs its stages in threads of its own
+        importer = ChunkedImport(
+            self.profiler.wrap("import", fetch_chunk),
+            self.profiler.wrap("import", process_chunk),
+            self.profiler.wrap("import", write_chunk),
+            queue_size=self.config.import_queue_size,
+            cancel_event=self.cancel_event
+        )
+        self.backfill_sink.start_sum = 0.0
+        try:
+            report = importer.run(ranges)
+        finally:
+            self.backfill_sink.start_sum = 0.0
+        self.last_import_report = report
+        return report
+    
     def publish_energy_data(self, energy_data: EnergyData, use_backfill: bool = False) -> bool:
-        """Publish energy data to MQTT or backfill to Home Assistant database.
+        """Deliver energy data to all registered sinks in parallel.
         
         Args:
             energy_data: Energy data to publish
             use_backfill: If True, use database backfill instead of MQTT
             
         Returns:
-            True if all data was published successfully
+            True if every participating sink succeeded
         """
-        if use_backfill:
-            return self._backfill_energy_data(energy_data)
-        else:
-            return self._publish_energy_data_mqtt(energy_data)
+        results = self.pipeline.run(energy_data, use_backfill=use_backfill)
+        return all(result.success for result in results)
     
     def _publish_energy_data_mqtt(self, energy_data: EnergyData) -> bool:
         """Publish energy data to MQTT (original method).
@@ -178,44 +659,54 @@ class WNSMSync:
         
         success_count = 0
         total_readings = len(energy_data.readings)
+        throttled_before = self.mqtt_client.rate_limiter.throttled_seconds
+        started = time.perf_counter()
+        topic = f"{self.config.mqtt_topic}/15min"
+        
+        if self.config.mqtt_payload_mode == "reading":
+            # Publish individual 15-minute readings
+            for reading in energy_data.readings:
+                if self.cancel_event.is_set():
+                    logger.warning("Publishing cancelled")
+                    break
+                
+                payload = reading.to_mqtt_payload()
+                
+                if self.mqtt_client.publish_message(topic, payload):
+                    success_count += 1
+                else:
+                    logger.warning(f"Failed to publish reading for {reading.timestamp}")
+        else:
+            # Publish one document per hour or day
+            batches = energy_data.batch_readings(self.config.mqtt_payload_mode)
+            for batch in batches:
+                if self.cancel_event.is_set():
+                    logger.warning("Publishing cancelled")
+                    break
+                
+                if self.mqtt_client.publish_message(topic, batch.to_mqtt_payload()):
+                    success_count += len(batch.readings)
+                else:
+                    logger.warning(f"Failed to publish {batch.period} batch starting {batch.start}")
+            logger.info(f"Grouped readings into {len(batches)} {self.config.mqtt_payload_mode} messages")
         
-        # Publish individual 15-minute readings
-        for reading in energy_data.readings:
-            topic = f"{self.config.mqtt_topic}/15min"
-            payload = reading.to_mqtt_payload()
-            
-            if self.mqtt_client.publish_message(topic, payload):
-                success_count += 1
-            else:
-                logger.warning(f"Failed to publish reading for {reading.timestamp}")
+        elapsed = time.perf_counter() - started
+        if success_count and elapsed > 0:
+            MQTT_PUBLISH_RATE.set(success_count / elapsed)
+            self.diagnostics.mqtt_readings_per_second = success_count / elapsed
         
         # Publish daily total
         self._publish_daily_total(energy_data)
         
         logger.info(f"Published {success_count}/{total_readings} energy readings")
-        return success_count == total_readings
-    
-    def _backfill_energy_data(self, energy_data: EnergyData) -> bool:
-        """Backfill energy data directly to Home Assistant database.
         
-        Args:
-            energy_data: Energy data to backfill
-            
-        Returns:
-            True if backfill was successful
-        """
-        logger.info(f"Backfilling {energy_data.reading_count} energy readings to Home Assistant database")
-        
-        success = self.backfill_integration.backfill_energy_data(energy_data)
+        throttled = self.mqtt_client.rate_limiter.throttled_seconds - throttled_before
+        if throttled > 0:
+            logger.info(f"MQTT rate limit throttled publishing for {throttled:.1f} seconds")
+        record_span("mqtt.batch", elapsed, mode=self.config.mqtt_payload_mode, readings=success_count,
+                    total=total_readings, throttled_seconds=round(throttled, 3))
         
-        if success:
-            logger.info("Successfully backfilled energy data to Home Assistant")
-            # Still publish daily total to MQTT for status
-            self._publish_daily_total(energy_data)
-        else:
-            logger.error("Failed to backfill energy data")
-        
-        return success
+        return success_count == total_readings
     
     def _publish_daily_total(self, energy_data: EnergyData) -> bool:
         """Publish daily total energy consumption.
@@ -246,14 +737,45 @@ class WNSMSync:
             True if published successfully
         """
         topic = f"{self.config.mqtt_topic}/status"
+        if self._next_poll is not None:
+            next_sync = self._next_poll.next_poll
+            next_sync_reason = self._next_poll.reason
+        else:
+            next_sync = datetime.now() + timedelta(seconds=self.config.update_interval)
+            next_sync_reason = "fixed update interval"
+        
         payload = {
             "status": status,
             "last_sync": datetime.now().isoformat(),
-            "next_sync": (datetime.now() + timedelta(seconds=self.config.update_interval)).isoformat(),
+            "next_sync": next_sync.isoformat(),
+            "next_sync_reason": next_sync_reason,
             "error": error
         }
+        if status != "running" and self.pipeline.last_results:
+            payload["sinks"] = {
+                result.name: result.to_status() for result in self.pipeline.last_results
+            }
+        if status != "running" and self.last_import_report is not None:
+            payload["import"] = self.last_import_report.to_dict()
+        # Endpoints failing fast because of an outage, with the seconds until their next probe
+        breakers = getattr(self.shared.api_client, "breakers", None)
+        outage = breakers.open_circuits() if isinstance(breakers, CircuitBreakers) else {}
+        if outage:
+            payload["api_outage"] = outage
+        
+        return self.mqtt_client.publish_message(topic, payload, retain=True, priority=Priority.CONTROL)
+    
+    def publish_diagnostics(self) -> bool:
+        """Publish the performance numbers of the last cycle to MQTT.
         
-        return self.mqtt_client.publish_message(topic, payload, retain=True)
+        Returns:
+            True if published successfully
+        """
+        self.diagnostics.mqtt_outbox = self.mqtt_client.outbox_depth()
+        topic = f"{self.config.mqtt_topic}/diagnostics"
+        return self.mqtt_client.publish_message(
+            topic, self.diagnostics.to_payload(), retain=True, priority=Priority.CONTROL
+        )
     
     def publish_availability(self, available: bool = True) -> bool:
         """Publish availability status to MQTT.
@@ -264,33 +786,7 @@ class WNSMSync:
         Returns:
             True if published successfully
         """
-        topic = f"{self.config.mqtt_topic}/availability"
-        payload = "online" if available else "offline"
-        
-        # Publish as plain string, not JSON
-        try:
-            import paho.mqtt.publish as publish
-            
-            auth = None
-            if self.config.mqtt_username and self.config.mqtt_password:
-                auth = {
-                    "username": self.config.mqtt_username,
-                    "password": self.config.mqtt_password
-                }
-            
-            publish.single(
-                topic=topic,
-                payload=payload,
-                hostname=self.mqtt_client._hostname,
-                port=self.mqtt_client._port,
-                auth=auth,
-                retain=True  # Retain availability messages
-            )
-            
-            return True
-        except Exception as e:
-            logger.error(f"Failed to publish availability: {e}")
-            return False
+        return self.mqtt_client.publish_availability(available)
     
     def run_sync_cycle(self, force_backfill: bool = False) -> bool:
         """Run a single synchronization cycle.
@@ -301,34 +797,45 @@ class WNSMSync:
         Returns:
             True if sync was successful, False otherwise
         """
-        try:
-            logger.info("Starting sync cycle")
-            self.publish_status("running")
-            self.publish_availability(True)
-            
-            # Fetch energy data
-            energy_data = self.fetch_energy_data()
-            if not energy_data:
-                self.publish_status("error", "Failed to fetch energy data")
-                return False
-            
-            # Determine whether to use backfill or MQTT
-            use_backfill = force_backfill or self._should_use_backfill(energy_data)
-            
-            # Publish energy data
-            if not self.publish_energy_data(energy_data, use_backfill=use_backfill):
-                self.publish_status("error", "Failed to publish some energy data")
-                return False
-            
-            # Mark as successful
-            self.publish_status("success")
-            logger.info("Sync cycle completed successfully")
-            return True
+        return asyncio.run(self.orchestrator.run_cycle(force_backfill))
+    
+    def _plan_next_poll(self, energy_data: Optional[EnergyData]) -> None:
+        """Record the fetch outcome and plan the next poll.
+        
+        Args:
+            energy_data: Fetched energy data, None if the fetch failed
+        """
+        if not self.config.adaptive_schedule:
+            return
+        
+        latest_reading = energy_data.date_until if energy_data else None
+        if self.scheduler.record_cycle(self.config.zp, latest_reading):
+            logger.info(f"New data available up to {latest_reading}")
+        
+        self._next_poll = self.scheduler.next_poll(self.config.zp)
+        logger.info(f"Next poll at {self._next_poll.next_poll:%Y-%m-%d %H:%M} ({self._next_poll.reason})")
+    
+    def _prewarm_login(self) -> None:
+        """Log in ahead of a scheduled poll so the fetch starts immediately."""
+        if self.config.use_mock_data:
+            return
+        
+        with self.shared.login_lock:
+            if self.api_client.is_logged_in():
+                return
             
-        except Exception as e:
-            logger.error(f"Sync cycle failed: {e}")
-            self.publish_status("error", str(e))
-            return False
+            try:
+                logger.info("Pre-warming Wiener Netze API login")
+                self._call_api(self.api_client.login)
+                self.session_manager.save_session(self.api_client)
+            except Exception as e:
+                logger.warning(f"Login pre-warm failed, will retry during sync: {e}")
+    
+    def next_poll_delay(self) -> float:
+        """Seconds until the next sync cycle should run."""
+        if not self.config.adaptive_schedule or self._next_poll is None:
+            return float(self.config.update_interval)
+        return self._next_poll.delay_seconds
     
     def _should_use_backfill(self, energy_data: EnergyData) -> bool:
         """Determine whether to use database backfill or MQTT publishing.
@@ -369,27 +876,37 @@ class WNSMSync:
         logger.info("Using MQTT for recent data")
         return False
     
-    def run_continuous(self) -> None:
-        """Run continuous synchronization loop."""
-        logger.info("Starting continuous synchronization")
+    def subscribe_commands(self) -> None:
+        """Subscribe the command topics of this meter, e.g. on-demand profiling."""
+        self.mqtt_client.subscribe(f"{self.config.mqtt_topic}/profile", self._on_profile_command)
+    
+    def start(self) -> None:
+        """Open the persistent MQTT connection and publish discovery."""
+        # Keep one broker connection for the lifetime of the process
+        if not self.mqtt_client.connect():
+            logger.warning("Persistent MQTT connection unavailable, falling back to per-message connections")
+            self.publish_availability(True)
+        self.mqtt_client.subscribe(HA_STATUS_TOPIC, self._on_ha_status)
+        self.subscribe_commands()
         
         # Setup discovery once at startup
         self.setup_discovery()
+    
+    def shutdown(self) -> None:
+        """Mark the service offline and close the MQTT connection."""
+        if self.mqtt_client.is_connected():
+            self.mqtt_client.disconnect()
+        else:
+            self.publish_availability(False)
+    
+    def run_continuous(self) -> None:
+        """Run continuous synchronization loop until SIGTERM/SIGINT."""
+        logger.info("Starting continuous synchronization")
         
         try:
-            while True:
-                # Run sync cycle
-                self.run_sync_cycle()
-                
-                # Sleep until next cycle
-                logger.info(f"Sleeping for {self.config.update_interval} seconds")
-                time.sleep(self.config.update_interval)
-                
+            asyncio.run(self.orchestrator.run_forever())
         except KeyboardInterrupt:
             logger.info("Received interrupt signal, shutting down")
         except Exception as e:
             logger.error(f"Continuous sync failed: {e}")
             raise
-        finally:
-            # Mark as offline when shutting down
-            self.publish_availability(False)
\ No newline at end of file
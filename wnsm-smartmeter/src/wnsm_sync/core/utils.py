@@ -1,20 +1,27 @@
 """Utility functions for core operations."""
 
+import atexit
+import gzip
 import json
 import logging
-import time
+import queue
+import shutil
 import os
-from typing import Callable, Any, Optional
-from functools import wraps
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Callable, Any, List, Optional, Tuple
 
 from ..config.loader import WNSMConfig
 from ..api.client import Smartmeter
+from .retry import RetryPolicy
 
 logger = logging.getLogger(__name__)
 
 
 def with_retry(func: Callable, config: WNSMConfig, *args, **kwargs) -> Any:
-    """Execute a function with retry logic and exponential backoff.
+    """Execute a function with the retry policy of a configuration.
+    
+    Only errors a retry can fix are retried, with decorrelated jitter
+    backoff; see RetryPolicy. The budgets apply to this one call.
     
     Args:
         func: Function to execute
@@ -28,29 +35,7 @@ def with_retry(func: Callable, config: WNSMConfig, *args, **kwargs) -> Any:
     Raises:
         Exception: The last exception if all retries fail
     """
-    last_exception = None
-    
-    for attempt in range(config.retry_count + 1):
-        try:
-            return func(*args, **kwargs)
-        except Exception as e:
-            last_exception = e
-            if attempt < config.retry_count:
-                # Exponential backoff: delay increases with each attempt
-                delay = config.retry_delay * (2 ** attempt)
-                # Cap the delay at 5 minutes
-                delay = min(delay, 300)
-                
-                logger.warning(
-                    f"Attempt {attempt + 1}/{config.retry_count + 1} failed: {e}. "
-                    f"Retrying in {delay} seconds..."
-                )
-                time.sleep(delay)
-            else:
-                logger.error(f"All {config.retry_count + 1} attempts failed")
-    
-    if last_exception:
-        raise last_exception
+    return RetryPolicy.from_config(config).call(getattr(func, "__name__", "call"), func, *args, **kwargs)
 
 
 class SessionManager:
@@ -128,19 +113,125 @@ class SessionManager:
             return False
 
 
-def setup_logging(debug: bool = False) -> None:
+# Attributes every LogRecord has; anything else was passed with extra=
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+
+class JsonFormatter(logging.Formatter):
+    """Formats records as one JSON object per line, including fields passed with ``extra``."""
+    
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage()
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES:
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+def _gzip_rotator(source: str, dest: str) -> None:
+    """Compress a rotated log file instead of renaming it."""
+    with open(source, "rb") as f_in, gzip.open(dest, "wb") as f_out:
+        shutil.copyfileobj(f_in, f_out)
+    os.remove(source)
+
+
+def rotating_file_handler(path: str, max_bytes: int, backups: int, compress: bool = False) -> RotatingFileHandler:
+    """Create a size-rotated log file handler.
+    
+    Args:
+        path: Log file path
+        max_bytes: Size at which the file is rotated
+        backups: Number of rotated files kept
+        compress: Gzip rotated files (``wnsm-sync.log.1.gz``)
+        
+    Returns:
+        File handler
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    handler = RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backups, encoding="utf-8")
+    if compress:
+        handler.namer = lambda name: name + ".gz"
+        handler.rotator = _gzip_rotator
+    return handler
+
+
+def _stop_listener(listener: QueueListener) -> None:
+    """Flush and stop a queue listener unless it was stopped already."""
+    # QueueListener.stop() fails when called twice
+    if listener._thread is not None:
+        listener.stop()
+
+
+def start_queue_listener(handlers: List[logging.Handler]) -> Tuple[QueueHandler, QueueListener]:
+    """Move log output to a background thread.
+    
+    Records are put on an unbounded queue, so logging never waits for a
+    slow terminal or SD card; the listener thread formats and writes them.
+    
+    Args:
+        handlers: Handlers doing the actual output
+        
+    Returns:
+        Handler to attach to loggers, and the started listener (stopped at exit)
+    """
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    atexit.register(_stop_listener, listener)
+    
+    queue_handler = QueueHandler(log_queue)
+    # The listener's handlers format the records; basicConfig must not add its own format first
+    queue_handler.setFormatter(logging.Formatter("%(message)s"))
+    return queue_handler, listener
+
+
+def setup_logging(debug: bool = False, log_format: str = "text", log_file: Optional[str] = None,
+                  log_max_bytes: int = 5 * 1024 * 1024, log_backups: int = 3, log_compress: bool = False,
+                  log_queue: bool = True) -> Optional[QueueListener]:
     """Setup logging configuration.
     
     Args:
         debug: Enable debug logging if True
+        log_format: "text" for the classic format, "json" for one JSON object per line
+        log_file: Additionally write the log to this file, rotated by size
+        log_max_bytes: Size at which the log file is rotated
+        log_backups: Number of rotated log files kept
+        log_compress: Gzip rotated log files
+        log_queue: Write the log on a background thread
+        
+    Returns:
+        The queue listener if the log is written on a background thread
     """
     log_level = logging.DEBUG if debug else logging.INFO
     
+    handlers: List[logging.Handler] = [logging.StreamHandler()]
+    if log_file:
+        handlers.append(rotating_file_handler(log_file, log_max_bytes, log_backups, log_compress))
+    for handler in handlers:
+        if log_format == "json":
+            handler.setFormatter(JsonFormatter())
+        else:
+            handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+    
+    listener = None
+    if log_queue:
+        queue_handler, listener = start_queue_listener(handlers)
+        handlers = [queue_handler]
+    
     logging.basicConfig(
         level=log_level,
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        handlers=[logging.StreamHandler()]
+        handlers=handlers
     )
     
     if debug:
-        logger.debug("Debug logging enabled")
\ No newline at end of file
+        logger.debug("Debug logging enabled")
+    return listener
\ No newline at end of file
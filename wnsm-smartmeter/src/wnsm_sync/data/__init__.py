@@ -1,6 +1,6 @@
 """Data processing and models for WNSM Sync."""
 
-from .models import EnergyReading, EnergyData
+from .models import EnergyReading, EnergyReadingBatch, EnergyData
 from .processor import DataProcessor
 
-__all__ = ["EnergyReading", "EnergyData", "DataProcessor"]
\ No newline at end of file
+__all__ = ["EnergyReading", "EnergyReadingBatch", "EnergyData", "DataProcessor"]
\ No newline at end of file
@@ -1,8 +1,8 @@
 """Data models for energy readings and statistics."""
 
 from dataclasses import dataclass
-from datetime import datetime
-from typing import List, Optional, Dict, Any
+from datetime import datetime, tzinfo
+from typing import List, Optional, Dict, Any, Tuple
 from decimal import Decimal
 
 
@@ -33,6 +33,39 @@ class EnergyReading:
         return payload
 
 
+@dataclass
+class EnergyReadingBatch:
+    """Readings of one hour or day grouped into a single document."""
+    
+    start: datetime
+    period: str  # "hour" or "day"
+    readings: List[EnergyReading]
+    
+    @property
+    def total_kwh(self) -> float:
+        """Sum of all readings in the batch."""
+        return sum(reading.value_kwh for reading in self.readings)
+    
+    def to_mqtt_payload(self) -> Dict[str, Any]:
+        """Convert to batched MQTT payload format.
+        
+        Readings are stored as offsets in seconds from ``start`` and a
+        parallel array of kWh deltas; ``latest`` and ``timestamp`` describe
+        the most recent reading.
+        """
+        latest = self.readings[-1]
+        return {
+            "start": self.start.isoformat(),
+            "period": self.period,
+            "offsets": [int((r.timestamp - self.start).total_seconds()) for r in self.readings],
+            "deltas": [r.value_kwh for r in self.readings],
+            "total": round(self.total_kwh, 6),
+            "count": len(self.readings),
+            "latest": latest.value_kwh,
+            "timestamp": latest.timestamp.isoformat()
+        }
+
+
 @dataclass
 class EnergyData:
     """Collection of energy readings with metadata."""
@@ -60,6 +93,37 @@ class EnergyData:
             if reading.timestamp.date() == target_date.date()
         ]
     
+    def batch_readings(self, period: str, tz: Optional[tzinfo] = None) -> List[EnergyReadingBatch]:
+        """Group readings into one batch per local hour or local day.
+        
+        The API reports UTC timestamps; they are converted to the local
+        zone before truncating, so a day batch runs from local midnight to
+        local midnight. Naive timestamps are taken as local already.
+        
+        Args:
+            period: "hour" or "day"
+            tz: Zone of the hours and days, defaults to the system's local zone
+            
+        Returns:
+            Batches in chronological order
+        """
+        if period not in ("hour", "day"):
+            raise ValueError(f"Unsupported batch period: {period}")
+        
+        # Keyed by naive local time, so readings on both sides of a DST switch share their day
+        batches: Dict[datetime, Tuple[Optional[tzinfo], List[EnergyReading]]] = {}
+        for reading in sorted(self.readings, key=lambda r: r.timestamp):
+            local = reading.timestamp.astimezone(tz) if reading.timestamp.tzinfo else reading.timestamp
+            key = local.replace(minute=0, second=0, microsecond=0, tzinfo=None)
+            if period == "day":
+                key = key.replace(hour=0)
+            batches.setdefault(key, (local.tzinfo, []))[1].append(reading)
+        
+        return [
+            EnergyReadingBatch(start=key.replace(tzinfo=zone), period=period, readings=readings)
+            for key, (zone, readings) in batches.items()
+        ]
+    
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary for JSON serialization."""
         return {
@@ -1,14 +1,27 @@
 """Data processing logic for energy readings."""
 
 import logging
+import time
 from datetime import datetime, timedelta
 from typing import Dict, Any, List, Optional
 from decimal import Decimal
 
 from .models import EnergyReading, EnergyData
+from ..metrics import REGISTRY
+from ..tracing import record_span
 
 logger = logging.getLogger(__name__)
 
+PROCESSING_SECONDS = REGISTRY.histogram(
+    "wnsm_processing_duration_seconds", "Duration of turning API responses into readings"
+)
+PROCESSED_READINGS = REGISTRY.counter(
+    "wnsm_processed_readings_total", "Readings produced from API responses"
+)
+PROCESSING_RATE = REGISTRY.gauge(
+    "wnsm_processing_readings_per_second", "Readings per second of the last processed response"
+)
+
 
 class DataProcessor:
     """Processes raw API data into structured energy readings."""
@@ -31,6 +44,7 @@ class DataProcessor:
         Returns:
             EnergyData object with processed readings, or None if processing fails
         """
+        started = time.perf_counter()
         try:
             # Support both formats: converted format with "data" and original format with "values"
             if not raw_data:
@@ -80,6 +94,14 @@ class DataProcessor:
                 f"to {date_until.date()}, total: {energy_data.total_kwh:.3f} kWh"
             )
             
+            elapsed = time.perf_counter() - started
+            PROCESSING_SECONDS.observe(elapsed)
+            PROCESSED_READINGS.inc(len(readings))
+            if elapsed > 0:
+                PROCESSING_RATE.set(len(readings) / elapsed)
+            record_span("process", elapsed, points=len(values), readings=len(readings),
+                        date_from=date_from.isoformat(), date_until=date_until.isoformat())
+            
             return energy_data
             
         except Exception as e:
@@ -0,0 +1,6 @@
+"""Prometheus metrics of the sync stages."""
+
+from .registry import REGISTRY, Counter, Gauge, Histogram, Registry
+from .server import MetricsServer
+
+__all__ = ["REGISTRY", "Counter", "Gauge", "Histogram", "Registry", "MetricsServer"]
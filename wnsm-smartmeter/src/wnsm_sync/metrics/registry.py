@@ -0,0 +1,243 @@
+"""Prometheus-style metrics kept in process memory."""
+
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+# Latency buckets in seconds, from fast local work to slow API calls
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+LabelKey = Tuple[str, ...]
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if value == int(value) and abs(value) < 1e15:
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class Metric:
+    """Base class of the metric types.
+    
+    Values are kept per label combination; every update takes the metric's
+    lock, so instruments can be shared by all threads.
+    """
+    
+    type_name = "untyped"
+    
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        """Initialize metric.
+        
+        Args:
+            name: Metric name, e.g. ``wnsm_api_requests_total``
+            documentation: HELP text
+            labelnames: Names of the labels every update must provide
+        """
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+    
+    def _key(self, labels: Dict[str, str]) -> LabelKey:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+    
+    def _label_string(self, key: LabelKey, extra: Optional[Tuple[str, str]] = None) -> str:
+        pairs = list(zip(self.labelnames, key))
+        if extra:
+            pairs.append(extra)
+        if not pairs:
+            return ""
+        return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+    
+    def samples(self) -> List[str]:
+        """Exposition lines of the current values."""
+        raise NotImplementedError
+    
+    def render(self) -> str:
+        """HELP, TYPE and sample lines in the Prometheus text format."""
+        lines = [f"# HELP {self.name} {_escape(self.documentation)}", f"# TYPE {self.name} {self.type_name}"]
+        lines.extend(self.samples())
+        return "\n".join(lines)
+
+
+class Counter(Metric):
+    """Monotonically increasing value."""
+    
+    type_name = "counter"
+    
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelKey, float] = {}
+    
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        """Increase the counter.
+        
+        Args:
+            amount: Non-negative increment
+            **labels: Label values
+        """
+        if amount < 0:
+            raise ValueError("Counters can only increase")
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+    
+    def value(self, **labels: str) -> float:
+        """Current value for the label values."""
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+    
+    def samples(self) -> List[str]:
+        with self._lock:
+            return [f"{self.name}{self._label_string(key)} {_format_value(value)}"
+                    for key, value in sorted(self._values.items())]
+
+
+class Gauge(Metric):
+    """Value that can go up and down."""
+    
+    type_name = "gauge"
+    
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelKey, float] = {}
+    
+    def set(self, value: float, **labels: str) -> None:
+        """Set the gauge to a value."""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = float(value)
+    
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        """Change the gauge by an amount, which may be negative."""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+    
+    def value(self, **labels: str) -> float:
+        """Current value for the label values."""
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+    
+    def samples(self) -> List[str]:
+        with self._lock:
+            return [f"{self.name}{self._label_string(key)} {_format_value(value)}"
+                    for key, value in sorted(self._values.items())]
+
+
+class Histogram(Metric):
+    """Distribution of observed values in cumulative buckets."""
+    
+    type_name = "histogram"
+    
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        # Per label key: (bucket counts, sum, count)
+        self._values: Dict[LabelKey, Tuple[List[int], float, int]] = {}
+    
+    def observe(self, value: float, **labels: str) -> None:
+        """Record one observation."""
+        key = self._key(labels)
+        with self._lock:
+            counts, total, count = self._values.get(key) or ([0] * len(self.buckets), 0.0, 0)
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[index] += 1
+                    break
+            self._values[key] = (counts, total + value, count + 1)
+    
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        """Observe the duration of the with block in seconds."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+    
+    def count(self, **labels: str) -> int:
+        """Number of observations for the label values."""
+        with self._lock:
+            entry = self._values.get(self._key(labels))
+            return entry[2] if entry else 0
+    
+    def sum(self, **labels: str) -> float:
+        """Sum of the observations for the label values."""
+        with self._lock:
+            entry = self._values.get(self._key(labels))
+            return entry[1] if entry else 0.0
+    
+    def samples(self) -> List[str]:
+        lines = []
+        with self._lock:
+            for key, (counts, total, count) in sorted(self._values.items()):
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets, counts):
+                    cumulative += bucket_count
+                    lines.append(f"{self.name}_bucket{self._label_string(key, ('le', _format_value(bound)))} "
+                                 f"{cumulative}")
+                lines.append(f"{self.name}_sum{self._label_string(key)} {_format_value(total)}")
+                lines.append(f"{self.name}_count{self._label_string(key)} {count}")
+        return lines
+
+
+class Registry:
+    """Collection of metrics rendered together.
+    
+    Metrics are created through the registry; asking for an existing name
+    returns the registered instance, so modules can declare their
+    instruments at import time.
+    """
+    
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+        self._lock = threading.Lock()
+    
+    def _get_or_create(self, cls, name: str, *args, **kwargs) -> Metric:
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, *args, **kwargs)
+            elif not isinstance(metric, cls):
+                raise ValueError(f"Metric {name} is already registered as {metric.type_name}")
+            return metric
+    
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        """Get or create a counter."""
+        return self._get_or_create(Counter, name, documentation, labelnames)
+    
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        """Get or create a gauge."""
+        return self._get_or_create(Gauge, name, documentation, labelnames)
+    
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        """Get or create a histogram."""
+        return self._get_or_create(Histogram, name, documentation, labelnames, buckets=buckets)
+    
+    def get(self, name: str) -> Optional[Metric]:
+        """Registered metric by name."""
+        with self._lock:
+            return self._metrics.get(name)
+    
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format."""
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda metric: metric.name)
+        return "\n".join(metric.render() for metric in metrics) + "\n"
+
+
+# Process-wide registry used by all instrumented modules
+REGISTRY = Registry()
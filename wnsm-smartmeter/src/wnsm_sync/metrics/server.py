@@ -0,0 +1,66 @@
+"""HTTP listener serving the metrics in the Prometheus text format."""
+
+import logging
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+from .registry import REGISTRY, Registry
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """Answers GET /metrics."""
+    
+    registry: Registry = REGISTRY
+    
+    def do_GET(self):
+        if self.path.split("?", 1)[0] not in ("/metrics", "/"):
+            self.send_error(404)
+            return
+        body = self.registry.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def log_message(self, format, *args):
+        logger.debug(f"Metrics request from {self.address_string()}: {format % args}")
+
+
+class MetricsServer:
+    """Serves a registry on ``http://<host>:<port>/metrics`` from a daemon thread."""
+    
+    def __init__(self, port: int, host: str = "0.0.0.0", registry: Registry = REGISTRY):
+        """Initialize metrics server.
+        
+        Args:
+            port: Port to listen on (0 picks a free port)
+            host: Interface to listen on
+            registry: Metrics to serve
+        """
+        handler = type("MetricsHandler", (_Handler,), {"registry": registry})
+        self._server = ThreadingHTTPServer((host, port), handler)
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+    
+    @property
+    def port(self) -> int:
+        """Port the server listens on."""
+        return self._server.server_address[1]
+    
+    def start(self) -> "MetricsServer":
+        """Start serving in the background."""
+        self._thread = threading.Thread(target=self._server.serve_forever, name="metrics-server", daemon=True)
+        self._thread.start()
+        logger.info(f"Serving Prometheus metrics on port {self.port}")
+        return self
+    
+    def stop(self) -> None:
+        """Stop serving and release the port."""
+        self._server.shutdown()
+        self._server.server_close()
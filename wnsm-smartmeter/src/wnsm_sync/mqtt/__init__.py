@@ -1,6 +1,10 @@
 """MQTT integration for Home Assistant."""
 
 from .client import MQTTClient
-from .discovery import HomeAssistantDiscovery
+from .discovery import HomeAssistantDiscovery, DiscoveryStateStore
+from .rate_limit import Priority, TokenBucket, PublishRateLimiter
 
-__all__ = ["MQTTClient", "HomeAssistantDiscovery"]
\ No newline at end of file
+__all__ = [
+    "MQTTClient", "HomeAssistantDiscovery", "DiscoveryStateStore",
+    "Priority", "TokenBucket", "PublishRateLimiter"
+]
\ No newline at end of file
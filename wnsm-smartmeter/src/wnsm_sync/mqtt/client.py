@@ -2,16 +2,36 @@
 
 import json
 import logging
+import threading
 import time
-from typing import Dict, Any, Optional, Tuple
+from typing import Callable, Dict, Any, Optional, Tuple
 from urllib.parse import urlparse
 
+import paho.mqtt.client as mqtt
 import paho.mqtt.publish as publish
+from paho.mqtt.packettypes import PacketTypes
+from paho.mqtt.properties import Properties
 
 from ..config.loader import WNSMConfig
+from ..metrics import REGISTRY
+from .rate_limit import Priority, PublishRateLimiter
 
 logger = logging.getLogger(__name__)
 
+MQTT_MESSAGES = REGISTRY.counter("wnsm_mqtt_messages_total", "MQTT messages handed to the broker", ["outcome"])
+MQTT_PAYLOAD_BYTES = REGISTRY.counter("wnsm_mqtt_payload_bytes_total", "Payload bytes of published MQTT messages")
+MQTT_PUBLISH_SECONDS = REGISTRY.histogram(
+    "wnsm_mqtt_publish_duration_seconds", "Duration of handing one MQTT message to the client",
+    buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+)
+MQTT_THROTTLED_SECONDS = REGISTRY.counter(
+    "wnsm_mqtt_throttled_seconds_total", "Time bulk publishes waited for the MQTT rate limit"
+)
+RETRIES = REGISTRY.counter("wnsm_retries_total", "Retried attempts of failed operations", ["operation"])
+
+# High-volume topics (relative to mqtt_topic) that get MQTT v5 topic aliases
+HOT_TOPIC_SUFFIXES = ("/15min", "/daily_total", "/status")
+
 
 class MQTTClient:
     """MQTT client for publishing energy data to Home Assistant."""
@@ -25,6 +45,27 @@ class MQTTClient:
         self.config = config
         self._auth = self._prepare_auth()
         self._hostname, self._port = self._parse_mqtt_host()
+        
+        # Persistent connection state (see connect())
+        self._client: Optional[mqtt.Client] = None
+        self._connected = threading.Event()
+        self._subscriptions: Dict[str, Callable[[str, bool], None]] = {}
+        
+        # MQTT v5 topic aliases, valid for the current connection only
+        self._use_v5 = str(config.mqtt_protocol) == "5"
+        self._alias_lock = threading.Lock()
+        self._topic_aliases: Dict[str, int] = {}
+        self._topic_alias_maximum = 0
+        
+        self.rate_limiter = PublishRateLimiter(
+            messages_per_second=config.mqtt_rate_limit_messages,
+            bytes_per_second=config.mqtt_rate_limit_bytes
+        )
+    
+    @property
+    def availability_topic(self) -> str:
+        """Topic carrying the retained online/offline availability state."""
+        return self.config.availability_topic
     
     def _prepare_auth(self) -> Optional[Dict[str, str]]:
         """Prepare MQTT authentication if credentials are provided."""
@@ -65,12 +106,213 @@ class MQTTClient:
         logger.debug(f"MQTT connection: {hostname}:{port}")
         return hostname, port
     
+    def _create_client(self) -> mqtt.Client:
+        """Create a paho client compatible with paho-mqtt 1.x and 2.x."""
+        kwargs = {
+            "client_id": f"wnsm_sync_{self.config.zp[-8:]}",
+            "protocol": mqtt.MQTTv5 if self._use_v5 else mqtt.MQTTv311,
+        }
+        if hasattr(mqtt, "CallbackAPIVersion"):
+            return mqtt.Client(mqtt.CallbackAPIVersion.VERSION2, **kwargs)
+        return mqtt.Client(**kwargs)
+    
+    def connect(self, timeout: float = 10.0) -> bool:
+        """Open the persistent broker connection used for all publishing.
+        
+        The network loop runs in a background thread and reconnects
+        automatically; subscriptions are restored on every reconnect.
+        "offline" is registered as Last Will on the availability topic and
+        "online" is published on every CONNACK.
+        
+        Args:
+            timeout: Seconds to wait for the broker to acknowledge the connection
+            
+        Returns:
+            True if the connection was established within the timeout
+        """
+        if self._client is None:
+            self._client = self._create_client()
+            if self._auth:
+                self._client.username_pw_set(self._auth["username"], self._auth["password"])
+            # The broker publishes "offline" for us if the process dies
+            self._client.will_set(self.availability_topic, "offline", qos=1, retain=True)
+            self._client.on_connect = self._on_connect
+            self._client.on_disconnect = self._on_disconnect
+            self._client.on_message = self._on_message
+            
+            logger.info(f"Connecting to MQTT broker {self._hostname}:{self._port}")
+            try:
+                self._client.connect_async(self._hostname, self._port, keepalive=60)
+                self._client.loop_start()
+            except Exception as e:
+                logger.error(f"Failed to start MQTT connection: {e}")
+                self._client = None
+                return False
+        
+        if not self._connected.wait(timeout):
+            logger.warning(f"MQTT broker did not acknowledge connection within {timeout} seconds")
+            return False
+        return True
+    
+    def disconnect(self) -> None:
+        """Close the persistent broker connection.
+        
+        A clean disconnect discards the Last Will, so "offline" is
+        published explicitly first.
+        """
+        if self._client is None:
+            return
+        
+        try:
+            if self.is_connected():
+                self._client.publish(self.availability_topic, "offline", qos=1, retain=True).wait_for_publish(5)
+            self._client.disconnect()
+            self._client.loop_stop()
+        except Exception as e:
+            logger.warning(f"Error while disconnecting from MQTT broker: {e}")
+        finally:
+            self._client = None
+            self._connected.clear()
+    
+    def is_connected(self) -> bool:
+        """Check whether the persistent connection is up."""
+        return self._client is not None and self._connected.is_set()
+    
+    def outbox_depth(self) -> int:
+        """Number of messages not yet handed to the broker.
+        
+        Counts the packets queued on the persistent connection's socket plus
+        QoS 1/2 messages still awaiting their acknowledgement.
+        
+        Returns:
+            Outbox depth, 0 without a persistent connection
+        """
+        client = self._client
+        if client is None:
+            return 0
+        # paho keeps no public accessor for its queues
+        return len(getattr(client, "_out_packet", ())) + len(getattr(client, "_out_messages", ()))
+    
+    def subscribe(self, topic: str, callback: Callable[[str, bool], None]) -> None:
+        """Subscribe to a topic on the persistent connection.
+        
+        Args:
+            topic: Topic to subscribe to
+            callback: Called with the decoded payload and the retained flag
+                of every message received on the topic
+        """
+        self._subscriptions[topic] = callback
+        if self.is_connected():
+            self._client.subscribe(topic)
+    
+    def _on_connect(self, client, userdata, flags, reason_code, properties=None) -> None:
+        """Handle CONNACK from the broker."""
+        if reason_code != 0:
+            logger.error(f"MQTT broker refused connection: {reason_code}")
+            return
+        
+        logger.info("Connected to MQTT broker")
+        with self._alias_lock:
+            self._topic_aliases.clear()
+            self._topic_alias_maximum = getattr(properties, "TopicAliasMaximum", 0) if self._use_v5 else 0
+        if self._use_v5:
+            logger.debug(f"Broker accepts up to {self._topic_alias_maximum} topic aliases")
+        client.publish(self.availability_topic, "online", qos=1, retain=True)
+        self._connected.set()
+        for topic in self._subscriptions:
+            client.subscribe(topic)
+    
+    def _on_disconnect(self, client, userdata, *args) -> None:
+        """Handle loss of the broker connection."""
+        self._connected.clear()
+        logger.info("Disconnected from MQTT broker")
+    
+    def _on_message(self, client, userdata, message) -> None:
+        """Dispatch incoming messages to subscription callbacks."""
+        callback = self._subscriptions.get(message.topic)
+        if callback is None:
+            return
+        
+        try:
+            callback(message.payload.decode("utf-8", errors="replace"), bool(message.retain))
+        except Exception as e:
+            logger.error(f"Error handling MQTT message on {message.topic}: {e}")
+    
+    def _publish(self, topic: str, payload: str, retain: bool) -> None:
+        """Publish a serialized payload, raising on failure.
+        
+        Uses the persistent connection when it is up, otherwise falls back
+        to a one-shot connection.
+        """
+        if self.is_connected():
+            if self._use_v5:
+                # Held until the alias is committed, so a reconnect cannot clear the table in between
+                with self._alias_lock:
+                    send_topic, properties, new_alias = self._v5_publish_properties(topic, retain)
+                    info = self._client.publish(send_topic, payload, qos=0, retain=retain, properties=properties)
+                    # The broker only knows an alias once the message carrying it went out
+                    if new_alias is not None and info.rc == mqtt.MQTT_ERR_SUCCESS:
+                        self._topic_aliases[topic] = new_alias
+            else:
+                info = self._client.publish(topic, payload, qos=0, retain=retain)
+            if info.rc != mqtt.MQTT_ERR_SUCCESS:
+                raise ConnectionError(f"publish failed with rc={info.rc}")
+            return
+        
+        publish.single(
+            topic=topic,
+            payload=payload,
+            hostname=self._hostname,
+            port=self._port,
+            auth=self._auth,
+            retain=retain
+        )
+    
+    def _v5_publish_properties(self, topic: str, retain: bool) -> Tuple[str, Optional[Properties], Optional[int]]:
+        """Build MQTT v5 PUBLISH properties for a message.
+        
+        Hot topics are assigned a topic alias on first use; later messages
+        send an empty topic name plus the alias. A new alias is only
+        returned, the caller registers it once the message was sent.
+        Non-retained messages get a message expiry so readings queued for
+        an offline subscriber do not pile up on the broker. The caller must
+        hold ``_alias_lock``.
+        
+        Args:
+            topic: Full topic name
+            retain: Whether the message is retained
+            
+        Returns:
+            Tuple of (topic to send, properties or None, new alias to register or None)
+        """
+        properties = Properties(PacketTypes.PUBLISH)
+        has_properties = False
+        send_topic = topic
+        new_alias = None
+        
+        if not retain and self.config.mqtt_message_expiry > 0:
+            properties.MessageExpiryInterval = self.config.mqtt_message_expiry
+            has_properties = True
+        
+        if topic.startswith(self.config.mqtt_topic) and topic.endswith(HOT_TOPIC_SUFFIXES):
+            alias = self._topic_aliases.get(topic)
+            if alias is not None:
+                send_topic = ""
+            elif len(self._topic_aliases) < self._topic_alias_maximum:
+                alias = new_alias = len(self._topic_aliases) + 1
+            if alias is not None:
+                properties.TopicAlias = alias
+                has_properties = True
+        
+        return send_topic, properties if has_properties else None, new_alias
+    
     def publish_message(
         self, 
         topic: str, 
         payload: Dict[str, Any], 
         retry_count: Optional[int] = None,
-        retain: bool = False
+        retain: bool = False,
+        priority: Priority = Priority.BULK
     ) -> bool:
         """Publish a message to MQTT broker.
         
@@ -79,6 +321,7 @@ class MQTTClient:
             payload: Message payload (will be JSON serialized)
             retry_count: Number of retry attempts (uses config default if None)
             retain: Whether to retain the message on the broker
+            priority: Priority class; bulk messages are subject to rate limits
             
         Returns:
             True if message was published successfully, False otherwise
@@ -87,20 +330,19 @@ class MQTTClient:
             retry_count = self.config.retry_count
         
         json_payload = json.dumps(payload)
+        throttle_started = time.perf_counter()
+        self.rate_limiter.acquire(len(json_payload), priority)
+        MQTT_THROTTLED_SECONDS.inc(time.perf_counter() - throttle_started)
         
         for attempt in range(retry_count + 1):
             try:
                 logger.debug(f"Publishing to {topic}: {json_payload}")
                 
-                publish.single(
-                    topic=topic,
-                    payload=json_payload,
-                    hostname=self._hostname,
-                    port=self._port,
-                    auth=self._auth,
-                    retain=retain
-                )
+                with MQTT_PUBLISH_SECONDS.time():
+                    self._publish(topic, json_payload, retain)
                 
+                MQTT_MESSAGES.inc(outcome="success")
+                MQTT_PAYLOAD_BYTES.inc(len(json_payload))
                 logger.debug(f"Successfully published to {topic}")
                 return True
                 
@@ -109,16 +351,41 @@ class MQTTClient:
                     logger.warning(
                         f"Failed to publish to {topic} (attempt {attempt + 1}/{retry_count + 1}): {e}"
                     )
+                    RETRIES.inc(operation="mqtt_publish")
                     time.sleep(self.config.retry_delay)
                 else:
                     logger.error(f"Failed to publish to {topic} after {retry_count + 1} attempts: {e}")
+                    MQTT_MESSAGES.inc(outcome="error")
                     return False
         
         return False
     
+    def publish_availability(self, available: bool = True) -> bool:
+        """Publish the retained availability state as a plain string.
+        
+        While the persistent connection is up this is handled by connect()
+        and the Last Will; this method covers explicit state changes.
+        
+        Args:
+            available: Whether the service is available
+            
+        Returns:
+            True if published successfully, False otherwise
+        """
+        payload = "online" if available else "offline"
+        try:
+            self._publish(self.availability_topic, payload, retain=True)
+            return True
+        except Exception as e:
+            logger.error(f"Failed to publish availability: {e}")
+            return False
+    
     def publish_discovery(self, discovery_config: Dict[str, Any]) -> bool:
         """Publish Home Assistant MQTT discovery configuration.
         
+        Discovery configs are retained so entities survive broker and
+        Home Assistant restarts without being re-sent.
+        
         Args:
             discovery_config: Discovery configuration dictionary
             
@@ -133,7 +400,24 @@ class MQTTClient:
             return False
         
         logger.info(f"Publishing MQTT discovery configuration to {topic}")
-        return self.publish_message(topic, config)
+        return self.publish_message(topic, config, retain=True, priority=Priority.CONTROL)
+    
+    def remove_discovery(self, topic: str) -> bool:
+        """Remove a retained discovery configuration, deleting its entity in Home Assistant.
+        
+        Args:
+            topic: Discovery topic of the configuration
+            
+        Returns:
+            True if the empty retained payload was published, False otherwise
+        """
+        logger.info(f"Removing MQTT discovery configuration {topic}")
+        try:
+            self._publish(topic, "", retain=True)
+            return True
+        except Exception as e:
+            logger.error(f"Failed to remove discovery config {topic}: {e}")
+            return False
     
     def test_connection(self) -> bool:
         """Test MQTT connection by publishing a test message.
@@ -148,7 +432,7 @@ class MQTTClient:
         }
         
         logger.info("Testing MQTT connection...")
-        success = self.publish_message(test_topic, test_payload, retry_count=1)
+        success = self.publish_message(test_topic, test_payload, retry_count=1, priority=Priority.CONTROL)
         
         if success:
             logger.info("MQTT connection test successful")
@@ -1,12 +1,29 @@
 """Home Assistant MQTT Discovery integration."""
 
+import hashlib
+import json
 import logging
+import os
 from typing import Dict, Any
 
 from ..config.loader import WNSMConfig
 
 logger = logging.getLogger(__name__)
 
+# Home Assistant publishes its birth ("online") and will ("offline") messages here
+HA_STATUS_TOPIC = "homeassistant/status"
+
+# Diagnostic entities backed by the diagnostics topic:
+# (payload key, name, unit, device class, icon)
+DIAGNOSTIC_SENSORS = (
+    ("cycle_seconds", "WNSM Last Cycle Duration", "s", "duration", "mdi:timer-outline"),
+    ("fetch_seconds", "WNSM Fetch Latency", "s", "duration", "mdi:cloud-download-outline"),
+    ("readings", "WNSM Readings Per Cycle", "readings", None, "mdi:counter"),
+    ("backfill_rows", "WNSM Backfill Rows Written", "rows", None, "mdi:database-arrow-down"),
+    ("mqtt_readings_per_second", "WNSM MQTT Publish Rate", "readings/s", None, "mdi:speedometer"),
+    ("mqtt_outbox", "WNSM MQTT Outbox Depth", "messages", None, "mdi:tray-full"),
+)
+
 
 class HomeAssistantDiscovery:
     """Manages Home Assistant MQTT Discovery configuration."""
@@ -55,12 +72,21 @@ class HomeAssistantDiscovery:
                 "sw_version": "1.0.0"
             },
             "availability": {
-                "topic": f"{self.config.mqtt_topic}/availability",
+                "topic": self.config.availability_topic,
                 "payload_available": "online",
                 "payload_not_available": "offline"
             }
         }
         
+        if self.config.mqtt_payload_mode != "reading":
+            # Batched documents: latest reading as state, full series for chart cards
+            sensor_config["value_template"] = "{{ value_json.latest }}"
+            sensor_config["json_attributes_template"] = (
+                "{{ {'timestamp': value_json.timestamp, 'start': value_json.start, "
+                "'period': value_json.period, 'offsets': value_json.offsets, "
+                "'deltas': value_json.deltas, 'total': value_json.total} | tojson }}"
+            )
+        
         return {
             "topic": discovery_topic,
             "config": sensor_config
@@ -102,7 +128,7 @@ class HomeAssistantDiscovery:
                 "sw_version": "1.0.0"
             },
             "availability": {
-                "topic": f"{self.config.mqtt_topic}/availability",
+                "topic": self.config.availability_topic,
                 "payload_available": "online",
                 "payload_not_available": "offline"
             }
@@ -136,7 +162,7 @@ class HomeAssistantDiscovery:
             "state_topic": state_topic,
             "value_template": "{{ value_json.status }}",
             "json_attributes_topic": state_topic,
-            "json_attributes_template": "{{ {'last_sync': value_json.last_sync, 'next_sync': value_json.next_sync, 'error': value_json.error} | tojson }}",
+            "json_attributes_template": "{{ {'last_sync': value_json.last_sync, 'next_sync': value_json.next_sync, 'next_sync_reason': value_json.next_sync_reason, 'error': value_json.error} | tojson }}",
             "icon": "mdi:sync",
             "device": {
                 "identifiers": [f"wnsm_{self.config.zp}"],
@@ -152,14 +178,121 @@ class HomeAssistantDiscovery:
             "config": sensor_config
         }
     
+    def create_diagnostic_sensor_configs(self) -> list[Dict[str, Any]]:
+        """Create MQTT discovery configurations for the performance diagnostics.
+        
+        One diagnostic entity per value of the diagnostics topic, which is
+        published once per sync cycle.
+        
+        Returns:
+            List of discovery configuration dictionaries
+        """
+        state_topic = f"{self.config.mqtt_topic}/diagnostics"
+        configs = []
+        
+        for key, name, unit, device_class, icon in DIAGNOSTIC_SENSORS:
+            sensor_name = f"wnsm_{key}_{self.config.zp[-8:]}"
+            sensor_config = {
+                "name": name,
+                "object_id": sensor_name,  # This controls the entity_id
+                "unique_id": sensor_name,
+                "state_topic": state_topic,
+                "unit_of_measurement": unit,
+                "state_class": "measurement",
+                "entity_category": "diagnostic",
+                "value_template": f"{{{{ value_json.{key} }}}}",
+                "icon": icon,
+                "device": {
+                    "identifiers": [f"wnsm_{self.config.zp}"],
+                    "name": f"Wiener Netze Smart Meter {self.config.zp[-8:]}",
+                    "model": "Smart Meter",
+                    "manufacturer": "Wiener Netze",
+                    "sw_version": "1.0.0"
+                },
+                "availability": {
+                    "topic": self.config.availability_topic,
+                    "payload_available": "online",
+                    "payload_not_available": "offline"
+                }
+            }
+            if device_class:
+                sensor_config["device_class"] = device_class
+            
+            configs.append({
+                "topic": f"homeassistant/sensor/{sensor_name}/config",
+                "config": sensor_config
+            })
+        
+        return configs
+    
     def get_all_discovery_configs(self) -> list[Dict[str, Any]]:
         """Get all discovery configurations.
         
         Returns:
             List of discovery configuration dictionaries
         """
-        return [
+        configs = [
             self.create_energy_sensor_config(),
             self.create_total_sensor_config(),
             self.create_status_sensor_config()
-        ]
\ No newline at end of file
+        ]
+        if self.config.diagnostic_sensors:
+            configs.extend(self.create_diagnostic_sensor_configs())
+        return configs
+    
+    @staticmethod
+    def config_hash(discovery_config: Dict[str, Any]) -> str:
+        """Compute a stable content hash for a discovery configuration.
+        
+        Args:
+            discovery_config: Discovery configuration dictionary
+            
+        Returns:
+            Hex digest of the canonical JSON representation
+        """
+        canonical = json.dumps(discovery_config, sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class DiscoveryStateStore:
+    """Persists hashes of the last published discovery configurations."""
+    
+    def __init__(self, config: WNSMConfig):
+        """Initialize discovery state store.
+        
+        Args:
+            config: WNSM configuration object
+        """
+        self.state_file = config.discovery_state_file
+    
+    def load(self) -> Dict[str, str]:
+        """Load published hashes keyed by discovery topic.
+        
+        Returns:
+            Dictionary of topic to hash, empty if no state is stored
+        """
+        try:
+            if os.path.exists(self.state_file):
+                with open(self.state_file, 'r') as f:
+                    return json.load(f)
+        except Exception as e:
+            logger.warning(f"Failed to load discovery state: {e}")
+        return {}
+    
+    def save(self, hashes: Dict[str, str]) -> bool:
+        """Save published hashes keyed by discovery topic.
+        
+        Args:
+            hashes: Dictionary of topic to hash
+            
+        Returns:
+            True if the state was saved successfully, False otherwise
+        """
+        try:
+            os.makedirs(os.path.dirname(self.state_file) or ".", exist_ok=True)
+            with open(self.state_file, 'w') as f:
+                json.dump(hashes, f)
+            return True
+        except Exception as e:
+            logger.warning(f"Failed to save discovery state: {e}")
+            return False
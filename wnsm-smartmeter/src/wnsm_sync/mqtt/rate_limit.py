@@ -0,0 +1,68 @@
+"""Token-bucket rate shaping for MQTT publishing."""
+
+import enum
+import logging
+import threading
+import time
+
+from ..rate_limit import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+
+class Priority(enum.IntEnum):
+    """Priority classes for MQTT messages."""
+    CONTROL = 0  #: Status, availability and discovery - never throttled
+    BULK = 1  #: Energy readings and history replay - subject to rate limits
+
+
+class PublishRateLimiter:
+    """Limits bulk MQTT traffic by messages and bytes per second.
+    
+    Control messages bypass the buckets entirely so status and availability
+    updates never queue behind a history replay.
+    """
+    
+    def __init__(self, messages_per_second: float = 0, bytes_per_second: float = 0):
+        """Initialize publish rate limiter.
+        
+        Args:
+            messages_per_second: Message rate limit, 0 disables it
+            bytes_per_second: Byte rate limit, 0 disables it
+        """
+        self._message_bucket = TokenBucket(messages_per_second) if messages_per_second > 0 else None
+        self._byte_bucket = TokenBucket(bytes_per_second) if bytes_per_second > 0 else None
+        self._stats_lock = threading.Lock()
+        self.throttled_seconds = 0.0
+        self.throttled_messages = 0
+    
+    @property
+    def enabled(self) -> bool:
+        """Whether any limit is configured."""
+        return self._message_bucket is not None or self._byte_bucket is not None
+    
+    def acquire(self, size_bytes: int, priority: Priority = Priority.BULK) -> float:
+        """Wait until a message of the given size may be sent.
+        
+        Args:
+            size_bytes: Payload size of the message
+            priority: Priority class of the message
+            
+        Returns:
+            Seconds spent throttled
+        """
+        if priority == Priority.CONTROL or not self.enabled:
+            return 0.0
+        
+        wait = 0.0
+        if self._message_bucket is not None:
+            wait = max(wait, self._message_bucket.reserve(1))
+        if self._byte_bucket is not None:
+            wait = max(wait, self._byte_bucket.reserve(size_bytes))
+        
+        if wait > 0:
+            time.sleep(wait)
+            with self._stats_lock:
+                self.throttled_seconds += wait
+                self.throttled_messages += 1
+        return wait
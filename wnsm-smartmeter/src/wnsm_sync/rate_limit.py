@@ -0,0 +1,74 @@
+"""Thread-safe token bucket shared by the MQTT and API rate limits."""
+
+import threading
+import time
+from typing import Optional
+
+
+class TokenBucket:
+    """Thread-safe token bucket.
+    
+    Callers reserve tokens up front and sleep off any deficit outside the
+    lock, so concurrent callers are served in arrival order.
+    """
+    
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        """Initialize token bucket.
+        
+        Args:
+            rate: Tokens added per second
+            capacity: Maximum burst size, defaults to one second worth of tokens
+        """
+        if rate <= 0:
+            raise ValueError("Token bucket rate must be positive")
+        self.rate = float(rate)
+        self.capacity = float(capacity) if capacity else max(self.rate, 1.0)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def _refill(self) -> None:
+        """Add tokens for the time elapsed since the last update."""
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+    
+    def reserve(self, tokens: float = 1.0) -> float:
+        """Reserve tokens without blocking.
+        
+        Args:
+            tokens: Number of tokens to take (capped at the bucket capacity)
+            
+        Returns:
+            Seconds the caller has to wait before using the reservation
+        """
+        with self._lock:
+            self._refill()
+            self._tokens -= min(tokens, self.capacity)
+            return -self._tokens / self.rate if self._tokens < 0 else 0.0
+    
+    def set_rate(self, rate: float) -> None:
+        """Change the refill rate, keeping the tokens accrued at the old one.
+        
+        Args:
+            rate: Tokens added per second
+        """
+        if rate <= 0:
+            raise ValueError("Token bucket rate must be positive")
+        with self._lock:
+            self._refill()
+            self.rate = float(rate)
+    
+    def acquire(self, tokens: float = 1.0) -> float:
+        """Take tokens, sleeping until they are available.
+        
+        Args:
+            tokens: Number of tokens to take (capped at the bucket capacity)
+            
+        Returns:
+            Seconds spent waiting
+        """
+        wait = self.reserve(tokens)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
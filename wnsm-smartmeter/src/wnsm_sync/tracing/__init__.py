@@ -0,0 +1,18 @@
+"""Tracing spans of the sync pipeline, exported as newline-delimited JSON."""
+
+from .tracer import (
+    NOOP_SPAN,
+    Span,
+    Trace,
+    TraceExporter,
+    bind_context,
+    current_span,
+    record_span,
+    span,
+    start_trace,
+)
+
+__all__ = [
+    "NOOP_SPAN", "Span", "Trace", "TraceExporter", "bind_context", "current_span",
+    "record_span", "span", "start_trace"
+]
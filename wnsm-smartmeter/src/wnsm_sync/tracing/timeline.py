@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""Render an exported sync cycle trace as a flame-style timeline.
+
+Each span is one line, indented below its parent, with a bar showing when
+it ran relative to the whole cycle.
+
+Usage:
+    python -m wnsm_sync.tracing.timeline /data/traces
+    python -m wnsm_sync.tracing.timeline /data/traces/trace-04392265-20250101-060000-000000.ndjson --width 100
+"""
+
+import argparse
+import json
+import os
+import sys
+from typing import Any, Dict, List, Optional
+
+# Attributes shown next to each span, in this order
+SHOWN_ATTRIBUTES = 6
+
+
+def load_spans(path: str) -> List[Dict[str, Any]]:
+    """Load the spans of a trace file.
+    
+    Args:
+        path: NDJSON trace file, or a directory whose newest trace is used
+    
+    Returns:
+        Spans as dictionaries
+    """
+    if os.path.isdir(path):
+        traces = sorted(entry for entry in os.listdir(path) if entry.endswith(".ndjson"))
+        if not traces:
+            raise FileNotFoundError(f"No trace files in {path}")
+        path = os.path.join(path, traces[-1])
+    
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def _ordered(spans: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Spans depth-first in start order, each annotated with its depth."""
+    by_id = {span["span_id"]: span for span in spans}
+    children: Dict[Optional[str], List[Dict[str, Any]]] = {}
+    for span in spans:
+        parent = span["parent_id"] if span["parent_id"] in by_id else None
+        children.setdefault(parent, []).append(span)
+    
+    ordered = []
+    
+    def visit(parent: Optional[str], depth: int) -> None:
+        for span in sorted(children.get(parent, []), key=lambda span: span["start"]):
+            ordered.append(dict(span, depth=depth))
+            visit(span["span_id"], depth + 1)
+    
+    visit(None, 0)
+    return ordered
+
+
+def render(spans: List[Dict[str, Any]], width: int = 60) -> str:
+    """Render spans as a text timeline.
+    
+    Args:
+        spans: Spans of one trace
+        width: Width of the timeline bars in characters
+    
+    Returns:
+        Timeline text
+    """
+    if not spans:
+        return "(empty trace)\n"
+    
+    begin = min(span["start"] for span in spans)
+    end = max(span["start"] + span["duration"] for span in spans)
+    total = max(end - begin, 1e-9)
+    
+    ordered = _ordered(spans)
+    label_width = max(len("  " * span["depth"] + span["name"]) for span in ordered)
+    lines = [f"{'span':<{label_width}}  {'timeline':<{width}}  {'ms':>9}"]
+    
+    for span in ordered:
+        offset = int((span["start"] - begin) / total * width)
+        length = max(1, round(span["duration"] / total * width))
+        bar = " " * offset + ("!" if span["status"] == "error" else "█") * min(length, width - offset)
+        label = "  " * span["depth"] + span["name"]
+        attributes = " ".join(
+            f"{key}={value}" for key, value in list(span["attributes"].items())[:SHOWN_ATTRIBUTES]
+        )
+        if span["error"]:
+            attributes = f"{attributes} error={span['error']}".strip()
+        lines.append(f"{label:<{label_width}}  {bar:<{width}}  {span['duration'] * 1000:>9.1f}  {attributes}".rstrip())
+    
+    return "\n".join(lines) + "\n"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("path", help="Trace file or directory of trace files (newest is shown)")
+    parser.add_argument("--width", type=int, default=60, help="Width of the timeline in characters")
+    args = parser.parse_args()
+    
+    try:
+        spans = load_spans(args.path)
+    except (OSError, ValueError) as e:
+        print(f"Cannot read trace: {e}", file=sys.stderr)
+        return 1
+    
+    sys.stdout.write(render(spans, args.width))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
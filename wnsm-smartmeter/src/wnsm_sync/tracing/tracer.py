@@ -0,0 +1,245 @@
+"""Minimal span API recording the timeline of a sync cycle."""
+
+import contextvars
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+# Span of the running operation; asyncio.to_thread copies it into stage threads
+_current_span: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar("wnsm_span", default=None)
+
+
+class Trace:
+    """Finished spans of one sync cycle."""
+    
+    def __init__(self):
+        self.trace_id = uuid.uuid4().hex[:16]
+        self.spans: List["Span"] = []
+        self._lock = threading.Lock()
+    
+    def add(self, span: "Span") -> None:
+        """Record a finished span."""
+        with self._lock:
+            self.spans.append(span)
+    
+    def to_ndjson(self) -> str:
+        """Spans as newline-delimited JSON, ordered by start time."""
+        with self._lock:
+            spans = sorted(self.spans, key=lambda span: span.start)
+        return "".join(json.dumps(span.to_dict(), default=str) + "\n" for span in spans)
+
+
+class Span:
+    """Timed operation with attributes, nested below the span that was current when it started."""
+    
+    def __init__(self, name: str, trace: Trace, parent_id: Optional[str] = None,
+                 attributes: Optional[Dict[str, Any]] = None, start: Optional[float] = None):
+        """Initialize span.
+        
+        Args:
+            name: Operation name, e.g. ``login`` or ``sqlite.transaction``
+            trace: Trace receiving the span when it ends
+            parent_id: ID of the enclosing span, None for the root span
+            attributes: Initial attributes
+            start: Start as UNIX timestamp, defaults to now
+        """
+        self.name = name
+        self.trace = trace
+        self.span_id = uuid.uuid4().hex[:8]
+        self.parent_id = parent_id
+        self.attributes: Dict[str, Any] = dict(attributes or {})
+        self.start = start if start is not None else time.time()
+        self.duration: Optional[float] = None
+        self.status = "ok"
+        self.error: Optional[str] = None
+        self.thread = threading.current_thread().name
+        self._started = time.perf_counter()
+    
+    def set_attribute(self, key: str, value: Any) -> None:
+        """Set one attribute."""
+        self.attributes[key] = value
+    
+    def set_attributes(self, **attributes: Any) -> None:
+        """Set several attributes."""
+        self.attributes.update(attributes)
+    
+    def record_error(self, error: BaseException) -> None:
+        """Mark the span as failed."""
+        self.status = "error"
+        self.error = f"{type(error).__name__}: {error}"
+    
+    def end(self, duration: Optional[float] = None) -> None:
+        """Finish the span and add it to its trace.
+        
+        Args:
+            duration: Duration in seconds, measured since the start if not given
+        """
+        if self.duration is not None:
+            return
+        self.duration = duration if duration is not None else time.perf_counter() - self._started
+        self.trace.add(self)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to the exported JSON object."""
+        return {
+            "trace_id": self.trace.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start": round(self.start, 6),
+            "duration": round(self.duration or 0.0, 6),
+            "status": self.status,
+            "error": self.error,
+            "thread": self.thread,
+            "attributes": self.attributes
+        }
+
+
+class _NoopSpan:
+    """Stands in for a span outside of any trace, so instrumentation costs almost nothing."""
+    
+    span_id = None
+    
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+    
+    def set_attributes(self, **attributes: Any) -> None:
+        pass
+    
+    def record_error(self, error: BaseException) -> None:
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+def current_span():
+    """Span of the running operation, a no-op span outside of a trace."""
+    return _current_span.get() or NOOP_SPAN
+
+
+@contextmanager
+def _activate(span: Span) -> Iterator[Span]:
+    token = _current_span.set(span)
+    try:
+        yield span
+    except BaseException as error:
+        span.record_error(error)
+        raise
+    finally:
+        _current_span.reset(token)
+        span.end()
+
+
+@contextmanager
+def start_trace(name: str, **attributes: Any) -> Iterator[Span]:
+    """Start a new trace with a root span.
+    
+    Args:
+        name: Name of the root span
+        **attributes: Attributes of the root span
+    
+    Yields:
+        The root span; its ``trace`` holds all spans once the block ends
+    """
+    with _activate(Span(name, Trace(), attributes=attributes)) as root:
+        yield root
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Any]:
+    """Record the with block as a child of the current span.
+    
+    Outside of a trace nothing is recorded.
+    
+    Args:
+        name: Operation name
+        **attributes: Initial attributes
+    
+    Yields:
+        The span, to add attributes known only at the end
+    """
+    parent = _current_span.get()
+    if parent is None:
+        yield NOOP_SPAN
+        return
+    with _activate(Span(name, parent.trace, parent.span_id, attributes)) as child:
+        yield child
+
+
+def record_span(name: str, duration: float, **attributes: Any) -> None:
+    """Record an operation that just finished as a child of the current span.
+    
+    Used where only the end of an operation can be hooked, e.g. HTTP
+    responses, which report how long they took.
+    
+    Args:
+        name: Operation name
+        duration: Duration of the operation in seconds
+        **attributes: Attributes of the span
+    """
+    parent = _current_span.get()
+    if parent is None:
+        return
+    # Durations measured by other timers may reach back before the parent started
+    start = max(time.time() - duration, parent.start)
+    Span(name, parent.trace, parent.span_id, attributes, start=start).end(duration)
+
+
+def bind_context(func: Callable) -> Callable:
+    """Run ``func`` in a copy of the caller's context, e.g. as a thread target.
+    
+    Plain threads and executors start with an empty context, so spans they
+    open would not be part of the caller's trace. Bind once per thread.
+    """
+    context = contextvars.copy_context()
+    
+    def bound(*args, **kwargs):
+        return context.run(func, *args, **kwargs)
+    return bound
+
+
+class TraceExporter:
+    """Writes each trace as a newline-delimited JSON file and keeps the newest ones."""
+    
+    def __init__(self, directory: str, keep: int = 20, name: str = "trace"):
+        """Initialize trace exporter.
+        
+        Args:
+            directory: Directory receiving the trace files
+            keep: Number of trace files kept
+            name: Prefix of the file names
+        """
+        self.directory = directory
+        self.keep = keep
+        self.name = name
+    
+    def export(self, trace: Trace) -> str:
+        """Write a trace.
+        
+        Args:
+            trace: Finished trace
+        
+        Returns:
+            Path of the written file
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, f"{self.name}-{datetime.now():%Y%m%d-%H%M%S-%f}.ndjson")
+        with open(path, "w") as f:
+            f.write(trace.to_ndjson())
+        
+        files = sorted(
+            entry for entry in os.listdir(self.directory)
+            if entry.startswith(f"{self.name}-") and entry.endswith(".ndjson")
+        )
+        for stale in files[:max(0, len(files) - self.keep)]:
+            try:
+                os.remove(os.path.join(self.directory, stale))
+            except FileNotFoundError:
+                pass
+        return path
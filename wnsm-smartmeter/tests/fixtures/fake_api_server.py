@@ -0,0 +1,599 @@
+#!/usr/bin/env python3
+"""Local fake of the Wiener Netze login and Smart Meter API.
+
+Serves the OpenID Connect login (login form, authorization code redirect,
+token endpoint), ``zaehlpunkte``, ``messwerte``, ``verbrauch`` and ``bewegungsdaten`` over
+HTTP with payloads shaped and sized like the real API. Latency, jitter,
+429/5xx responses and hanging requests are injected at configurable rates,
+so chunked fetching, retries and concurrency can be exercised offline.
+
+Point the add-on at it with ``API_AUTH_URL`` and ``API_BASE_URL``. Data
+endpoints are matched by their last path segments, so clients using the
+B2C gateway paths and the ``m/`` paths of older library versions both work.
+
+Usage:
+    python tests/fixtures/fake_api_server.py --port 8089 --latency 0.3 --jitter 0.2 --error-rate 0.05
+"""
+
+import argparse
+import json
+import random
+import re
+import secrets
+import sys
+import threading
+import time
+import zlib
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional, Tuple
+from urllib import parse
+
+from dateutil import parser as date_parser
+
+AUTH_PATH = "/auth/realms/logwien/protocol/openid-connect/"
+API_PATH = "/sm/api/"
+
+LOGIN_PAGE = """<!DOCTYPE html>
+<html><head><title>Anmeldung | Wien</title></head>
+<body><div id="kc-form"><form id="kc-form-login" action="{action}" method="post">
+{inputs}
+<input type="submit" name="login" value="Anmelden"/>
+</form>{message}</div></body></html>
+"""
+
+
+@dataclass
+class FaultProfile:
+    """Latency and failures injected into API responses."""
+    
+    latency: float = 0.0  # Base delay of every response in seconds
+    jitter: float = 0.0  # Additional random delay of up to this many seconds
+    endpoint_latency: Dict[str, float] = field(default_factory=dict)  # Extra delay per endpoint name in seconds
+    rate_limit_rate: float = 0.0  # Share of API requests answered with 429
+    retry_after: int = 1  # Retry-After header of 429 responses
+    error_rate: float = 0.0  # Share of API requests answered with 500/502/503
+    timeout_rate: float = 0.0  # Share of API requests that hang without a response
+    hang_seconds: float = 30.0  # How long hanging requests stall before the connection is dropped
+    token_lifetime: int = 300  # Access token lifetime in seconds
+    seed: Optional[int] = None  # Seed for reproducible fault sequences
+
+
+def reading_value(zaehlpunkt: str, timestamp: datetime) -> float:
+    """Deterministic quarter-hour consumption between 0.05 and 0.25 kWh."""
+    key = f"{zaehlpunkt}{timestamp.isoformat()}".encode()
+    return round(0.05 + (zlib.crc32(key) % 200) / 1000, 3)
+
+
+def _api_time(timestamp: datetime) -> str:
+    return timestamp.strftime("%Y-%m-%dT%H:%M:%S.000Z")
+
+
+def _parse_time(value: str) -> datetime:
+    parsed = date_parser.isoparse(value)
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+class FakeWienerNetzeServer:
+    """In-process HTTP server imitating the Wiener Netze API.
+    
+    Any username is accepted with the configured password. Each account owns
+    ``meters_per_account`` Zählpunkte derived from its username, but
+    ``bewegungsdaten`` answers for any Zählpunkt so per-account configs do not
+    have to match. Request counts, statuses and injected faults are kept in
+    ``stats`` and served at ``/_fake/stats``.
+    """
+    
+    def __init__(self, host: str = "127.0.0.1", port: int = 0,
+                 faults: Optional[FaultProfile] = None, password: Optional[str] = None,
+                 meters_per_account: int = 1):
+        """Initialize fake server.
+        
+        Args:
+            host: Interface to bind
+            port: Port to bind, 0 picks a free port
+            faults: Latency and failure injection, none by default
+            password: Password required for every account, None accepts any
+            meters_per_account: Number of Zählpunkte returned per account
+        """
+        self.faults = faults or FaultProfile()
+        self.password = password
+        self.meters_per_account = meters_per_account
+        self._random = random.Random(self.faults.seed)
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._login_sessions: Dict[str, Dict[str, str]] = {}
+        self._codes: Dict[str, str] = {}
+        self._tokens: Dict[str, Tuple[str, float]] = {}
+        self._refresh_tokens: Dict[str, str] = {}
+        self.stats: Dict[str, Any] = {
+            "requests": {}, "statuses": {}, "faults": {}, "logins": 0,
+            "in_flight": 0, "max_in_flight": 0
+        }
+        
+        handler = type("FakeWienerNetzeHandler", (_Handler,), {"fake": self})
+        self.httpd = ThreadingHTTPServer((host, port), handler)
+        self.httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+    
+    @property
+    def url(self) -> str:
+        """Root URL of the server."""
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+    
+    @property
+    def auth_url(self) -> str:
+        """Value for API_AUTH_URL."""
+        return self.url + AUTH_PATH
+    
+    @property
+    def api_url(self) -> str:
+        """Value for API_BASE_URL."""
+        return self.url + API_PATH
+    
+    def start(self) -> "FakeWienerNetzeServer":
+        """Serve requests in a background thread."""
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="fake-wiener-netze", daemon=True)
+        self._thread.start()
+        return self
+    
+    def stop(self) -> None:
+        """Stop serving and release hanging requests."""
+        self._stopping.set()
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+    
+    def __enter__(self) -> "FakeWienerNetzeServer":
+        return self.start()
+    
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+    
+    def zaehlpunkte_for(self, username: str) -> list:
+        """Zählpunkte owned by an account."""
+        base = zlib.crc32(username.encode()) % 10_000_000
+        return [f"AT0010000000000000001000{base + i:09d}" for i in range(self.meters_per_account)]
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """Copy of the request statistics."""
+        with self._lock:
+            return json.loads(json.dumps(self.stats))
+    
+    def _count(self, key: str, name: str) -> None:
+        with self._lock:
+            counts = self.stats[key]
+            counts[name] = counts.get(name, 0) + 1
+    
+    def _choose_fault(self) -> Optional[str]:
+        """Pick the fault for an API request, None for a normal response."""
+        faults = self.faults
+        with self._lock:
+            roll = self._random.random()
+        for name, rate in (("timeout", faults.timeout_rate), ("rate_limit", faults.rate_limit_rate),
+                           ("error", faults.error_rate)):
+            if roll < rate:
+                return name
+            roll -= rate
+        return None
+    
+    def _delay(self) -> None:
+        with self._lock:
+            delay = self.faults.latency + self._random.uniform(0, self.faults.jitter)
+        if delay > 0:
+            self._stopping.wait(delay)
+    
+    def _endpoint_delay(self, endpoint: str) -> None:
+        delay = self.faults.endpoint_latency.get(endpoint, 0.0)
+        if delay > 0:
+            self._stopping.wait(delay)
+    
+    def issue_tokens(self, username: str) -> Dict[str, Any]:
+        """Create an access/refresh token pair for an account."""
+        access_token = secrets.token_urlsafe(32)
+        refresh_token = secrets.token_urlsafe(32)
+        with self._lock:
+            self._tokens[access_token] = (username, time.time() + self.faults.token_lifetime)
+            self._refresh_tokens[refresh_token] = username
+            self.stats["logins"] += 1
+        return {
+            "access_token": access_token,
+            "expires_in": self.faults.token_lifetime,
+            "refresh_expires_in": 1800,
+            "refresh_token": refresh_token,
+            "token_type": "Bearer",
+            "id_token": secrets.token_urlsafe(48),
+            "not-before-policy": 0,
+            "session_state": secrets.token_hex(16),
+            "scope": "openid profile email"
+        }
+    
+    def account_for_token(self, authorization: Optional[str]) -> Optional[str]:
+        """Username of a valid bearer token, None if missing or expired."""
+        if not authorization or not authorization.startswith("Bearer "):
+            return None
+        with self._lock:
+            entry = self._tokens.get(authorization[len("Bearer "):])
+        if entry is None or entry[1] < time.time():
+            return None
+        return entry[0]
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """Request handler; ``fake`` is set on the per-server subclass."""
+    
+    fake: FakeWienerNetzeServer
+    protocol_version = "HTTP/1.1"
+    
+    def log_message(self, format: str, *args) -> None:
+        # Keep benchmark and test output clean
+        pass
+    
+    # Response helpers
+    
+    def _send(self, status: int, body: bytes, content_type: str = "application/json",
+              headers: Optional[Dict[str, str]] = None) -> None:
+        self.fake._count("statuses", str(status))
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def _send_json(self, status: int, payload: Any, headers: Optional[Dict[str, str]] = None) -> None:
+        self._send(status, json.dumps(payload).encode("utf-8"), headers=headers)
+    
+    def _send_html(self, status: int, page: str) -> None:
+        self._send(status, page.encode("utf-8"), content_type="text/html;charset=utf-8")
+    
+    def _read_form(self) -> Dict[str, str]:
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length).decode("utf-8") if length else ""
+        return {key: values[0] for key, values in parse.parse_qs(body).items()}
+    
+    # Dispatch
+    
+    def do_GET(self) -> None:
+        self._dispatch("GET")
+    
+    def do_POST(self) -> None:
+        self._dispatch("POST")
+    
+    def _dispatch(self, method: str) -> None:
+        fake = self.fake
+        url = parse.urlparse(self.path)
+        path = url.path.rstrip("/")
+        query = {key: values[0] for key, values in parse.parse_qs(url.query).items()}
+        
+        with fake._lock:
+            fake.stats["in_flight"] += 1
+            fake.stats["max_in_flight"] = max(fake.stats["max_in_flight"], fake.stats["in_flight"])
+        try:
+            if path == "/_fake/stats":
+                self._send_json(200, fake.snapshot())
+                return
+            
+            fake._delay()
+            
+            if path.endswith("/auth") and method == "GET":
+                fake._count("requests", "auth")
+                return self._login_page(query)
+            if path.endswith("/login-actions/authenticate") and method == "POST":
+                fake._count("requests", "authenticate")
+                return self._authenticate(query)
+            if path.endswith("/token") and method == "POST":
+                fake._count("requests", "token")
+                return self._token()
+            
+            endpoint = self._api_endpoint(path)
+            if endpoint is None:
+                fake._count("requests", "unknown")
+                return self._send_json(404, {"error": "not found", "path": url.path})
+            
+            fake._count("requests", endpoint[0])
+            fake._endpoint_delay(endpoint[0])
+            if not self._inject_fault():
+                return
+            getattr(self, f"_{endpoint[0]}")(query, *endpoint[1:])
+        except (BrokenPipeError, ConnectionResetError):
+            # The client gave up, e.g. after its own timeout
+            pass
+        finally:
+            with fake._lock:
+                fake.stats["in_flight"] -= 1
+    
+    @staticmethod
+    def _api_endpoint(path: str) -> Optional[tuple]:
+        if path.endswith("app-config.json"):
+            return ("app_config",)
+        if path.endswith("/bewegungsdaten"):
+            return ("bewegungsdaten",)
+        match = re.search(r"/zaehlpunkte/([^/]+)/([^/]+)/messwerte$", path)
+        if match:
+            return ("messwerte", match.group(1), match.group(2))
+        match = re.search(r"/messdaten/([^/]+)/([^/]+)/verbrauch$", path)
+        if match:
+            return ("verbrauch", match.group(1), match.group(2))
+        if path.endswith("/zaehlpunkte"):
+            return ("zaehlpunkte",)
+        return None
+    
+    def _inject_fault(self) -> bool:
+        """Answer with an injected fault; returns False if one was sent."""
+        fake = self.fake
+        fault = fake._choose_fault()
+        if fault is None:
+            return True
+        
+        fake._count("faults", fault)
+        if fault == "timeout":
+            fake._stopping.wait(fake.faults.hang_seconds)
+            self.close_connection = True
+        elif fault == "rate_limit":
+            self._send_json(429, {"error": "Too Many Requests"},
+                            headers={"Retry-After": str(fake.faults.retry_after)})
+        else:
+            with fake._lock:
+                status = fake._random.choice((500, 502, 503))
+            self._send_json(status, {"error": "Service temporarily unavailable"})
+        return False
+    
+    def _account(self) -> Optional[str]:
+        username = self.fake.account_for_token(self.headers.get("Authorization"))
+        if username is None and self.headers.get("X-Gateway-APIKey"):
+            username = "api-key"
+        if username is None:
+            self._send_json(401, {"error": "invalid_token", "error_description": "Token is not active"})
+        return username
+    
+    # OpenID Connect login
+    
+    def _login_page(self, query: Dict[str, str]) -> None:
+        session_code = secrets.token_urlsafe(16)
+        with self.fake._lock:
+            self.fake._login_sessions[session_code] = {
+                "redirect_uri": query.get("redirect_uri", "https://smartmeter-web.wienernetze.at/"),
+                "state": query.get("state", secrets.token_hex(8))
+            }
+        self._send_html(200, self._form(session_code, '<input id="username" name="username" type="text"/>'))
+    
+    def _form(self, session_code: str, inputs: str, message: str = "") -> str:
+        action = (f"{self.fake.auth_url}login-actions/authenticate?"
+                  + parse.urlencode({"session_code": session_code, "execution": "1", "client_id": "wn-smartmeter"}))
+        return LOGIN_PAGE.format(action=action.replace("&", "&amp;"), inputs=inputs, message=message)
+    
+    def _authenticate(self, query: Dict[str, str]) -> None:
+        fake = self.fake
+        form = self._read_form()
+        session_code = query.get("session_code", "")
+        with fake._lock:
+            session = fake._login_sessions.get(session_code)
+        if session is None:
+            return self._send_html(400, "<html><body>Session expired</body></html>")
+        
+        username = form.get("username", "")
+        if "password" not in form:
+            # First step of the two-step login: ask for the password
+            return self._send_html(200, self._form(
+                session_code,
+                f'<input name="username" type="hidden" value="{username}"/>'
+                '<input id="password" name="password" type="password"/>'
+                '<input name="credentialId" type="hidden" value=""/>'
+            ))
+        
+        if not username or (fake.password is not None and form["password"] != fake.password):
+            return self._send_html(200, self._form(
+                session_code, '<input id="username" name="username" type="text"/>',
+                '<span id="input-error">Ungültiger Benutzername oder Passwort.</span>'
+            ))
+        
+        code = secrets.token_urlsafe(24)
+        with fake._lock:
+            fake._codes[code] = username
+            del fake._login_sessions[session_code]
+        location = (f"{session['redirect_uri']}#state={session['state']}"
+                    f"&session_state={secrets.token_hex(16)}&code={code}")
+        self.fake._count("statuses", "302")
+        self.send_response(302)
+        self.send_header("Location", location)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+    
+    def _token(self) -> None:
+        fake = self.fake
+        form = self._read_form()
+        grant_type = form.get("grant_type")
+        with fake._lock:
+            if grant_type == "authorization_code":
+                username = fake._codes.pop(form.get("code", ""), None)
+            elif grant_type == "refresh_token":
+                username = fake._refresh_tokens.pop(form.get("refresh_token", ""), None)
+            else:
+                username = None
+        if username is None:
+            return self._send_json(400, {"error": "invalid_grant", "error_description": "Code not valid"})
+        self._send_json(200, fake.issue_tokens(username))
+    
+    # Smart Meter API
+    
+    def _app_config(self, query: Dict[str, str]) -> None:
+        self._send_json(200, {
+            "b2cApiKey": "fake-b2c-key",
+            "b2bApiKey": "fake-b2b-key",
+            "b2cApiUrl": self.fake.api_url,
+            "b2bApiUrl": self.fake.api_url
+        })
+    
+    def _zaehlpunkte(self, query: Dict[str, str]) -> None:
+        username = self._account()
+        if username is None:
+            return
+        customer_id = f"12{zlib.crc32(username.encode()) % 100_000_000:08d}"
+        self._send_json(200, [{
+            "bezeichnung": "Strom",
+            "geschaeftspartner": customer_id,
+            "zaehlpunkte": [{
+                "zaehlpunktnummer": zaehlpunkt,
+                "customLabel": f"Zähler {index + 1}",
+                "equipmentNumber": f"1{index:08d}",
+                "geraetNumber": f"1KFM00{index:08d}",
+                "isSmartMeter": True,
+                "isDefault": index == 0,
+                "isActive": True,
+                "isDataDeleted": False,
+                "isSmartMeterMarketReady": True,
+                "dataDeletionTimestampUTC": None,
+                "verbrauchsstelle": {
+                    "strasse": "Thomas-Klestil-Platz", "hausnummer": "14", "anlageHausnummer": "14",
+                    "postleitzahl": "1030", "ort": "Wien", "laengengrad": "16.3944", "breitengrad": "48.1874"
+                },
+                "anlage": {"typ": "TAGSTROM", "sparte": "STROM"},
+                "vertraege": [{"einzugsdatum": "2020-01-01", "auszugsdatum": "9999-12-31"}],
+                "idexStatus": {"granularity": {"status": "QUARTER_HOUR", "canBeChanged": True}},
+                "optOutDetails": {"isOptOut": False},
+                "zpSmartMeterRolle": "V002"
+            } for index, zaehlpunkt in enumerate(self.fake.zaehlpunkte_for(username))]
+        }])
+    
+    def _bewegungsdaten(self, query: Dict[str, str]) -> None:
+        username = self._account()
+        if username is None:
+            return
+        zaehlpunkt = query.get("zaehlpunktnummer") or query.get("zaehlpunkt")
+        try:
+            date_from = _parse_time(query["zeitpunktVon"])
+            date_until = _parse_time(query["zeitpunktBis"])
+        except (KeyError, ValueError):
+            return self._send_json(400, {"error": "zeitpunktVon and zeitpunktBis are required"})
+        if not zaehlpunkt:
+            return self._send_json(400, {"error": "zaehlpunktnummer is required"})
+        
+        rolle = query.get("rolle", "V002")
+        step = timedelta(days=1) if rolle.endswith("001") else timedelta(minutes=15)
+        timestamp = date_from.replace(minute=date_from.minute - date_from.minute % 15, second=0, microsecond=0)
+        values = []
+        while timestamp < date_until:
+            value = reading_value(zaehlpunkt, timestamp)
+            if step > timedelta(minutes=15):
+                value = round(value * 96, 3)
+            values.append({
+                "wert": value,
+                "zeitpunktVon": _api_time(timestamp),
+                "zeitpunktBis": _api_time(timestamp + step),
+                "geschaetzt": False
+            })
+            timestamp += step
+        
+        self._send_json(200, {
+            "descriptor": {
+                "geschaeftspartnernummer": f"12{zlib.crc32(username.encode()) % 100_000_000:08d}",
+                "zaehlpunktnummer": zaehlpunkt,
+                "rolle": rolle,
+                "aggregat": query.get("aggregat", "NONE"),
+                "granularitaet": "D" if step > timedelta(minutes=15) else "QH",
+                "einheit": "KWH"
+            },
+            "values": values
+        })
+    
+    def _messwerte(self, query: Dict[str, str], customer_id: str, zaehlpunkt: str) -> None:
+        if self._account() is None:
+            return
+        try:
+            date_from = datetime.strptime(query["datumVon"], "%Y-%m-%d")
+            date_until = datetime.strptime(query["datumBis"], "%Y-%m-%d") + timedelta(days=1)
+        except (KeyError, ValueError):
+            return self._send_json(400, {"error": "datumVon and datumBis are required"})
+        
+        wertetyp = query.get("wertetyp", "METER_READ")
+        step = timedelta(minutes=15) if wertetyp == "QUARTER_HOUR" else timedelta(days=1)
+        messwerte = []
+        total_wh = 0
+        timestamp = date_from
+        while timestamp < date_until:
+            day_wh = int(reading_value(zaehlpunkt, timestamp) * 1000 * (1 if step < timedelta(days=1) else 96))
+            total_wh += day_wh
+            messwerte.append({
+                "messwert": total_wh if wertetyp == "METER_READ" else day_wh,
+                "zeitVon": _api_time(timestamp),
+                "zeitBis": _api_time(timestamp + step),
+                "qualitaet": "VAL"
+            })
+            timestamp += step
+        
+        obis = "1-1:1.8.0" if wertetyp == "METER_READ" else "1-1:1.9.0"
+        self._send_json(200, {
+            "zaehlpunkt": zaehlpunkt,
+            "zaehlwerke": [{"obisCode": obis, "einheit": "WH", "messwerte": messwerte}]
+        })
+    
+    def _verbrauch(self, query: Dict[str, str], customer_id: str, zaehlpunkt: str) -> None:
+        if self._account() is None:
+            return
+        try:
+            date_from = _parse_time(query["dateFrom"])
+        except (KeyError, ValueError):
+            return self._send_json(400, {"error": "dateFrom is required"})
+        date_until = _parse_time(query["dateTo"]) if query.get("dateTo") else date_from + timedelta(days=1)
+        
+        # Day view in Wh, quarter-hourly only on request
+        step = timedelta(minutes=15) if query.get("dayViewResolution") == "QUARTER-HOUR" else timedelta(hours=1)
+        values = []
+        timestamp = date_from
+        while timestamp < date_until:
+            slots = [timestamp + timedelta(minutes=15 * i) for i in range(step // timedelta(minutes=15))]
+            values.append({
+                "value": round(sum(reading_value(zaehlpunkt, slot) for slot in slots) * 1000, 1),
+                "timestamp": _api_time(timestamp),
+                "isEstimated": False
+            })
+            timestamp += step
+        
+        self._send_json(200, {
+            "quarter-hour-opt-in": True,
+            "values": values,
+            "statistics": {"average": sum(v["value"] for v in values) / max(len(values), 1)}
+        })
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to bind")
+    parser.add_argument("--port", type=int, default=8089, help="Port to bind")
+    parser.add_argument("--password", help="Password required for every account (default: any)")
+    parser.add_argument("--meters-per-account", type=int, default=1, help="Zählpunkte per account")
+    defaults = FaultProfile()
+    for name, value in asdict(defaults).items():
+        if isinstance(value, dict):
+            # e.g. --endpoint-latency bewegungsdaten=2.0,zaehlpunkte=0.5
+            parser.add_argument(f"--{name.replace('_', '-')}", default=value, type=lambda text: {
+                key: float(delay) for key, delay in (item.split("=", 1) for item in text.split(",") if item)
+            })
+            continue
+        parser.add_argument(f"--{name.replace('_', '-')}", type=type(value) if value is not None else int,
+                            default=value)
+    args = parser.parse_args()
+    
+    faults = FaultProfile(**{name: getattr(args, name) for name in asdict(defaults)})
+    server = FakeWienerNetzeServer(args.host, args.port, faults, args.password, args.meters_per_account)
+    print(f"Fake Wiener Netze API listening on {server.url}")
+    print(f"  API_AUTH_URL={server.auth_url}")
+    print(f"  API_BASE_URL={server.api_url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
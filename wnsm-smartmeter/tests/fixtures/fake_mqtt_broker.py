@@ -0,0 +1,266 @@
+"""Minimal local MQTT broker for tests and benchmarks.
+
+Speaks enough MQTT 3.1.1 and 5 for MQTTClient: CONNECT (with Topic Alias
+Maximum for v5), PUBLISH with QoS 0/1/2 and topic aliases, SUBSCRIBE,
+PINGREQ and DISCONNECT. Messages are counted per topic, not routed to
+subscribers.
+"""
+
+import socket
+import socketserver
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+CONNECT, CONNACK, PUBLISH, PUBACK, PUBREC, PUBREL, PUBCOMP = 1, 2, 3, 4, 5, 6, 7
+SUBSCRIBE, SUBACK, PINGREQ, PINGRESP, DISCONNECT = 8, 9, 12, 13, 14
+
+# Property identifier of the v5 Topic Alias
+TOPIC_ALIAS = 0x23
+
+
+def _encode_length(length: int) -> bytes:
+    encoded = bytearray()
+    while True:
+        byte, length = length % 128, length // 128
+        encoded.append(byte | 0x80 if length else byte)
+        if not length:
+            return bytes(encoded)
+
+
+def _decode_varint(data: bytes, offset: int) -> Tuple[int, int]:
+    value, shift = 0, 0
+    while True:
+        byte = data[offset]
+        offset += 1
+        value += (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return value, offset
+        shift += 7
+
+
+def _properties(data: bytes, offset: int) -> Tuple[Dict[int, Any], int]:
+    """Parse the v5 properties starting at offset.
+    
+    Only the topic alias is interpreted; other properties are skipped by
+    their encoded size.
+    """
+    length, offset = _decode_varint(data, offset)
+    end = offset + length
+    properties: Dict[int, Any] = {}
+    while offset < end:
+        identifier = data[offset]
+        offset += 1
+        if identifier in (0x01, 0x17, 0x19, 0x24, 0x25, 0x28, 0x29, 0x2A):
+            offset += 1
+        elif identifier in (0x13, 0x21, 0x22, 0x23):
+            properties[identifier] = int.from_bytes(data[offset:offset + 2], "big")
+            offset += 2
+        elif identifier in (0x02, 0x11, 0x18, 0x27):
+            offset += 4
+        elif identifier == 0x0B:
+            _, offset = _decode_varint(data, offset)
+        elif identifier == 0x26:
+            for _ in range(2):
+                offset += 2 + int.from_bytes(data[offset:offset + 2], "big")
+        else:
+            offset += 2 + int.from_bytes(data[offset:offset + 2], "big")
+    return properties, end
+
+
+class _Handler(socketserver.BaseRequestHandler):
+    """One client connection."""
+    
+    def setup(self):
+        self.broker: "FakeMQTTBroker" = self.server.broker
+        self.request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.version = 4
+        self.aliases: Dict[int, str] = {}
+        self.buffer = b""
+    
+    def _read(self, size: int) -> Optional[bytes]:
+        while len(self.buffer) < size:
+            chunk = self.request.recv(65536)
+            if not chunk:
+                return None
+            self.buffer += chunk
+        data, self.buffer = self.buffer[:size], self.buffer[size:]
+        return data
+    
+    def _read_packet(self) -> Optional[Tuple[int, int, bytes]]:
+        header = self._read(1)
+        if header is None:
+            return None
+        length, shift = 0, 0
+        while True:
+            byte = self._read(1)
+            if byte is None:
+                return None
+            length += (byte[0] & 0x7F) << shift
+            if not byte[0] & 0x80:
+                break
+            shift += 7
+        body = self._read(length) if length else b""
+        if body is None:
+            return None
+        return header[0], length, body
+    
+    def _send(self, packet_type: int, body: bytes, flags: int = 0) -> None:
+        self.request.sendall(bytes([packet_type << 4 | flags]) + _encode_length(len(body)) + body)
+    
+    def handle(self):
+        self.broker._count("connections")
+        while True:
+            packet = self._read_packet()
+            if packet is None:
+                return
+            header, length, body = packet
+            packet_type = header >> 4
+            
+            if packet_type == CONNECT:
+                self.version = body[6]
+                if self.version == 5:
+                    # Session present 0, success, Topic Alias Maximum
+                    properties = bytes([0x22]) + self.broker.topic_alias_maximum.to_bytes(2, "big")
+                    self._send(CONNACK, b"\x00\x00" + _encode_length(len(properties)) + properties)
+                else:
+                    self._send(CONNACK, b"\x00\x00")
+            elif packet_type == PUBLISH:
+                self._handle_publish(header, length, body)
+            elif packet_type == PUBREL:
+                self._send(PUBCOMP, body[:2])
+            elif packet_type == SUBSCRIBE:
+                packet_id = body[:2]
+                offset = 2
+                if self.version == 5:
+                    _, offset = _properties(body, offset)
+                granted = bytearray()
+                while offset < len(body):
+                    offset += 2 + int.from_bytes(body[offset:offset + 2], "big")
+                    granted.append(body[offset] & 0x03)
+                    offset += 1
+                self._send(SUBACK, packet_id + (b"\x00" if self.version == 5 else b"") + bytes(granted))
+            elif packet_type == PINGREQ:
+                self._send(PINGRESP, b"")
+            elif packet_type == DISCONNECT:
+                return
+    
+    def _handle_publish(self, header: int, length: int, body: bytes) -> None:
+        qos = (header >> 1) & 0x03
+        topic_length = int.from_bytes(body[:2], "big")
+        topic = body[2:2 + topic_length].decode("utf-8")
+        offset = 2 + topic_length
+        packet_id = b""
+        if qos:
+            packet_id = body[offset:offset + 2]
+            offset += 2
+        if self.version == 5:
+            properties, offset = _properties(body, offset)
+            alias = properties.get(TOPIC_ALIAS)
+            if alias is not None:
+                if topic:
+                    self.aliases[alias] = topic
+                else:
+                    topic = self.aliases.get(alias, "")
+        
+        self.broker._record(topic, body[offset:], 1 + len(_encode_length(length)) + length, bool(header & 0x01))
+        if qos == 1:
+            self._send(PUBACK, packet_id)
+        elif qos == 2:
+            self._send(PUBREC, packet_id)
+
+
+class _Server(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class FakeMQTTBroker:
+    """In-process MQTT broker counting the messages it receives.
+    
+    Usage:
+        with FakeMQTTBroker() as broker:
+            config.mqtt_host, config.mqtt_port = "127.0.0.1", broker.port
+            ...
+            broker.wait_for_messages(100)
+    """
+    
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, topic_alias_maximum: int = 10):
+        """Initialize broker.
+        
+        Args:
+            host: Interface to listen on
+            port: Port to listen on (0 picks a free port)
+            topic_alias_maximum: Topic Alias Maximum announced to v5 clients
+        """
+        self.host = host
+        self.topic_alias_maximum = topic_alias_maximum
+        self._server = _Server((host, port), _Handler)
+        self._server.broker = self
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Condition()
+        self.messages = 0
+        self.bytes = 0
+        self.connections = 0
+        self.topics: Dict[str, int] = {}
+        self.retained: Dict[str, bytes] = {}
+    
+    @property
+    def port(self) -> int:
+        """Port the broker listens on."""
+        return self._server.server_address[1]
+    
+    def start(self) -> "FakeMQTTBroker":
+        """Serve connections in a background thread."""
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+    
+    def stop(self) -> None:
+        """Stop serving and close the listening socket."""
+        self._server.shutdown()
+        self._server.server_close()
+    
+    def __enter__(self) -> "FakeMQTTBroker":
+        return self.start()
+    
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+    
+    def _count(self, name: str) -> None:
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+    
+    def _record(self, topic: str, payload: bytes, size: int, retain: bool) -> None:
+        with self._lock:
+            self.messages += 1
+            self.bytes += size
+            self.topics[topic] = self.topics.get(topic, 0) + 1
+            if retain:
+                self.retained[topic] = payload
+            self._lock.notify_all()
+    
+    def wait_for_messages(self, count: int, timeout: float = 10.0) -> bool:
+        """Wait until at least count messages were received in total.
+        
+        Returns:
+            True if the count was reached within the timeout
+        """
+        deadline = time.monotonic() + timeout
+        with self._lock:
+            while self.messages < count:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._lock.wait(remaining)
+            return True
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """Counters as a JSON-serializable dict."""
+        with self._lock:
+            return {
+                "messages": self.messages,
+                "bytes": self.bytes,
+                "connections": self.connections,
+                "topics": dict(self.topics)
+            }
@@ -0,0 +1,103 @@
+"""In-process stand-in for the Wiener Netze Smartmeter client."""
+
+import random
+import threading
+import time
+import zlib
+from contextlib import nullcontext
+from datetime import datetime, timedelta
+from typing import Any, Callable, ContextManager, Dict, Optional
+
+
+class FakeSmartmeter:
+    """Smartmeter client answering from memory after a simulated latency.
+    
+    Implements the subset of the client used by WNSMSync. Readings are
+    derived from the Zählpunkt and timestamp, so repeated requests return
+    the same values. Concurrent calls across all instances are counted in
+    ``in_flight`` / ``max_in_flight`` to verify worker-pool bounds.
+    """
+    
+    in_flight = 0
+    max_in_flight = 0
+    _lock = threading.Lock()
+    
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0, seed: Optional[int] = None,
+                 api_slot: Optional[Callable[[], ContextManager[None]]] = None):
+        """Initialize fake client.
+        
+        Args:
+            latency: Seconds every API call takes
+            jitter: Additional random delay of up to this many seconds
+            seed: Seed of the jitter, for reproducible runs
+            api_slot: Context manager held by bewegungsdaten requests, like the real client's
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self._random = random.Random(seed)
+        self._logged_in = False
+        self.calls: Dict[str, int] = {}
+        self.api_slot = api_slot or nullcontext
+    
+    @classmethod
+    def reset_counters(cls) -> None:
+        """Reset the process-wide concurrency counters."""
+        with cls._lock:
+            cls.in_flight = 0
+            cls.max_in_flight = 0
+    
+    def _call(self, name: str) -> None:
+        cls = type(self)
+        with cls._lock:
+            cls.in_flight += 1
+            cls.max_in_flight = max(cls.max_in_flight, cls.in_flight)
+            self.calls[name] = self.calls.get(name, 0) + 1
+        try:
+            delay = self.latency + self._random.uniform(0, self.jitter)
+            if delay > 0:
+                time.sleep(delay)
+        finally:
+            with cls._lock:
+                cls.in_flight -= 1
+    
+    def login(self) -> "FakeSmartmeter":
+        """Simulate an OAuth login."""
+        self._call("login")
+        self._logged_in = True
+        return self
+    
+    def is_logged_in(self) -> bool:
+        """Whether login() succeeded since the last reset."""
+        return self._logged_in
+    
+    def reset(self) -> None:
+        """Forget the login."""
+        self._logged_in = False
+    
+    def export_session(self) -> Dict[str, Any]:
+        """Session data as stored by SessionManager."""
+        return {"access_token": "fake", "logged_in": self._logged_in}
+    
+    def restore_session(self, session_data: Dict[str, Any]) -> None:
+        """Restore a session saved by export_session()."""
+        self._logged_in = bool(session_data.get("logged_in"))
+    
+    def bewegungsdaten(self, zaehlpunktnummer: str, date_from: datetime,
+                       date_until: datetime, **kwargs) -> Dict[str, Any]:
+        """Return quarter-hour readings for the range in the API's format."""
+        with self.api_slot():
+            self._call("bewegungsdaten")
+        
+        values = []
+        timestamp = date_from.replace(minute=date_from.minute - date_from.minute % 15, second=0, microsecond=0)
+        while timestamp < date_until:
+            # Deterministic pseudo-consumption between 0.05 and 0.25 kWh
+            key = f"{zaehlpunktnummer}{timestamp.isoformat()}".encode()
+            value = 0.05 + (zlib.crc32(key) % 200) / 1000
+            values.append({
+                "zeitpunktVon": timestamp.strftime("%Y-%m-%dT%H:%M:%S.000Z"),
+                "wert": round(value, 3),
+                "geschaetzt": False
+            })
+            timestamp += timedelta(minutes=15)
+        return {"zaehlpunkt": zaehlpunktnummer, "values": values}
@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""Home Assistant recorder database with the statistics schema.
+
+``create_database`` creates an empty recorder database. ``generate_database``
+also fills it like a busy installation that has been running for a few
+years: hourly long-term statistics for many sensors, 5-minute short-term
+statistics for the recorder's retention window, rows interleaved in time
+order as the recorder writes them, and the indexes plus WAL journal of a
+real ``home-assistant_v2.db``.
+
+Rows are written the way current recorder versions do, with ``start_ts`` /
+``created_ts`` set and the legacy ``start`` / ``created`` columns empty.
+
+Usage:
+    python tests/fixtures/ha_recorder_db.py home-assistant_v2.db --sensors 200 --days 1095
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+# Recorder schema version the tables below correspond to
+SCHEMA_VERSION = 48
+
+TABLES = """
+CREATE TABLE statistics_meta (
+    id INTEGER NOT NULL,
+    statistic_id VARCHAR(255),
+    source VARCHAR(32),
+    unit_of_measurement VARCHAR(255),
+    has_mean BOOLEAN,
+    has_sum BOOLEAN,
+    name VARCHAR(255),
+    PRIMARY KEY (id)
+);
+
+CREATE TABLE statistics (
+    id INTEGER NOT NULL,
+    created DATETIME,
+    created_ts FLOAT,
+    metadata_id INTEGER,
+    start DATETIME,
+    start_ts FLOAT,
+    mean FLOAT,
+    min FLOAT,
+    max FLOAT,
+    last_reset DATETIME,
+    last_reset_ts FLOAT,
+    state FLOAT,
+    sum FLOAT,
+    PRIMARY KEY (id),
+    FOREIGN KEY(metadata_id) REFERENCES statistics_meta (id) ON DELETE CASCADE
+);
+
+CREATE TABLE statistics_short_term (
+    id INTEGER NOT NULL,
+    created DATETIME,
+    created_ts FLOAT,
+    metadata_id INTEGER,
+    start DATETIME,
+    start_ts FLOAT,
+    mean FLOAT,
+    min FLOAT,
+    max FLOAT,
+    last_reset DATETIME,
+    last_reset_ts FLOAT,
+    state FLOAT,
+    sum FLOAT,
+    PRIMARY KEY (id),
+    FOREIGN KEY(metadata_id) REFERENCES statistics_meta (id) ON DELETE CASCADE
+);
+
+CREATE TABLE schema_changes (
+    change_id INTEGER NOT NULL,
+    schema_version INTEGER,
+    changed DATETIME NOT NULL,
+    PRIMARY KEY (change_id)
+);
+"""
+
+INDEXES = """
+CREATE UNIQUE INDEX ix_statistics_meta_statistic_id ON statistics_meta (statistic_id);
+CREATE INDEX ix_statistics_start_ts ON statistics (start_ts);
+CREATE UNIQUE INDEX ix_statistics_statistic_id_start_ts ON statistics (metadata_id, start_ts);
+CREATE INDEX ix_statistics_short_term_start_ts ON statistics_short_term (start_ts);
+CREATE UNIQUE INDEX ix_statistics_short_term_statistic_id_start_ts ON statistics_short_term (metadata_id, start_ts);
+"""
+
+# Rows per executemany() call while filling
+_BATCH_SIZE = 50000
+
+# (statistic_id prefix, unit, has_sum) of the generated sensors, in rotation
+_SENSOR_KINDS = (
+    ("sensor.power", "W", False),
+    ("sensor.temperature", "°C", False),
+    ("sensor.energy", "kWh", True),
+    ("sensor.humidity", "%", False),
+    ("sensor.gas", "m³", True),
+)
+
+
+def _create(conn: sqlite3.Connection, wal: bool) -> None:
+    if wal:
+        conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(TABLES)
+    conn.execute(
+        "INSERT INTO schema_changes (schema_version, changed) VALUES (?, ?)",
+        (SCHEMA_VERSION, datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S"))
+    )
+
+
+def _register(conn: sqlite3.Connection, sensors: Iterable[Tuple[str, str, bool]]) -> Dict[str, int]:
+    metadata_ids = {}
+    for statistic_id, unit, has_sum in sensors:
+        cursor = conn.execute(
+            "INSERT INTO statistics_meta (statistic_id, source, unit_of_measurement, has_mean, has_sum, name) "
+            "VALUES (?, 'recorder', ?, ?, ?, ?)",
+            (statistic_id, unit, not has_sum, has_sum, statistic_id)
+        )
+        metadata_ids[statistic_id] = cursor.lastrowid
+    return metadata_ids
+
+
+def create_database(path: str, statistic_ids: Iterable[str], wal: bool = True) -> Dict[str, int]:
+    """Create a recorder database with one kWh sum statistic per ID.
+    
+    Args:
+        path: Path of the SQLite file to create
+        statistic_ids: Entity IDs to register in statistics_meta
+        wal: Whether to switch the database to WAL journaling like the recorder
+    
+    Returns:
+        Metadata ID of each statistic ID
+    """
+    conn = sqlite3.connect(path)
+    try:
+        _create(conn, wal)
+        conn.executescript(INDEXES)
+        metadata_ids = _register(conn, ((statistic_id, "kWh", True) for statistic_id in statistic_ids))
+        conn.commit()
+        return metadata_ids
+    finally:
+        conn.close()
+
+
+def _statistic_rows(sensors: Sequence[Tuple[int, bool]], start: float, end: float, period: int,
+                    rng: random.Random) -> Iterator[Tuple]:
+    """Rows of all sensors, period by period as the recorder writes them."""
+    totals = {metadata_id: rng.uniform(0, 5000) for metadata_id, has_sum in sensors if has_sum}
+    start_ts = start
+    while start_ts < end:
+        created_ts = start_ts + period + rng.uniform(0.5, 10)
+        for metadata_id, has_sum in sensors:
+            if has_sum:
+                totals[metadata_id] += rng.uniform(0, 0.5) * period / 3600
+                total = totals[metadata_id]
+                yield created_ts, metadata_id, start_ts, None, None, None, total, total
+            else:
+                mean = rng.uniform(10, 500)
+                yield created_ts, metadata_id, start_ts, mean, mean * 0.8, mean * 1.2, None, None
+        start_ts += period
+
+
+def _insert_rows(conn: sqlite3.Connection, table: str, rows: Iterator[Tuple]) -> int:
+    statement = (f"INSERT INTO {table} (created_ts, metadata_id, start_ts, mean, min, max, state, sum) "
+                 f"VALUES (?, ?, ?, ?, ?, ?, ?, ?)")
+    count = 0
+    batch: List[Tuple] = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= _BATCH_SIZE:
+            conn.executemany(statement, batch)
+            count += len(batch)
+            batch = []
+    conn.executemany(statement, batch)
+    return count + len(batch)
+
+
+def generate_database(
+    path: str,
+    sensors: int = 200,
+    days: int = 3 * 365,
+    short_term_days: int = 10,
+    zaehlpunkte: Sequence[str] = (),
+    end: Optional[datetime] = None,
+    seed: int = 0,
+    wal: bool = True
+) -> Dict[str, int]:
+    """Create a recorder database filled with years of statistics.
+    
+    Args:
+        path: Path of the SQLite file to create
+        sensors: Number of unrelated sensors (power, temperature, energy, ...)
+        days: Days of hourly long-term statistics
+        short_term_days: Days of 5-minute short-term statistics (the
+            recorder keeps 10 by default)
+        zaehlpunkte: Meters whose ``sensor.wnsm_daily_total_*`` statistic is
+            registered and filled along with the other sensors
+        end: End of the generated history (UTC), defaults to the last full hour
+        seed: Seed of the generated values
+        wal: Whether to switch the database to WAL journaling like the recorder
+    
+    Returns:
+        Metadata ID of each statistic ID
+    """
+    rng = random.Random(seed)
+    end = end or datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)
+    end_ts = end.replace(tzinfo=end.tzinfo or timezone.utc).timestamp()
+    
+    definitions = []
+    for index in range(sensors):
+        prefix, unit, has_sum = _SENSOR_KINDS[index % len(_SENSOR_KINDS)]
+        definitions.append((f"{prefix}_{index:04d}", unit, has_sum))
+    # Registered in the middle, like a sensor added to a running installation
+    middle = len(definitions) // 2
+    definitions[middle:middle] = [(f"sensor.wnsm_daily_total_{zp[-8:]}", "kWh", True) for zp in zaehlpunkte]
+    
+    conn = sqlite3.connect(path)
+    try:
+        conn.execute("PRAGMA synchronous=OFF")
+        _create(conn, wal)
+        metadata_ids = _register(conn, definitions)
+        rows = [(metadata_ids[statistic_id], has_sum) for statistic_id, _, has_sum in definitions]
+        
+        # Indexes are built once after filling, which is much faster than
+        # maintaining them row by row
+        _insert_rows(conn, "statistics", _statistic_rows(rows, end_ts - days * 86400, end_ts, 3600, rng))
+        _insert_rows(conn, "statistics_short_term",
+                     _statistic_rows(rows, end_ts - short_term_days * 86400, end_ts, 300, rng))
+        conn.commit()
+        conn.executescript(INDEXES)
+        conn.execute("ANALYZE")
+        conn.commit()
+        return metadata_ids
+    finally:
+        conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("path", help="Database file to create")
+    parser.add_argument("--sensors", type=int, default=200, help="Number of sensors with statistics")
+    parser.add_argument("--days", type=int, default=3 * 365, help="Days of hourly statistics")
+    parser.add_argument("--short-term-days", type=int, default=10, help="Days of 5-minute statistics")
+    parser.add_argument("--zp", action="append", default=[], help="Zählpunkt whose WNSM sensor is included")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the generated values")
+    parser.add_argument("--no-wal", action="store_true", help="Keep the rollback journal")
+    args = parser.parse_args()
+    
+    if os.path.exists(args.path):
+        parser.error(f"{args.path} already exists")
+    
+    started = time.monotonic()
+    metadata_ids = generate_database(args.path, args.sensors, args.days, args.short_term_days,
+                                     args.zp, seed=args.seed, wal=not args.no_wal)
+    conn = sqlite3.connect(args.path)
+    long_term, = conn.execute("SELECT COUNT(*) FROM statistics").fetchone()
+    short_term, = conn.execute("SELECT COUNT(*) FROM statistics_short_term").fetchone()
+    conn.close()
+    
+    print(f"Created {args.path} in {time.monotonic() - started:.1f} s: "
+          f"{len(metadata_ids)} statistics, {long_term} long-term and {short_term} short-term rows, "
+          f"{os.path.getsize(args.path) / 1024 / 1024:.0f} MiB")
+    for zp in args.zp:
+        statistic_id = f"sensor.wnsm_daily_total_{zp[-8:]}"
+        print(f"  {statistic_id}: metadata_id {metadata_ids[statistic_id]}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,37 @@
+"""Stand-in for the bewegungsdaten query of the pinned vienna-smartmeter fork.
+
+requirements.txt pins a fork of vienna-smartmeter that provides
+``Smartmeter.bewegungsdaten``; the releases on PyPI do not. Tests against
+the fake API server run with whichever release is installed, so they
+patch in this subclass when the method is missing.
+"""
+
+from contextlib import contextmanager
+from typing import Iterator
+from unittest import mock
+
+from vienna_smartmeter import Smartmeter as ViennaSmartmeter
+
+
+class PinnedSmartmeter(ViennaSmartmeter):
+    """vienna-smartmeter client with the bewegungsdaten query of the pinned fork."""
+    
+    def bewegungsdaten(self, zaehlpunkt, date_from, date_to, rolle="V002"):
+        """Query readings of a meter in the format of the pinned fork."""
+        return self._call_api("user/messwerte/bewegungsdaten", query={
+            "zaehlpunktnummer": zaehlpunkt,
+            "rolle": rolle,
+            "zeitpunktVon": date_from.strftime("%Y-%m-%dT%H:%M:00.000Z"),
+            "zeitpunktBis": date_to.strftime("%Y-%m-%dT%H:%M:00.000Z"),
+            "aggregat": "NONE"
+        })
+
+
+@contextmanager
+def pinned_library() -> Iterator[None]:
+    """Use PinnedSmartmeter in the client while the installed release lacks bewegungsdaten."""
+    if hasattr(ViennaSmartmeter, "bewegungsdaten"):
+        yield
+        return
+    with mock.patch("wnsm_sync.api.client.ViennaSmartmeter", PinnedSmartmeter):
+        yield
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""Tests for the Python backfill against a generated recorder database."""
+
+import sqlite3
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add src directory to Python path
+src_path = Path(__file__).parent.parent.parent / "src"
+sys.path.insert(0, str(src_path))
+
+from wnsm_sync.backfill.csv_exporter import CumulativeReading
+from wnsm_sync.backfill.python_backfill import PythonBackfill
+from wnsm_sync.config.loader import WNSMConfig
+from tests.fixtures.ha_recorder_db import generate_database
+
+ZP = "AT0010000000000000001000004392265"
+
+
+def test_backfill_into_generated_recorder_database(tmp_path):
+    """Test detection and insert against a filled recorder database."""
+    db_path = tmp_path / "home-assistant_v2.db"
+    end = datetime(2024, 3, 1)
+    metadata_ids = generate_database(str(db_path), sensors=10, days=3, short_term_days=1,
+                                     zaehlpunkte=[ZP], end=end)
+    
+    conn = sqlite3.connect(db_path)
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    indexes = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    assert "ix_statistics_statistic_id_start_ts" in indexes
+    assert "ix_statistics_short_term_statistic_id_start_ts" in indexes
+    assert conn.execute("SELECT COUNT(*) FROM statistics").fetchone()[0] == 11 * 3 * 24
+    assert conn.execute("SELECT COUNT(*) FROM statistics_short_term").fetchone()[0] == 11 * 288
+    # Sum statistics only ever grow
+    sums = [row[0] for row in conn.execute(
+        "SELECT sum FROM statistics WHERE metadata_id = ? ORDER BY start_ts",
+        (metadata_ids[f"sensor.wnsm_daily_total_{ZP[-8:]}"],))]
+    assert sums == sorted(sums)
+    conn.close()
+    
+    config = WNSMConfig(
+        wnsm_username="test", wnsm_password="test", zp=ZP, mqtt_host="localhost",
+        ha_database_path=str(db_path)
+    )
+    backfill = PythonBackfill(config)
+    metadata_id = backfill.auto_detect_sensor_metadata_id()
+    assert metadata_id == str(metadata_ids[f"sensor.wnsm_daily_total_{ZP[-8:]}"])
+    
+    backfill.import_metadata_id = metadata_id
+    readings = [
+        CumulativeReading(timestamp=end - timedelta(days=1) + timedelta(minutes=15 * i), cumulative_kwh=i * 0.1)
+        for i in range(96)
+    ]
+    assert backfill._insert_statistics(readings)
+    
+    conn = sqlite3.connect(db_path)
+    written = conn.execute(
+        "SELECT COUNT(*) FROM statistics WHERE metadata_id = ? AND start IS NOT NULL", (metadata_id,)
+    ).fetchone()[0]
+    conn.close()
+    assert written == 24
+    
+    print("✅ Backfill works against a generated recorder database")
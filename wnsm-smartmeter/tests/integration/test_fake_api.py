@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+"""Tests of the API client against the local fake Wiener Netze API."""
+
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+import requests
+
+# Add src directory to Python path
+src_path = Path(__file__).parent.parent.parent / "src"
+sys.path.insert(0, str(src_path))
+
+from wnsm_sync.api.client import Smartmeter
+from tests.fixtures.fake_api_server import FakeWienerNetzeServer, FaultProfile
+from tests.fixtures.vienna_library import pinned_library
+
+
+@pytest.fixture(autouse=True)
+def _pinned_library():
+    with pinned_library():
+        yield
+
+
+def test_client_against_fake_api():
+    """Test login, zaehlpunkte and bewegungsdaten over HTTP."""
+    with FakeWienerNetzeServer(password="secret") as server:
+        client = Smartmeter("user@example.com", "secret", auth_url=server.auth_url, api_url=server.api_url)
+        client.login()
+        assert client.is_logged_in()
+        
+        contracts = client.zaehlpunkte()
+        zaehlpunkt = contracts[0]["zaehlpunkte"][0]["zaehlpunktnummer"]
+        assert zaehlpunkt == server.zaehlpunkte_for("user@example.com")[0]
+        
+        data = client.bewegungsdaten(zaehlpunkt, datetime(2025, 3, 1), datetime(2025, 3, 2))
+        assert len(data["data"]) == 96
+        assert data["data"][0]["timestamp"] == "2025-03-01T00:00:00.000Z"
+        
+        stats = server.snapshot()
+        assert stats["logins"] == 1
+        assert stats["requests"]["bewegungsdaten"] == 1
+        
+        # The library's login fails on a wrong password
+        with pytest.raises(Exception):
+            Smartmeter("user@example.com", "wrong", auth_url=server.auth_url,
+                       api_url=server.api_url).login()
+    
+    print("✅ API client works end-to-end against the fake API")
+
+
+def test_fake_api_fault_injection():
+    """Test latency, 429, 5xx and hanging requests of the fake API."""
+    faults = FaultProfile(latency=0.1)
+    with FakeWienerNetzeServer(faults=faults) as server:
+        tokens = server.issue_tokens("user@example.com")
+        headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+        url = server.api_url + "zaehlpunkte"
+        
+        started = time.monotonic()
+        assert requests.get(url, headers=headers, timeout=5).status_code == 200
+        assert time.monotonic() - started >= 0.1
+        assert requests.get(url, timeout=5).status_code == 401
+        
+        faults.latency = 0.0
+        faults.rate_limit_rate = 1.0
+        response = requests.get(url, headers=headers, timeout=5)
+        assert response.status_code == 429
+        assert response.headers["Retry-After"] == "1"
+        
+        faults.rate_limit_rate = 0.0
+        faults.error_rate = 1.0
+        assert requests.get(url, headers=headers, timeout=5).status_code in (500, 502, 503)
+        
+        faults.error_rate = 0.0
+        faults.timeout_rate = 1.0
+        with pytest.raises(requests.exceptions.Timeout):
+            requests.get(url, headers=headers, timeout=0.3)
+        
+        assert server.snapshot()["faults"] == {"rate_limit": 1, "error": 1, "timeout": 1}
+    
+    print("✅ Fake API injects latency and failures")
+
+
+def test_api_errors_reach_the_retry_policy():
+    """Test that gateway errors raise classified errors instead of returning mock data."""
+    from wnsm_sync.api.errors import SmartmeterConnectionError
+    from wnsm_sync.core.retry import ErrorClass, RetryPolicy, classify
+    
+    faults = FaultProfile(rate_limit_rate=1.0, retry_after=3)
+    with FakeWienerNetzeServer(faults=faults) as server:
+        client = Smartmeter("user@example.com", "secret", auth_url=server.auth_url, api_url=server.api_url)
+        client.login()
+        zaehlpunkt = server.zaehlpunkte_for("user@example.com")[0]
+        
+        with pytest.raises(SmartmeterConnectionError) as error:
+            client.bewegungsdaten(zaehlpunkt, datetime(2025, 3, 1), datetime(2025, 3, 2))
+        classification = classify(error.value)
+        assert classification.error_class is ErrorClass.RATE_LIMITED
+        assert classification.retry_after == 3
+        
+        # One retry after the requested delay, then the gateway recovers
+        delays = []
+        
+        def recover(delay):
+            delays.append(delay)
+            faults.rate_limit_rate = 0.0
+        
+        policy = RetryPolicy(retries=2, base_delay=1, sleep=recover)
+        data = policy.call("bewegungsdaten", client.bewegungsdaten, zaehlpunkt,
+                           datetime(2025, 3, 1), datetime(2025, 3, 2))
+        assert len(data["data"]) == 96
+        assert delays and delays[0] >= 3
+    
+    print("✅ Gateway errors are classified and retried")
+
+
+def test_open_circuit_fails_cycles_fast(tmp_path):
+    """Test that an outage opens the circuit, is reported and ends once a probe succeeds."""
+    from unittest import mock
+    from wnsm_sync.config.loader import WNSMConfig
+    from wnsm_sync.core.sync import WNSMSync
+    
+    faults = FaultProfile()
+    with FakeWienerNetzeServer(faults=faults) as server:
+        config = WNSMConfig(
+            wnsm_username="user@example.com", wnsm_password="secret",
+            zp=server.zaehlpunkte_for("user@example.com")[0], mqtt_host="localhost",
+            api_auth_url=server.auth_url, api_base_url=server.api_url, api_timeout=5,
+            retry_count=1, retry_delay=1, retry_max_delay=1,
+            circuit_failure_threshold=2, circuit_reset_timeout=1,
+            session_file=str(tmp_path / "session.json"),
+            schedule_state_file=str(tmp_path / "schedule_state.json"),
+            discovery_state_file=str(tmp_path / "discovery_state.json")
+        )
+        sync = WNSMSync(config)
+        sync.mqtt_client = mock.Mock()
+        sync.mqtt_client.publish_message.return_value = True
+        sync.mqtt_client.rate_limiter.throttled_seconds = 0.0
+        sync.api_client.login()
+        sync.api_client.zaehlpunkte()
+        
+        def last_status():
+            return [call.args[1] for call in sync.mqtt_client.publish_message.call_args_list
+                    if call.args[0] == f"{config.mqtt_topic}/status"][-1]
+        
+        # Both attempts of the first cycle fail and open the circuit
+        faults.error_rate = 1.0
+        assert sync.run_sync_cycle() is False
+        assert server.snapshot()["requests"]["bewegungsdaten"] == 2
+        
+        # The next cycle fails fast without a request and reports the outage
+        started = time.monotonic()
+        assert sync.run_sync_cycle() is False
+        assert time.monotonic() - started < 0.5
+        assert server.snapshot()["requests"]["bewegungsdaten"] == 2
+        status = last_status()
+        assert "bewegungsdaten circuit open" in status["error"]
+        assert list(status["api_outage"]) == ["bewegungsdaten"]
+        
+        # After the reset timeout one probe finds the API recovered
+        faults.error_rate = 0.0
+        time.sleep(1.1)
+        assert sync.run_sync_cycle() is True
+        assert server.snapshot()["requests"]["bewegungsdaten"] == 3
+        assert "api_outage" not in last_status()
+    
+    print("✅ Open circuits fail cycles fast and close after a successful probe")
+
+
+def test_throttle_shared_by_all_requests():
+    """Test that concurrent fetches of an account stay within its concurrency limit."""
+    import threading
+    from wnsm_sync.api.throttle import AdaptiveThrottle
+    
+    class CountingThrottle(AdaptiveThrottle):
+        def __init__(self, **kwargs):
+            super().__init__(**kwargs)
+            self.requests = []
+        
+        def release(self, endpoint, *args, **kwargs):
+            self.requests.append((endpoint, self.in_flight))
+            super().release(endpoint, *args, **kwargs)
+    
+    with FakeWienerNetzeServer(faults=FaultProfile(latency=0.1)) as server:
+        throttle = CountingThrottle(max_concurrency=2, max_rate=100)
+        client = Smartmeter("user@example.com", "secret", auth_url=server.auth_url, api_url=server.api_url,
+                            throttle=throttle)
+        client.login()
+        zaehlpunkt = client.zaehlpunkte()[0]["zaehlpunkte"][0]["zaehlpunktnummer"]
+        
+        results = []
+        threads = [
+            threading.Thread(target=lambda day=day: results.append(
+                client.bewegungsdaten(zaehlpunkt, datetime(2025, 3, day), datetime(2025, 3, day + 1))))
+            for day in range(1, 9)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        assert len(results) == 8
+        stats = server.snapshot()
+        assert stats["requests"]["bewegungsdaten"] == 8
+        # The library's session is throttled like the client's own
+        fetches = [in_flight for endpoint, in_flight in throttle.requests if endpoint == "bewegungsdaten"]
+        assert len(fetches) == 8
+        assert max(fetches) == 2
+        assert throttle.limit == 2 and throttle.in_flight == 0
+    
+    print("✅ Concurrent fetches share the account's throttle")
+
+
+def test_hedged_bewegungsdaten_served_by_verbrauch():
+    """Test that a slow bewegungsdaten request is answered by the verbrauch day view."""
+    from datetime import timedelta
+    from wnsm_sync.api.client import API_REQUEST_SECONDS
+    from wnsm_sync.api.hedging import Hedger
+    
+    verbrauch_calls = API_REQUEST_SECONDS.count(endpoint="verbrauch", outcome="success")
+    faults = FaultProfile()
+    with FakeWienerNetzeServer(faults=faults) as server:
+        hedger = Hedger(min_delay=0.2)
+        hedger.tracker.initial = 0.2
+        client = Smartmeter("user@example.com", "secret", auth_url=server.auth_url, api_url=server.api_url,
+                            hedger=hedger)
+        client.login()
+        zaehlpunkt = client.zaehlpunkte()[0]["zaehlpunkte"][0]["zaehlpunktnummer"]
+        date_until = datetime.combine(datetime.now().date(), datetime.min.time())
+        date_from = date_until - timedelta(days=1)
+        
+        expected = client.bewegungsdaten(zaehlpunkt, date_from, date_until)
+        assert server.snapshot()["requests"].get("verbrauch", 0) == 0
+        
+        faults.endpoint_latency = {"bewegungsdaten": 2.0}
+        started = time.monotonic()
+        data = client.bewegungsdaten(zaehlpunkt, date_from, date_until)
+        assert time.monotonic() - started < 1.5
+        assert server.snapshot()["requests"]["verbrauch"] == 1
+        assert API_REQUEST_SECONDS.count(endpoint="verbrauch", outcome="success") == verbrauch_calls + 1
+        
+        # Same readings in the same format, whichever endpoint answered
+        assert len(data["data"]) == 96
+        assert [point["timestamp"] for point in data["data"]] == [point["timestamp"] for point in expected["data"]]
+        assert [point["value"] for point in data["data"]] == pytest.approx(
+            [point["value"] for point in expected["data"]])
+        
+        # Old ranges are never hedged
+        client.bewegungsdaten(zaehlpunkt, datetime(2025, 3, 1), datetime(2025, 3, 2))
+        assert server.snapshot()["requests"]["verbrauch"] == 1
+    
+    print("✅ Slow recent bewegungsdaten requests are hedged by the verbrauch day view")
+
+
+def test_overlapping_fetches_share_one_request():
+    """Test that concurrent fetches of the same or a contained range send one request."""
+    import threading
+    from wnsm_sync.core.api_gate import AccountGate, FairQueue
+    
+    faults = FaultProfile()
+    gate = AccountGate("user", FairQueue(1))
+    with FakeWienerNetzeServer(faults=faults) as server:
+        client = Smartmeter("user@example.com", "secret", auth_url=server.auth_url, api_url=server.api_url,
+                            api_slot=gate.slot)
+        client.login()
+        zaehlpunkt = client.zaehlpunkte()[0]["zaehlpunkte"][0]["zaehlpunktnummer"]
+        expected = client.bewegungsdaten(zaehlpunkt, datetime(2025, 3, 2, 6), datetime(2025, 3, 3))
+        
+        faults.endpoint_latency = {"bewegungsdaten": 0.5}
+        ranges = [
+            (datetime(2025, 3, 1), datetime(2025, 3, 4)),
+            (datetime(2025, 3, 1), datetime(2025, 3, 4)),
+            (datetime(2025, 3, 2, 6), datetime(2025, 3, 3)),
+        ]
+        results = {}
+        threads = [
+            threading.Thread(target=lambda index=index, span=span: results.__setitem__(
+                index, client.bewegungsdaten(zaehlpunkt, *span)))
+            for index, span in enumerate(ranges)
+        ]
+        threads[0].start()
+        while client.single_flight.in_flight() == 0:
+            time.sleep(0.01)
+        for thread in threads[1:]:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        assert server.snapshot()["requests"]["bewegungsdaten"] == 2
+        # Only the callers sending a request took the single gate slot
+        assert gate.calls == 2
+        assert len(results[0]["data"]) == 3 * 96
+        assert results[1] is results[0]
+        # The contained range is cut out of the larger request
+        assert results[2] == expected
+    
+    print("✅ Overlapping concurrent fetches share one request")
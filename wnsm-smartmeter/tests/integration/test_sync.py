@@ -114,4 +114,535 @@ def test_bewegungsdaten_parameter_fix_integration(monkeypatch):
         assert hasattr(reading, 'timestamp')
         assert reading.value_kwh > 0
     
-    print("✓ Integration test: bewegungsdaten parameter fix works in full sync flow")
\ No newline at end of file
+    print("✓ Integration test: bewegungsdaten parameter fix works in full sync flow")
+
+def _mock_sync(monkeypatch, tmp_path):
+    """Create a sync instance using mock data and a mocked MQTT client."""
+    monkeypatch.setenv("WNSM_USERNAME", "test_user")
+    monkeypatch.setenv("WNSM_PASSWORD", "test_pass")
+    monkeypatch.setenv("ZP", "AT0010000000000000001000004392265")
+    monkeypatch.setenv("MQTT_HOST", "localhost")
+    monkeypatch.setenv("USE_MOCK_DATA", "true")
+    
+    config = ConfigLoader().load()
+    config.schedule_state_file = str(tmp_path / "schedule_state.json")
+    config.discovery_state_file = str(tmp_path / "discovery_state.json")
+    sync = WNSMSync(config)
+    sync.mqtt_client = mock.Mock()
+    sync.mqtt_client.publish_message.return_value = True
+    sync.mqtt_client.rate_limiter.throttled_seconds = 0.0
+    return sync
+
+
+def test_async_sync_cycle(monkeypatch, tmp_path):
+    """Test that the orchestrated sync cycle publishes readings and status."""
+    sync = _mock_sync(monkeypatch, tmp_path)
+    
+    assert sync.run_sync_cycle() is True
+    
+    topics = [call.args[0] for call in sync.mqtt_client.publish_message.call_args_list]
+    assert topics.count(f"{sync.config.mqtt_topic}/15min") == 96
+    assert f"{sync.config.mqtt_topic}/daily_total" in topics
+    
+    statuses = [call.args[1]["status"] for call in sync.mqtt_client.publish_message.call_args_list
+                if call.args[0] == f"{sync.config.mqtt_topic}/status"]
+    assert statuses == ["running", "success"]
+    
+    print("✅ Orchestrated sync cycle publishes readings and status")
+
+
+def test_cycle_publishes_diagnostics(monkeypatch, tmp_path):
+    """Test that every cycle publishes its performance numbers once."""
+    sync = _mock_sync(monkeypatch, tmp_path)
+    sync.mqtt_client.outbox_depth.return_value = 4
+    
+    assert sync.run_sync_cycle() is True
+    
+    diagnostics = [call for call in sync.mqtt_client.publish_message.call_args_list
+                   if call.args[0] == f"{sync.config.mqtt_topic}/diagnostics"]
+    assert len(diagnostics) == 1
+    assert diagnostics[0].kwargs["retain"] is True
+    payload = diagnostics[0].args[1]
+    assert payload["readings"] == 96
+    assert payload["cycle_seconds"] >= payload["fetch_seconds"] >= 0
+    assert payload["mqtt_readings_per_second"] > 0
+    assert payload["backfill_rows"] == 0
+    assert payload["mqtt_outbox"] == 4
+    
+    print("✅ Sync cycle publishes diagnostics")
+
+
+def test_profiled_cycle(monkeypatch, tmp_path):
+    """Test that a profile requested over MQTT covers the next cycle."""
+    import pstats
+    
+    sync = _mock_sync(monkeypatch, tmp_path)
+    sync.profiler.directory = str(tmp_path / "profiles")
+    
+    sync._on_profile_command("1", retained=True)
+    sync._on_profile_command("many", retained=False)
+    assert sync.profiler.remaining == 0
+    sync._on_profile_command("1", retained=False)
+    
+    assert sync.run_sync_cycle() is True
+    assert sync.run_sync_cycle() is True
+    
+    profiles = list((tmp_path / "profiles").glob("cycle-04392265-*.pstats"))
+    assert len(profiles) == 1
+    functions = {name for _, _, name in pstats.Stats(str(profiles[0])).stats}
+    assert "fetch_energy_data" in functions
+    assert "_publish_energy_data_mqtt" in functions
+    
+    print("✅ Profiled cycle covers stages and sinks")
+
+
+def test_traced_cycle(monkeypatch, tmp_path):
+    """Test that a traced cycle is exported with its stages nested below the cycle."""
+    from wnsm_sync.tracing.timeline import load_spans, render
+    
+    sync = _mock_sync(monkeypatch, tmp_path)
+    sync.config.tracing = True
+    sync.trace_exporter.directory = str(tmp_path / "traces")
+    
+    assert sync.run_sync_cycle() is True
+    
+    traces = list((tmp_path / "traces").glob("trace-04392265-*.ndjson"))
+    assert len(traces) == 1
+    spans = load_spans(str(tmp_path / "traces"))
+    by_name = {span["name"]: span for span in spans}
+    assert {"cycle", "stage.fetch", "stage.sinks", "sink.mqtt", "mqtt.batch"} <= set(by_name)
+    assert len({span["trace_id"] for span in spans}) == 1
+    
+    root = by_name["cycle"]
+    assert root["parent_id"] is None
+    assert root["attributes"]["success"] is True
+    assert by_name["stage.sinks"]["parent_id"] == root["span_id"]
+    # Sinks run in executor threads and still join the trace
+    assert by_name["sink.mqtt"]["parent_id"] == by_name["stage.sinks"]["span_id"]
+    assert by_name["mqtt.batch"]["parent_id"] == by_name["sink.mqtt"]["span_id"]
+    assert by_name["mqtt.batch"]["attributes"]["readings"] > 0
+    
+    assert "stage.fetch" in render(spans)
+    
+    print("✅ Traced cycle exports nested spans")
+
+
+def test_stage_timeout_aborts_cycle(monkeypatch, tmp_path):
+    """Test that a stuck stage times out, cancels and reports an error."""
+    import threading
+    
+    sync = _mock_sync(monkeypatch, tmp_path)
+    sync.config.stage_timeout = 1
+    released = threading.Event()
+    
+    def slow_publish(energy_data):
+        # Behaves like a publish loop that honours the cancel checkpoint
+        while not sync.cancel_event.is_set():
+            released.wait(0.05)
+        return False
+    
+    sync._publish_energy_data_mqtt = slow_publish
+    
+    assert sync.run_sync_cycle() is False
+    assert sync.cancel_event.is_set()
+    
+    last_status = [call.args[1] for call in sync.mqtt_client.publish_message.call_args_list
+                   if call.args[0] == f"{sync.config.mqtt_topic}/status"][-1]
+    assert last_status["status"] == "error"
+    assert "timed out" in last_status["error"]
+    
+    print("✅ Stuck stage times out and reports an error")
+
+
+def test_timed_out_worker_stops_at_checkpoint(monkeypatch, tmp_path):
+    """Test that a timed-out stage worker stops at its next checkpoint before the next cycle."""
+    import asyncio
+    import time
+    from wnsm_sync.core.orchestrator import CycleCancelled
+    
+    sync = _mock_sync(monkeypatch, tmp_path)
+    steps = []
+    
+    def stuck_fetch():
+        time.sleep(0.3)
+        steps.append("checkpoint")
+        sync._checkpoint()
+        steps.append("after checkpoint")
+    
+    async def scenario():
+        # An explicit timeout of 0 is not replaced by the configured one
+        with pytest.raises(TimeoutError):
+            await sync.orchestrator._run_stage("fetch", stuck_fetch, timeout=0)
+        assert sync.cancel_event.is_set() and steps == []
+        
+        # The next cycle waits for the worker instead of clearing the event under it
+        assert await sync.orchestrator._cycle(False) is True
+    
+    asyncio.run(scenario())
+    assert steps == ["checkpoint"]
+    
+    # Sinks not yet started are skipped once the cycle is cancelled
+    sync.cancel_event.set()
+    results = sync.pipeline.run(sync.fetch_energy_data())
+    assert results and not any(result.success for result in results)
+    assert "cancelled" in results[0].error
+    with pytest.raises(CycleCancelled):
+        sync._call_api(sync.api_client.login)
+    
+    print("✅ Timed-out stage workers stop at their next checkpoint")
+
+
+def test_sink_fan_out(monkeypatch, tmp_path):
+    """Test that sinks run in parallel and report their own status."""
+    import time
+    from wnsm_sync.core.sync import CSVSink, EnergySink
+    from wnsm_sync.backfill.csv_exporter import CSVExporter
+    
+    class SlowSink(EnergySink):
+        name = "slow"
+        
+        def write(self, energy_data, use_backfill=False):
+            time.sleep(0.5)
+            return True
+    
+    class BrokenSink(EnergySink):
+        name = "broken"
+        
+        def write(self, energy_data, use_backfill=False):
+            time.sleep(0.5)
+            raise IOError("disk full")
+    
+    sync = _mock_sync(monkeypatch, tmp_path)
+    sync.pipeline.register(CSVSink(CSVExporter(str(tmp_path / "csv"))))
+    sync.pipeline.register(SlowSink())
+    sync.pipeline.register(BrokenSink())
+    
+    started = time.monotonic()
+    assert sync.run_sync_cycle() is False
+    assert time.monotonic() - started < 0.9
+    
+    results = {result.name: result for result in sync.pipeline.last_results}
+    assert set(results) == {"mqtt", "csv", "slow", "broken"}
+    assert results["mqtt"].success and results["csv"].success and results["slow"].success
+    assert not results["broken"].success and results["broken"].error == "disk full"
+    assert results["slow"].latency_seconds >= 0.5
+    assert list((tmp_path / "csv").glob("*.csv"))
+    
+    # A sink without write fails when it is created, not in a cycle's worker thread
+    class IncompleteSink(EnergySink):
+        name = "incomplete"
+    
+    with pytest.raises(TypeError):
+        IncompleteSink()
+    
+    status = [call.args[1] for call in sync.mqtt_client.publish_message.call_args_list
+              if call.args[0] == f"{sync.config.mqtt_topic}/status"][-1]
+    assert status["sinks"]["broken"]["success"] is False
+    assert status["sinks"]["mqtt"]["success"] is True
+    
+    print("✅ Sinks run in parallel with independent status and latency")
+
+
+def test_backfill_cycle_sinks(monkeypatch, tmp_path):
+    """Test that backfill cycles write the database and publish only the daily total."""
+    sync = _mock_sync(monkeypatch, tmp_path)
+    sync.backfill_integration.backfill_energy_data = mock.Mock(return_value=True)
+    
+    assert sync.run_sync_cycle(force_backfill=True) is True
+    
+    sync.backfill_integration.backfill_energy_data.assert_called_once()
+    topics = [call.args[0] for call in sync.mqtt_client.publish_message.call_args_list]
+    assert f"{sync.config.mqtt_topic}/15min" not in topics
+    assert f"{sync.config.mqtt_topic}/daily_total" in topics
+    assert [result.name for result in sync.pipeline.last_results] == ["mqtt", "backfill"]
+    
+    print("✅ Backfill cycle fans out to database and MQTT daily total")
+
+
+def test_chunked_import_carries_statistics_sum(monkeypatch, tmp_path):
+    """Test that long backfills are imported in chunks with a continuous sum."""
+    sync = _mock_sync(monkeypatch, tmp_path)
+    sync.config.history_days = 75
+    sync.config.import_chunk_days = 30
+    
+    calls = []
+    
+    def backfill(energy_data, start_sum=0.0):
+        calls.append((energy_data.date_from, start_sum, energy_data.total_kwh))
+        return True
+    
+    sync.backfill_integration.backfill_energy_data = backfill
+    
+    assert sync.use_chunked_import(force_backfill=True)
+    assert sync.run_sync_cycle(force_backfill=True) is True
+    
+    assert len(calls) == 3
+    assert calls == sorted(calls)
+    assert calls[0][1] == 0.0
+    for previous, current in zip(calls, calls[1:]):
+        assert abs(current[1] - (previous[1] + previous[2])) < 1e-9
+    
+    status = [call.args[1] for call in sync.mqtt_client.publish_message.call_args_list
+              if call.args[0] == f"{sync.config.mqtt_topic}/status"][-1]
+    assert status["status"] == "success"
+    assert status["import"]["chunks"] == 3
+    assert set(status["import"]["stages"]) == {"fetch", "process", "write"}
+    
+    # Every sink sees every chunk, not only the database
+    totals = [call.args[1] for call in sync.mqtt_client.publish_message.call_args_list
+              if call.args[0] == f"{sync.config.mqtt_topic}/daily_total"]
+    assert len(totals) == 3
+    assert set(status["sinks"]) == {"mqtt", "backfill"}
+    assert sync.backfill_sink.start_sum == 0.0
+    
+    print("✅ Chunked import keeps the statistics sum continuous")
+
+
+def test_chunked_import_fails_on_unparsable_chunk(monkeypatch, tmp_path):
+    """Test that a chunk whose readings cannot be parsed fails the import instead of leaving a gap."""
+    from datetime import datetime
+    from wnsm_sync.backfill.csv_exporter import CSVExporter
+    from wnsm_sync.core.sync import CSVSink
+    
+    sync = _mock_sync(monkeypatch, tmp_path)
+    sync.config.use_mock_data = False
+    sync.pipeline.register(CSVSink(CSVExporter(str(tmp_path / "csv"))))
+    sync.backfill_integration.backfill_energy_data = mock.Mock(return_value=True)
+    
+    def fetch_raw_range(date_from, date_until):
+        if date_from == datetime(2025, 3, 1):
+            return {"data": [{"timestamp": "not a time", "value": 0.1}]}
+        readings = sync.data_processor.generate_mock_data(date_from, date_until, sync.config.zp).readings
+        return {"data": [
+            {"timestamp": reading.timestamp.strftime("%Y-%m-%dT%H:%M:%S"), "value": reading.value_kwh}
+            for reading in readings
+        ]}
+    
+    sync.fetch_raw_range = fetch_raw_range
+    report = sync.run_chunked_import([
+        (datetime(2025, 3, 1), datetime(2025, 3, 11)),
+        (datetime(2025, 3, 11), datetime(2025, 3, 21)),
+        (datetime(2025, 3, 21), datetime(2025, 3, 31)),
+    ])
+    
+    assert not report.success
+    assert report.error.startswith("process")
+    # Later chunks are not written on top of the gap
+    assert report.chunks == 0
+    sync.backfill_integration.backfill_energy_data.assert_not_called()
+    assert not list((tmp_path / "csv").glob("*.csv"))
+    
+    print("✅ Unparsable chunks fail the import")
+
+
+def test_multi_meter_cycle_shares_login(monkeypatch, tmp_path):
+    """Test that several meters sync concurrently over one login."""
+    import time
+    from wnsm_sync.core.multi_meter import MultiMeterSync
+    
+    monkeypatch.setenv("WNSM_USERNAME", "test_user")
+    monkeypatch.setenv("WNSM_PASSWORD", "test_pass")
+    monkeypatch.setenv("ZP", "AT0010000000000000001000000000001,AT0010000000000000001000000000002,"
+                             "AT0010000000000000001000000000003")
+    monkeypatch.setenv("MQTT_HOST", "localhost")
+    monkeypatch.setenv("USE_MOCK_DATA", "true")
+    
+    config = ConfigLoader().load()
+    config.schedule_state_file = str(tmp_path / "schedule_state.json")
+    config.discovery_state_file = str(tmp_path / "discovery_state.json")
+    
+    multi = MultiMeterSync(config)
+    mqtt_client = mock.Mock()
+    mqtt_client.publish_message.return_value = True
+    mqtt_client.rate_limiter.throttled_seconds = 0.0
+    for meter in multi.meters:
+        meter.mqtt_client = mqtt_client
+        original_fetch = meter.fetch_energy_data
+        
+        def slow_fetch(original_fetch=original_fetch):
+            time.sleep(0.3)
+            return original_fetch()
+        
+        meter.fetch_energy_data = slow_fetch
+    
+    started = time.monotonic()
+    assert multi.run_sync_cycle() is True
+    elapsed = time.monotonic() - started
+    
+    # Concurrent: close to one meter's fetch rather than three
+    assert elapsed < 0.8
+    assert len({id(meter.api_client) for meter in multi.meters}) == 1
+    assert set(multi.last_cycle_seconds) == set(config.zaehlpunkte)
+    
+    topics = {call.args[0] for call in mqtt_client.publish_message.call_args_list}
+    for suffix in ("00000001", "00000002", "00000003"):
+        assert f"smartmeter/energy/state/{suffix}/15min" in topics
+        assert f"smartmeter/energy/state/{suffix}/status" in topics
+    
+    discovery_topics = {config["topic"] for meter in multi.meters
+                        for config in meter.discovery.get_all_discovery_configs()}
+    assert len(discovery_topics) == 3 * len(multi.primary.discovery.get_all_discovery_configs())
+    
+    print("✅ Multiple meters sync concurrently with one shared login")
+
+
+def test_account_pool_bounds_concurrency(tmp_path):
+    """Test that many accounts sync with a bounded number of workers."""
+    from wnsm_sync.config.loader import WNSMConfig
+    from wnsm_sync.core.accounts import AccountPool
+    from tests.fixtures.fake_smartmeter import FakeSmartmeter
+    
+    accounts_file = tmp_path / "accounts.json"
+    accounts_file.write_text(json.dumps([
+        {"name": f"account{i}", "username": f"user{i}", "password": "secret",
+         "zp": f"AT00100000000000000010000000000{i:02d}"}
+        for i in range(10)
+    ]))
+    config = WNSMConfig(
+        wnsm_username="", wnsm_password="", zp="", mqtt_host="localhost",
+        accounts_file=str(accounts_file), account_workers=3,
+        session_file=str(tmp_path / "session.json"),
+        schedule_state_file=str(tmp_path / "schedule_state.json"),
+        discovery_state_file=str(tmp_path / "discovery_state.json")
+    )
+    
+    pool = AccountPool(config, ConfigLoader().load_accounts(config))
+    mqtt_client = mock.Mock()
+    mqtt_client.publish_message.return_value = True
+    mqtt_client.rate_limiter.throttled_seconds = 0.0
+    FakeSmartmeter.reset_counters()
+    for sync in pool.accounts.values():
+        sync.mqtt_client = mqtt_client
+        sync.shared.api_client = FakeSmartmeter(latency=0.05, api_slot=sync.shared.api_gate.slot)
+    
+    assert pool.run_sync_cycle() is True
+    
+    assert 1 < FakeSmartmeter.max_in_flight <= 3
+    assert set(pool.last_results) == {f"account{i}" for i in range(10)}
+    # Every account logged in once and fetched once through its own gate
+    assert all(sync.shared.api_gate.calls == 2 for sync in pool.accounts.values())
+    assert all(count == 2 for count in pool.api_queue.granted.values())
+    assert (tmp_path / "sessions" / "account7.json").exists()
+    
+    topics = {call.args[0] for call in mqtt_client.publish_message.call_args_list}
+    assert "smartmeter/energy/state/account0/15min" in topics
+    assert "smartmeter/energy/state/account9/status" in topics
+    
+    print("✅ Account pool syncs many accounts with bounded concurrency")
+
+
+def test_account_pool_removes_discovery_of_dropped_accounts(tmp_path):
+    """Test that dropping an account removes its entities but keeps the others'."""
+    from wnsm_sync.config.loader import WNSMConfig
+    from wnsm_sync.core.accounts import AccountPool
+    
+    accounts_file = tmp_path / "accounts.json"
+    config = WNSMConfig(
+        wnsm_username="", wnsm_password="", zp="", mqtt_host="localhost",
+        accounts_file=str(accounts_file),
+        session_file=str(tmp_path / "session.json"),
+        schedule_state_file=str(tmp_path / "schedule_state.json"),
+        discovery_state_file=str(tmp_path / "discovery_state.json")
+    )
+    
+    def start_pool(count):
+        accounts_file.write_text(json.dumps([
+            {"name": f"account{i}", "username": f"user{i}", "password": "secret",
+             "zp": f"AT00100000000000000010000000000{i:02d}"}
+            for i in range(count)
+        ]))
+        pool = AccountPool(config, ConfigLoader().load_accounts(config))
+        mqtt_client = mock.Mock()
+        mqtt_client.connect.return_value = True
+        mqtt_client.publish_discovery.return_value = True
+        mqtt_client.remove_discovery.return_value = True
+        pool.mqtt_client = mqtt_client
+        for sync in pool.accounts.values():
+            sync.mqtt_client = mqtt_client
+        pool.start()
+        return pool, mqtt_client
+    
+    pool, mqtt_client = start_pool(2)
+    mqtt_client.remove_discovery.assert_not_called()
+    dropped = pool.accounts["account1"].discovery_topics()
+    
+    pool, mqtt_client = start_pool(1)
+    assert {call.args[0] for call in mqtt_client.remove_discovery.call_args_list} == dropped
+    assert set(pool.accounts["account0"].discovery_state.load()) == pool.accounts["account0"].discovery_topics()
+    
+    print("✅ Discovery of dropped accounts is removed")
+
+
+def test_account_pool_subscribes_profile_commands(tmp_path):
+    """Test that on-demand profiling listens per meter in multi-account mode."""
+    from wnsm_sync.config.loader import WNSMConfig
+    from wnsm_sync.core.accounts import AccountPool
+    
+    accounts_file = tmp_path / "accounts.json"
+    accounts_file.write_text(json.dumps([
+        {"name": "single", "username": "user0", "password": "secret", "zp": "AT0010000000000000001000000000001"},
+        {"name": "multi", "username": "user1", "password": "secret",
+         "zp": "AT0010000000000000001000000000002,AT0010000000000000001000000000003"}
+    ]))
+    config = WNSMConfig(
+        wnsm_username="", wnsm_password="", zp="", mqtt_host="localhost",
+        accounts_file=str(accounts_file),
+        session_file=str(tmp_path / "session.json"),
+        schedule_state_file=str(tmp_path / "schedule_state.json"),
+        discovery_state_file=str(tmp_path / "discovery_state.json")
+    )
+    
+    pool = AccountPool(config, ConfigLoader().load_accounts(config))
+    mqtt_client = mock.Mock()
+    mqtt_client.connect.return_value = True
+    mqtt_client.publish_discovery.return_value = True
+    pool.mqtt_client = mqtt_client
+    meters = [pool.accounts["single"], *pool.accounts["multi"].meters]
+    for meter in meters:
+        meter.mqtt_client = mqtt_client
+    pool.start()
+    
+    subscribed = {call.args[0]: call.args[1] for call in mqtt_client.subscribe.call_args_list}
+    for meter in meters:
+        assert subscribed[f"{meter.config.mqtt_topic}/profile"] == meter._on_profile_command
+    
+    subscribed[f"{meters[2].config.mqtt_topic}/profile"]("2", False)
+    assert meters[2].profiler._remaining == 2 and meters[1].profiler._remaining == 0
+    
+    print("✅ Profile commands are subscribed for every meter of every account")
+
+
+def test_account_pool_prewarms_login(tmp_path):
+    """Test that accounts log in ahead of their next poll."""
+    import asyncio
+    from wnsm_sync.config.loader import WNSMConfig
+    from wnsm_sync.core.accounts import AccountPool
+    
+    accounts_file = tmp_path / "accounts.json"
+    accounts_file.write_text(json.dumps([
+        {"name": "home", "username": "user0", "password": "secret", "zp": "AT0010000000000000001000000000001",
+         "login_prewarm_seconds": 1}
+    ]))
+    config = WNSMConfig(
+        wnsm_username="", wnsm_password="", zp="", mqtt_host="localhost",
+        accounts_file=str(accounts_file),
+        session_file=str(tmp_path / "session.json"),
+        schedule_state_file=str(tmp_path / "schedule_state.json"),
+        discovery_state_file=str(tmp_path / "discovery_state.json")
+    )
+    
+    pool = AccountPool(config, ConfigLoader().load_accounts(config))
+    sync = pool.accounts["home"]
+    delays = iter([1.2, 0.05])
+    events = []
+    
+    async def wait():
+        pool._stop_event = asyncio.Event()
+        with mock.patch.object(sync, "next_poll_delay", side_effect=lambda: next(delays)), \
+                mock.patch.object(sync, "_prewarm_login", side_effect=lambda: events.append("prewarm")):
+            return await pool._wait_for_next_poll("home")
+    
+    assert asyncio.run(wait()) is False
+    assert events == ["prewarm"]
+    
+    print("✅ Accounts pre-warm their login before the next poll")
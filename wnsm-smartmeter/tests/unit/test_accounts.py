@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""Tests for multi-account configuration and fair API call queueing."""
+
+import json
+import sys
+import threading
+import time
+from pathlib import Path
+
+# Add src directory to Python path
+src_path = Path(__file__).parent.parent.parent / "src"
+sys.path.insert(0, str(src_path))
+
+from wnsm_sync.config.loader import ConfigLoader, WNSMConfig
+from wnsm_sync.core.api_gate import AccountGate, FairQueue
+
+
+def _wait_until(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition not reached"
+        time.sleep(0.01)
+
+
+def test_fair_queue_round_robin():
+    """Test that a busy account cannot starve another one."""
+    queue = FairQueue(1)
+    order = []
+    order_lock = threading.Lock()
+    
+    def call(account):
+        queue.acquire(account)
+        with order_lock:
+            order.append(account)
+        time.sleep(0.01)
+        queue.release()
+    
+    # Hold the only slot while the calls queue up
+    queue.acquire("setup")
+    busy = [threading.Thread(target=call, args=("busy",)) for _ in range(4)]
+    for thread in busy:
+        thread.start()
+    _wait_until(lambda: len(queue._waiting.get("busy", ())) == 4)
+    
+    quiet = threading.Thread(target=call, args=("quiet",))
+    quiet.start()
+    _wait_until(lambda: "quiet" in queue._waiting)
+    queue.release()
+    
+    for thread in busy + [quiet]:
+        thread.join(timeout=2)
+    
+    # The quiet account is served right after the busy account's first call
+    assert order == ["busy", "quiet", "busy", "busy", "busy"]
+    assert queue.granted == {"setup": 1, "busy": 4, "quiet": 1}
+    assert queue.in_flight == 0
+    
+    print("✅ Fair queue serves accounts round-robin")
+
+
+def test_account_gate_bounds_concurrency():
+    """Test that gates respect the shared slot count."""
+    queue = FairQueue(2)
+    gates = [AccountGate(f"account{i}", queue=queue) for i in range(4)]
+    peak = [0]
+    
+    def call(gate):
+        with gate.slot():
+            peak[0] = max(peak[0], queue.in_flight)
+            time.sleep(0.05)
+    
+    threads = [threading.Thread(target=call, args=(gate,)) for gate in gates for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=5)
+    
+    assert peak[0] == 2
+    assert all(gate.calls == 3 for gate in gates)
+    
+    print("✅ Account gates bound concurrency")
+
+
+def test_account_rate_limit_caps_adaptive_throttle(tmp_path):
+    """Test that the account rate limit is the ceiling of its API throttle."""
+    from wnsm_sync.api.throttle import DEFAULT_MAX_RATE
+    from wnsm_sync.core.sync import WNSMSync
+    
+    accounts_file = tmp_path / "accounts.json"
+    accounts_file.write_text(json.dumps([
+        {"name": "house", "username": "a@example.com", "password": "secret",
+         "zp": "AT0010000000000000001000000000001", "api_rate_limit": 120},
+        {"name": "flat", "username": "b@example.com", "password": "secret",
+         "zp": "AT0010000000000000001000000000002"}
+    ]))
+    config = WNSMConfig(
+        wnsm_username="", wnsm_password="", zp="", mqtt_host="localhost", use_mock_data=True,
+        accounts_file=str(accounts_file), session_file=str(tmp_path / "session.json")
+    )
+    house, flat = ConfigLoader().load_accounts(config)
+    
+    assert WNSMSync(house).api_client.throttle.max_rate == 2.0
+    assert WNSMSync(flat).api_client.throttle.max_rate == DEFAULT_MAX_RATE
+    
+    print("✅ Account rate limit caps the adaptive throttle")
+
+
+def test_load_accounts(tmp_path):
+    """Test loading per-account configurations from the accounts file."""
+    accounts_file = tmp_path / "accounts.json"
+    accounts_file.write_text(json.dumps([
+        {"name": "home", "username": "user1", "password": "pass1",
+         "zp": "AT0010000000000000001000000000001"},
+        {"name": "flat 2", "username": "user2", "password": "pass2",
+         "zp": "AT0010000000000000001000000000002", "api_rate_limit": "10"}
+    ]))
+    config = WNSMConfig(
+        wnsm_username="",
+        wnsm_password="",
+        zp="",
+        mqtt_host="localhost",
+        accounts_file=str(accounts_file),
+        session_file=str(tmp_path / "session.json")
+    )
+    
+    accounts = ConfigLoader().load_accounts(config)
+    
+    assert [account.account_name for account in accounts] == ["home", "flat_2"]
+    assert accounts[0].wnsm_username == "user1"
+    assert accounts[0].mqtt_topic == "smartmeter/energy/state/home"
+    assert accounts[0].availability_topic == "smartmeter/energy/state/availability"
+    assert accounts[0].session_file == str(tmp_path / "sessions" / "home.json")
+    assert accounts[0].api_rate_limit == 0
+    assert accounts[1].api_rate_limit == 10
+    assert accounts[1].zp == "AT0010000000000000001000000000002"
+    
+    accounts_file.write_text(json.dumps([
+        {"name": "home", "username": "user1", "password": "pass1", "zp": "AT1", "colour": "red"}
+    ]))
+    try:
+        ConfigLoader().load_accounts(config)
+        assert False, "Should have raised ValueError"
+    except ValueError as e:
+        assert "colour" in str(e)
+    
+    print("✅ Accounts file is loaded into per-account configs")
+
+
+def test_accounts_do_not_inherit_metadata_id(tmp_path):
+    """Test that the add-on's statistics metadata ID is not shared by the accounts."""
+    accounts_file = tmp_path / "accounts.json"
+    accounts_file.write_text(json.dumps([
+        {"name": "home", "username": "user1", "password": "pass1",
+         "zp": "AT0010000000000000001000000000001"},
+        {"name": "flat", "username": "user2", "password": "pass2",
+         "zp": "AT0010000000000000001000000000002", "ha_import_metadata_id": "42"}
+    ]))
+    config = WNSMConfig(
+        wnsm_username="",
+        wnsm_password="",
+        zp="",
+        mqtt_host="localhost",
+        accounts_file=str(accounts_file),
+        session_file=str(tmp_path / "session.json"),
+        ha_import_metadata_id="7"
+    )
+    
+    home, flat = ConfigLoader().load_accounts(config)
+    
+    assert home.metadata_id_for(home.zp) is None
+    assert flat.metadata_id_for(flat.zp) == "42"
+    
+    print("✅ Accounts only use their own statistics metadata ID")
@@ -209,6 +209,97 @@ def test_bewegungsdaten_date_handling():
     print("✓ bewegungsdaten handles different date formats correctly")
 
 
+def test_configured_base_urls():
+    """Test that configured base URLs replace the library's URLs."""
+    from vienna_smartmeter import Smartmeter as ViennaSmartmeter
+    
+    client = Smartmeter('test_user', 'test_pass')
+    assert client._vienna_client_class() is ViennaSmartmeter
+    
+    client = Smartmeter('test_user', 'test_pass',
+                        auth_url="http://127.0.0.1:8089/auth/realms/logwien/protocol/openid-connect",
+                        api_url="http://127.0.0.1:8089/sm/api/")
+    client_class = client._vienna_client_class()
+    assert issubclass(client_class, ViennaSmartmeter)
+    assert client_class.AUTH_URL == "http://127.0.0.1:8089/auth/realms/logwien/protocol/openid-connect/"
+    assert client_class.API_URL == "http://127.0.0.1:8089/sm/api/"
+    assert client.auth_url.startswith("http://127.0.0.1:8089/")
+    assert client.api_url == "http://127.0.0.1:8089/sm/api/"
+    
+    print("✅ Configured base URLs are applied to the API client")
+
+
+def test_log_redaction_and_preview_sampling():
+    """Test that credentials never reach the log and previews are sampled."""
+    from wnsm_sync.api.log_helpers import PreviewSampler, redact, redact_text, summarize
+    
+    headers = {"apikey": "secret-key", "Accept": "application/json", "Authorization": "Bearer abc.def"}
+    assert redact(headers) == {"apikey": "***", "Accept": "application/json", "Authorization": "***"}
+    assert redact({"tokens": [{"access_token": "t0k3n", "expires_in": 300}]}) == {
+        "tokens": [{"access_token": "***", "expires_in": 300}]
+    }
+    
+    text = redact_text('{"access_token": "t0k3n", "token_type": "Bearer"} Bearer abc.def '
+                       'https://app/callback?state=1&code=0815&session_state=x')
+    assert "t0k3n" not in text and "abc.def" not in text and "0815" not in text
+    assert '"token_type": "Bearer"' in text
+    
+    assert summarize({"descriptor": {}, "values": [1, 2, 3], "rolle": "V002"}) == "dict(descriptor[0], values[3], rolle)"
+    
+    sampler = PreviewSampler(interval=60, size=20)
+    assert sampler.allow("bewegungsdaten", now=0) is True
+    assert sampler.allow("bewegungsdaten", now=30) is False
+    assert sampler.allow("zaehlpunkte", now=30) is True
+    assert sampler.allow("bewegungsdaten", now=61) is True
+    # Truncation must not leak the start of a secret
+    assert sampler.preview(b'{"password": "hunter2", "padding": "xxxxxxxx"}') == '{"password": "***'
+    
+    print("✅ API logging redacts credentials and samples previews")
+
+
+def test_call_api_logs_summary_at_info(caplog):
+    """Test that a request logs one summary line at INFO and details only at DEBUG."""
+    import logging
+    import requests
+    from requests.adapters import BaseAdapter
+    from wnsm_sync.api import client as api_client
+    
+    class CannedAdapter(BaseAdapter):
+        def send(self, request, **kwargs):
+            response = requests.Response()
+            response.status_code = 200
+            response._content = b'{"values": [], "access_token": "t0k3n"}'
+            response.headers["Set-Cookie"] = "KEYCLOAK_SESSION=s3ss10n"
+            response.url = request.url
+            response.request = request
+            response.elapsed = timedelta(0)
+            return response
+        
+        def close(self):
+            pass
+    
+    client = Smartmeter('test_user', 'test_pass', api_url="https://api.example.invalid/")
+    client.session.mount("https://", CannedAdapter())
+    
+    with caplog.at_level(logging.INFO, logger=api_client.logger.name):
+        assert client._call_api("user/messwerte/bewegungsdaten") == {"values": [], "access_token": "t0k3n"}
+    records = [record for record in caplog.records if record.name == api_client.logger.name
+               and record.levelno == logging.INFO]
+    assert len(records) == 1
+    assert records[0].endpoint == "bewegungsdaten"
+    assert records[0].status == 200
+    
+    caplog.clear()
+    api_client.PREVIEWS._last.clear()
+    with caplog.at_level(logging.DEBUG, logger=api_client.logger.name):
+        client._call_api("user/messwerte/bewegungsdaten")
+    assert "Response content preview" in caplog.text
+    assert "APIKey" in caplog.text
+    assert "t0k3n" not in caplog.text and "s3ss10n" not in caplog.text
+    
+    print("✅ API calls log a summary at INFO and redacted details at DEBUG")
+
+
 if __name__ == "__main__":
     print("Testing API client...")
     print("=" * 50)
@@ -223,6 +314,8 @@ if __name__ == "__main__":
     test_bewegungsdaten_method_signature()
     test_bewegungsdaten_default_parameters()
     test_bewegungsdaten_date_handling()
+    test_configured_base_urls()
+    test_log_redaction_and_preview_sampling()
     
     print("=" * 50)
-    print("🎉 All API client tests passed!")
\ No newline at end of file
+    print("🎉 All API client tests passed!")
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""Tests for the API circuit breakers."""
+
+import sys
+from pathlib import Path
+
+import pytest
+import requests
+
+# Add src directory to Python path
+src_path = Path(__file__).parent.parent.parent / "src"
+sys.path.insert(0, str(src_path))
+
+from wnsm_sync.api.circuit import CircuitBreakers, CircuitState
+from wnsm_sync.api.errors import SmartmeterCircuitOpenError
+from wnsm_sync.core.retry import ErrorClass, RetryPolicy, classify
+
+
+class Clock:
+    """Monotonic clock the test sets by hand."""
+    
+    def __init__(self):
+        self.now = 0.0
+    
+    def __call__(self):
+        return self.now
+
+
+def _fail(breakers, endpoint, error):
+    with pytest.raises(type(error)):
+        with breakers.guard(endpoint):
+            raise error
+
+
+def test_breaker_opens_fails_fast_and_probes():
+    """Test opening on outages, fast failures and recovery through a probe."""
+    clock = Clock()
+    breakers = CircuitBreakers(failure_threshold=3, reset_timeout=60, clock=clock)
+    breaker = breakers.get("bewegungsdaten")
+    
+    # Rejected requests show the endpoint is up and reset the count
+    _fail(breakers, "bewegungsdaten", requests.exceptions.ReadTimeout())
+    _fail(breakers, "bewegungsdaten", requests.exceptions.ReadTimeout())
+    _fail(breakers, "bewegungsdaten", SmartmeterCircuitOpenError("zaehlpunkte", 10))
+    response = requests.Response()
+    response.status_code = 429
+    _fail(breakers, "bewegungsdaten", requests.exceptions.HTTPError(response=response))
+    assert breaker.state is CircuitState.CLOSED
+    
+    for _ in range(3):
+        _fail(breakers, "bewegungsdaten", requests.exceptions.ConnectionError())
+    assert breaker.state is CircuitState.OPEN
+    assert breakers.open_circuits() == {"bewegungsdaten": 60.0}
+    
+    # Fails fast without calling, other endpoints are unaffected
+    clock.now = 45
+    calls = []
+    with pytest.raises(SmartmeterCircuitOpenError) as error:
+        with breakers.guard("bewegungsdaten"):
+            calls.append(1)
+    assert calls == []
+    assert error.value.retry_in == 15
+    with breakers.guard("zaehlpunkte"):
+        pass
+    
+    # A failed probe keeps it open for another timeout
+    clock.now = 61
+    _fail(breakers, "bewegungsdaten", requests.exceptions.ReadTimeout())
+    assert breaker.state is CircuitState.OPEN
+    assert breakers.open_circuits() == {"bewegungsdaten": 60.0}
+    
+    # One probe at a time; its success closes the breaker
+    clock.now = 122
+    with breakers.guard("bewegungsdaten"):
+        assert breaker.state is CircuitState.HALF_OPEN
+        with pytest.raises(SmartmeterCircuitOpenError):
+            breaker.before_call()
+    assert breaker.state is CircuitState.CLOSED
+    assert breakers.open_circuits() == {}
+    
+    print("✅ Circuit breaker opens, fails fast and closes after a probe")
+
+
+def test_open_circuit_is_not_retried():
+    """Test that the retry policy gives up right away on an open circuit."""
+    error = SmartmeterCircuitOpenError("login", 30)
+    assert classify(error).error_class is ErrorClass.CIRCUIT_OPEN
+    assert not classify(error).retryable
+    
+    sleeps = []
+    calls = []
+    
+    def rejected():
+        calls.append(1)
+        raise error
+    
+    with pytest.raises(SmartmeterCircuitOpenError):
+        RetryPolicy(retries=3, base_delay=1, sleep=sleeps.append).call("login", rejected)
+    assert calls == [1] and sleeps == []
+    
+    print("✅ Open circuits end the retry sequence")
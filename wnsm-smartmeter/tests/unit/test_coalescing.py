@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""Tests for single-flight coalescing of API requests."""
+
+import sys
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+# Add src directory to Python path
+src_path = Path(__file__).parent.parent.parent / "src"
+sys.path.insert(0, str(src_path))
+
+from wnsm_sync.api.coalescing import SingleFlight
+from wnsm_sync.api.errors import SmartmeterSharedRequestError
+
+
+def _run_concurrently(single_flight, calls):
+    """Start the first call, let the others join it while in flight and collect all outcomes."""
+    outcomes = [None] * len(calls)
+    
+    def run(index, args):
+        try:
+            outcomes[index] = single_flight.do(*args)
+        except Exception as e:
+            outcomes[index] = e
+    
+    threads = [threading.Thread(target=run, args=(index, args)) for index, args in enumerate(calls)]
+    threads[0].start()
+    while single_flight.in_flight() == 0:
+        time.sleep(0.001)
+    for thread in threads[1:]:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return outcomes
+
+
+def test_concurrent_callers_share_one_request():
+    """Test exact and sub-range sharing, and separate requests for other keys."""
+    single_flight = SingleFlight()
+    requests = []
+    release = threading.Event()
+    
+    def fetch(name, days):
+        def call():
+            requests.append(name)
+            release.wait(5)
+            return list(days)
+        return call
+    
+    def subrange(result, start, end):
+        return [day for day in result if start.day <= day < end.day]
+    
+    def release_soon():
+        time.sleep(0.2)
+        release.set()
+    
+    threading.Thread(target=release_soon).start()
+    march = (datetime(2025, 3, 1), datetime(2025, 3, 8))
+    outcomes = _run_concurrently(single_flight, [
+        ("AT001", "bewegungsdaten", *march, fetch("week", range(1, 8)), subrange),
+        ("AT001", "bewegungsdaten", *march, fetch("same week", range(1, 8)), subrange),
+        ("AT001", "bewegungsdaten", datetime(2025, 3, 2), datetime(2025, 3, 4), fetch("days", range(2, 4)), subrange),
+        ("AT001", "messwerte", datetime(2025, 3, 2), datetime(2025, 3, 4), fetch("messwerte", range(2, 4))),
+        ("AT002", "bewegungsdaten", *march, fetch("other meter", range(1, 8)), subrange),
+    ])
+    
+    assert sorted(requests) == ["messwerte", "other meter", "week"]
+    assert outcomes[0] == outcomes[1] == [1, 2, 3, 4, 5, 6, 7]
+    assert outcomes[0] is outcomes[1]
+    assert outcomes[2] == [2, 3]
+    assert single_flight.in_flight() == 0
+    
+    # Nothing is kept once a request is done
+    assert single_flight.do("AT001", "bewegungsdaten", *march, fetch("later", range(1, 8))) == list(range(1, 8))
+    assert requests[-1] == "later"
+    
+    print("✅ Concurrent callers of the same range share one request")
+
+
+def test_error_is_shared_by_waiting_callers():
+    """Test that callers sharing a failed request get their own error caused by it."""
+    single_flight = SingleFlight()
+    calls = []
+    
+    def failing():
+        calls.append(1)
+        time.sleep(0.1)
+        raise ConnectionError("gateway down")
+    
+    span = (datetime(2025, 3, 1), datetime(2025, 3, 2))
+    outcomes = _run_concurrently(single_flight, [("AT001", "bewegungsdaten", *span, failing)] * 3)
+    
+    assert calls == [1]
+    assert isinstance(outcomes[0], ConnectionError)
+    for outcome in outcomes[1:]:
+        assert isinstance(outcome, SmartmeterSharedRequestError)
+        assert outcome.__cause__ is outcomes[0]
+    assert outcomes[1] is not outcomes[2]
+    assert single_flight.in_flight() == 0
+    
+    # The next caller sends a new request
+    with pytest.raises(ConnectionError):
+        single_flight.do("AT001", "bewegungsdaten", *span, failing)
+    assert calls == [1, 1]
+    
+    print("✅ Errors reach every caller of a shared request")
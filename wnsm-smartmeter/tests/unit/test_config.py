@@ -132,6 +132,44 @@ def test_config_loader_with_options():
         os.unlink(options_file)
 
 
+def test_multiple_zaehlpunkte():
+    """Test parsing of several Zählpunkte and the derived per-meter configs."""
+    config = WNSMConfig(
+        wnsm_username="test_user",
+        wnsm_password="test_pass",
+        zp="AT0010000000000000001000004392265, AT0010000000000000001000004392266",
+        mqtt_host="localhost",
+        ha_import_metadata_id="04392266=16"
+    )
+    
+    assert config.multi_meter
+    assert config.zp == "AT0010000000000000001000004392265"
+    assert config.zaehlpunkte == [
+        "AT0010000000000000001000004392265", "AT0010000000000000001000004392266"
+    ]
+    
+    meter = config.for_meter("AT0010000000000000001000004392266")
+    assert meter.zp == "AT0010000000000000001000004392266"
+    assert not meter.multi_meter
+    assert meter.mqtt_topic == "smartmeter/energy/state/04392266"
+    assert meter.availability_topic == "smartmeter/energy/state/availability"
+    assert meter.ha_import_metadata_id == "16"
+    assert config.for_meter(config.zp).ha_import_metadata_id is None
+    
+    try:
+        WNSMConfig(
+            wnsm_username="test_user",
+            wnsm_password="test_pass",
+            zp="AT0010000000000000001000004392265,AT0020000000000000001000004392265",
+            mqtt_host="localhost"
+        )
+        assert False, "Should have raised ValueError"
+    except ValueError as e:
+        assert "8 digits" in str(e)
+    
+    print("✅ Multiple Zählpunkte are parsed into per-meter configs")
+
+
 if __name__ == "__main__":
     print("Testing configuration management...")
     
@@ -139,5 +177,6 @@ if __name__ == "__main__":
     test_config_validation_errors()
     test_secrets_manager()
     test_config_loader_with_options()
+    test_multiple_zaehlpunkte()
     
-    print("\n🎉 All configuration tests passed!")
\ No newline at end of file
+    print("\n🎉 All configuration tests passed!")
@@ -8,7 +8,8 @@ import sys
 import os
 import json
 import pytest
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
 from pathlib import Path
 
 # Add src directory to Python path
@@ -112,6 +113,68 @@ def test_mock_data_generation():
     print("✅ Mock data generation works correctly!")
 
 
+def test_batched_payloads():
+    """Test grouping readings into hourly and daily documents."""
+    
+    processor = DataProcessor()
+    date_from = datetime(2025, 1, 15, 0, 0)
+    energy_data = processor.generate_mock_data(
+        date_from=date_from,
+        date_until=date_from + timedelta(days=2),
+        zaehlpunkt="AT0010000000000000001000004392265"
+    )
+    
+    hourly = energy_data.batch_readings("hour")
+    daily = energy_data.batch_readings("day")
+    
+    # 4x and 96x fewer messages than one per reading
+    assert len(hourly) == 48
+    assert len(daily) == 2
+    
+    payload = hourly[1].to_mqtt_payload()
+    assert payload["start"] == "2025-01-15T01:00:00"
+    assert payload["offsets"] == [0, 900, 1800, 2700]
+    assert payload["count"] == 4
+    assert payload["latest"] == payload["deltas"][-1]
+    assert payload["timestamp"] == "2025-01-15T01:45:00"
+    
+    # Totals are preserved
+    assert sum(b.total_kwh for b in daily) == pytest.approx(energy_data.total_kwh)
+    assert sum(len(b.readings) for b in daily) == energy_data.reading_count
+    
+    with pytest.raises(ValueError):
+        energy_data.batch_readings("week")
+    
+    print("✅ Batched payloads work correctly!")
+
+
+def test_batches_follow_local_days():
+    """Test that UTC readings around local midnight are batched by the local day."""
+    
+    vienna = ZoneInfo("Europe/Vienna")
+    start = datetime(2025, 1, 14, 22, 30, tzinfo=timezone.utc)
+    readings = [
+        EnergyReading(timestamp=start + timedelta(minutes=15 * i), value_kwh=0.1)
+        for i in range(4)
+    ]
+    energy_data = EnergyData(readings=readings, zaehlpunkt="AT0010000000000000001000004392265",
+                             date_from=start, date_until=start + timedelta(hours=1))
+    
+    # 23:30 and 23:45 belong to the 14th, 00:00 and 00:15 Vienna time to the 15th
+    daily = energy_data.batch_readings("day", tz=vienna)
+    assert [len(batch.readings) for batch in daily] == [2, 2]
+    payload = daily[1].to_mqtt_payload()
+    assert payload["start"] == "2025-01-15T00:00:00+01:00"
+    assert payload["offsets"] == [0, 900]
+    
+    hourly = energy_data.batch_readings("hour", tz=vienna)
+    assert [batch.start.isoformat() for batch in hourly] == [
+        "2025-01-14T23:00:00+01:00", "2025-01-15T00:00:00+01:00"
+    ]
+    
+    print("✅ Batches follow local days")
+
+
 if __name__ == "__main__":
     print("Testing the data processor...")
     
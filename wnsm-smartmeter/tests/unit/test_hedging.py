@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""Tests for hedged API requests."""
+
+import sys
+import threading
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+import pytest
+
+# Add src directory to Python path
+src_path = Path(__file__).parent.parent.parent / "src"
+sys.path.insert(0, str(src_path))
+
+from wnsm_sync.api.hedging import Hedger, LatencyTracker
+
+
+def test_latency_tracker_percentile():
+    """Test the initial threshold and the percentile of recent latencies."""
+    tracker = LatencyTracker(percentile=90, window=10, min_samples=5, initial=4.0)
+    for latency in (0.1, 0.2, 0.3, 0.4):
+        tracker.record(latency)
+    assert tracker.threshold() == 4.0
+    
+    for latency in (0.5, 0.6, 0.7, 0.8, 0.9, 1.0):
+        tracker.record(latency)
+    assert tracker.threshold() == 0.9
+    
+    # Old latencies leave the window
+    for _ in range(10):
+        tracker.record(0.2)
+    assert tracker.threshold() == 0.2
+    
+    print("✅ Latency tracker follows the percentile of recent latencies")
+
+
+def test_hedger_races_slow_primary():
+    """Test fast primaries, backups for slow or failing primaries and double failures."""
+    hedger = Hedger(min_delay=0.05)
+    hedger.tracker.initial = 0.1
+    calls = []
+    
+    def source(name, delay=0.0, error=None):
+        def call():
+            calls.append(name)
+            time.sleep(delay)
+            if error is not None:
+                raise error
+            return name
+        return call
+    
+    # A fast primary sends no backup
+    assert hedger.call(source("primary"), source("backup")) == ("primary", "primary")
+    assert calls == ["primary"]
+    
+    # A slow primary loses to the backup
+    calls.clear()
+    release = threading.Event()
+    started = time.monotonic()
+    result = hedger.call(lambda: release.wait(5) and "primary", source("backup"))
+    assert result == ("backup", "backup")
+    assert time.monotonic() - started < 1
+    release.set()
+    
+    # A failing primary asks the backup at once
+    calls.clear()
+    assert hedger.call(source("primary", error=ValueError("down")), source("backup", 0.01)) == ("backup", "backup")
+    assert calls == ["primary", "backup"]
+    
+    # Both failing raises the primary's error
+    with pytest.raises(ValueError, match="primary"):
+        hedger.call(source("primary", error=ValueError("primary")), source("backup", error=KeyError("backup")))
+    
+    # Only short ranges of the last days are hedged
+    today = date.today()
+    now = datetime.now()
+    assert hedger.covers(today - timedelta(days=1), today)
+    assert hedger.covers(now - timedelta(days=2), now)
+    assert hedger.covers(today - timedelta(days=1), now)
+    assert hedger.covers(now - timedelta(days=1), today)
+    assert not hedger.covers(today - timedelta(days=7), today)
+    assert not hedger.covers(today - timedelta(days=31), today - timedelta(days=30))
+    
+    print("✅ Hedger sends backups only for slow or failed primaries")
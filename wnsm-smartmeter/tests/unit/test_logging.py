@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""Tests for the queued, rotated log output."""
+
+import gzip
+import json
+import logging
+import sys
+import threading
+import time
+from pathlib import Path
+
+# Add src directory to Python path
+src_path = Path(__file__).parent.parent.parent / "src"
+sys.path.insert(0, str(src_path))
+
+from wnsm_sync.core.utils import JsonFormatter, rotating_file_handler, start_queue_listener
+
+
+class SlowHandler(logging.Handler):
+    """Handler standing in for a slow SD card."""
+    
+    def __init__(self):
+        super().__init__()
+        self.records = []
+        self.threads = set()
+    
+    def emit(self, record):
+        time.sleep(0.05)
+        self.records.append(record)
+        self.threads.add(threading.current_thread().name)
+
+
+def _logger(name, handler):
+    logger = logging.getLogger(name)
+    logger.handlers = [handler]
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    return logger
+
+
+def test_queued_logging_does_not_block():
+    """Test that slow output happens on the listener thread, not the caller's."""
+    slow = SlowHandler()
+    queue_handler, listener = start_queue_listener([slow])
+    logger = _logger("wnsm_test.queued", queue_handler)
+    
+    started = time.perf_counter()
+    for i in range(10):
+        logger.info("reading %d", i)
+    assert time.perf_counter() - started < 0.25
+    
+    listener.stop()
+    assert [record.getMessage() for record in slow.records] == [f"reading {i}" for i in range(10)]
+    assert slow.records[0].levelname == "INFO"
+    assert threading.current_thread().name not in slow.threads
+    
+    print("✅ Queued logging writes on a background thread")
+
+
+def test_rotating_file_handler_compresses_backups(tmp_path):
+    """Test size rotation with gzip compressed, bounded backups."""
+    path = tmp_path / "logs" / "wnsm-sync.log"
+    handler = rotating_file_handler(str(path), max_bytes=2000, backups=2, compress=True)
+    handler.setFormatter(JsonFormatter())
+    queue_handler, listener = start_queue_listener([handler])
+    logger = _logger("wnsm_test.rotating", queue_handler)
+    
+    for i in range(200):
+        logger.info("reading %d", i, extra={"endpoint": "bewegungsdaten"})
+    listener.stop()
+    handler.close()
+    
+    files = sorted(entry.name for entry in path.parent.iterdir())
+    assert files == ["wnsm-sync.log", "wnsm-sync.log.1.gz", "wnsm-sync.log.2.gz"]
+    assert path.stat().st_size <= 2000
+    
+    with gzip.open(path.parent / "wnsm-sync.log.1.gz", "rt") as f:
+        entries = [json.loads(line) for line in f]
+    assert entries and all(entry["endpoint"] == "bewegungsdaten" for entry in entries)
+    last = json.loads(path.read_text().splitlines()[-1])
+    assert last["message"] == "reading 199"
+    
+    print("✅ Log file rotates by size into compressed backups")
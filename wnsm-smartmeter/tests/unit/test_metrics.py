@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""Tests for the Prometheus metrics."""
+
+import sqlite3
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+import requests
+
+# Add src directory to Python path
+src_path = Path(__file__).parent.parent.parent / "src"
+sys.path.insert(0, str(src_path))
+
+from wnsm_sync.api.client import endpoint_label
+from wnsm_sync.backfill.csv_exporter import CumulativeReading
+from wnsm_sync.backfill.python_backfill import PythonBackfill
+from wnsm_sync.config.loader import WNSMConfig
+from wnsm_sync.metrics import REGISTRY, MetricsServer, Registry
+from tests.fixtures.ha_recorder_db import create_database
+
+ZP = "AT0010000000000000001000004392265"
+
+
+def test_registry_rendering():
+    """Test the text exposition of counters, gauges and histograms."""
+    registry = Registry()
+    requests_total = registry.counter("test_requests_total", "Requests", ["endpoint"])
+    requests_total.inc(endpoint="messwerte")
+    requests_total.inc(2, endpoint="messwerte")
+    assert registry.counter("test_requests_total", "Requests", ["endpoint"]) is requests_total
+    assert requests_total.value(endpoint="messwerte") == 3
+    
+    registry.gauge("test_rate", "Rate").set(12.5)
+    latency = registry.histogram("test_seconds", "Latency", buckets=(0.1, 1.0))
+    latency.observe(0.05)
+    latency.observe(0.5)
+    latency.observe(5)
+    
+    text = registry.render()
+    assert "# TYPE test_requests_total counter" in text
+    assert 'test_requests_total{endpoint="messwerte"} 3' in text
+    assert "test_rate 12.5" in text
+    assert 'test_seconds_bucket{le="0.1"} 1' in text
+    assert 'test_seconds_bucket{le="1"} 2' in text
+    assert 'test_seconds_bucket{le="+Inf"} 3' in text
+    assert "test_seconds_count 3" in text
+    assert latency.sum() == pytest.approx(5.55)
+    
+    with pytest.raises(ValueError):
+        requests_total.inc(endpoint="messwerte", status="200")
+    with pytest.raises(ValueError):
+        registry.gauge("test_requests_total", "Requests")
+    
+    print("✅ Registry rendering works correctly")
+
+
+def test_endpoint_label():
+    """Test that identifiers are kept out of the endpoint label."""
+    base = "https://service.wienernetze.at/sm/api/"
+    assert endpoint_label(base + "zaehlpunkt/customerid/AT0010000000000000001000004392265/messwerte") == "messwerte"
+    assert endpoint_label(base + "user/messwerte/bewegungsdaten?zaehlpunkt=AT001") == "bewegungsdaten"
+    assert endpoint_label("https://example.com/12345") == "other"
+    
+    print("✅ Endpoint labels work correctly")
+
+
+def test_metrics_server():
+    """Test serving the metrics over HTTP."""
+    registry = Registry()
+    registry.counter("test_served_total", "Served").inc()
+    server = MetricsServer(0, host="127.0.0.1", registry=registry).start()
+    try:
+        response = requests.get(f"http://127.0.0.1:{server.port}/metrics", timeout=5)
+        assert response.status_code == 200
+        assert response.headers["Content-Type"].startswith("text/plain; version=0.0.4")
+        assert "test_served_total 1" in response.text
+        assert requests.get(f"http://127.0.0.1:{server.port}/other", timeout=5).status_code == 404
+    finally:
+        server.stop()
+    
+    print("✅ Metrics server works correctly")
+
+
+def test_backfill_metrics(tmp_path):
+    """Test that a backfill records rows, phases and lock wait."""
+    db_path = tmp_path / "home-assistant_v2.db"
+    metadata_ids = create_database(str(db_path), [f"sensor.wnsm_daily_total_{ZP[-8:]}"])
+    config = WNSMConfig(
+        wnsm_username="test", wnsm_password="test", zp=ZP, mqtt_host="localhost",
+        ha_database_path=str(db_path)
+    )
+    backfill = PythonBackfill(config)
+    backfill.import_metadata_id = str(next(iter(metadata_ids.values())))
+    
+    rows = REGISTRY.get("wnsm_backfill_rows_total")
+    lock_wait = REGISTRY.get("wnsm_backfill_lock_wait_seconds")
+    rows_before = rows.value(table="statistics")
+    waits_before = lock_wait.count()
+    
+    start = datetime(2024, 3, 1)
+    readings = [
+        CumulativeReading(timestamp=start + timedelta(minutes=15 * i), cumulative_kwh=i * 0.1)
+        for i in range(8)
+    ]
+    assert backfill._insert_statistics(readings)
+    
+    assert rows.value(table="statistics") - rows_before == 2
+    assert lock_wait.count() == waits_before + 1
+    assert REGISTRY.get("wnsm_backfill_duration_seconds").count(phase="commit") >= 1
+    conn = sqlite3.connect(db_path)
+    assert conn.execute("SELECT COUNT(*) FROM statistics").fetchone()[0] == 2
+    conn.close()
+    
+    print("✅ Backfill metrics work correctly")
+
+
+def test_metrics_port_validation():
+    """Test validation of the metrics port."""
+    config = WNSMConfig(
+        wnsm_username="test", wnsm_password="test", zp=ZP, mqtt_host="localhost", metrics_port=9464
+    )
+    assert config.metrics_port == 9464
+    with pytest.raises(ValueError):
+        WNSMConfig(wnsm_username="test", wnsm_password="test", zp=ZP, mqtt_host="localhost", metrics_port=70000)
+    
+    print("✅ Metrics port validation works correctly")
@@ -5,13 +5,18 @@ import sys
 from pathlib import Path
 from unittest.mock import Mock, patch
 
+import paho.mqtt.client as mqtt
+import pytest
+
 # Add src directory to Python path
 src_path = Path(__file__).parent.parent.parent / "src"
 sys.path.insert(0, str(src_path))
 
 from wnsm_sync.config.loader import WNSMConfig
 from wnsm_sync.mqtt.client import MQTTClient
-from wnsm_sync.mqtt.discovery import HomeAssistantDiscovery
+from wnsm_sync.mqtt.discovery import DIAGNOSTIC_SENSORS, HomeAssistantDiscovery
+from wnsm_sync.mqtt.rate_limit import Priority, PublishRateLimiter, TokenBucket
+from wnsm_sync.core.sync import WNSMSync
 
 
 def test_mqtt_host_parsing():
@@ -185,8 +190,8 @@ def test_discovery_all_configs():
     discovery = HomeAssistantDiscovery(config)
     all_configs = discovery.get_all_discovery_configs()
     
-    # Should have 3 sensors: energy, total, status
-    assert len(all_configs) == 3
+    # Should have 3 sensors (energy, total, status) plus the diagnostic sensors
+    assert len(all_configs) == 3 + len(DIAGNOSTIC_SENSORS)
     
     # Check that all configs have required fields
     for config_item in all_configs:
@@ -197,6 +202,296 @@ def test_discovery_all_configs():
     print("✅ All discovery configurations work correctly")
 
 
+def test_discovery_diagnostic_sensors():
+    """Test discovery of the performance diagnostic sensors."""
+    
+    config = WNSMConfig(
+        wnsm_username="test",
+        wnsm_password="test",
+        zp="AT0010000000000000001000004392265",
+        mqtt_host="localhost"
+    )
+    
+    diagnostic_configs = HomeAssistantDiscovery(config).create_diagnostic_sensor_configs()
+    assert len(diagnostic_configs) == len(DIAGNOSTIC_SENSORS)
+    
+    cycle = diagnostic_configs[0]
+    assert cycle["topic"] == "homeassistant/sensor/wnsm_cycle_seconds_04392265/config"
+    assert cycle["config"]["entity_category"] == "diagnostic"
+    assert cycle["config"]["state_topic"] == "smartmeter/energy/state/diagnostics"
+    # Stale values are shown unavailable once the add-on goes offline
+    assert cycle["config"]["availability"]["topic"] == config.availability_topic
+    assert cycle["config"]["value_template"] == "{{ value_json.cycle_seconds }}"
+    assert cycle["config"]["device_class"] == "duration"
+    
+    # Can be switched off
+    config.diagnostic_sensors = False
+    assert len(HomeAssistantDiscovery(config).get_all_discovery_configs()) == 3
+    
+    print("✅ Diagnostic sensor discovery works correctly")
+
+
+def test_discovery_batched_payload_templates():
+    """Test discovery templates for batched payload mode."""
+    
+    config = WNSMConfig(
+        wnsm_username="test",
+        wnsm_password="test",
+        zp="AT0010000000000000001000004392265",
+        mqtt_host="localhost",
+        mqtt_payload_mode="hour"
+    )
+    
+    config_data = HomeAssistantDiscovery(config).create_energy_sensor_config()["config"]
+    assert config_data["value_template"] == "{{ value_json.latest }}"
+    assert "value_json.deltas" in config_data["json_attributes_template"]
+    assert "value_json.offsets" in config_data["json_attributes_template"]
+    
+    print("✅ Batched discovery templates work correctly")
+
+
+@patch('paho.mqtt.publish.single')
+def test_discovery_published_retained(mock_publish):
+    """Test that discovery configurations are retained on the broker."""
+    
+    config = WNSMConfig(
+        wnsm_username="test",
+        wnsm_password="test",
+        zp="AT0010000000000000001000004392265",
+        mqtt_host="localhost"
+    )
+    
+    client = MQTTClient(config)
+    discovery_config = HomeAssistantDiscovery(config).create_energy_sensor_config()
+    
+    assert client.publish_discovery(discovery_config) is True
+    assert mock_publish.call_args[1]['retain'] is True
+    
+    print("✅ Discovery configurations are published retained")
+
+
+def test_setup_discovery_skips_unchanged_configs(tmp_path):
+    """Test that discovery is only re-sent when its content hash changes."""
+    
+    config = WNSMConfig(
+        wnsm_username="test",
+        wnsm_password="test",
+        zp="AT0010000000000000001000004392265",
+        mqtt_host="localhost",
+        discovery_state_file=str(tmp_path / "discovery_state.json")
+    )
+    
+    sync = WNSMSync(config)
+    sync.mqtt_client = Mock()
+    sync.mqtt_client.publish_discovery.return_value = True
+    
+    # First run publishes everything
+    assert sync.setup_discovery() is True
+    assert sync.mqtt_client.publish_discovery.call_count == len(sync.discovery.get_all_discovery_configs())
+    
+    # Second run with identical configs publishes nothing
+    sync.mqtt_client.publish_discovery.reset_mock()
+    assert sync.setup_discovery() is True
+    sync.mqtt_client.publish_discovery.assert_not_called()
+    
+    # A changed config is re-sent on its own
+    sync.config.mqtt_topic = "smartmeter/other"
+    assert sync.setup_discovery() is True
+    assert sync.mqtt_client.publish_discovery.call_count == len(sync.discovery.get_all_discovery_configs())
+    
+    print("✅ Discovery publishing is hash-gated")
+
+
+def test_setup_discovery_removes_stale_configs(tmp_path):
+    """Test that configs of entities no longer generated are removed from the broker."""
+    
+    config = WNSMConfig(
+        wnsm_username="test",
+        wnsm_password="test",
+        zp="AT0010000000000000001000004392265",
+        mqtt_host="localhost",
+        diagnostic_sensors=True,
+        discovery_state_file=str(tmp_path / "discovery_state.json")
+    )
+    
+    sync = WNSMSync(config)
+    sync.mqtt_client = Mock()
+    sync.mqtt_client.publish_discovery.return_value = True
+    sync.mqtt_client.remove_discovery.return_value = True
+    sync.setup_discovery()
+    with_diagnostics = sync.discovery_topics()
+    sync.mqtt_client.remove_discovery.assert_not_called()
+    
+    # Turning diagnostics off removes their entities and forgets their hashes
+    sync.config.diagnostic_sensors = False
+    assert sync.setup_discovery() is True
+    stale = with_diagnostics - sync.discovery_topics()
+    assert stale
+    assert {call.args[0] for call in sync.mqtt_client.remove_discovery.call_args_list} == stale
+    assert set(sync.discovery_state.load()) == sync.discovery_topics()
+    
+    # A failed removal is retried on the next run
+    sync.config.diagnostic_sensors = True
+    sync.setup_discovery()
+    sync.config.diagnostic_sensors = False
+    sync.mqtt_client.remove_discovery.reset_mock()
+    sync.mqtt_client.remove_discovery.return_value = False
+    sync.setup_discovery()
+    assert set(sync.discovery_state.load()) == with_diagnostics
+    sync.mqtt_client.remove_discovery.return_value = True
+    sync.setup_discovery()
+    assert set(sync.discovery_state.load()) == sync.discovery_topics()
+    
+    print("✅ Stale discovery configurations are removed")
+
+
+def test_ha_birth_message_forces_discovery(tmp_path):
+    """Test that a live Home Assistant birth message re-sends discovery."""
+    
+    config = WNSMConfig(
+        wnsm_username="test",
+        wnsm_password="test",
+        zp="AT0010000000000000001000004392265",
+        mqtt_host="localhost",
+        discovery_state_file=str(tmp_path / "discovery_state.json")
+    )
+    
+    sync = WNSMSync(config)
+    sync.mqtt_client = Mock()
+    sync.mqtt_client.publish_discovery.return_value = True
+    sync.setup_discovery()
+    sync.mqtt_client.publish_discovery.reset_mock()
+    
+    # Retained replays and offline messages are ignored
+    sync._on_ha_status("online", retained=True)
+    sync._on_ha_status("offline", retained=False)
+    sync.mqtt_client.publish_discovery.assert_not_called()
+    
+    sync._on_ha_status("online", retained=False)
+    assert sync.mqtt_client.publish_discovery.call_count == len(sync.discovery.get_all_discovery_configs())
+    
+    print("✅ Home Assistant birth message re-publishes discovery")
+
+
+@patch('paho.mqtt.client.Client')
+def test_availability_last_will_and_connack(mock_client_class):
+    """Test that availability is handled by the persistent session."""
+    
+    config = WNSMConfig(
+        wnsm_username="test",
+        wnsm_password="test",
+        zp="AT0010000000000000001000004392265",
+        mqtt_host="localhost"
+    )
+    
+    client = MQTTClient(config)
+    paho_client = mock_client_class.return_value
+    
+    # Simulate the broker acknowledging the connection
+    paho_client.connect_async.side_effect = lambda *args, **kwargs: client._on_connect(paho_client, None, {}, 0)
+    
+    assert client.connect(timeout=1) is True
+    paho_client.will_set.assert_called_once_with(
+        "smartmeter/energy/state/availability", "offline", qos=1, retain=True
+    )
+    paho_client.publish.assert_any_call(
+        "smartmeter/energy/state/availability", "online", qos=1, retain=True
+    )
+    
+    # Clean shutdown publishes "offline" explicitly since the will is discarded
+    client.disconnect()
+    paho_client.publish.assert_called_with(
+        "smartmeter/energy/state/availability", "offline", qos=1, retain=True
+    )
+    paho_client.disconnect.assert_called_once()
+    
+    print("✅ Availability uses Last Will and CONNACK")
+
+
+def test_mqtt_v5_topic_aliases_and_expiry():
+    """Test MQTT v5 topic alias assignment and message expiry."""
+    
+    config = WNSMConfig(
+        wnsm_username="test",
+        wnsm_password="test",
+        zp="AT0010000000000000001000004392265",
+        mqtt_host="localhost",
+        mqtt_protocol="5",
+        mqtt_message_expiry=600
+    )
+    
+    client = MQTTClient(config)
+    client._client = Mock()
+    client._client.publish.return_value = Mock(rc=mqtt.MQTT_ERR_SUCCESS)
+    client._on_connect(Mock(), None, {}, 0, Mock(TopicAliasMaximum=10))
+    
+    def publish(topic, retain=False):
+        client._publish(topic, "{}", retain)
+        args, kwargs = client._client.publish.call_args
+        return args[0], kwargs["properties"]
+    
+    reading_topic = "smartmeter/energy/state/15min"
+    
+    # A failed first publish does not register the alias
+    client._client.publish.return_value = Mock(rc=mqtt.MQTT_ERR_NO_CONN)
+    with pytest.raises(ConnectionError):
+        publish(reading_topic)
+    client._client.publish.return_value = Mock(rc=mqtt.MQTT_ERR_SUCCESS)
+    
+    # The first sent publish registers the alias together with the full topic
+    topic, properties = publish(reading_topic)
+    assert topic == reading_topic
+    assert properties.TopicAlias == 1
+    assert properties.MessageExpiryInterval == 600
+    
+    # Later publishes only carry the alias
+    topic, properties = publish(reading_topic)
+    assert topic == ""
+    assert properties.TopicAlias == 1
+    
+    # Retained status messages get an alias but never expire
+    topic, properties = publish("smartmeter/energy/state/status", retain=True)
+    assert properties.TopicAlias == 2
+    assert not hasattr(properties, "MessageExpiryInterval")
+    
+    # Aliases are per connection and reset on reconnect
+    client._on_connect(Mock(), None, {}, 0, Mock(TopicAliasMaximum=0))
+    topic, properties = publish(reading_topic, retain=True)
+    assert topic == reading_topic
+    assert properties is None
+    
+    print("✅ MQTT v5 topic aliases and expiry work correctly")
+
+
+@patch('wnsm_sync.mqtt.rate_limit.time.sleep')
+def test_token_bucket_rate_shaping(mock_sleep):
+    """Test token-bucket throttling of bulk messages."""
+    
+    bucket = TokenBucket(rate=10)
+    
+    # The initial burst is free, then callers wait for refills
+    waits = [bucket.reserve() for _ in range(12)]
+    assert waits[:10] == [0.0] * 10
+    assert 0.09 < waits[10] <= 0.1
+    assert 0.19 < waits[11] <= 0.2
+    
+    limiter = PublishRateLimiter(messages_per_second=5, bytes_per_second=1000)
+    for _ in range(5):
+        assert limiter.acquire(100) == 0.0
+    
+    # Control messages never wait, even with the buckets drained
+    assert limiter.acquire(100, Priority.CONTROL) == 0.0
+    mock_sleep.assert_not_called()
+    
+    # Bulk messages are throttled and the time is reported
+    assert limiter.acquire(100) > 0
+    assert limiter.throttled_messages == 1
+    assert limiter.throttled_seconds > 0
+    mock_sleep.assert_called_once()
+    
+    print("✅ Token-bucket rate shaping works correctly")
+
+
 if __name__ == "__main__":
     print("Testing MQTT functionality...")
     
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""Tests for the chunked import pipeline."""
+
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add src directory to Python path
+src_path = Path(__file__).parent.parent.parent / "src"
+sys.path.insert(0, str(src_path))
+
+from wnsm_sync.core.pipeline import ChunkedImport, split_range
+from wnsm_sync.data.models import EnergyData, EnergyReading
+
+START = datetime(2024, 1, 1)
+
+
+def make_chunk(date_from: datetime, date_until: datetime) -> EnergyData:
+    """Create one reading per hour for a range."""
+    readings = []
+    timestamp = date_from
+    while timestamp < date_until:
+        readings.append(EnergyReading(timestamp=timestamp, value_kwh=0.25))
+        timestamp += timedelta(hours=1)
+    return EnergyData(readings=readings, zaehlpunkt="AT001", date_from=date_from, date_until=date_until)
+
+
+def test_split_range():
+    """Test that ranges are split into consecutive chunks."""
+    ranges = split_range(START, START + timedelta(days=75), 30)
+    
+    assert [(end - start).days for start, end in ranges] == [30, 30, 15]
+    assert all(ranges[i][1] == ranges[i + 1][0] for i in range(len(ranges) - 1))
+    
+    print("✅ Date range split into consecutive chunks")
+
+
+def test_stages_overlap():
+    """Test that fetching the next chunk overlaps writing the previous one."""
+    written = []
+    
+    def fetch(date_from, date_until):
+        time.sleep(0.1)
+        return make_chunk(date_from, date_until)
+    
+    def write(energy_data):
+        time.sleep(0.1)
+        written.append(energy_data.date_from)
+        return True
+    
+    ranges = split_range(START, START + timedelta(days=8), 1)
+    report = ChunkedImport(fetch, lambda raw: raw, write).run(ranges)
+    
+    assert report.success
+    assert report.chunks == 8
+    assert report.readings == 8 * 24
+    assert written == [start for start, _ in ranges]
+    # Sequential execution would take 1.6 seconds
+    assert report.wall_seconds < 1.3
+    
+    stats = report.to_dict()["stages"]
+    assert set(stats) == {"fetch", "process", "write"}
+    assert stats["fetch"]["utilization"] > 0.5 and stats["write"]["utilization"] > 0.5
+    
+    print("✅ Fetch and write stages overlap")
+
+
+def test_backpressure_bounds_buffered_chunks():
+    """Test that a slow writer blocks the fetcher instead of buffering everything."""
+    lock = threading.Lock()
+    in_flight = [0]
+    max_in_flight = [0]
+    
+    def fetch(date_from, date_until):
+        with lock:
+            in_flight[0] += 1
+            max_in_flight[0] = max(max_in_flight[0], in_flight[0])
+        return make_chunk(date_from, date_until)
+    
+    def write(energy_data):
+        time.sleep(0.05)
+        with lock:
+            in_flight[0] -= 1
+        return True
+    
+    ranges = split_range(START, START + timedelta(days=20), 1)
+    report = ChunkedImport(fetch, lambda raw: raw, write, queue_size=1).run(ranges)
+    
+    assert report.success and report.chunks == 20
+    # One chunk per queue, one held by each stage
+    assert max_in_flight[0] <= 5
+    assert report.stages["fetch"].blocked_seconds > 0.3
+    assert report.bottleneck == "write"
+    
+    print("✅ Backpressure keeps buffered chunks bounded")
+
+
+def test_write_failure_stops_import():
+    """Test that a failed write aborts the remaining chunks."""
+    fetched = []
+    
+    def fetch(date_from, date_until):
+        fetched.append(date_from)
+        return make_chunk(date_from, date_until)
+    
+    def write(energy_data):
+        return energy_data.date_from < START + timedelta(days=2)
+    
+    ranges = split_range(START, START + timedelta(days=30), 1)
+    report = ChunkedImport(fetch, lambda raw: raw, write, queue_size=1).run(ranges)
+    
+    assert not report.success
+    assert report.error.startswith("write")
+    assert report.chunks == 2
+    assert len(fetched) < 30
+    
+    print("✅ Failed write stops the import")
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""Tests for the cycle profiler."""
+
+import pstats
+import sys
+import threading
+import tracemalloc
+from pathlib import Path
+
+# Add src directory to Python path
+src_path = Path(__file__).parent.parent.parent / "src"
+sys.path.insert(0, str(src_path))
+
+from wnsm_sync.core.profiling import CycleProfiler
+
+
+def _busy_stage():
+    """Allocates and burns a little CPU."""
+    return sum(len(str(i)) for i in range(20000))
+
+
+def test_profiler_writes_stats_from_worker_threads(tmp_path):
+    """Test that stages profiled in other threads end up in one file."""
+    profiler = CycleProfiler(str(tmp_path), cycles=1)
+    assert profiler.start_cycle() is True
+    assert tracemalloc.is_tracing()
+    
+    worker = threading.Thread(target=profiler.wrap("fetch", _busy_stage))
+    worker.start()
+    worker.join()
+    
+    pstats_path = profiler.finish_cycle()
+    assert pstats_path is not None
+    assert not tracemalloc.is_tracing()
+    
+    functions = {name for _, _, name in pstats.Stats(pstats_path).stats}
+    assert "_busy_stage" in functions
+    summary = Path(pstats_path).with_suffix(".txt").read_text()
+    assert "Traced memory" in summary
+    assert "allocation sites" in summary
+    
+    # Only the requested number of cycles is profiled
+    assert profiler.start_cycle() is False
+    
+    print("✅ Profiler merges stage profiles from worker threads")
+
+
+def test_profiler_stage_filter_and_rotation(tmp_path):
+    """Test stage filtering, on-demand requests and file rotation."""
+    profiler = CycleProfiler(str(tmp_path), keep=2, stages={"sinks"})
+    assert profiler.start_cycle() is False
+    
+    profiler.request(3)
+    for _ in range(3):
+        assert profiler.start_cycle() is True
+        profiler.wrap("fetch", _busy_stage)()
+        profiler.wrap("sinks", _busy_stage)()
+        profiler.finish_cycle()
+    assert profiler.remaining == 0
+    
+    assert len(list(tmp_path.glob("cycle-*.txt"))) == 2
+    assert len(list(tmp_path.glob("cycle-*.pstats"))) == 2
+    
+    # Outside a profiled cycle the wrapper is a plain call
+    assert profiler.wrap("sinks", _busy_stage)() == _busy_stage()
+    
+    print("✅ Profiler filters stages and rotates its files")
+
+
+def test_profiler_labels_shared_peak(tmp_path):
+    """Test that overlapping profiled cycles report the peak as process-wide."""
+    first = CycleProfiler(str(tmp_path / "first"), cycles=2)
+    second = CycleProfiler(str(tmp_path / "second"), cycles=1)
+    
+    assert first.start_cycle() is True
+    assert second.start_cycle() is True
+    _busy_stage()
+    second.finish_cycle()
+    first.finish_cycle()
+    for directory in ("first", "second"):
+        summary = next((tmp_path / directory).glob("cycle-*.txt")).read_text()
+        assert "process-wide peak" in summary
+    
+    # A cycle profiled alone reports its own peak
+    assert first.start_cycle() is True
+    first.finish_cycle()
+    summaries = sorted((tmp_path / "first").glob("cycle-*.txt"))
+    assert "process-wide" not in summaries[-1].read_text()
+    assert "peak" in summaries[-1].read_text()
+    
+    print("✅ Profiler labels the peak of overlapping cycles as process-wide")
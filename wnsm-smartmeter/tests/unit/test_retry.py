@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""Tests for the retry policy engine."""
+
+import random
+import sys
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from pathlib import Path
+
+import pytest
+import requests
+
+# Add src directory to Python path
+src_path = Path(__file__).parent.parent.parent / "src"
+sys.path.insert(0, str(src_path))
+
+from wnsm_sync.api.errors import SmartmeterConnectionError, SmartmeterLoginError, SmartmeterQueryError
+from wnsm_sync.core.retry import ErrorClass, RetryPolicy, classify, parse_retry_after
+
+
+def _http_error(status, retry_after=None):
+    response = requests.Response()
+    response.status_code = status
+    if retry_after is not None:
+        response.headers["Retry-After"] = retry_after
+    return requests.exceptions.HTTPError(f"HTTP {status}", response=response)
+
+
+def _wrapped(cause, error_type=SmartmeterConnectionError):
+    """Raise ``cause`` wrapped like the API client does and return the outer error."""
+    try:
+        try:
+            raise cause
+        except Exception as e:
+            raise error_type(f"request failed: {e}") from e
+    except Exception as outer:
+        return outer
+
+
+def test_classify_errors():
+    """Test classification through the exception chain."""
+    assert classify(requests.exceptions.ReadTimeout()).error_class is ErrorClass.TIMEOUT
+    assert classify(_wrapped(ConnectionResetError())).error_class is ErrorClass.CONNECTION
+    assert classify(_wrapped(_http_error(503))).error_class is ErrorClass.SERVER
+    assert classify(_wrapped(_http_error(404))).error_class is ErrorClass.CLIENT
+    assert classify(_wrapped(_http_error(401))).error_class is ErrorClass.AUTH
+    assert classify(SmartmeterConnectionError("HTTP 502", code=502)).error_class is ErrorClass.SERVER
+    assert classify(SmartmeterQueryError("bad range")).error_class is ErrorClass.CLIENT
+    assert classify(ValueError("unexpected")).error_class is ErrorClass.UNKNOWN
+    
+    rate_limited = classify(_wrapped(_http_error(429, retry_after="7")))
+    assert rate_limited.error_class is ErrorClass.RATE_LIMITED
+    assert rate_limited.status == 429
+    assert rate_limited.retry_after == 7.0
+    assert rate_limited.retryable
+    
+    # A login rejected by the server is final, a login that timed out is not
+    assert not classify(SmartmeterLoginError("Check username/password")).retryable
+    timed_out_login = _wrapped(requests.exceptions.ConnectTimeout(), SmartmeterLoginError)
+    assert classify(timed_out_login).error_class is ErrorClass.TIMEOUT
+    
+    later = datetime.now(timezone.utc) + timedelta(seconds=120)
+    assert 100 < parse_retry_after(format_datetime(later, usegmt=True)) <= 120
+    assert parse_retry_after("soon") is None
+    
+    print("✅ Errors are classified by their causes")
+
+
+class Flaky:
+    """Callable failing with the given errors before it succeeds."""
+    
+    def __init__(self, *errors):
+        self.errors = list(errors)
+        self.calls = 0
+    
+    def __call__(self):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return "data"
+
+
+def _policy(**kwargs):
+    sleeps = []
+    kwargs.setdefault("base_delay", 1.0)
+    policy = RetryPolicy(sleep=sleeps.append, rng=random.Random(1), **kwargs)
+    return policy, sleeps
+
+
+def test_retry_policy_backoff_and_retry_after():
+    """Test that retryable errors are retried with jitter and Retry-After is honored."""
+    policy, sleeps = _policy(retries=4, max_delay=5.0)
+    func = Flaky(requests.exceptions.ReadTimeout(), _http_error(503), _http_error(502), _http_error(500))
+    assert policy.call("bewegungsdaten", func) == "data"
+    assert func.calls == 5
+    assert len(sleeps) == 4
+    assert all(1.0 <= delay <= 5.0 for delay in sleeps)
+    assert len(set(sleeps)) == 4
+    
+    policy, sleeps = _policy(retries=2, max_delay=5.0)
+    assert policy.call("bewegungsdaten", Flaky(_http_error(429, retry_after="30"))) == "data"
+    assert sleeps == [30.0]
+    
+    print("✅ Retries back off with decorrelated jitter and honor Retry-After")
+
+
+def test_retry_policy_stops_on_permanent_errors_and_budgets():
+    """Test that permanent errors and exhausted budgets end retrying right away."""
+    policy, sleeps = _policy(retries=5)
+    func = Flaky(_wrapped(_http_error(401), SmartmeterLoginError))
+    with pytest.raises(SmartmeterLoginError):
+        policy.call("login", func)
+    assert func.calls == 1 and sleeps == []
+    
+    # Per endpoint: two retries per cycle, other endpoints are unaffected
+    policy, sleeps = _policy(retries=5, endpoint_retries=2)
+    with pytest.raises(requests.exceptions.HTTPError):
+        policy.call("bewegungsdaten", Flaky(*[_http_error(503)] * 6))
+    assert len(sleeps) == 2
+    assert policy.call("zaehlpunkte", Flaky(_http_error(503))) == "data"
+    with pytest.raises(requests.exceptions.HTTPError):
+        policy.call("bewegungsdaten", Flaky(_http_error(503)))
+    policy.start_cycle()
+    assert policy.call("bewegungsdaten", Flaky(_http_error(503))) == "data"
+    
+    # Per cycle: a Retry-After beyond the remaining budget is not waited for
+    policy, sleeps = _policy(retries=5, cycle_budget=60)
+    with pytest.raises(requests.exceptions.HTTPError):
+        policy.call("bewegungsdaten", Flaky(_http_error(429, retry_after="3600")))
+    assert sleeps == []
+    assert policy.remaining_budget == 60
+    
+    # A cancelled cycle stops waiting
+    cancelled = RetryPolicy(retries=5, base_delay=1.0, sleep=lambda delay: True)
+    func = Flaky(requests.exceptions.ReadTimeout(), requests.exceptions.ReadTimeout())
+    with pytest.raises(requests.exceptions.ReadTimeout):
+        cancelled.call("bewegungsdaten", func)
+    assert func.calls == 1
+    
+    print("✅ Permanent errors, budgets and cancellation stop retrying")
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""Tests for the adaptive sync scheduler."""
+
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add src directory to Python path
+src_path = Path(__file__).parent.parent.parent / "src"
+sys.path.insert(0, str(src_path))
+
+from wnsm_sync.config.loader import WNSMConfig
+from wnsm_sync.core.scheduler import AdaptiveScheduler
+
+ZP = "AT0010000000000000001000004392265"
+
+
+def make_scheduler(tmp_path) -> AdaptiveScheduler:
+    """Create a scheduler with its state in a temporary directory."""
+    config = WNSMConfig(
+        wnsm_username="test",
+        wnsm_password="test",
+        zp=ZP,
+        mqtt_host="localhost",
+        update_interval=86400,
+        min_poll_interval=900,
+        schedule_state_file=str(tmp_path / "schedule_state.json")
+    )
+    return AdaptiveScheduler(config)
+
+
+def test_backoff_while_learning(tmp_path):
+    """Test exponential backoff before an arrival window is known."""
+    
+    scheduler = make_scheduler(tmp_path)
+    now = datetime(2025, 1, 10, 12, 0)
+    
+    # First observation sets the watermark but is not an arrival
+    assert scheduler.record_cycle(ZP, datetime(2025, 1, 9, 23, 45), now) is True
+    assert scheduler.expected_window(ZP) is None
+    
+    delays = []
+    for i in range(1, 5):
+        scheduler.record_cycle(ZP, datetime(2025, 1, 9, 23, 45), now)
+        decision = scheduler.next_poll(ZP, now)
+        delays.append((decision.next_poll - now).total_seconds())
+        assert "learning" in decision.reason
+    
+    assert delays == [1800, 3600, 7200, 14400]
+    
+    print("✅ Scheduler backs off while learning")
+
+
+def test_polls_around_learned_window(tmp_path):
+    """Test polling around the learned arrival window."""
+    
+    scheduler = make_scheduler(tmp_path)
+    day = datetime(2025, 1, 1)
+    scheduler.record_cycle(ZP, day - timedelta(minutes=15), day)
+    
+    # New days consistently show up around 07:00
+    for i in range(1, 6):
+        arrival = day + timedelta(days=i, hours=7, minutes=i)
+        assert scheduler.record_cycle(ZP, arrival.replace(hour=0) - timedelta(minutes=15), arrival)
+    
+    start, end = scheduler.expected_window(ZP)
+    assert start <= 7 * 3600 <= end
+    
+    # After new data, sleep until tomorrow's window
+    now = datetime(2025, 1, 6, 7, 30)
+    decision = scheduler.next_poll(ZP, now)
+    assert decision.next_poll.date() == datetime(2025, 1, 7).date()
+    assert "new data received" in decision.reason
+    
+    # Before the window with nothing new yet, wait for the window
+    scheduler.record_cycle(ZP, datetime(2025, 1, 5, 23, 45), datetime(2025, 1, 7, 3, 0))
+    decision = scheduler.next_poll(ZP, datetime(2025, 1, 7, 3, 0))
+    assert decision.next_poll.hour in (6, 7)
+    assert "waiting for expected window" in decision.reason
+    
+    # Inside the window, poll at the minimum interval
+    inside = datetime(2025, 1, 7, 7, 2)
+    decision = scheduler.next_poll(ZP, inside)
+    assert (decision.next_poll - inside).total_seconds() == 900
+    assert "inside expected window" in decision.reason
+    
+    # State survives a restart
+    assert make_scheduler(tmp_path).expected_window(ZP) == (start, end)
+    
+    print("✅ Scheduler polls around the learned window")
+
+
+def test_window_spanning_midnight(tmp_path):
+    """Test that arrivals on both sides of midnight give a window around midnight."""
+    
+    scheduler = make_scheduler(tmp_path)
+    day = datetime(2025, 1, 1)
+    scheduler.record_cycle(ZP, day - timedelta(minutes=15), day)
+    
+    # New days show up at 23:50, 00:10, 23:55 and 00:05
+    for i, offset in enumerate((-10, 10, -5, 5), start=1):
+        arrival = day + timedelta(days=i, minutes=offset)
+        assert scheduler.record_cycle(ZP, day + timedelta(days=i - 1, hours=23, minutes=45), arrival)
+    
+    start, end = scheduler.expected_window(ZP)
+    assert start > 22 * 3600 and 86400 < end < 86400 + 2 * 3600
+    
+    # Shortly after midnight without new data, yesterday's window is still open
+    scheduler.record_cycle(ZP, None, datetime(2025, 1, 6, 0, 2))
+    decision = scheduler.next_poll(ZP, datetime(2025, 1, 6, 0, 2))
+    assert "inside expected window" in decision.reason
+    
+    # At noon, wait for tonight's window
+    decision = scheduler.next_poll(ZP, datetime(2025, 1, 6, 12, 0))
+    assert decision.next_poll.date() == datetime(2025, 1, 6).date() and decision.next_poll.hour >= 22
+    
+    print("✅ Scheduler handles windows spanning midnight")
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""Tests for the adaptive API throttle."""
+
+import sys
+import threading
+import time
+from pathlib import Path
+
+# Add src directory to Python path
+src_path = Path(__file__).parent.parent.parent / "src"
+sys.path.insert(0, str(src_path))
+
+from wnsm_sync.api.throttle import AdaptiveThrottle
+from wnsm_sync.rate_limit import TokenBucket
+
+
+def _request(throttle, status=200, latency=0.1, **kwargs):
+    throttle.acquire()
+    throttle.release("bewegungsdaten", latency, status, **kwargs)
+
+
+def test_throttle_grows_and_backs_off():
+    """Test additive increase on healthy responses and multiplicative decrease on overload."""
+    throttle = AdaptiveThrottle(max_concurrency=8, max_rate=100, cooldown=60)
+    assert throttle.limit == 4
+    
+    for _ in range(40):
+        _request(throttle)
+    assert throttle.limit == 8
+    assert throttle.rate == 100
+    
+    # One decrease per cooldown, however many concurrent requests failed
+    _request(throttle, status=503)
+    _request(throttle, status=429)
+    assert throttle.limit == 4
+    assert throttle.rate == 50
+    
+    throttle.cooldown = 0
+    _request(throttle, status=None, timed_out=True)
+    assert throttle.limit == 2
+    assert throttle.rate == 25
+    
+    # Healthy responses win the rate back
+    for _ in range(15):
+        _request(throttle)
+    assert throttle.rate == 100
+    
+    # Latency well above the endpoint's average counts as overload, below the floor it does not
+    throttle = AdaptiveThrottle(max_concurrency=8, max_rate=100, latency_floor=1.0, cooldown=0)
+    for _ in range(10):
+        _request(throttle, latency=0.5)
+    _request(throttle, latency=0.9)
+    assert throttle.limit > 4
+    limit = throttle.limit
+    _request(throttle, latency=3.0)
+    assert throttle.limit == limit / 2
+    
+    print("✅ Throttle grows additively and backs off multiplicatively")
+
+
+def test_throttle_bounds_concurrency_and_honors_retry_after():
+    """Test that concurrent requests stay within the limit and 429 pauses all requests."""
+    throttle = AdaptiveThrottle(max_concurrency=2, max_rate=1000)
+    throttle.limit = 2
+    active = []
+    peak = []
+    lock = threading.Lock()
+    
+    def request():
+        throttle.acquire()
+        with lock:
+            active.append(1)
+            peak.append(len(active))
+        time.sleep(0.05)
+        with lock:
+            active.pop()
+        throttle.release("bewegungsdaten", 0.05, 200)
+    
+    threads = [threading.Thread(target=request) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert max(peak) == 2
+    
+    _request(throttle, status=429, retry_after=0.3)
+    assert throttle.acquire() >= 0.25
+    throttle.release("bewegungsdaten", 0.05, 200)
+    
+    print("✅ Throttle bounds concurrency and pauses on Retry-After")
+
+
+def test_token_bucket_set_rate_keeps_accrued_tokens():
+    """Test that changing the rate keeps the tokens accrued at the old rate."""
+    bucket = TokenBucket(rate=100, capacity=10)
+    for _ in range(10):
+        bucket.reserve()
+    time.sleep(0.05)
+    
+    # About five tokens accrued at 100/s before the rate dropped, refills now take a second each
+    bucket.set_rate(1)
+    assert bucket.rate == 1.0
+    assert bucket.reserve(4) == 0.0
+    assert bucket.reserve(10) >= 3.9
+    
+    try:
+        bucket.set_rate(0)
+        assert False, "a zero rate must be rejected"
+    except ValueError:
+        pass
+    
+    print("✅ Token bucket changes its rate under the lock")
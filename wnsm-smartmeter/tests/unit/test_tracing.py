@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""Tests for the cycle tracing spans."""
+
+import json
+import sys
+import threading
+from pathlib import Path
+
+# Add src directory to Python path
+src_path = Path(__file__).parent.parent.parent / "src"
+sys.path.insert(0, str(src_path))
+
+from wnsm_sync.tracing import NOOP_SPAN, TraceExporter, bind_context, current_span, record_span, span, start_trace
+from wnsm_sync.tracing.timeline import render
+
+
+def test_spans_nest_across_threads():
+    """Test parent links, error status and context propagation into threads."""
+    with start_trace("cycle", zaehlpunkt="AT0001") as root:
+        with span("fetch", days=1) as fetch:
+            record_span("http", 0.25, status=200)
+            fetch.set_attribute("points", 96)
+        
+        worker = threading.Thread(target=bind_context(lambda: record_span("sqlite.transaction", 0.1)))
+        worker.start()
+        worker.join()
+        
+        try:
+            with span("publish"):
+                raise RuntimeError("broker down")
+        except RuntimeError:
+            pass
+    
+    spans = {span.name: span for span in root.trace.spans}
+    assert set(spans) == {"cycle", "fetch", "http", "sqlite.transaction", "publish"}
+    assert spans["cycle"].parent_id is None
+    assert spans["fetch"].parent_id == root.span_id
+    assert spans["http"].parent_id == spans["fetch"].span_id
+    assert spans["http"].duration == 0.25
+    assert spans["fetch"].attributes == {"days": 1, "points": 96}
+    assert spans["sqlite.transaction"].parent_id == root.span_id
+    assert spans["publish"].status == "error"
+    assert "broker down" in spans["publish"].error
+    
+    lines = [json.loads(line) for line in root.trace.to_ndjson().splitlines()]
+    assert len(lines) == 5
+    assert all(line["start"] >= lines[0]["start"] for line in lines)
+    assert {line["trace_id"] for line in lines} == {root.trace.trace_id}
+    
+    # Outside of a trace nothing is recorded
+    assert current_span() is NOOP_SPAN
+    with span("untraced") as untraced:
+        record_span("http", 0.1)
+    assert untraced is NOOP_SPAN
+    
+    print("✅ Spans nest across threads and record errors")
+
+
+def test_exporter_rotation_and_timeline(tmp_path):
+    """Test that the exporter keeps the newest traces and the timeline renders them."""
+    exporter = TraceExporter(str(tmp_path), keep=2, name="trace-test")
+    for _ in range(3):
+        with start_trace("cycle") as root:
+            with span("stage.fetch"):
+                record_span("http", 0.01, status=200)
+        path = exporter.export(root.trace)
+    
+    assert len(list(tmp_path.glob("trace-test-*.ndjson"))) == 2
+    
+    spans = [json.loads(line) for line in Path(path).read_text().splitlines()]
+    lines = render(spans, width=20).splitlines()
+    assert lines[1].startswith("cycle")
+    assert lines[2].startswith("  stage.fetch")
+    assert lines[3].startswith("    http")
+    assert "status=200" in lines[3]
+    
+    print("✅ Trace exporter rotates and timeline renders nesting")